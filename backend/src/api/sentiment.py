@@ -1,12 +1,20 @@
 """
 Sentiment API Endpoints
 """
+import asyncio
+import time
 from fastapi import APIRouter, Query, HTTPException, Depends
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
 from typing import List, Optional
+from backend.src.config import config
 from backend.src.storage.database import get_db
 from backend.src.models.daily_aggregate import DailyAggregate, Topic
+from backend.src.models.weighting_config import WeightingConfig
+from backend.src.services.daily_aggregator import DailyAggregator, DEFAULT_QUANTILES
+from backend.src.services.formula_engine import FormulaDomainError, FormulaError
+from backend.src.services.feature_snapshot import reweight_history
 
 router = APIRouter(prefix="/sentiment", tags=["sentiment"])
 
@@ -111,3 +119,159 @@ async def get_daily_sentiment(
         "total_retweets": aggregate.total_retweets,
         "avg_engagement_per_post": aggregate.avg_engagement_per_post
     }
+
+
+@router.get("/bot-threshold-curve")
+async def get_bot_threshold_curve(
+    day: str = Query(..., alias="date", description="Date in YYYY-MM-DD format"),
+    algorithm: str = Query("openai-gpt4", description="Sentiment algorithm"),
+    thresholds: Optional[str] = Query(None, description="Comma-separated bot-score thresholds (default: 0.00 to 1.00 in 0.05 steps)")
+):
+    """
+    Get human sentiment for a day at every bot-score threshold
+    
+    Computed on demand from the day's posts; aggregates are not modified.
+    """
+    try:
+        query_date = date.fromisoformat(day)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    
+    threshold_values = None
+    if thresholds:
+        try:
+            threshold_values = [float(value) for value in thresholds.split(",")]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Thresholds must be comma-separated numbers")
+    
+    curve = await DailyAggregator().bot_threshold_curve(query_date, algorithm, threshold_values)
+    
+    if curve is None:
+        raise HTTPException(status_code=404, detail="No scored posts found for this date and algorithm")
+    
+    return curve
+
+
+@router.get("/authors")
+async def get_distinct_authors(
+    topic: str = Query(..., description="Topic: Bitcoin, MSTR, or BitcoinTreasuries"),
+    days: int = Query(30, ge=1, le=365, description="Number of days to query"),
+    algorithm: str = Query("openai-gpt4", description="Sentiment algorithm"),
+    window: Optional[int] = Query(None, ge=1, le=365, description="Rolling window in days")
+):
+    """
+    Get approximate distinct (verified) authors over a period
+    
+    Merges the HyperLogLog sketches stored on daily aggregates, optionally
+    with a rolling-window count per day.
+    """
+    # Validate topic
+    valid_topics = ["Bitcoin", "MSTR", "BitcoinTreasuries"]
+    if topic not in valid_topics:
+        raise HTTPException(status_code=400, detail=f"Invalid topic. Must be one of: {valid_topics}")
+    
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days)
+    
+    return await DailyAggregator().distinct_authors(start_date, end_date, topic, algorithm, window)
+
+
+@router.get("/score-distribution")
+async def get_score_distribution(
+    topic: str = Query(..., description="Topic: Bitcoin, MSTR, or BitcoinTreasuries"),
+    days: int = Query(30, ge=1, le=365, description="Number of days to query"),
+    algorithm: str = Query("openai-gpt4", description="Sentiment algorithm"),
+    quantiles: Optional[str] = Query(None, description="Comma-separated quantiles 0-1 (default: 0.1,0.25,0.5,0.75,0.9)"),
+    human_only: bool = Query(False, description="Only posts below the bot threshold")
+):
+    """
+    Get Fear & Greed score quantiles and histogram over a period
+    
+    Merges the score histograms stored on daily aggregates.
+    """
+    # Validate topic
+    valid_topics = ["Bitcoin", "MSTR", "BitcoinTreasuries"]
+    if topic not in valid_topics:
+        raise HTTPException(status_code=400, detail=f"Invalid topic. Must be one of: {valid_topics}")
+    
+    quantile_values = DEFAULT_QUANTILES
+    if quantiles:
+        try:
+            quantile_values = [float(value) for value in quantiles.split(",")]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Quantiles must be comma-separated numbers")
+        if any(not 0 <= value <= 1 for value in quantile_values):
+            raise HTTPException(status_code=400, detail="Quantiles must be between 0 and 1")
+    
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days)
+    
+    return await DailyAggregator().score_distribution(
+        start_date, end_date, topic, algorithm, quantile_values, human_only
+    )
+
+
+_DEFAULT_WEIGHTING = WeightingConfig.get_default()
+
+
+class WhatIfRequest(BaseModel):
+    """Weighting config to evaluate against the feature snapshots"""
+    algorithm: str = "openai-gpt4"
+    version: str = "what-if"
+    visibility_formula: str = _DEFAULT_WEIGHTING.visibility_formula
+    influence_formula: str = _DEFAULT_WEIGHTING.influence_formula
+    bot_penalty_formula: str = _DEFAULT_WEIGHTING.bot_penalty_formula
+    verification_multiplier: float = _DEFAULT_WEIGHTING.verification_multiplier
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+
+@router.post("/what-if")
+async def what_if_reweighting(request: WhatIfRequest):
+    """
+    Re-score history under an arbitrary weighting config
+    
+    Reads the per-day feature snapshots (see FeatureSnapshotBuilder), so
+    the database is not touched and nothing is stored. Re-scoring runs in
+    a worker thread and is cut off after aggregation.what_if_timeout_seconds.
+    """
+    weighting_config = WeightingConfig(
+        version=request.version,
+        visibility_formula=request.visibility_formula,
+        influence_formula=request.influence_formula,
+        bot_penalty_formula=request.bot_penalty_formula,
+        verification_multiplier=request.verification_multiplier
+    )
+    
+    timeout = config.aggregation_config.get("what_if_timeout_seconds", 30)
+    deadline = time.monotonic() + timeout
+    
+    try:
+        # The deadline stops the worker thread too, not just the wait for it
+        days = await asyncio.wait_for(
+            asyncio.get_running_loop().run_in_executor(
+                None,
+                lambda: reweight_history(
+                    directory=config.aggregation_config.get("snapshot_directory", "data/snapshots"),
+                    algorithm=request.algorithm,
+                    config=weighting_config,
+                    start_date=request.start_date,
+                    end_date=request.end_date,
+                    deadline=deadline
+                )
+            ),
+            timeout=timeout
+        )
+    except (FormulaError, FormulaDomainError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (asyncio.TimeoutError, TimeoutError):
+        raise HTTPException(status_code=503, detail=f"Re-scoring took longer than {timeout} seconds, narrow the date range")
+    
+    if not days:
+        raise HTTPException(status_code=404, detail="No feature snapshots found for this algorithm and range")
+    
+    return {
+        "algorithm_id": request.algorithm,
+        "weighting_config_version": request.version,
+        "days": days
+    }
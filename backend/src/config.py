@@ -48,6 +48,16 @@ class Config:
         """Get sentiment analysis system prompt"""
         return self._config.get('sentiment', {}).get('openai', {}).get('system_prompt', '')
     
+    @property
+    def sentiment_batch_prompt(self) -> str:
+        """Get instructions appended to the system prompt for batched requests"""
+        return self._config.get('sentiment', {}).get('openai', {}).get('batch_prompt', '')
+    
+    @property
+    def sentiment_cache_config(self) -> Dict[str, Any]:
+        """Get sentiment result cache config"""
+        return self._config.get('sentiment', {}).get('cache', {})
+    
     @property
     def sentiment_keyword_config(self) -> Dict[str, List[str]]:
         """Get keyword sentiment config"""
@@ -58,6 +68,16 @@ class Config:
         """Get VADER sentiment config"""
         return self._config.get('sentiment', {}).get('vader', {})
     
+    @property
+    def sentiment_transformer_config(self) -> Dict[str, Any]:
+        """Get local transformer sentiment config"""
+        return self._config.get('sentiment', {}).get('transformer', {})
+    
+    @property
+    def sentiment_cascade_config(self) -> Dict[str, Any]:
+        """Get cascade (cheap analyzer, then LLM) routing config"""
+        return self._config.get('sentiment', {}).get('cascade', {})
+    
     @property
     def bot_detection_algorithm(self) -> str:
         """Get bot detection algorithm"""
@@ -83,6 +103,21 @@ class Config:
         """Get data collection config"""
         return self._config.get('collection', {})
     
+    @property
+    def analysis_config(self) -> Dict[str, Any]:
+        """Get analysis pipeline config"""
+        return self._config.get('analysis', {})
+    
+    @property
+    def http_config(self) -> Dict[str, Any]:
+        """Get shared HTTP client config"""
+        return self._config.get('http', {})
+    
+    @property
+    def aggregation_config(self) -> Dict[str, Any]:
+        """Get aggregation config"""
+        return self._config.get('aggregation', {})
+    
     @property
     def dashboard_config(self) -> Dict[str, Any]:
         """Get dashboard config"""
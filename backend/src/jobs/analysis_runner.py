@@ -0,0 +1,268 @@
+"""
+Analysis Runner
+Runs sentiment analysis and bot detection over many posts concurrently
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from backend.src.config import config
+from backend.src.services.sentiment_service import SentimentService
+from backend.src.services.bot_detector import BotDetector
+from backend.src.services.near_duplicates import NearDuplicateIndex
+from backend.src.services.weighting_calculator import WeightingCalculator
+from backend.src.storage.database import get_session
+from backend.src.models.engagement import Engagement
+
+
+DEFAULT_CONCURRENCY = 8
+PRIORITY_CHUNK_SIZE = 500
+
+
+def work_units(analyzer, texts: List[str]) -> List[List[int]]:
+    """
+    Split posts into units of work (lists of indexes into texts)
+    
+    Analyzers that batch requests (pack_batches) get one unit per
+    request; everything else gets one unit per post.
+    """
+    pack_batches = getattr(analyzer, "pack_batches", None)
+    if pack_batches is not None:
+        return pack_batches(texts)
+    return [[index] for index in range(len(texts))]
+
+
+def split_by_cluster(posts: List[Dict], representatives: Dict[str, str]):
+    """
+    Pick one post per near-duplicate cluster to analyze now
+    
+    The cluster's representative is preferred when it is among `posts`.
+    Posts missing from `representatives` (not indexed) are always analyzed.
+    
+    Returns:
+        (posts to analyze, deferred posts)
+    """
+    chosen = {}
+    for post in posts:
+        cluster = representatives.get(post["post_id"])
+        if cluster is not None and (cluster not in chosen or post["post_id"] == cluster):
+            chosen[cluster] = post["post_id"]
+    
+    leaders = set(chosen.values())
+    analyze, deferred = [], []
+    for post in posts:
+        if post["post_id"] in representatives and post["post_id"] not in leaders:
+            deferred.append(post)
+        else:
+            analyze.append(post)
+    return analyze, deferred
+
+
+def expected_weights(
+    posts: List[Dict],
+    session_factory=None,
+    calculator: Optional[WeightingCalculator] = None,
+    bot_detector: Optional[BotDetector] = None
+) -> List[float]:
+    """
+    Expected pull of each post on the weighted aggregate (same order as posts)
+    
+    The WeightingCalculator weight from the post's current engagement and
+    its author's followers and verification, with the bot penalty taken
+    from the author's heuristic bot likelihood (bot detection has not run
+    yet). Posts without an author or engagement row count zeros.
+    
+    Args:
+        posts: Dicts with post_id and author (author_data dict or None)
+    """
+    if not posts:
+        return []
+    
+    post_ids = [post["post_id"] for post in posts]
+    counts = {}
+    session = (session_factory or get_session)()
+    try:
+        for start in range(0, len(post_ids), PRIORITY_CHUNK_SIZE):
+            rows = session.query(
+                Engagement.post_id,
+                Engagement.like_count,
+                Engagement.retweet_count,
+                Engagement.reply_count,
+                Engagement.quote_count
+            ).filter(Engagement.post_id.in_(post_ids[start:start + PRIORITY_CHUNK_SIZE]))
+            counts.update((row[0], row[1:]) for row in rows)
+    finally:
+        session.close()
+    
+    bot_detector = bot_detector or BotDetector()
+    
+    def _bot_score(author: Dict) -> float:
+        # Incomplete author data only costs the post its penalty here;
+        # run_analysis reports the bot detection failure itself
+        try:
+            return bot_detector.calculate_bot_likelihood(author) if author else 0.0
+        except Exception:
+            return 0.0
+    
+    authors = [post.get("author") or {} for post in posts]
+    engagement = [counts.get(post_id, (0, 0, 0, 0)) for post_id in post_ids]
+    weights = (calculator or WeightingCalculator()).calculate_weights_batch(
+        likes=[row[0] or 0 for row in engagement],
+        retweets=[row[1] or 0 for row in engagement],
+        replies=[row[2] or 0 for row in engagement],
+        quotes=[row[3] or 0 for row in engagement],
+        followers=[author.get("followers_count") or 0 for author in authors],
+        verified=[bool(author.get("verified")) for author in authors],
+        bot_score=[_bot_score(author) for author in authors]
+    )
+    return weights.tolist()
+
+
+def prioritize(posts: List[Dict], **kwargs) -> List[Dict]:
+    """
+    Posts ordered by expected weight, highest first (ties keep their order)
+    
+    With a capped budget, analyzing in this order scores the posts that
+    move the weighted index most. Keyword arguments go to expected_weights.
+    """
+    weights = expected_weights(posts, **kwargs)
+    order = sorted(range(len(posts)), key=lambda index: -weights[index])
+    return [posts[index] for index in order]
+
+
+async def run_analysis(
+    posts: List[Dict],
+    algorithm: str,
+    concurrency: Optional[int] = None,
+    sentiment_service: Optional[SentimentService] = None,
+    bot_detector: Optional[BotDetector] = None,
+    near_duplicates: Optional[NearDuplicateIndex] = None
+) -> Dict:
+    """
+    Classify and store sentiment (and bot scores) for many posts concurrently
+    
+    Units of work run under a semaphore of `concurrency` slots; requests
+    to each provider are further capped by analysis.provider_concurrency.
+    Every unit writes its own rows, so completion order does not matter,
+    and a failing unit or post is recorded without stopping the run.
+    
+    With a near-duplicate index, posts whose cluster already has a score
+    get a copy of it, then one post per remaining cluster is analyzed and
+    its score copied to the rest. Posts that cannot reuse a score (e.g.
+    their cluster's analysis failed) are analyzed themselves.
+    
+    Args:
+        posts: Dicts with post_id, text and author (author_data dict or None)
+        algorithm: Sentiment algorithm to use
+        concurrency: Max units in flight (default: analysis.concurrency)
+        sentiment_service: SentimentService to use (default: new instance)
+        bot_detector: BotDetector to use (default: new instance)
+        near_duplicates: NearDuplicateIndex to reuse scores from (default: none)
+    
+    Returns:
+        Summary dict with results (post_id, score, bot_score, reused),
+        failures (post_id, stage, error) and throughput
+    """
+    concurrency = concurrency or config.analysis_config.get('concurrency', DEFAULT_CONCURRENCY)
+    sentiment_service = sentiment_service or SentimentService()
+    bot_detector = bot_detector or BotDetector()
+    
+    analyzer = sentiment_service.analyzers.get(algorithm)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    results = []
+    failures = []
+    progress = {"done": 0}
+    
+    def _record(post: Dict, score, reused: bool = False):
+        bot_score = None
+        if post.get("author"):
+            try:
+                bot_score = bot_detector.calculate_and_store_bot_likelihood(
+                    post_id=post["post_id"],
+                    author_data=post["author"]
+                )
+            except Exception as e:
+                failures.append({"post_id": post["post_id"], "stage": "bot_detection", "error": str(e)})
+        
+        results.append({"post_id": post["post_id"], "score": score, "bot_score": bot_score, "reused": reused})
+    
+    def _reuse(candidates: List[Dict]) -> List[Dict]:
+        """Copy scores from near-duplicates; returns the posts still without one"""
+        if near_duplicates is None or not candidates:
+            return candidates
+        try:
+            reused = near_duplicates.reuse_scores([post["post_id"] for post in candidates], algorithm)
+        except Exception as e:
+            print(f"[{datetime.now()}] ⚠️  Near-duplicate reuse failed, analyzing instead: {e}")
+            return candidates
+        
+        for post in candidates:
+            if post["post_id"] in reused:
+                _record(post, reused[post["post_id"]], reused=True)
+        progress["done"] += len(reused)
+        return [post for post in candidates if post["post_id"] not in reused]
+    
+    async def _run_unit(batch: List[Dict]) -> int:
+        async with semaphore:
+            try:
+                scores = await sentiment_service.classify_and_store_batch(
+                    [(post["post_id"], post["text"]) for post in batch],
+                    algorithm=algorithm
+                )
+            except Exception as e:
+                failures.extend(
+                    {"post_id": post["post_id"], "stage": "sentiment", "error": str(e)}
+                    for post in batch
+                )
+                return len(batch)
+        
+        for post, score in zip(batch, scores):
+            _record(post, score)
+        
+        return len(batch)
+    
+    async def _analyze(batch: List[Dict]):
+        units = work_units(analyzer, [post["text"] for post in batch])
+        print(f"[{datetime.now()}] Analyzing {len(batch)} posts with '{algorithm}': "
+              f"{len(units)} units, concurrency {concurrency}")
+        
+        for finished in asyncio.as_completed([_run_unit([batch[index] for index in unit]) for unit in units]):
+            progress["done"] += await finished
+            elapsed = time.perf_counter() - started
+            rate = progress["done"] / elapsed if elapsed else 0.0
+            print(f"[{datetime.now()}] [{progress['done']}/{len(posts)}] {rate:.1f} posts/s, "
+                  f"{len(failures)} failures", flush=True)
+    
+    started = time.perf_counter()
+    
+    pending = _reuse(posts)
+    deferred = []
+    if near_duplicates is not None and pending:
+        try:
+            representatives = near_duplicates.clusters(post["post_id"] for post in pending)
+        except Exception as e:
+            print(f"[{datetime.now()}] ⚠️  Near-duplicate lookup failed, analyzing every post: {e}")
+            representatives = {}
+        pending, deferred = split_by_cluster(pending, representatives)
+        if len(posts) > len(pending):
+            print(f"[{datetime.now()}] Near-duplicates: {len(posts) - len(pending) - len(deferred)} reused, "
+                  f"{len(deferred)} waiting on their cluster")
+    
+    if pending:
+        await _analyze(pending)
+    
+    leftover = _reuse(deferred)
+    if leftover:
+        await _analyze(leftover)
+    
+    elapsed = time.perf_counter() - started
+    return {
+        "posts": len(posts),
+        "analyzed": len(results),
+        "reused": sum(1 for result in results if result["reused"]),
+        "results": results,
+        "failures": failures,
+        "elapsed_seconds": elapsed,
+        "posts_per_second": len(posts) / elapsed if elapsed else 0.0
+    }
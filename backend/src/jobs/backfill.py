@@ -0,0 +1,290 @@
+"""
+Backfill Job
+Re-aggregates a date range in parallel, one date shard per worker process
+"""
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+from backend.src.storage.database import DATABASE_URL, create_session_factory
+from backend.src.models.weighting_config import WeightingConfig
+from backend.src.services.daily_aggregator import DailyAggregator
+
+
+DEFAULT_TOPICS = ["Bitcoin", "MSTR", "BitcoinTreasuries"]
+DEFAULT_ALGORITHMS = ["openai-gpt4", "vader"]
+DEFAULT_STATE_FILE = "data/backfill_state.json"
+
+
+def shard_date_range(
+    start_date: date,
+    end_date: date,
+    days_per_shard: int = 7
+) -> List[Tuple[date, date]]:
+    """
+    Split an inclusive date range into consecutive shards
+    
+    Args:
+        start_date: First date (inclusive)
+        end_date: Last date (inclusive)
+        days_per_shard: Number of days per shard (last shard may be shorter)
+    
+    Returns:
+        List of (shard_start, shard_end) tuples, inclusive
+    """
+    if days_per_shard < 1:
+        raise ValueError("days_per_shard must be at least 1")
+    
+    shards = []
+    shard_start = start_date
+    while shard_start <= end_date:
+        shard_end = min(shard_start + timedelta(days=days_per_shard - 1), end_date)
+        shards.append((shard_start, shard_end))
+        shard_start = shard_end + timedelta(days=1)
+    return shards
+
+
+def run_shard(
+    database_url: str,
+    start_date: date,
+    end_date: date,
+    topics: List[str],
+    algorithms: List[str],
+    weighting_version: Optional[str] = None
+) -> Dict:
+    """
+    Re-aggregate one shard (runs inside a worker process)
+    
+    Each call owns its own engine and sessions; existing aggregates in
+    the shard are replaced, so re-running a shard is safe.
+    
+    Args:
+        weighting_version: Stored WeightingConfig to weight posts with (default config if None)
+    
+    Returns:
+        Dict with shard dates, aggregates written, scored posts and elapsed seconds
+    """
+    session_factory = create_session_factory(database_url)
+    started = time.perf_counter()
+    
+    try:
+        aggregator = DailyAggregator(
+            session_factory=session_factory,
+            weighting_config=load_weighting_config(session_factory, weighting_version)
+        )
+        aggregates = asyncio.run(aggregator.aggregate_date_range(
+            start_date=start_date,
+            end_date=end_date,
+            topics=topics,
+            algorithms=algorithms,
+            replace=True
+        ))
+    finally:
+        session_factory.kw["bind"].dispose()
+    
+    # Every bucket is labelled once per topic; count its posts once
+    scored_posts = sum(
+        aggregate.total_posts for aggregate in aggregates
+        if aggregate.topic.value == aggregates[0].topic.value
+    ) if aggregates else 0
+    
+    return {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "aggregates": len(aggregates),
+        "scored_posts": scored_posts,
+        "elapsed_seconds": time.perf_counter() - started
+    }
+
+
+def load_weighting_config(session_factory, version: Optional[str]) -> Optional[WeightingConfig]:
+    """
+    Load a stored WeightingConfig by version (None for the default config)
+    
+    Raises:
+        ValueError: If no config with that version is stored
+    """
+    if version is None:
+        return None
+    
+    session = session_factory()
+    try:
+        weighting_config = session.get(WeightingConfig, version)
+    finally:
+        session.close()
+    
+    if weighting_config is None:
+        raise ValueError(f"No weighting config with version {version!r}")
+    return weighting_config
+
+
+def _refresh_statistics(database_url: str):
+    """
+    Refresh planner statistics before sharding
+    
+    Without them SQLite drives the shard query from the (unselective)
+    algorithm_id index instead of the posts.created_at range, so every
+    shard scans all scores.
+    """
+    session_factory = create_session_factory(database_url)
+    session = session_factory()
+    try:
+        session.execute(text("ANALYZE"))
+        session.commit()
+    finally:
+        session.close()
+        session_factory.kw["bind"].dispose()
+
+
+def _load_state(state_file: str, run: Dict) -> Dict[str, Dict]:
+    """Load completed shards from a previous run with the same parameters"""
+    if not state_file or not os.path.exists(state_file):
+        return {}
+    
+    try:
+        with open(state_file, 'r') as f:
+            state = json.load(f)
+    except Exception as e:
+        print(f"⚠️  Could not load backfill state: {e}")
+        return {}
+    
+    if state.get("run") != run:
+        print(f"⚠️  Backfill state in {state_file} is for a different run, starting over")
+        return {}
+    
+    return state.get("completed", {})
+
+
+def _save_state(state_file: str, run: Dict, completed: Dict[str, Dict]):
+    """Write progress atomically so an interrupted run never leaves a torn file"""
+    if not state_file:
+        return
+    
+    directory = os.path.dirname(state_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump({"run": run, "completed": completed}, f, indent=2)
+    os.replace(tmp_file, state_file)
+
+
+def run_backfill(
+    start_date: date,
+    end_date: date,
+    topics: Optional[List[str]] = None,
+    algorithms: Optional[List[str]] = None,
+    database_url: str = DATABASE_URL,
+    workers: Optional[int] = None,
+    days_per_shard: int = 7,
+    state_file: Optional[str] = DEFAULT_STATE_FILE,
+    weighting_version: Optional[str] = None
+) -> Dict:
+    """
+    Re-aggregate a date range across a process pool
+    
+    The range is split into shards of `days_per_shard` days and each shard
+    is aggregated in a separate process with its own database engine.
+    Completed shards are recorded in `state_file`; running again with the
+    same parameters resumes after the shards that already finished.
+    
+    Args:
+        start_date: First date to re-aggregate (inclusive)
+        end_date: Last date to re-aggregate (inclusive)
+        topics: Topics to label aggregates with (default: all)
+        algorithms: Sentiment algorithms to aggregate (default: openai-gpt4, vader)
+        database_url: Database URL for the workers (default: DATABASE_URL)
+        workers: Number of worker processes (default: CPU count)
+        days_per_shard: Days per shard (default: 7)
+        state_file: JSON progress file, or None to disable resume
+        weighting_version: Stored WeightingConfig to weight posts with (default config if None)
+    
+    Returns:
+        Summary dict with shard counts, aggregates, scored posts and throughput
+    """
+    topics = topics or DEFAULT_TOPICS
+    algorithms = algorithms or DEFAULT_ALGORITHMS
+    workers = workers or os.cpu_count() or 1
+    
+    run = {
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "topics": topics,
+        "algorithms": algorithms,
+        "days_per_shard": days_per_shard,
+        "weighting_version": weighting_version
+    }
+    completed = _load_state(state_file, run)
+    
+    # Fail before starting workers if the weighting config does not exist
+    session_factory = create_session_factory(database_url)
+    try:
+        load_weighting_config(session_factory, weighting_version)
+    finally:
+        session_factory.kw["bind"].dispose()
+    
+    shards = shard_date_range(start_date, end_date, days_per_shard)
+    pending = [shard for shard in shards if shard[0].isoformat() not in completed]
+    
+    print(f"[{datetime.now()}] Backfill {start_date} to {end_date}: {len(shards)} shards, "
+          f"{len(shards) - len(pending)} already done, {workers} workers")
+    
+    started = time.perf_counter()
+    results = []
+    failed = []
+    
+    if pending:
+        _refresh_statistics(database_url)
+        
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            futures = {
+                executor.submit(
+                    run_shard, database_url, shard_start, shard_end, topics, algorithms, weighting_version
+                ): (shard_start, shard_end)
+                for shard_start, shard_end in pending
+            }
+            
+            for future in as_completed(futures):
+                shard_start, shard_end = futures[future]
+                done = len(completed) + 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed.append(shard_start.isoformat())
+                    print(f"[{datetime.now()}] ✗ Shard {shard_start} to {shard_end} failed: {e}")
+                    continue
+                
+                results.append(result)
+                completed[shard_start.isoformat()] = result
+                _save_state(state_file, run, completed)
+                
+                rate = result["scored_posts"] / result["elapsed_seconds"] if result["elapsed_seconds"] else 0.0
+                print(f"[{datetime.now()}] ✓ [{done}/{len(shards)}] {shard_start} to {shard_end}: "
+                      f"{result['aggregates']} aggregates, {result['scored_posts']} posts "
+                      f"in {result['elapsed_seconds']:.2f}s ({rate:.0f} posts/s)")
+    
+    elapsed = time.perf_counter() - started
+    scored_posts = sum(result["scored_posts"] for result in results)
+    summary = {
+        "shards": len(shards),
+        "skipped": len(shards) - len(pending),
+        "completed": len(results),
+        "failed": failed,
+        "aggregates": sum(result["aggregates"] for result in results),
+        "scored_posts": scored_posts,
+        "elapsed_seconds": elapsed,
+        "posts_per_second": scored_posts / elapsed if elapsed else 0.0
+    }
+    
+    print(f"[{datetime.now()}] Backfill finished: {summary['completed']} shards, "
+          f"{summary['aggregates']} aggregates, {scored_posts} posts in {elapsed:.2f}s "
+          f"({summary['posts_per_second']:.0f} posts/s)")
+    if failed:
+        print(f"[{datetime.now()}] ⚠️  {len(failed)} shards failed; run again to retry them")
+    
+    return summary
@@ -8,8 +8,11 @@ from datetime import datetime
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from backend.src.jobs.daily_batch import run_daily_batch
+from backend.src.config import config
 from backend.src.services.daily_aggregator import DailyAggregator
-from datetime import date
+from backend.src.services.feature_snapshot import FeatureSnapshotBuilder
+from backend.src.services.http_client import close_http_clients
+from datetime import date, timedelta
 
 
 async def daily_collection_job():
@@ -43,21 +46,31 @@ async def daily_aggregation_job():
     try:
         aggregator = DailyAggregator()
         today = date.today()
+        # Late scores and engagement for recent days are folded in too
+        start_date = today - timedelta(days=config.aggregation_config.get("incremental_lookback_days", 1))
         
-        # Aggregate for each topic
         topics = ["Bitcoin", "MSTR", "BitcoinTreasuries"]
         algorithms = ["openai-gpt4", "vader"]
         
-        for topic in topics:
-            for algorithm in algorithms:
-                aggregate = await aggregator.aggregate_daily_sentiment(
-                    target_date=today,
-                    topic=topic,
-                    algorithm=algorithm
-                )
-                
-                if aggregate:
-                    print(f"[{datetime.now()}] ✓ Aggregated {topic} ({algorithm}): {aggregate.dominant_sentiment.value}")
+        # Incremental: one pass folds posts scored or changed since the last run into every day's state
+        aggregates = await aggregator.refresh_incremental_range(
+            start_date=start_date,
+            end_date=today,
+            topics=topics,
+            algorithms=algorithms
+        )
+        
+        for aggregate in aggregates:
+            print(f"[{datetime.now()}] ✓ Aggregated {aggregate.date} {aggregate.topic.value} "
+                  f"({aggregate.algorithm_id}): {aggregate.dominant_sentiment.value}")
+        
+        # Rebuild the window's feature snapshots for what-if reweighting, so
+        # late scores and engagement reach earlier days' snapshots too
+        FeatureSnapshotBuilder().build(
+            start_date=start_date,
+            end_date=today,
+            directory=config.aggregation_config.get("snapshot_directory", "data/snapshots")
+        )
         
         print(f"[{datetime.now()}] ✓ Daily aggregation completed")
         
@@ -107,6 +120,8 @@ async def run_scheduler():
     except (KeyboardInterrupt, SystemExit):
         print("\n🛑 Shutting down scheduler...")
         scheduler.shutdown()
+    finally:
+        await close_http_clients()
 
 
 if __name__ == "__main__":
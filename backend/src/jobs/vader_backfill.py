@@ -0,0 +1,108 @@
+"""
+VADER Backfill Job
+Scores every post that has no VADER score yet, across a process pool
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+from backend.src.storage.database import DATABASE_URL, create_session_factory
+from backend.src.models.post import Post
+from backend.src.models.sentiment_score import SentimentScore, SentimentClassification
+from backend.src.services.sentiment.vader_analyzer import (
+    VADERAnalyzer, DEFAULT_CHUNK_SIZE, load_intensity_analyzer
+)
+
+
+DEFAULT_PAGE_SIZE = 50_000
+
+
+def run_vader_backfill(
+    database_url: str = DATABASE_URL,
+    workers: Optional[int] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    limit: Optional[int] = None
+) -> Dict:
+    """
+    Store VADER scores for posts that do not have one
+    
+    Posts are read in pages ordered by post_id (keyset pagination, so
+    each page is an index range scan), scored in chunks on one shared
+    process pool and bulk-inserted one page per transaction. Posts that
+    already have a VADER score are skipped, so an interrupted run
+    resumes where it stopped.
+    
+    Args:
+        database_url: Database to score (default: DATABASE_URL)
+        workers: Worker processes (default: CPU count)
+        page_size: Posts read and committed per page
+        chunk_size: Posts per pool task
+        limit: Stop after this many posts (default: all)
+    
+    Returns:
+        Summary dict with posts scored, pages and throughput
+    """
+    session_factory = create_session_factory(database_url)
+    analyzer = VADERAnalyzer()
+    classification_map = {classification.value: classification for classification in SentimentClassification}
+    
+    last_post_id = ""
+    scored = 0
+    pages = 0
+    started = time.perf_counter()
+    
+    print(f"[{datetime.now()}] VADER backfill: pages of {page_size}, chunks of {chunk_size}")
+    
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=load_intensity_analyzer) as executor:
+            while limit is None or scored < limit:
+                session = session_factory()
+                try:
+                    scored_post_ids = session.query(SentimentScore.post_id).filter(
+                        SentimentScore.algorithm_id == analyzer.algorithm_id
+                    )
+                    size = page_size if limit is None else min(page_size, limit - scored)
+                    rows = session.query(Post.post_id, Post.text).filter(
+                        Post.post_id > last_post_id,
+                        ~Post.post_id.in_(scored_post_ids)
+                    ).order_by(Post.post_id).limit(size).all()
+                    if not rows:
+                        break
+                    
+                    results = analyzer.score_in_pool(
+                        [text for _, text in rows], executor=executor, chunk_size=chunk_size
+                    )
+                    now = datetime.utcnow()
+                    session.bulk_insert_mappings(SentimentScore, [
+                        {
+                            "post_id": post_id,
+                            "algorithm_id": result["algorithm_id"],
+                            "algorithm_version": result["algorithm_version"],
+                            "classification": classification_map[result["classification"]],
+                            "confidence": result["confidence"],
+                            "score": result["score"],
+                            "created_at": now
+                        }
+                        for (post_id, _), result in zip(rows, results)
+                    ])
+                    session.commit()
+                finally:
+                    session.close()
+                
+                last_post_id = rows[-1][0]
+                scored += len(rows)
+                pages += 1
+                elapsed = time.perf_counter() - started
+                print(f"[{datetime.now()}] Page {pages}: {scored} posts scored "
+                      f"({scored / elapsed if elapsed else 0.0:.0f} posts/s)", flush=True)
+    finally:
+        session_factory.kw["bind"].dispose()
+    
+    elapsed = time.perf_counter() - started
+    return {
+        "scored_posts": scored,
+        "pages": pages,
+        "elapsed_seconds": elapsed,
+        "posts_per_second": scored / elapsed if elapsed else 0.0
+    }
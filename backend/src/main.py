@@ -2,14 +2,25 @@
 X Sentiment Analysis API
 Main FastAPI application entrypoint
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.src.api.sentiment import router as sentiment_router
+from backend.src.services.http_client import close_http_clients
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Close pooled HTTP clients on shutdown"""
+    yield
+    await close_http_clients()
+
 
 app = FastAPI(
     title="X Sentiment Analysis API",
     description="Daily batch sentiment analysis for Bitcoin, MSTR, and Bitcoin treasuries",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for web deployment
@@ -10,6 +10,10 @@ from backend.src.models.sentiment_score import SentimentScore
 from backend.src.models.bot_signal import BotSignal
 from backend.src.models.weighting_config import WeightingConfig
 from backend.src.models.daily_aggregate import DailyAggregate
+from backend.src.models.daily_aggregate_state import DailyAggregateState, DailyAggregateFold, DailyAggregateAuthor
+from backend.src.models.post_signature import PostSignature, LSHBucket
+from backend.src.models.sentiment_reuse import SentimentReuse
+from backend.src.models.cascade_decision import CascadeDecision
 
 __all__ = [
     "Author",
@@ -19,5 +23,12 @@ __all__ = [
     "SentimentScore",
     "BotSignal",
     "WeightingConfig",
-    "DailyAggregate"
+    "DailyAggregate",
+    "DailyAggregateState",
+    "DailyAggregateFold",
+    "DailyAggregateAuthor",
+    "PostSignature",
+    "LSHBucket",
+    "SentimentReuse",
+    "CascadeDecision"
 ]
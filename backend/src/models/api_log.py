@@ -40,9 +40,12 @@ class APILog(Base):
     algorithm_id = Column(String, nullable=True)  # Related algorithm
     
     # Status
-    status = Column(String, nullable=False, index=True)  # 'success', 'error', 'timeout'
+    status = Column(String, nullable=False, index=True)  # 'success', 'error', 'timeout', 'cancelled'
     error_message = Column(Text, nullable=True)  # Error details if failed
     
+    # Hedging
+    hedge = Column(String, nullable=True)  # 'primary' or 'duplicate' when a duplicate request was sent
+    
     def __repr__(self):
         return f"<APILog(service={self.service}, status={self.status}, time={self.response_time_ms}ms)>"
     
@@ -0,0 +1,33 @@
+"""
+CascadeDecision Model
+Routing record of one post through the cheap-then-LLM sentiment cascade
+"""
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, ForeignKey
+from backend.src.storage.database import Base
+
+
+class CascadeDecision(Base):
+    __tablename__ = "cascade_decisions"
+    
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # Foreign Key
+    post_id = Column(String, ForeignKey("posts.post_id"), nullable=False, index=True)
+    
+    # First (cheap) analyzer's verdict
+    first_algorithm_id = Column(String, nullable=False)
+    first_classification = Column(String, nullable=False)
+    first_confidence = Column(Float, nullable=False)
+    weight = Column(Float, nullable=True)  # Engagement weight at routing time (None if unknown)
+    
+    # Routing
+    escalated = Column(Boolean, nullable=False, default=False, index=True)
+    reason = Column(String, nullable=True)  # e.g. "low_confidence", "high_weight", "low_confidence,high_weight"
+    final_algorithm_id = Column(String, nullable=False)  # Analyzer whose result was stored
+    
+    # Metadata
+    created_at = Column(DateTime, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<CascadeDecision(post_id={self.post_id}, escalated={self.escalated}, reason={self.reason})>"
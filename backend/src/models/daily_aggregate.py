@@ -2,7 +2,7 @@
 DailyAggregate Model
 Represents aggregated sentiment for a specific topic on a specific day
 """
-from sqlalchemy import Column, String, Integer, Float, Date, Enum, ForeignKey
+from sqlalchemy import Column, String, Integer, Float, Date, Enum, ForeignKey, LargeBinary
 import enum
 from backend.src.storage.database import Base
 
@@ -38,6 +38,10 @@ class DailyAggregate(Base):
     unique_authors = Column(Integer, nullable=False, default=0)
     verified_authors = Column(Integer, nullable=False, default=0)
     
+    # Mergeable HyperLogLog sketches of author IDs (for multi-day distinct counts)
+    author_sketch = Column(LargeBinary, nullable=True)
+    verified_author_sketch = Column(LargeBinary, nullable=True)
+    
     # Sentiment Distribution
     bullish_count = Column(Integer, nullable=False, default=0)
     bearish_count = Column(Integer, nullable=False, default=0)
@@ -55,6 +59,10 @@ class DailyAggregate(Base):
     human_tweet_count = Column(Integer, nullable=True)  # Count of human tweets
     bot_tweet_count = Column(Integer, nullable=True)  # Count of bot tweets (bot_score >= 0.8)
     
+    # Mergeable histograms of the 0-100 score (all posts / human posts only)
+    score_histogram = Column(LargeBinary, nullable=True)
+    human_score_histogram = Column(LargeBinary, nullable=True)
+    
     # Engagement Aggregates
     total_likes = Column(Integer, nullable=False, default=0)
     total_retweets = Column(Integer, nullable=False, default=0)
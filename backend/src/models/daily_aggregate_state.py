@@ -0,0 +1,149 @@
+"""
+DailyAggregateState Model
+Additive partial sums behind a day's DailyAggregates, and the posts and authors folded into them
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Float, Boolean, Date, DateTime, ForeignKey, LargeBinary, UniqueConstraint
+from backend.src.storage.database import Base
+
+
+class DailyAggregateState(Base):
+    __tablename__ = "daily_aggregate_states"
+    __table_args__ = (
+        UniqueConstraint("date", "algorithm_id", name="uq_daily_aggregate_state"),
+    )
+    
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # Dimensions (DailyAggregate's without topic: topics do not filter posts)
+    date = Column(Date, nullable=False, index=True)
+    algorithm_id = Column(String, nullable=False)
+    
+    # Counts
+    total_posts = Column(Integer, nullable=False, default=0)
+    bullish_count = Column(Integer, nullable=False, default=0)
+    bearish_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    bot_flagged = Column(Integer, nullable=False, default=0)
+    high_confidence = Column(Integer, nullable=False, default=0)
+    human_count = Column(Integer, nullable=False, default=0)
+    bot_count = Column(Integer, nullable=False, default=0)
+    
+    # Engagement totals
+    total_likes = Column(Integer, nullable=False, default=0)
+    total_retweets = Column(Integer, nullable=False, default=0)
+    
+    # Engagement-weighted Fear & Greed numerators/denominators
+    overall_numerator = Column(Float, nullable=False, default=0.0)
+    overall_denominator = Column(Integer, nullable=False, default=0)
+    human_numerator = Column(Float, nullable=False, default=0.0)
+    human_denominator = Column(Integer, nullable=False, default=0)
+    
+    # WeightingCalculator sums, under this weighting config
+    weighting_config_version = Column(String, nullable=False)
+    total_weight = Column(Float, nullable=False, default=0.0)
+    bullish_weight = Column(Float, nullable=False, default=0.0)
+    bearish_weight = Column(Float, nullable=False, default=0.0)
+    
+    # Distinct authors (the IDs themselves are in daily_aggregate_authors)
+    unique_authors = Column(Integer, nullable=False, default=0)
+    verified_authors = Column(Integer, nullable=False, default=0)
+    
+    # Serialized HyperLogLog sketches of the same authors
+    author_sketch = Column(LargeBinary, nullable=False)
+    verified_author_sketch = Column(LargeBinary, nullable=False)
+    
+    # Serialized ScoreHistograms of the folded scores
+    score_histogram = Column(LargeBinary, nullable=False)
+    human_score_histogram = Column(LargeBinary, nullable=False)
+    
+    # Metadata
+    updated_at = Column(DateTime, nullable=False)
+    
+    @classmethod
+    def empty(cls, date, algorithm_id):
+        """Return a zeroed state (column defaults only apply on INSERT)"""
+        return cls(
+            date=date,
+            algorithm_id=algorithm_id,
+            total_posts=0,
+            bullish_count=0,
+            bearish_count=0,
+            neutral_count=0,
+            bot_flagged=0,
+            high_confidence=0,
+            human_count=0,
+            bot_count=0,
+            total_likes=0,
+            total_retweets=0,
+            overall_numerator=0.0,
+            overall_denominator=0,
+            human_numerator=0.0,
+            human_denominator=0,
+            total_weight=0.0,
+            bullish_weight=0.0,
+            bearish_weight=0.0,
+            unique_authors=0,
+            verified_authors=0,
+            updated_at=datetime.utcnow()
+        )
+    
+    def __repr__(self):
+        return f"<DailyAggregateState(date={self.date}, algorithm={self.algorithm_id}, total_posts={self.total_posts})>"
+    
+    def as_totals(self):
+        """Return the additive totals in the shape DailyAggregator expects"""
+        return {
+            "total_posts": self.total_posts,
+            "bullish_count": self.bullish_count,
+            "bearish_count": self.bearish_count,
+            "neutral_count": self.neutral_count,
+            "total_likes": self.total_likes,
+            "total_retweets": self.total_retweets,
+            "unique_authors": self.unique_authors,
+            "verified_authors": self.verified_authors,
+            "bot_flagged": self.bot_flagged,
+            "high_confidence": self.high_confidence,
+            "overall_numerator": self.overall_numerator,
+            "overall_denominator": self.overall_denominator,
+            "human_numerator": self.human_numerator,
+            "human_denominator": self.human_denominator,
+            "human_count": self.human_count,
+            "bot_count": self.bot_count
+        }
+
+
+class DailyAggregateFold(Base):
+    __tablename__ = "daily_aggregate_folds"
+    
+    # Primary Key: a sentiment score is folded into exactly one state
+    score_id = Column(Integer, primary_key=True)
+    state_id = Column(Integer, ForeignKey("daily_aggregate_states.id"), nullable=False, index=True)
+    
+    # Late-arriving inputs as they were when folded (a change triggers a re-fold)
+    like_count = Column(Integer, nullable=False)
+    retweet_count = Column(Integer, nullable=False)
+    reply_count = Column(Integer, nullable=False)
+    quote_count = Column(Integer, nullable=False)
+    bot_score = Column(Float, nullable=True)  # NULL: no bot signal yet
+    
+    # Weight added to the state's weight sums
+    weight = Column(Float, nullable=False)
+    
+    def __repr__(self):
+        return f"<DailyAggregateFold(state_id={self.state_id}, score_id={self.score_id}, weight={self.weight:.3f})>"
+
+
+class DailyAggregateAuthor(Base):
+    __tablename__ = "daily_aggregate_authors"
+    
+    # Primary Key: one row per distinct author counted in a state
+    state_id = Column(Integer, ForeignKey("daily_aggregate_states.id"), primary_key=True)
+    user_id = Column(String, primary_key=True)
+    
+    # Whether the author was counted as verified
+    verified = Column(Boolean, nullable=False, default=False)
+    
+    def __repr__(self):
+        return f"<DailyAggregateAuthor(state_id={self.state_id}, user_id={self.user_id}, verified={self.verified})>"
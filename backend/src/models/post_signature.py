@@ -0,0 +1,47 @@
+"""
+PostSignature Model
+MinHash signature and near-duplicate cluster of a post, with its LSH band keys
+"""
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, ForeignKey, LargeBinary, Index
+from backend.src.storage.database import Base
+
+
+class PostSignature(Base):
+    __tablename__ = "post_signatures"
+    
+    # Primary Key (one signature per post)
+    post_id = Column(String, ForeignKey("posts.post_id"), primary_key=True)
+    
+    # MinHash signature (uint32 little-endian, see services/sketches/minhash.py)
+    signature = Column(LargeBinary, nullable=False)
+    
+    # Near-duplicate cluster: first indexed post of the cluster (itself for a new cluster)
+    representative_post_id = Column(String, ForeignKey("posts.post_id"), nullable=False, index=True)
+    similarity = Column(Float, nullable=False, default=1.0)  # Estimated Jaccard similarity to the matched post
+    
+    # Metadata
+    created_at = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<PostSignature(post_id={self.post_id}, representative={self.representative_post_id}, similarity={self.similarity:.2f})>"
+
+
+class LSHBucket(Base):
+    __tablename__ = "lsh_buckets"
+    __table_args__ = (
+        # Candidate lookup: every post sharing a (band, key) pair
+        Index("ix_lsh_buckets_band_key", "band", "bucket_key"),
+    )
+    
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # Band number and hash of the signature slots in that band
+    band = Column(Integer, nullable=False)
+    bucket_key = Column(BigInteger, nullable=False)
+    
+    # Foreign Key
+    post_id = Column(String, ForeignKey("posts.post_id"), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<LSHBucket(band={self.band}, bucket_key={self.bucket_key}, post_id={self.post_id})>"
@@ -0,0 +1,29 @@
+"""
+SentimentReuse Model
+Audit record of a sentiment score copied from a near-duplicate post
+"""
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey
+from backend.src.storage.database import Base
+
+
+class SentimentReuse(Base):
+    __tablename__ = "sentiment_reuses"
+    
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # The copied score and the post it was written for
+    sentiment_score_id = Column(Integer, ForeignKey("sentiment_scores.id"), nullable=False, index=True)
+    post_id = Column(String, ForeignKey("posts.post_id"), nullable=False, index=True)
+    
+    # Where the score came from
+    source_post_id = Column(String, ForeignKey("posts.post_id"), nullable=False, index=True)
+    source_score_id = Column(Integer, ForeignKey("sentiment_scores.id"), nullable=False)
+    algorithm_id = Column(String, nullable=False)
+    similarity = Column(Float, nullable=False)  # Estimated Jaccard similarity of the two posts
+    
+    # Metadata
+    created_at = Column(DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f"<SentimentReuse(post_id={self.post_id}, source={self.source_post_id}, similarity={self.similarity:.2f})>"
@@ -2,7 +2,7 @@
 SentimentScore Model
 Represents sentiment analysis result for a post
 """
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 from backend.src.storage.database import Base
@@ -17,6 +17,10 @@ class SentimentClassification(enum.Enum):
 
 class SentimentScore(Base):
     __tablename__ = "sentiment_scores"
+    __table_args__ = (
+        # Covers the per-post "first score for this algorithm" lookup in DailyAggregator
+        Index("ix_sentiment_scores_post_algorithm", "post_id", "algorithm_id"),
+    )
     
     # Primary Key
     id = Column(Integer, primary_key=True, autoincrement=True)
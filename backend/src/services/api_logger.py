@@ -29,7 +29,9 @@ class APILogger:
         response_time_ms: Optional[int] = None,
         status: str = 'success',
         error_message: Optional[str] = None,
-        context: Optional[Dict[str, Any]] = None
+        context: Optional[Dict[str, Any]] = None,
+        hedge: Optional[str] = None,
+        estimated_tokens: Optional[int] = None
     ) -> APILog:
         """
         Log an API call to the database
@@ -40,9 +42,12 @@ class APILogger:
             request_data: Request parameters
             response_data: Response data (if successful)
             response_time_ms: Response time in milliseconds
-            status: 'success', 'error', or 'timeout'
+            status: 'success', 'error', 'timeout' or 'cancelled'
             error_message: Error details if failed
             context: Additional context (post_id, algorithm_id, etc.)
+            hedge: 'primary' or 'duplicate' if the call was hedged
+            estimated_tokens: Token estimate for calls without a usage
+                report (e.g. cancelled hedges), used for cost
         
         Returns:
             APILog object
@@ -70,9 +75,13 @@ class APILogger:
             
             if response_data and 'usage' in response_data:
                 tokens_used = response_data['usage'].get('total_tokens')
-                if tokens_used and model:
-                    cost_per_token = APILogger.COST_PER_1M_TOKENS.get(model, 0) / 1_000_000
-                    cost_usd = tokens_used * cost_per_token
+            elif estimated_tokens is not None:
+                # No usage report (e.g. a cancelled hedge): cost from the estimate
+                tokens_used = estimated_tokens
+            
+            if tokens_used and model:
+                cost_per_token = APILogger.COST_PER_1M_TOKENS.get(model, 0) / 1_000_000
+                cost_usd = tokens_used * cost_per_token
             
             # Create log entry
             log_entry = APILog(
@@ -91,7 +100,8 @@ class APILogger:
                 post_id=context.get('post_id') if context else None,
                 algorithm_id=context.get('algorithm_id') if context else None,
                 status=status,
-                error_message=error_message
+                error_message=error_message,
+                hedge=hedge
             )
             
             session.add(log_entry)
@@ -99,7 +109,41 @@ class APILogger:
             session.refresh(log_entry)
             
             return log_entry
+        
+        finally:
+            session.close()
+    
+    @staticmethod
+    def log_circuit_transition(
+        service: str,
+        old_state: str,
+        new_state: str,
+        reason: str
+    ) -> APILog:
+        """
+        Log a circuit breaker state change
+        
+        Stored as an api_logs row with status 'circuit_<new state>' and the
+        reason as error_message, next to the calls that caused it.
+        """
+        session = get_session()
+        
+        try:
+            log_entry = APILog(
+                timestamp=datetime.utcnow(),
+                service=service,
+                endpoint=f"circuit_breaker:{service}",
+                request_params=json.dumps({"from": old_state, "to": new_state}),
+                status=f"circuit_{new_state}",
+                error_message=reason
+            )
+            
+            session.add(log_entry)
+            session.commit()
+            session.refresh(log_entry)
             
+            return log_entry
+        
         finally:
             session.close()
     
@@ -115,7 +159,7 @@ class APILogger:
                 query = query.filter(APILog.service == service)
             
             return query.limit(limit).all()
-            
+        
         finally:
             session.close()
     
@@ -129,25 +173,36 @@ class APILogger:
         try:
             cutoff = datetime.utcnow() - timedelta(hours=hours)
             
+            # Circuit breaker transitions are not calls
             logs = session.query(APILog).filter(
-                APILog.timestamp >= cutoff
+                APILog.timestamp >= cutoff,
+                ~APILog.status.like('circuit_%')
             ).all()
             
             total_calls = len(logs)
             successful = sum(1 for log in logs if log.status == 'success')
             failed = sum(1 for log in logs if log.status == 'error')
+            # Hedge losers and stopped runs neither succeeded nor failed
+            cancelled = sum(1 for log in logs if log.status == 'cancelled')
             total_cost = sum(log.cost_usd for log in logs if log.cost_usd)
             avg_latency = sum(log.response_time_ms for log in logs if log.response_time_ms) / total_calls if total_calls > 0 else 0
             
+            # Hedging: duplicates sent, and the cost of calls cancelled after losing a hedge
+            hedged_calls = sum(1 for log in logs if log.hedge == 'duplicate')
+            hedge_cost = sum(log.cost_usd for log in logs if log.hedge and log.status == 'cancelled' and log.cost_usd)
+            
             return {
                 'total_calls': total_calls,
                 'successful': successful,
                 'failed': failed,
-                'success_rate': (successful / total_calls * 100) if total_calls > 0 else 0,
+                'cancelled': cancelled,
+                'success_rate': (successful / (total_calls - cancelled) * 100) if total_calls > cancelled else 0,
                 'total_cost_usd': total_cost,
-                'avg_latency_ms': avg_latency
+                'avg_latency_ms': avg_latency,
+                'hedged_calls': hedged_calls,
+                'hedge_cost_usd': hedge_cost
             }
-            
+        
         finally:
             session.close()
 
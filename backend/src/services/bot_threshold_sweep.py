@@ -0,0 +1,67 @@
+"""
+Bot Threshold Sweep
+Human sentiment at every bot-score threshold from one sort and two prefix sums
+"""
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+
+# 0.00, 0.05, ..., 1.00
+DEFAULT_THRESHOLDS = [round(step * 0.05, 2) for step in range(21)]
+
+
+def human_sentiment_curve(
+    bot_score: np.ndarray,
+    score: np.ndarray,
+    engagement: np.ndarray,
+    thresholds: Optional[Iterable[float]] = None
+) -> List[Dict]:
+    """
+    Engagement-weighted human Fear & Greed score at each bot threshold
+
+    A post counts as human at threshold t when bot_score < t (the rule
+    DailyAggregator applies at HUMAN_BOT_THRESHOLD). Posts are sorted by
+    bot score once; prefix sums of score x engagement and of engagement
+    then give the human numerator/denominator for any threshold with a
+    binary search, so the whole curve costs O(n log n).
+
+    Args:
+        bot_score: Bot scores per post (missing already filled with 0.0)
+        score: 0-100 scores per post (missing already filled with 50)
+        engagement: likes + retweets per post
+        thresholds: Thresholds to evaluate (default: 0.00 to 1.00 in 0.05 steps)
+
+    Returns:
+        One dict per threshold with human/bot counts, human engagement
+        and human_sentiment_score (50 when no human engagement)
+    """
+    thresholds = np.asarray(DEFAULT_THRESHOLDS if thresholds is None else list(thresholds), dtype=np.float64)
+    bot_score = np.asarray(bot_score, dtype=np.float64)
+    score = np.asarray(score, dtype=np.float64)
+    engagement = np.asarray(engagement, dtype=np.int64)
+
+    order = np.argsort(bot_score, kind="stable")
+    sorted_bot_score = bot_score[order]
+
+    # Prefix sums with a leading zero: element k covers the k lowest bot scores
+    numerator = np.concatenate(([0.0], np.cumsum(score[order] * engagement[order])))
+    denominator = np.concatenate(([0], np.cumsum(engagement[order])))
+
+    human_counts = np.searchsorted(sorted_bot_score, thresholds, side="left")
+    total_posts = len(bot_score)
+
+    curve = []
+    for threshold, human_count in zip(thresholds, human_counts):
+        human_engagement = int(denominator[human_count])
+        curve.append({
+            "threshold": float(threshold),
+            "human_tweet_count": int(human_count),
+            "bot_tweet_count": total_posts - int(human_count),
+            "human_engagement": human_engagement,
+            "human_sentiment_score": (
+                float(numerator[human_count]) / human_engagement
+                if human_engagement > 0 else 50
+            )
+        })
+
+    return curve
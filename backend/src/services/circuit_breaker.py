@@ -0,0 +1,190 @@
+"""
+Circuit Breaker
+Stops calling a degraded provider and probes it again after a cool-down
+"""
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from backend.src.config import config
+from backend.src.services.api_logger import APILogger
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Breakers hold no event-loop state, so one per provider for the whole process
+_breakers: Dict[str, "CircuitBreaker"] = {}
+
+
+class CircuitOpenError(Exception):
+    """The provider's circuit is open; the call was not attempted"""
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker over a sliding window of calls
+    
+    While closed, the last `window_size` outcomes are kept. Once at least
+    `minimum_calls` are in the window, the circuit opens when the failure
+    rate reaches `failure_rate_threshold` or the share of calls slower
+    than `slow_call_ms` reaches `slow_call_rate_threshold`. An open
+    circuit rejects calls for `open_seconds`, then lets up to
+    `half_open_max_calls` probes through: a fast success closes it again,
+    a failure or slow call reopens it.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_ms: Optional[float] = None,
+        slow_call_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        minimum_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        on_transition: Optional[Callable[["CircuitBreaker", str, str, str], None]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_ms = slow_call_ms
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.minimum_calls = max(1, minimum_calls)
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.on_transition = on_transition
+        self._clock = clock
+        
+        self._state = CLOSED
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=max(1, window_size))  # (failed, slow)
+        self._opened_at = 0.0
+        self._probes = 0
+        
+        self.rejected = 0
+        self.transitions = 0
+    
+    @property
+    def state(self) -> str:
+        """Current state (an open circuit turns half-open once open_seconds have passed)"""
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN, f"{self.open_seconds:g}s cool-down elapsed")
+        return self._state
+    
+    def allow_request(self) -> bool:
+        """Whether a call may go out now (counts half-open probes)"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+    
+    def record_success(self, elapsed_ms: Optional[float] = None):
+        """A call completed; slow completions count against the slow-call rate"""
+        slow = self.slow_call_ms is not None and elapsed_ms is not None and elapsed_ms >= self.slow_call_ms
+        if self._state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+            if slow:
+                self._open(f"half-open probe took {elapsed_ms:.0f}ms")
+            else:
+                self._window.clear()
+                self._transition(CLOSED, "half-open probe succeeded")
+            return
+        self._window.append((False, slow))
+        self._evaluate()
+    
+    def record_failure(self, error: Optional[str] = None):
+        """A call failed (error or timeout)"""
+        if self._state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+            self._open(f"half-open probe failed: {error}" if error else "half-open probe failed")
+            return
+        self._window.append((True, False))
+        self._evaluate()
+    
+    def release(self):
+        """A call ended without a verdict on provider health (e.g. rate limited)"""
+        if self._state == HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+    
+    def _evaluate(self):
+        if self._state != CLOSED or len(self._window) < self.minimum_calls:
+            return
+        calls = len(self._window)
+        failure_rate = sum(failed for failed, _ in self._window) / calls
+        slow_rate = sum(slow for _, slow in self._window) / calls
+        if failure_rate >= self.failure_rate_threshold:
+            self._open(f"failure rate {failure_rate:.0%} over last {calls} calls")
+        elif self.slow_call_ms is not None and slow_rate >= self.slow_call_rate_threshold:
+            self._open(f"{slow_rate:.0%} of last {calls} calls slower than {self.slow_call_ms:g}ms")
+    
+    def _open(self, reason: str):
+        self._opened_at = self._clock()
+        self._probes = 0
+        self._window.clear()
+        self._transition(OPEN, reason)
+    
+    def _transition(self, new_state: str, reason: str):
+        old_state, self._state = self._state, new_state
+        self.transitions += 1
+        if self.on_transition is not None:
+            self.on_transition(self, old_state, new_state, reason)
+    
+    def stats(self) -> Dict:
+        """State, window contents and counters"""
+        return {
+            "name": self.name,
+            "state": self.state,
+            "window_calls": len(self._window),
+            "window_failures": sum(failed for failed, _ in self._window),
+            "rejected": self.rejected,
+            "transitions": self.transitions
+        }
+
+
+def breaker_settings(provider: str) -> Dict:
+    """
+    Settings for a provider from analysis.circuit_breakers in config.yaml
+    
+    "<provider>" overrides "default".
+    """
+    breakers = config.analysis_config.get('circuit_breakers', {})
+    settings = dict(breakers.get('default', {}))
+    settings.update(breakers.get(provider, {}))
+    return settings
+
+
+def _log_transition(breaker: CircuitBreaker, old_state: str, new_state: str, reason: str):
+    """Record a state change in api_logs (status circuit_<state>)"""
+    print(f"   ⚡ Circuit '{breaker.name}' {old_state} -> {new_state}: {reason}")
+    try:
+        APILogger.log_circuit_transition(breaker.name, old_state, new_state, reason)
+    except Exception as e:
+        print(f"   ⚠️ Could not log circuit transition: {e}")
+
+
+def circuit_breaker(provider: str) -> CircuitBreaker:
+    """Breaker shared by every caller of a provider in this process"""
+    if provider not in _breakers:
+        settings = breaker_settings(provider)
+        _breakers[provider] = CircuitBreaker(
+            provider,
+            failure_rate_threshold=settings.get('failure_rate_threshold', 0.5),
+            slow_call_ms=settings.get('slow_call_ms'),
+            slow_call_rate_threshold=settings.get('slow_call_rate_threshold', 0.5),
+            window_size=settings.get('window_size', 20),
+            minimum_calls=settings.get('minimum_calls', 5),
+            open_seconds=settings.get('open_seconds', 30),
+            half_open_max_calls=settings.get('half_open_max_calls', 1),
+            on_transition=_log_transition
+        )
+    return _breakers[provider]
+
+
+def circuit_breaker_stats() -> List[Dict]:
+    """stats() of every breaker created in this process"""
+    return [breaker.stats() for breaker in _breakers.values()]
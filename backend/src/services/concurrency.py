@@ -0,0 +1,35 @@
+"""
+Concurrency Limits
+Per-provider semaphores shared by every caller of an external API
+"""
+import asyncio
+from typing import Dict
+from weakref import WeakKeyDictionary
+from backend.src.config import config
+
+
+# Semaphores bind to the event loop that uses them, so keep one set per loop
+_semaphores: "WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = WeakKeyDictionary()
+
+
+def provider_limit(provider: str) -> int:
+    """Max concurrent requests for a provider (analysis.provider_concurrency in config.yaml)"""
+    analysis_config = config.analysis_config
+    limit = analysis_config.get('provider_concurrency', {}).get(
+        provider, analysis_config.get('default_provider_concurrency', 4)
+    )
+    return max(1, int(limit))
+
+
+def provider_semaphore(provider: str) -> asyncio.Semaphore:
+    """
+    Semaphore limiting in-flight requests to a provider
+    
+    Every analyzer talking to the same provider shares one semaphore
+    per event loop, so the limit holds across analyzers and tasks.
+    """
+    loop = asyncio.get_running_loop()
+    semaphores = _semaphores.setdefault(loop, {})
+    if provider not in semaphores:
+        semaphores[provider] = asyncio.Semaphore(provider_limit(provider))
+    return semaphores[provider]
@@ -2,9 +2,16 @@
 Daily Aggregator Service
 Creates daily aggregate sentiment records from individual posts
 """
-from datetime import date, datetime
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import groupby
+from types import SimpleNamespace
+import numpy as np
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import Integer, and_, case, cast, distinct, func, or_, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Query, Session, aliased
 from backend.src.storage.database import get_session
 from backend.src.models.post import Post
 from backend.src.models.sentiment_score import SentimentScore, SentimentClassification
@@ -12,20 +19,57 @@ from backend.src.models.engagement import Engagement
 from backend.src.models.author import Author
 from backend.src.models.bot_signal import BotSignal
 from backend.src.models.daily_aggregate import DailyAggregate, Topic, DominantSentiment
-from backend.src.services.weighting_calculator import WeightingCalculator
+from backend.src.models.daily_aggregate_state import DailyAggregateState, DailyAggregateFold, DailyAggregateAuthor
+from backend.src.models.weighting_config import WeightingConfig
+from backend.src.services.bot_threshold_sweep import human_sentiment_curve
+from backend.src.services.sketches import HyperLogLog, ScoreHistogram
+from backend.src.services.weighting_calculator import WeightingCalculator, SENTIMENT_CODES, sequential_sum
+
+
+# Quantiles reported by score_distribution by default
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Map topic names to enum
+TOPIC_MAP = {
+    "Bitcoin": Topic.BITCOIN,
+    "MSTR": Topic.MSTR,
+    "BitcoinTreasuries": Topic.BITCOIN_TREASURIES
+}
+
+# Same thresholds as BotSignal.is_likely_bot / SentimentScore.is_high_confidence
+LIKELY_BOT_SCORE = 0.7
+HIGH_CONFIDENCE = 0.7
 
 
 class DailyAggregator:
     """Aggregates daily sentiment data"""
     
-    def __init__(self):
-        self.weighting_calculator = WeightingCalculator()
+    # Rows fetched per round-trip when streaming a day's posts
+    CHUNK_SIZE = 1000
+    
+    # Bot score at or above which a post is excluded from human sentiment
+    HUMAN_BOT_THRESHOLD = 0.8
+    
+    # Authors looked up per IN (...) query during incremental refreshes
+    AUTHOR_CHUNK_SIZE = 500
+    
+    def __init__(self, session_factory=None, weighting_config: Optional[WeightingConfig] = None):
+        """
+        Args:
+            session_factory: Callable returning a Session (defaults to get_session)
+            weighting_config: WeightingConfig for post weights (default config if None)
+        """
+        self.weighting_calculator = WeightingCalculator(weighting_config)
+        self.session_factory = session_factory or get_session
+        # Engine -> whether it supports the SQL math functions weights need
+        self._sql_math = {}
     
     async def aggregate_daily_sentiment(
         self,
         target_date: date,
         topic: str,
-        algorithm: str = "openai-gpt4"
+        algorithm: str = "openai-gpt4",
+        mode: str = "rows"
     ) -> Optional[DailyAggregate]:
         """
         Create daily aggregate for a specific date and topic
@@ -34,17 +78,30 @@ class DailyAggregator:
             target_date: Date to aggregate
             topic: Topic (Bitcoin, MSTR, BitcoinTreasuries)
             algorithm: Algorithm to use for sentiment scores
+            mode: "rows" streams post rows into Python, "sql" computes
+                counts and engagement-weighted scores with SQL aggregates,
+                "incremental" folds new and changed posts into stored
+                partial sums and upserts the aggregate
         
         Returns:
             DailyAggregate object or None if no data
         """
-        session = get_session()
+        if mode == "incremental":
+            return await self.refresh_incremental(target_date, topic, algorithm)
+        
+        if mode == "sql":
+            aggregates = await self.aggregate_date_range_sql(
+                target_date, target_date, topic, algorithm
+            )
+            return aggregates[0] if aggregates else None
+        
+        session = self.session_factory()
         
         try:
             # Check if aggregate already exists
             existing_aggregate = session.query(DailyAggregate).filter(
                 DailyAggregate.date == target_date,
-                DailyAggregate.topic == Topic[topic.upper()],
+                DailyAggregate.topic == TOPIC_MAP.get(topic, Topic.BITCOIN),
                 DailyAggregate.algorithm_id == algorithm
             ).first()
             
@@ -53,187 +110,1380 @@ class DailyAggregator:
                 print(f"   Delete it first or use a different algorithm")
                 return existing_aggregate
             
-            # Query posts for this date
+            # Stream every scored post for this date in a single joined query
             start_datetime = datetime.combine(target_date, datetime.min.time())
             end_datetime = datetime.combine(target_date, datetime.max.time())
             
-            posts = session.query(Post).filter(
-                Post.created_at >= start_datetime,
-                Post.created_at <= end_datetime
-            ).all()
+            rows = self.post_rows_query(
+                session, start_datetime, end_datetime, [algorithm]
+            ).yield_per(self.CHUNK_SIZE)
+            
+            aggregate = self._build_aggregate(rows, target_date, topic, algorithm)
             
-            if not posts:
+            if aggregate is None:
                 return None
             
-            # Collect post data with all needed info
-            post_data_list = []
-            
-            bullish_count = 0
-            bearish_count = 0
-            neutral_count = 0
-            total_likes = 0
-            total_retweets = 0
-            unique_authors = set()
-            verified_authors = set()
-            bot_flagged = 0
-            high_confidence = 0
-            
-            for post in posts:
-                # Get sentiment score
-                sentiment_score = session.query(SentimentScore).filter(
-                    SentimentScore.post_id == post.post_id,
-                    SentimentScore.algorithm_id == algorithm
-                ).first()
-                
-                if not sentiment_score:
-                    continue
-                
-                # Get engagement
-                engagement = session.query(Engagement).filter(
-                    Engagement.post_id == post.post_id
-                ).first()
-                
-                # Get author
-                author = session.query(Author).filter(
-                    Author.user_id == post.author_id
-                ).first()
-                
-                # Get bot signal
-                bot_signal = session.query(BotSignal).filter(
-                    BotSignal.post_id == post.post_id
-                ).first()
-                
-                if not engagement or not author:
-                    continue
-                
-                # Count metrics
-                if sentiment_score.classification == SentimentClassification.BULLISH:
-                    bullish_count += 1
-                elif sentiment_score.classification == SentimentClassification.BEARISH:
-                    bearish_count += 1
+            session.add(aggregate)
+            session.commit()
+            session.refresh(aggregate)
+            
+            return aggregate
+            
+        finally:
+            session.close()
+    
+    async def refresh_incremental(
+        self,
+        target_date: date,
+        topic: str,
+        algorithm: str = "openai-gpt4"
+    ) -> Optional[DailyAggregate]:
+        """
+        Fold new and changed posts into a day's aggregate
+        
+        Single-day form of refresh_incremental_range.
+        
+        Args:
+            target_date: Date to aggregate
+            topic: Topic (Bitcoin, MSTR, BitcoinTreasuries)
+            algorithm: Algorithm to use for sentiment scores
+        
+        Returns:
+            DailyAggregate object or None if no data
+        """
+        aggregates = await self.refresh_incremental_range(target_date, target_date, [topic], [algorithm])
+        if aggregates:
+            return aggregates[0]
+        
+        # Nothing new: return the stored aggregate as is
+        session = self.session_factory()
+        try:
+            return session.query(DailyAggregate).filter(
+                DailyAggregate.date == target_date,
+                DailyAggregate.topic == TOPIC_MAP.get(topic, Topic.BITCOIN),
+                DailyAggregate.algorithm_id == algorithm
+            ).first()
+        finally:
+            session.close()
+    
+    async def refresh_incremental_range(
+        self,
+        start_date: date,
+        end_date: date,
+        topics: List[str],
+        algorithms: List[str]
+    ) -> List[DailyAggregate]:
+        """
+        Fold new and changed posts into the aggregates of a date range
+        
+        Additive partial sums are kept in one DailyAggregateState per
+        (date, algorithm); topics do not filter posts, so the same state
+        labels every topic's aggregate. Every score folded in is recorded
+        in daily_aggregate_folds along with the engagement counts and bot
+        score it was folded with. One query anti-joins the range's scored
+        posts against that record, so the database returns only the delta:
+        
+        - scores not folded yet, whatever their id order, including
+          posts whose engagement row arrived after an earlier refresh
+          (posts without one are not joined, and not recorded, until it
+          does);
+        - folded posts whose engagement counts or bot signal changed
+          since, which are taken back out and folded in again.
+        
+        Distinct authors are counted through a keyed author table and
+        HyperLogLog sketches on the state, so a refresh touches only the
+        authors of the rows it folds. Author follower counts and
+        verification are taken as of the fold and not revisited.
+        States folded under another weighting config are rebuilt.
+        
+        Args:
+            start_date: First date to refresh (inclusive)
+            end_date: Last date to refresh (inclusive)
+            topics: Topics (Bitcoin, MSTR, BitcoinTreasuries)
+            algorithms: Algorithms to use for sentiment scores
+        
+        Returns:
+            Aggregates created or updated (days with new or changed
+            posts, or without an aggregate for a topic yet), ordered by date
+        """
+        session = self.session_factory()
+        # Keep returned aggregates readable after the session closes
+        session.expire_on_commit = False
+        
+        try:
+            version = self.weighting_calculator.config["version"]
+            states = {}
+            for state in session.query(DailyAggregateState).filter(
+                DailyAggregateState.date >= start_date,
+                DailyAggregateState.date <= end_date,
+                DailyAggregateState.algorithm_id.in_(algorithms)
+            ):
+                if state.weighting_config_version != version:
+                    # Folded weights came from another config: rebuild from scratch
+                    self._delete_state(session, state)
                 else:
-                    neutral_count += 1
-                
-                total_likes += engagement.like_count
-                total_retweets += engagement.retweet_count
-                
-                unique_authors.add(author.user_id)
-                if author.verified:
-                    verified_authors.add(author.user_id)
-                
-                if bot_signal and bot_signal.is_likely_bot:
-                    bot_flagged += 1
-                
-                if sentiment_score.is_high_confidence:
-                    high_confidence += 1
-                
-                # Prepare data for weighting
-                post_data_list.append({
-                    "sentiment": sentiment_score.classification.value,
-                    "confidence": sentiment_score.confidence,
-                    "score": sentiment_score.score if sentiment_score.score else 50,  # New: 0-100 score
-                    "engagement": {
-                        "like_count": engagement.like_count,
-                        "retweet_count": engagement.retweet_count,
-                        "reply_count": engagement.reply_count,
-                        "quote_count": engagement.quote_count
-                    },
-                    "author": {
-                        "followers_count": author.followers_count,
-                        "verified": author.verified
-                    },
-                    "bot_score": bot_signal.score if bot_signal else 0.0
-                })
+                    states[(state.date, state.algorithm_id)] = state
             
-            if not post_data_list:
-                return None
+            start_datetime = datetime.combine(start_date, datetime.min.time())
+            end_datetime = datetime.combine(end_date, datetime.max.time())
             
-            # Calculate weighted sentiment
-            weighted_result = self.weighting_calculator.calculate_weighted_sentiment(post_data_list)
+            # A score belongs to exactly one state, so its fold is found by score id alone
+            rows = self.post_rows_query(
+                session, start_datetime, end_datetime, algorithms
+            ).add_entity(DailyAggregateFold).outerjoin(
+                DailyAggregateFold, DailyAggregateFold.score_id == SentimentScore.id
+            ).filter(or_(
+                DailyAggregateFold.score_id.is_(None),
+                DailyAggregateFold.like_count != Engagement.like_count,
+                DailyAggregateFold.retweet_count != Engagement.retweet_count,
+                DailyAggregateFold.reply_count != Engagement.reply_count,
+                DailyAggregateFold.quote_count != Engagement.quote_count,
+                DailyAggregateFold.bot_score.is_distinct_from(BotSignal.score)
+            )).all()
             
-            # NEW: Calculate dual sentiment scores (0-100 Fear & Greed)
-            BOT_THRESHOLD = 0.8
+            rows_by_state = defaultdict(list)
+            for row in rows:
+                rows_by_state[(row.created_at.date(), row.algorithm_id)].append(row)
             
-            # Overall score (all tweets, weighted by engagement)
-            overall_numerator = 0
-            overall_denominator = 0
+            for (day, algorithm), state_rows in rows_by_state.items():
+                state = states.get((day, algorithm))
+                if state is None:
+                    state = self._empty_state(day, algorithm)
+                    session.add(state)
+                    session.flush()  # assigns state.id for the fold and author keys
+                    states[(day, algorithm)] = state
+                self._fold_state(session, state, state_rows)
             
-            # Human score (bot_score < 0.8, weighted by engagement)
-            human_numerator = 0
-            human_denominator = 0
-            human_count = 0
-            bot_count = 0
+            topic_enums = [TOPIC_MAP.get(topic, Topic.BITCOIN) for topic in topics]
+            existing_keys = {
+                (row.date, row.topic, row.algorithm_id)
+                for row in session.query(
+                    DailyAggregate.date, DailyAggregate.topic, DailyAggregate.algorithm_id
+                ).filter(
+                    DailyAggregate.date >= start_date,
+                    DailyAggregate.date <= end_date,
+                    DailyAggregate.topic.in_(topic_enums),
+                    DailyAggregate.algorithm_id.in_(algorithms)
+                )
+            }
             
-            for post_data in post_data_list:
-                score = post_data["score"]
-                engagement = post_data["engagement"]["like_count"] + post_data["engagement"]["retweet_count"]
-                bot_score = post_data["bot_score"]
-                
-                # Overall (all tweets)
-                overall_numerator += score * engagement
-                overall_denominator += engagement
+            aggregates = []
+            for (day, algorithm), state in sorted(states.items()):
+                for topic, topic_enum in zip(topics, topic_enums):
+                    if (day, algorithm) not in rows_by_state and (day, topic_enum, algorithm) in existing_keys:
+                        continue
+                    aggregates.append(self._upsert_aggregate(session, self._state_aggregate(state, topic)))
+            
+            session.commit()
+            return aggregates
+            
+        finally:
+            session.close()
+    
+    def _fold_state(self, session: Session, state: DailyAggregateState, rows: List):
+        """
+        Fold anti-joined rows (with their DailyAggregateFold, if any) into a state
+        
+        Args:
+            session: Database session
+            state: Partial sums to update in place
+            rows: post_rows_query rows with a DailyAggregateFold entity
+        """
+        histograms = tuple(
+            ScoreHistogram.from_bytes(data)
+            for data in (state.score_histogram, state.human_score_histogram)
+        )
+        authors = {}
+        
+        for row in rows:
+            fold = row.DailyAggregateFold
+            if fold is None:
+                fold = DailyAggregateFold(state_id=state.id, score_id=row.score_id)
+                session.add(fold)
+            else:
+                # Engagement or bot signal changed: take the old contribution back out
+                folded = row._asdict()
+                folded.update(
+                    like_count=fold.like_count,
+                    retweet_count=fold.retweet_count,
+                    reply_count=fold.reply_count,
+                    quote_count=fold.quote_count,
+                    bot_score=fold.bot_score
+                )
+                self._fold_row(state, SimpleNamespace(**folded), histograms, sign=-1, weight=fold.weight)
+            
+            fold.weight = self._fold_row(state, row, histograms)
+            fold.like_count = row.like_count
+            fold.retweet_count = row.retweet_count
+            fold.reply_count = row.reply_count
+            fold.quote_count = row.quote_count
+            fold.bot_score = row.bot_score
+            authors[row.user_id] = authors.get(row.user_id, False) or bool(row.verified)
+        
+        self._fold_authors(session, state, authors)
+        state.score_histogram = histograms[0].to_bytes()
+        state.human_score_histogram = histograms[1].to_bytes()
+        state.updated_at = datetime.utcnow()
+    
+    def _state_aggregate(self, state: DailyAggregateState, topic: str) -> DailyAggregate:
+        """Build a topic's (unsaved) aggregate from a state's partial sums"""
+        weighted_result = self.weighting_calculator.summarize_weights(
+            state.bullish_weight, state.bearish_weight, state.total_weight
+        )
+        totals = {
+            **state.as_totals(),
+            "author_sketch": state.author_sketch,
+            "verified_author_sketch": state.verified_author_sketch,
+            "score_histogram": state.score_histogram,
+            "human_score_histogram": state.human_score_histogram
+        }
+        return self._make_aggregate(state.date, topic, state.algorithm_id, totals, weighted_result)
+    
+    async def aggregate_date_range(
+        self,
+        start_date: date,
+        end_date: date,
+        topics: List[str],
+        algorithms: List[str],
+        replace: bool = False
+    ) -> List[DailyAggregate]:
+        """
+        Aggregate a whole date range for several topics and algorithms in one pass
+        
+        Streams every scored post in the range once (one row per post and
+        algorithm, ordered by time), buckets rows by (date, algorithm) and
+        holds only one day in memory at a time. Topics do not filter posts,
+        so each bucket is summarized once and labelled per topic. All
+        aggregates are written in a single bulk insert.
+        
+        Args:
+            start_date: First date to aggregate (inclusive)
+            end_date: Last date to aggregate (inclusive)
+            topics: Topics (Bitcoin, MSTR, BitcoinTreasuries)
+            algorithms: Algorithms to use for sentiment scores
+            replace: Delete and recompute existing aggregates in the range,
+                and delete their incremental states so later refreshes
+                rebuild them (default skips them, like aggregate_daily_sentiment)
+        
+        Returns:
+            List of newly created DailyAggregate objects (without ids), ordered by date
+        """
+        session = self.session_factory()
+        # Keep returned aggregates readable after the session closes
+        session.expire_on_commit = False
+        
+        try:
+            topic_enums = [TOPIC_MAP.get(topic, Topic.BITCOIN) for topic in topics]
+            existing = session.query(DailyAggregate).filter(
+                DailyAggregate.date >= start_date,
+                DailyAggregate.date <= end_date,
+                DailyAggregate.topic.in_(topic_enums),
+                DailyAggregate.algorithm_id.in_(algorithms)
+            )
+            
+            if replace:
+                existing.delete(synchronize_session=False)
+                existing_keys = set()
+                states = session.query(DailyAggregateState).filter(
+                    DailyAggregateState.date >= start_date,
+                    DailyAggregateState.date <= end_date,
+                    DailyAggregateState.algorithm_id.in_(algorithms)
+                ).all()
+                for state in states:
+                    self._delete_state(session, state)
+            else:
+                existing_keys = {
+                    (row.date, row.topic, row.algorithm_id)
+                    for row in existing.with_entities(
+                        DailyAggregate.date, DailyAggregate.topic, DailyAggregate.algorithm_id
+                    )
+                }
+            
+            start_datetime = datetime.combine(start_date, datetime.min.time())
+            end_datetime = datetime.combine(end_date, datetime.max.time())
+            
+            rows = self.post_rows_query(
+                session, start_datetime, end_datetime, algorithms
+            ).yield_per(self.CHUNK_SIZE)
+            
+            aggregates = []
+            for day, day_rows in groupby(rows, key=lambda row: row.created_at.date()):
+                rows_by_algorithm = defaultdict(list)
+                for row in day_rows:
+                    rows_by_algorithm[row.algorithm_id].append(row)
                 
-                # Human only (bot_score < 0.8)
-                if bot_score < BOT_THRESHOLD:
-                    human_numerator += score * engagement
-                    human_denominator += engagement
-                    human_count += 1
-                else:
-                    bot_count += 1
+                for algorithm in algorithms:
+                    summary = self._summarize_rows(rows_by_algorithm.get(algorithm, []))
+                    if summary is None:
+                        continue
+                    
+                    totals, weighted_result = summary
+                    for topic, topic_enum in zip(topics, topic_enums):
+                        if (day, topic_enum, algorithm) in existing_keys:
+                            continue
+                        aggregates.append(self._make_aggregate(
+                            day, topic, algorithm, totals, weighted_result
+                        ))
             
-            overall_sentiment_score = overall_numerator / overall_denominator if overall_denominator > 0 else 50
-            human_sentiment_score = human_numerator / human_denominator if human_denominator > 0 else 50
+            # One executemany INSERT (primary keys are not fetched back)
+            session.bulk_save_objects(aggregates)
+            session.commit()
             
-            # Map dominant sentiment to enum
-            dominant_map = {
-                "Bullish": DominantSentiment.BULLISH,
-                "Bearish": DominantSentiment.BEARISH,
-                "Neutral": DominantSentiment.NEUTRAL
-            }
+            return aggregates
             
-            # Map topic to enum
-            topic_map = {
-                "Bitcoin": Topic.BITCOIN,
-                "MSTR": Topic.MSTR,
-                "BitcoinTreasuries": Topic.BITCOIN_TREASURIES
+        finally:
+            session.close()
+    
+    async def aggregate_date_range_sql(
+        self,
+        start_date: date,
+        end_date: date,
+        topic: str,
+        algorithm: str = "openai-gpt4"
+    ) -> List[DailyAggregate]:
+        """
+        Create daily aggregates for a date range using SQL aggregates
+        
+        Counts, engagement totals, distinct authors, the engagement-
+        weighted Fear & Greed scores and the summed post weights come from
+        a single GROUP BY date query, and the score histograms from a
+        GROUP BY (date, bin) query, so only a few rows per day cross the
+        wire. The weights need ln/sqrt/power in SQL; on databases without
+        them (SQLite built without math functions) a narrow projection of
+        the weighting inputs is streamed and reduced with
+        WeightingCalculator's batch API instead.
+        Days that already have an aggregate are left untouched.
+        
+        Args:
+            start_date: First date to aggregate (inclusive)
+            end_date: Last date to aggregate (inclusive)
+            topic: Topic (Bitcoin, MSTR, BitcoinTreasuries)
+            algorithm: Algorithm to use for sentiment scores
+        
+        Returns:
+            List of newly created DailyAggregate objects, ordered by date
+        """
+        session = self.session_factory()
+        
+        try:
+            start_datetime = datetime.combine(start_date, datetime.min.time())
+            end_datetime = datetime.combine(end_date, datetime.max.time())
+            
+            existing_dates = {
+                row.date for row in session.query(DailyAggregate.date).filter(
+                    DailyAggregate.date >= start_date,
+                    DailyAggregate.date <= end_date,
+                    DailyAggregate.topic == TOPIC_MAP.get(topic, Topic.BITCOIN),
+                    DailyAggregate.algorithm_id == algorithm
+                )
             }
             
-            total_posts = len(post_data_list)
-            
-            # Create aggregate
-            aggregate = DailyAggregate(
-                date=target_date,
-                topic=topic_map.get(topic, Topic.BITCOIN),
-                algorithm_id=algorithm,
-                total_posts=total_posts,
-                total_posts_after_bot_filter=total_posts - bot_flagged,
-                unique_authors=len(unique_authors),
-                verified_authors=len(verified_authors),
-                bullish_count=bullish_count,
-                bearish_count=bearish_count,
-                neutral_count=neutral_count,
-                weighted_score=weighted_result["weighted_score"],
-                weighted_bullish_score=weighted_result.get("bullish_weight", 0.0),
-                weighted_bearish_score=weighted_result.get("bearish_weight", 0.0),
-                dominant_sentiment=dominant_map[weighted_result["dominant_sentiment"]],
-                total_likes=total_likes,
-                total_retweets=total_retweets,
-                avg_engagement_per_post=(total_likes + total_retweets) / total_posts if total_posts > 0 else 0,
-                bot_detection_rate=(bot_flagged / total_posts * 100) if total_posts > 0 else 0,
-                high_confidence_sentiment_pct=(high_confidence / total_posts * 100) if total_posts > 0 else 0,
-                weighting_config_version="v1.0",
-                # NEW: Dual sentiment scores
-                overall_sentiment_score=overall_sentiment_score,
-                human_sentiment_score=human_sentiment_score,
-                human_tweet_count=human_count,
-                bot_tweet_count=bot_count
+            sql_weights = self._sql_math_available(session)
+            totals_by_date = self._daily_totals_sql(
+                session, start_datetime, end_datetime, algorithm, weights=sql_weights
             )
+            if sql_weights:
+                histograms_by_date = self._daily_histograms_sql(
+                    session, start_datetime, end_datetime, algorithm
+                )
+                weighted_by_date = {
+                    day: (
+                        self.weighting_calculator.summarize_weights(
+                            totals["bullish_weight"], totals["bearish_weight"], totals["total_weight"]
+                        ),
+                        histograms_by_date[day]
+                    )
+                    for day, totals in totals_by_date.items()
+                }
+            else:
+                weighted_by_date = self._daily_weights(
+                    session, start_datetime, end_datetime, algorithm
+                )
             
-            session.add(aggregate)
+            aggregates = []
+            for day in sorted(totals_by_date):
+                if day in existing_dates:
+                    continue
+                weighted_result, histograms = weighted_by_date[day]
+                aggregates.append(self._make_aggregate(
+                    day, topic, algorithm, {**totals_by_date[day], **histograms}, weighted_result
+                ))
+            
+            session.add_all(aggregates)
             session.commit()
-            session.refresh(aggregate)
+            for aggregate in aggregates:
+                session.refresh(aggregate)
             
-            return aggregate
+            return aggregates
+            
+        finally:
+            session.close()
+    
+    async def bot_threshold_curve(
+        self,
+        target_date: date,
+        algorithm: str = "openai-gpt4",
+        thresholds: Optional[Iterable[float]] = None
+    ) -> Optional[Dict]:
+        """
+        Human sentiment for one day at a range of bot-score thresholds
+        
+        Answers "what would human_sentiment_score be at 0.5/0.6/.../0.9"
+        from a single query and one sort (see human_sentiment_curve).
+        Nothing is stored.
+        
+        Args:
+            target_date: Date to analyze
+            algorithm: Algorithm to use for sentiment scores
+            thresholds: Bot-score thresholds (default: 0.00 to 1.00 in 0.05 steps)
+        
+        Returns:
+            Dict with date, algorithm_id, total_posts, overall_sentiment_score,
+            the current human_bot_threshold and the curve, or None if no data
+        """
+        session = self.session_factory()
+        
+        try:
+            start_datetime = datetime.combine(target_date, datetime.min.time())
+            end_datetime = datetime.combine(target_date, datetime.max.time())
             
+            columns = self._row_columns(self.post_rows_query(
+                session, start_datetime, end_datetime, [algorithm]
+            ).yield_per(self.CHUNK_SIZE))
+        finally:
+            session.close()
+        
+        if columns is None:
+            return None
+        
+        engagement = columns["likes"] + columns["retweets"]
+        total_engagement = int(engagement.sum())
+        
+        return {
+            "date": target_date.isoformat(),
+            "algorithm_id": algorithm,
+            "total_posts": len(engagement),
+            "overall_sentiment_score": (
+                sequential_sum(columns["score"] * engagement) / total_engagement
+                if total_engagement > 0 else 50
+            ),
+            "human_bot_threshold": self.HUMAN_BOT_THRESHOLD,
+            "curve": human_sentiment_curve(
+                columns["bot_score"], columns["score"], engagement, thresholds
+            )
+        }
+    
+    async def distinct_authors(
+        self,
+        start_date: date,
+        end_date: date,
+        topic: str,
+        algorithm: str = "openai-gpt4",
+        window_days: Optional[int] = None
+    ) -> Dict:
+        """
+        Approximate distinct (verified) authors over a date range
+        
+        Unions the HyperLogLog sketches stored on each DailyAggregate, so
+        weekly, monthly or rolling counts never rescan posts. Days whose
+        aggregate has no sketch (SQL mode, or written before sketches
+        existed) are counted in days_without_sketch and contribute nothing.
+        
+        Args:
+            start_date: First date (inclusive)
+            end_date: Last date (inclusive)
+            topic: Topic (Bitcoin, MSTR, BitcoinTreasuries)
+            algorithm: Algorithm the aggregates were built with
+            window_days: Also return a rolling count over this many days,
+                one point per aggregated day in the range
+        
+        Returns:
+            Dict with unique_authors, verified_authors, days,
+            days_without_sketch and (with window_days) rolling
+        """
+        first_date = start_date - timedelta(days=window_days - 1) if window_days else start_date
+        session = self.session_factory()
+        
+        try:
+            rows = session.query(
+                DailyAggregate.date,
+                DailyAggregate.author_sketch,
+                DailyAggregate.verified_author_sketch
+            ).filter(
+                DailyAggregate.date >= first_date,
+                DailyAggregate.date <= end_date,
+                DailyAggregate.topic == TOPIC_MAP.get(topic, Topic.BITCOIN),
+                DailyAggregate.algorithm_id == algorithm
+            ).order_by(DailyAggregate.date).all()
+        finally:
+            session.close()
+        
+        days = [row.date for row in rows]
+        authors = _sketch_registers([row.author_sketch for row in rows])
+        verified = _sketch_registers([row.verified_author_sketch for row in rows])
+        in_range = [i for i, day in enumerate(days) if day >= start_date]
+        
+        result = {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "topic": topic,
+            "algorithm_id": algorithm,
+            "days": len(in_range),
+            "days_without_sketch": sum(1 for i in in_range if rows[i].author_sketch is None),
+            "unique_authors": _union_count(authors[in_range]),
+            "verified_authors": _union_count(verified[in_range])
+        }
+        
+        if window_days:
+            rolling = []
+            for i in in_range:
+                first = bisect_left(days, days[i] - timedelta(days=window_days - 1))
+                rolling.append({
+                    "date": days[i].isoformat(),
+                    "unique_authors": _union_count(authors[first:i + 1]),
+                    "verified_authors": _union_count(verified[first:i + 1])
+                })
+            result["window_days"] = window_days
+            result["rolling"] = rolling
+        
+        return result
+    
+    async def score_distribution(
+        self,
+        start_date: date,
+        end_date: date,
+        topic: str,
+        algorithm: str = "openai-gpt4",
+        quantiles: Iterable[float] = DEFAULT_QUANTILES,
+        human_only: bool = False
+    ) -> Dict:
+        """
+        Score quantiles and histogram over a date range
+        
+        Sums the score histograms stored on each DailyAggregate, so
+        medians, p10/p90 or a distribution chart never reload scores.
+        Quantiles are accurate to one histogram bin (1 point).
+        
+        Args:
+            start_date: First date (inclusive)
+            end_date: Last date (inclusive)
+            topic: Topic (Bitcoin, MSTR, BitcoinTreasuries)
+            algorithm: Algorithm the aggregates were built with
+            quantiles: Quantiles to report (0-1)
+            human_only: Use only posts below HUMAN_BOT_THRESHOLD
+        
+        Returns:
+            Dict with days, days_without_histogram, total_posts, mean,
+            quantiles ({"p50": ...}, None when empty) and histogram
+        """
+        column = DailyAggregate.human_score_histogram if human_only else DailyAggregate.score_histogram
+        session = self.session_factory()
+        
+        try:
+            histograms = [
+                data for (data,) in session.query(column).filter(
+                    DailyAggregate.date >= start_date,
+                    DailyAggregate.date <= end_date,
+                    DailyAggregate.topic == TOPIC_MAP.get(topic, Topic.BITCOIN),
+                    DailyAggregate.algorithm_id == algorithm
+                )
+            ]
         finally:
             session.close()
+        
+        histogram = ScoreHistogram.union(
+            ScoreHistogram.from_bytes(data) for data in histograms if data is not None
+        )
+        quantiles = list(quantiles)
+        empty = histogram.total == 0
+        
+        return {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "topic": topic,
+            "algorithm_id": algorithm,
+            "human_only": human_only,
+            "days": len(histograms),
+            "days_without_histogram": sum(1 for data in histograms if data is None),
+            "total_posts": histogram.total,
+            "mean": None if empty else histogram.mean(),
+            "quantiles": {
+                f"p{q * 100:g}": None if empty else value
+                for q, value in zip(quantiles, histogram.quantiles(quantiles))
+            },
+            "histogram": histogram.to_dict()
+        }
+    
+    def _scored_posts_query(
+        self,
+        session: Session,
+        columns: List,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        algorithms: List[str]
+    ) -> Query:
+        """
+        Join posts to their sentiment score, engagement, author and bot signal
+        
+        When a post was scored more than once, its first score row (lowest
+        autoincrement id) is used; when it was bot-checked more than once,
+        the signal with the earliest created_at is used, ties broken on id.
+        Either way every post appears once per algorithm.
+        
+        Args:
+            session: Database session
+            columns: Columns or SQL expressions to select
+            start_datetime: Inclusive lower bound on Post.created_at
+            end_datetime: Inclusive upper bound on Post.created_at
+            algorithms: Sentiment algorithm IDs to include
+        
+        Returns:
+            Query over the joined tables
+        """
+        earlier_score = aliased(SentimentScore)
+        first_score_id = select(func.min(earlier_score.id)).where(
+            earlier_score.post_id == SentimentScore.post_id,
+            earlier_score.algorithm_id == SentimentScore.algorithm_id
+        ).scalar_subquery()
+        
+        earlier_signal = aliased(BotSignal)
+        # Signal ids are UUID strings, so min(id) would pick an arbitrary row
+        first_signal_id = select(earlier_signal.id).where(
+            earlier_signal.post_id == Post.post_id
+        ).order_by(
+            earlier_signal.created_at, earlier_signal.id
+        ).limit(1).scalar_subquery()
+        
+        return session.query(*columns).select_from(Post).join(
+            SentimentScore, SentimentScore.post_id == Post.post_id
+        ).join(
+            Engagement, Engagement.post_id == Post.post_id
+        ).join(
+            Author, Author.user_id == Post.author_id
+        ).outerjoin(
+            BotSignal, and_(
+                BotSignal.post_id == Post.post_id,
+                BotSignal.id == first_signal_id
+            )
+        ).filter(
+            Post.created_at >= start_datetime,
+            Post.created_at <= end_datetime,
+            SentimentScore.algorithm_id.in_(algorithms),
+            SentimentScore.id == first_score_id
+        )
+    
+    def post_rows_query(
+        self,
+        session: Session,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        algorithms: List[str]
+    ) -> Query:
+        """
+        Build the projected query feeding aggregation
+        
+        Fetches a whole day in one round-trip instead of four lookups
+        per post. Also used to export feature snapshots.
+        
+        Args:
+            session: Database session
+            start_datetime: Inclusive lower bound on Post.created_at
+            end_datetime: Inclusive upper bound on Post.created_at
+            algorithms: Sentiment algorithm IDs to include
+        
+        Returns:
+            Query yielding one row per (post, algorithm)
+        """
+        return self._scored_posts_query(
+            session,
+            [
+                Post.post_id,
+                Post.created_at,
+                SentimentScore.id.label("score_id"),
+                SentimentScore.algorithm_id,
+                SentimentScore.classification,
+                SentimentScore.confidence,
+                SentimentScore.score,
+                Engagement.like_count,
+                Engagement.retweet_count,
+                Engagement.reply_count,
+                Engagement.quote_count,
+                Author.user_id,
+                Author.followers_count,
+                Author.verified,
+                BotSignal.score.label("bot_score")
+            ],
+            start_datetime,
+            end_datetime,
+            algorithms
+        ).order_by(Post.created_at, Post.post_id)
+    
+    def _sql_math_available(self, session: Session) -> bool:
+        """Whether the database has the ln, sqrt, power and floor functions SQL mode uses"""
+        bind = session.get_bind()
+        if bind not in self._sql_math:
+            try:
+                # Own connection, so a failed probe cannot abort the session's transaction
+                with bind.connect() as connection:
+                    connection.execute(select(func.ln(1.0), func.sqrt(1.0), func.power(1.0, 1.0), func.floor(1.5)))
+                self._sql_math[bind] = True
+            except DBAPIError:
+                self._sql_math[bind] = False
+        return self._sql_math[bind]
+    
+    def _score_expression(self):
+        """Post score in SQL; missing or zero scores count as neutral (50), as in the row path"""
+        return case(
+            (or_(SentimentScore.score.is_(None), SentimentScore.score == 0), 50.0),
+            else_=SentimentScore.score
+        )
+    
+    def _is_human_expression(self):
+        """Whether a post counts toward human sentiment, in SQL"""
+        return func.coalesce(BotSignal.score, 0.0) < self.HUMAN_BOT_THRESHOLD
+    
+    def _daily_totals_sql(
+        self,
+        session: Session,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        algorithm: str,
+        weights: bool = False
+    ) -> Dict[date, Dict]:
+        """
+        Compute per-day counts and engagement-weighted sums in SQL
+        
+        Args:
+            weights: Also sum post weights (total_weight, bullish_weight,
+                bearish_weight); needs SQL math functions
+        
+        Returns:
+            Dict of date -> totals (see _make_aggregate)
+        
+        Raises:
+            ValueError: If a weighting formula is undefined for some post
+                (e.g. ln(0) evaluates to NULL on SQLite)
+        """
+        day = func.date(Post.created_at).label("day")
+        engagement = Engagement.like_count + Engagement.retweet_count
+        score = self._score_expression()
+        is_human = self._is_human_expression()
+        
+        def count_if(condition):
+            return func.sum(case((condition, 1), else_=0))
+        
+        weight_columns = []
+        if weights:
+            weight = self.weighting_calculator.weight_expression(
+                Engagement.like_count,
+                Engagement.retweet_count,
+                Engagement.reply_count,
+                Engagement.quote_count,
+                Author.followers_count,
+                Author.verified,
+                func.coalesce(BotSignal.score, 0.0)
+            )
+            weight_columns = [
+                func.count(weight).label("weighted_posts"),
+                func.sum(weight).label("total_weight"),
+                func.sum(case(
+                    (SentimentScore.classification == SentimentClassification.BULLISH, weight), else_=0.0
+                )).label("bullish_weight"),
+                func.sum(case(
+                    (SentimentScore.classification == SentimentClassification.BEARISH, weight), else_=0.0
+                )).label("bearish_weight")
+            ]
+        
+        rows = self._scored_posts_query(
+            session,
+            [
+                day,
+                func.count().label("total_posts"),
+                count_if(SentimentScore.classification == SentimentClassification.BULLISH).label("bullish_count"),
+                count_if(SentimentScore.classification == SentimentClassification.BEARISH).label("bearish_count"),
+                func.sum(Engagement.like_count).label("total_likes"),
+                func.sum(Engagement.retweet_count).label("total_retweets"),
+                func.count(distinct(Author.user_id)).label("unique_authors"),
+                func.count(distinct(case((Author.verified, Author.user_id)))).label("verified_authors"),
+                count_if(BotSignal.score > LIKELY_BOT_SCORE).label("bot_flagged"),
+                count_if(SentimentScore.confidence >= HIGH_CONFIDENCE).label("high_confidence"),
+                func.sum(score * engagement).label("overall_numerator"),
+                func.sum(engagement).label("overall_denominator"),
+                func.sum(case((is_human, score * engagement), else_=0)).label("human_numerator"),
+                func.sum(case((is_human, engagement), else_=0)).label("human_denominator"),
+                count_if(is_human).label("human_count"),
+                *weight_columns
+            ],
+            start_datetime,
+            end_datetime,
+            [algorithm]
+        ).group_by(day).all()
+        
+        totals_by_date = {}
+        for row in rows:
+            totals = {
+                "total_posts": row.total_posts,
+                "bullish_count": row.bullish_count,
+                "bearish_count": row.bearish_count,
+                "neutral_count": row.total_posts - row.bullish_count - row.bearish_count,
+                "total_likes": row.total_likes,
+                "total_retweets": row.total_retweets,
+                "unique_authors": row.unique_authors,
+                "verified_authors": row.verified_authors,
+                "bot_flagged": row.bot_flagged,
+                "high_confidence": row.high_confidence,
+                "overall_numerator": float(row.overall_numerator),
+                "overall_denominator": row.overall_denominator,
+                "human_numerator": float(row.human_numerator),
+                "human_denominator": row.human_denominator,
+                "human_count": row.human_count,
+                "bot_count": row.total_posts - row.human_count
+            }
+            if weights:
+                if row.weighted_posts != row.total_posts:
+                    raise ValueError(
+                        f"Weighting formulas are undefined for {row.total_posts - row.weighted_posts} "
+                        f"posts on {row.day}"
+                    )
+                totals["total_weight"] = float(row.total_weight)
+                totals["bullish_weight"] = float(row.bullish_weight)
+                totals["bearish_weight"] = float(row.bearish_weight)
+            totals_by_date[_as_date(row.day)] = totals
+        
+        return totals_by_date
+    
+    def _daily_histograms_sql(
+        self,
+        session: Session,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        algorithm: str
+    ) -> Dict[date, Dict]:
+        """
+        Count each day's scores per histogram bin in SQL
+        
+        Uses the same binning as ScoreHistogram (out-of-range scores go to
+        the edge bins), so at most two rows per bin and day are returned.
+        
+        Returns:
+            Dict of date -> serialized score histograms (see _score_histograms)
+        """
+        histogram = ScoreHistogram()
+        day = func.date(Post.created_at).label("day")
+        # Floor before the cast: casting truncates on SQLite but rounds on PostgreSQL
+        raw_bin = cast(func.floor((self._score_expression() - histogram.LOW) / histogram.width), Integer)
+        bin_index = case(
+            (raw_bin < 0, 0),
+            (raw_bin >= histogram.bins, histogram.bins - 1),
+            else_=raw_bin
+        ).label("bin")
+        is_human = self._is_human_expression().label("is_human")
+        
+        rows = self._scored_posts_query(
+            session,
+            [day, bin_index, is_human, func.count().label("posts")],
+            start_datetime,
+            end_datetime,
+            [algorithm]
+        ).group_by(day, bin_index, is_human).all()
+        
+        # Per day: row 0 counts all posts, row 1 human posts
+        counts_by_date = defaultdict(lambda: np.zeros((2, histogram.bins), dtype=np.int64))
+        for row in rows:
+            counts = counts_by_date[_as_date(row.day)]
+            counts[0, row.bin] += row.posts
+            if row.is_human:
+                counts[1, row.bin] += row.posts
+        
+        return {
+            day: {
+                "score_histogram": ScoreHistogram(histogram.bins, counts[0]).to_bytes(),
+                "human_score_histogram": ScoreHistogram(histogram.bins, counts[1]).to_bytes()
+            }
+            for day, counts in counts_by_date.items()
+        }
+    
+    def _daily_weights(
+        self,
+        session: Session,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        algorithm: str
+    ) -> Dict[date, Dict]:
+        """
+        Compute per-day weighted sentiment and score histograms
+        
+        Fallback for databases without SQL math functions. Streams only
+        the numeric weighting inputs and scores, ordered like the row path
+        so sums accumulate in the same order.
+        
+        Returns:
+            Dict of date -> (calculate_weighted_sentiment_batch result, score histograms)
+        """
+        codes = {
+            classification: SENTIMENT_CODES[classification.value]
+            for classification in SentimentClassification
+        }
+        columns_by_date = defaultdict(lambda: defaultdict(list))
+        scores_by_date = defaultdict(list)
+        
+        rows = self._scored_posts_query(
+            session,
+            [
+                func.date(Post.created_at).label("day"),
+                SentimentScore.classification,
+                SentimentScore.score,
+                Engagement.like_count,
+                Engagement.retweet_count,
+                Engagement.reply_count,
+                Engagement.quote_count,
+                Author.followers_count,
+                Author.verified,
+                BotSignal.score.label("bot_score")
+            ],
+            start_datetime,
+            end_datetime,
+            [algorithm]
+        ).order_by(Post.created_at, Post.post_id).yield_per(self.CHUNK_SIZE)
+        
+        for row in rows:
+            columns = columns_by_date[_as_date(row.day)]
+            columns["likes"].append(row.like_count)
+            columns["retweets"].append(row.retweet_count)
+            columns["replies"].append(row.reply_count)
+            columns["quotes"].append(row.quote_count)
+            columns["followers"].append(row.followers_count)
+            columns["verified"].append(row.verified)
+            columns["bot_score"].append(row.bot_score if row.bot_score is not None else 0.0)
+            columns["sentiment"].append(codes[row.classification])
+            scores_by_date[_as_date(row.day)].append(row.score if row.score else 50.0)
+        
+        results = {}
+        for day, columns in columns_by_date.items():
+            is_human = np.array(columns["bot_score"], dtype=np.float64) < self.HUMAN_BOT_THRESHOLD
+            results[day] = (
+                self.weighting_calculator.calculate_weighted_sentiment_batch(**columns),
+                self._score_histograms(np.array(scores_by_date[day], dtype=np.float64), is_human)
+            )
+        return results
+    
+    def _build_aggregate(
+        self,
+        rows: Iterable,
+        target_date: date,
+        topic: str,
+        algorithm: str
+    ) -> Optional[DailyAggregate]:
+        """
+        Fold projected post rows into an (unsaved) DailyAggregate
+        
+        Args:
+            rows: Rows from post_rows_query for a single date and algorithm
+            target_date: Date being aggregated
+            topic: Topic (Bitcoin, MSTR, BitcoinTreasuries)
+            algorithm: Algorithm the rows were scored with
+        
+        Returns:
+            DailyAggregate object or None if no rows
+        """
+        summary = self._summarize_rows(rows)
+        if summary is None:
+            return None
+        
+        totals, weighted_result = summary
+        return self._make_aggregate(target_date, topic, algorithm, totals, weighted_result)
+    
+    def _summarize_rows(self, rows: Iterable) -> Optional[Tuple[Dict, Dict]]:
+        """
+        Reduce projected post rows to additive totals and weighted sentiment
+        
+        Rows are transposed into columns and reduced with NumPy. Sums are
+        accumulated in row order, like the original per-post loop.
+        
+        Args:
+            rows: Rows from post_rows_query for a single date and algorithm
+        
+        Returns:
+            (totals, weighted_result) tuple or None if no rows
+        """
+        columns = self._row_columns(rows)
+        if columns is None:
+            return None
+        
+        sentiment = columns["sentiment"]
+        likes = columns["likes"]
+        retweets = columns["retweets"]
+        bot_score = columns["bot_score"]
+        score = columns["score"]
+        has_bot_signal = columns["has_bot_signal"]
+        
+        # Dual sentiment scores (0-100 Fear & Greed), weighted by engagement
+        engagement = likes + retweets
+        weighted_scores = score * engagement
+        is_human = bot_score < self.HUMAN_BOT_THRESHOLD
+        
+        bullish_count = int(np.count_nonzero(sentiment == SENTIMENT_CODES["Bullish"]))
+        bearish_count = int(np.count_nonzero(sentiment == SENTIMENT_CODES["Bearish"]))
+        human_count = int(np.count_nonzero(is_human))
+        
+        unique_authors = set(columns["user_id"])
+        verified_authors = {
+            user_id for user_id, verified in zip(columns["user_id"], columns["verified"]) if verified
+        }
+        
+        # Calculate weighted sentiment
+        weighted_result = self.weighting_calculator.calculate_weighted_sentiment_batch(
+            likes=likes,
+            retweets=retweets,
+            replies=columns["replies"],
+            quotes=columns["quotes"],
+            followers=columns["followers"],
+            verified=columns["verified"],
+            bot_score=bot_score,
+            sentiment=sentiment
+        )
+        
+        total_posts = len(sentiment)
+        totals = {
+            "total_posts": total_posts,
+            "bullish_count": bullish_count,
+            "bearish_count": bearish_count,
+            "neutral_count": total_posts - bullish_count - bearish_count,
+            "total_likes": int(likes.sum()),
+            "total_retweets": int(retweets.sum()),
+            "unique_authors": len(unique_authors),
+            "verified_authors": len(verified_authors),
+            "bot_flagged": int(np.count_nonzero(has_bot_signal & (bot_score > LIKELY_BOT_SCORE))),
+            "high_confidence": int(np.count_nonzero(columns["confidence"] >= HIGH_CONFIDENCE)),
+            "overall_numerator": sequential_sum(weighted_scores),
+            "overall_denominator": int(engagement.sum()),
+            "human_numerator": sequential_sum(weighted_scores[is_human]),
+            "human_denominator": int(engagement[is_human].sum()),
+            "human_count": human_count,
+            "bot_count": total_posts - human_count,
+            **self._author_sketches(unique_authors, verified_authors),
+            **self._score_histograms(score, is_human)
+        }
+        
+        return totals, weighted_result
+    
+    def _score_histograms(self, score: np.ndarray, is_human: np.ndarray) -> Dict:
+        """Serialized histograms of a day's scores (all posts and human posts)"""
+        return {
+            "score_histogram": ScoreHistogram().update(score).to_bytes(),
+            "human_score_histogram": ScoreHistogram().update(score[is_human]).to_bytes()
+        }
+    
+    def _author_sketches(self, authors: Iterable[str], verified_authors: Iterable[str]) -> Dict:
+        """Serialized HyperLogLog sketches of a day's (verified) author IDs"""
+        return {
+            "author_sketch": HyperLogLog().update(authors).to_bytes(),
+            "verified_author_sketch": HyperLogLog().update(verified_authors).to_bytes()
+        }
+    
+    def _row_columns(self, rows: Iterable) -> Optional[Dict]:
+        """
+        Transpose projected post rows into NumPy columns
+        
+        Missing bot signals are treated as human (0.0) and missing or zero
+        scores as neutral (50); has_bot_signal records which posts had one.
+        
+        Args:
+            rows: Rows from post_rows_query for a single date and algorithm
+        
+        Returns:
+            Dict of columns or None if no rows
+        """
+        rows = list(rows)
+        if not rows:
+            return None
+        
+        columns = dict(zip(rows[0]._fields, zip(*rows)))
+        
+        bot_score = np.array(columns["bot_score"], dtype=np.float64)
+        has_bot_signal = ~np.isnan(bot_score)
+        score = np.array(columns["score"], dtype=np.float64)
+        
+        return {
+            "sentiment": np.array(
+                [SENTIMENT_CODES[classification.value] for classification in columns["classification"]],
+                dtype=np.int8
+            ),
+            "likes": np.array(columns["like_count"], dtype=np.int64),
+            "retweets": np.array(columns["retweet_count"], dtype=np.int64),
+            "replies": columns["reply_count"],
+            "quotes": columns["quote_count"],
+            "followers": columns["followers_count"],
+            "verified": columns["verified"],
+            "user_id": columns["user_id"],
+            "confidence": np.array(columns["confidence"], dtype=np.float64),
+            "bot_score": np.where(has_bot_signal, bot_score, 0.0),
+            "has_bot_signal": has_bot_signal,
+            "score": np.where(np.isnan(score) | (score == 0), 50.0, score)
+        }
+    
+    def _fold_row(
+        self,
+        state: DailyAggregateState,
+        row,
+        histograms: Tuple[ScoreHistogram, ScoreHistogram],
+        sign: int = 1,
+        weight: Optional[float] = None
+    ) -> float:
+        """
+        Add one projected post row to incremental partial sums
+        
+        Args:
+            state: Partial sums to update in place
+            row: Row from post_rows_query
+            histograms: (all posts, human posts) score histograms (updated in place)
+            sign: 1 to add the row, -1 to take a previously folded row back out
+            weight: The row's weight, if already known
+        
+        Returns:
+            The row's weight
+        """
+        state.total_posts += sign
+        if row.classification == SentimentClassification.BULLISH:
+            state.bullish_count += sign
+        elif row.classification == SentimentClassification.BEARISH:
+            state.bearish_count += sign
+        else:
+            state.neutral_count += sign
+        
+        state.total_likes += sign * row.like_count
+        state.total_retweets += sign * row.retweet_count
+        
+        if row.bot_score is not None and row.bot_score > LIKELY_BOT_SCORE:
+            state.bot_flagged += sign
+        
+        if row.confidence >= HIGH_CONFIDENCE:
+            state.high_confidence += sign
+        
+        score = row.score if row.score else 50
+        bot_score = row.bot_score if row.bot_score is not None else 0.0
+        engagement = row.like_count + row.retweet_count
+        
+        state.overall_numerator += sign * score * engagement
+        state.overall_denominator += sign * engagement
+        histograms[0].add(score, sign)
+        
+        if bot_score < self.HUMAN_BOT_THRESHOLD:
+            state.human_numerator += sign * score * engagement
+            state.human_denominator += sign * engagement
+            state.human_count += sign
+            histograms[1].add(score, sign)
+        else:
+            state.bot_count += sign
+        
+        if weight is None:
+            weight = self.weighting_calculator.calculate_weight({
+                "engagement": {
+                    "like_count": row.like_count,
+                    "retweet_count": row.retweet_count,
+                    "reply_count": row.reply_count,
+                    "quote_count": row.quote_count
+                },
+                "author": {
+                    "followers_count": row.followers_count,
+                    "verified": row.verified
+                },
+                "bot_score": bot_score
+            })
+        state.total_weight += sign * weight
+        if row.classification == SentimentClassification.BULLISH:
+            state.bullish_weight += sign * weight
+        elif row.classification == SentimentClassification.BEARISH:
+            state.bearish_weight += sign * weight
+        
+        return weight
+    
+    def _fold_authors(self, session: Session, state: DailyAggregateState, authors: Dict[str, bool]):
+        """
+        Count authors the state has not seen yet, and newly verified ones
+        
+        Only the given authors are looked up (by state and user ID), so the
+        cost follows the rows just folded rather than the day's author count.
+        
+        Args:
+            session: Database session
+            state: Partial sums to update in place
+            authors: User ID -> whether any of their folded rows was verified
+        """
+        sketches = [
+            HyperLogLog.from_bytes(data)
+            for data in (state.author_sketch, state.verified_author_sketch)
+        ]
+        user_ids = sorted(authors)
+        
+        for start in range(0, len(user_ids), self.AUTHOR_CHUNK_SIZE):
+            chunk = user_ids[start:start + self.AUTHOR_CHUNK_SIZE]
+            known = {
+                author.user_id: author
+                for author in session.query(DailyAggregateAuthor).filter(
+                    DailyAggregateAuthor.state_id == state.id,
+                    DailyAggregateAuthor.user_id.in_(chunk)
+                )
+            }
+            
+            for user_id in chunk:
+                verified = authors[user_id]
+                author = known.get(user_id)
+                if author is None:
+                    session.add(DailyAggregateAuthor(state_id=state.id, user_id=user_id, verified=verified))
+                    state.unique_authors += 1
+                    sketches[0].add(user_id)
+                elif verified and not author.verified:
+                    author.verified = True
+                else:
+                    continue
+                
+                if verified:
+                    state.verified_authors += 1
+                    sketches[1].add(user_id)
+        
+        state.author_sketch = sketches[0].to_bytes()
+        state.verified_author_sketch = sketches[1].to_bytes()
+    
+    def _empty_state(self, target_date: date, algorithm: str) -> DailyAggregateState:
+        """Zeroed state with empty author sketches and score histograms"""
+        state = DailyAggregateState.empty(target_date, algorithm)
+        state.weighting_config_version = self.weighting_calculator.config["version"]
+        state.author_sketch = HyperLogLog().to_bytes()
+        state.verified_author_sketch = HyperLogLog().to_bytes()
+        state.score_histogram = ScoreHistogram().to_bytes()
+        state.human_score_histogram = ScoreHistogram().to_bytes()
+        return state
+    
+    def _delete_state(self, session: Session, state: DailyAggregateState):
+        """Delete a state together with its fold and author records"""
+        for model in (DailyAggregateFold, DailyAggregateAuthor):
+            session.query(model).filter(model.state_id == state.id).delete(synchronize_session=False)
+        session.delete(state)
+        session.flush()
+    
+    def _upsert_aggregate(self, session: Session, aggregate: DailyAggregate) -> DailyAggregate:
+        """
+        Insert an aggregate, or copy its values onto the existing row
+        
+        Args:
+            session: Database session
+            aggregate: Unsaved aggregate with the new values
+        
+        Returns:
+            The persisted DailyAggregate
+        """
+        existing = session.query(DailyAggregate).filter(
+            DailyAggregate.date == aggregate.date,
+            DailyAggregate.topic == aggregate.topic,
+            DailyAggregate.algorithm_id == aggregate.algorithm_id
+        ).first()
+        
+        if existing is None:
+            session.add(aggregate)
+            return aggregate
+        
+        for column in DailyAggregate.__table__.columns:
+            if column.key != "id":
+                setattr(existing, column.key, getattr(aggregate, column.key))
+        
+        return existing
+    
+    def _make_aggregate(
+        self,
+        target_date: date,
+        topic: str,
+        algorithm: str,
+        totals: Dict,
+        weighted_result: Dict
+    ) -> DailyAggregate:
+        """
+        Create an (unsaved) DailyAggregate from additive daily totals
+        
+        Args:
+            target_date: Date being aggregated
+            topic: Topic (Bitcoin, MSTR, BitcoinTreasuries)
+            algorithm: Algorithm the posts were scored with
+            totals: Counts and engagement-weighted numerators/denominators
+            weighted_result: WeightingCalculator result for the same posts
+        
+        Returns:
+            DailyAggregate object
+        """
+        overall_sentiment_score = (
+            totals["overall_numerator"] / totals["overall_denominator"]
+            if totals["overall_denominator"] > 0 else 50
+        )
+        human_sentiment_score = (
+            totals["human_numerator"] / totals["human_denominator"]
+            if totals["human_denominator"] > 0 else 50
+        )
+        
+        # Map dominant sentiment to enum
+        dominant_map = {
+            "Bullish": DominantSentiment.BULLISH,
+            "Bearish": DominantSentiment.BEARISH,
+            "Neutral": DominantSentiment.NEUTRAL
+        }
+        
+        total_posts = totals["total_posts"]
+        total_likes = totals["total_likes"]
+        total_retweets = totals["total_retweets"]
+        
+        # Create aggregate
+        aggregate = DailyAggregate(
+            date=target_date,
+            topic=TOPIC_MAP.get(topic, Topic.BITCOIN),
+            algorithm_id=algorithm,
+            total_posts=total_posts,
+            total_posts_after_bot_filter=total_posts - totals["bot_flagged"],
+            unique_authors=totals["unique_authors"],
+            verified_authors=totals["verified_authors"],
+            author_sketch=totals.get("author_sketch"),
+            verified_author_sketch=totals.get("verified_author_sketch"),
+            score_histogram=totals.get("score_histogram"),
+            human_score_histogram=totals.get("human_score_histogram"),
+            bullish_count=totals["bullish_count"],
+            bearish_count=totals["bearish_count"],
+            neutral_count=totals["neutral_count"],
+            weighted_score=weighted_result["weighted_score"],
+            weighted_bullish_score=weighted_result.get("bullish_weight", 0.0),
+            weighted_bearish_score=weighted_result.get("bearish_weight", 0.0),
+            dominant_sentiment=dominant_map[weighted_result["dominant_sentiment"]],
+            total_likes=total_likes,
+            total_retweets=total_retweets,
+            avg_engagement_per_post=(total_likes + total_retweets) / total_posts if total_posts > 0 else 0,
+            bot_detection_rate=(totals["bot_flagged"] / total_posts * 100) if total_posts > 0 else 0,
+            high_confidence_sentiment_pct=(totals["high_confidence"] / total_posts * 100) if total_posts > 0 else 0,
+            weighting_config_version=self.weighting_calculator.config["version"],
+            # NEW: Dual sentiment scores
+            overall_sentiment_score=overall_sentiment_score,
+            human_sentiment_score=human_sentiment_score,
+            human_tweet_count=totals["human_count"],
+            bot_tweet_count=totals["bot_count"]
+        )
+        
+        return aggregate
+
+
+def _sketch_registers(sketches: List[Optional[bytes]]) -> np.ndarray:
+    """Stack serialized sketches into a (days, registers) array; missing ones are empty"""
+    registers = np.zeros((len(sketches), 1 << HyperLogLog.DEFAULT_PRECISION), dtype=np.uint8)
+    for i, data in enumerate(sketches):
+        if data is not None:
+            registers[i] = HyperLogLog.from_bytes(data).registers
+    return registers
+
+
+def _union_count(registers: np.ndarray) -> int:
+    """Distinct count of the union of stacked sketch registers"""
+    if len(registers) == 0:
+        return 0
+    return HyperLogLog(registers=np.maximum.reduce(registers)).count()
+
+
+def _as_date(value) -> date:
+    """Normalize a SQL date() result (string on SQLite, date on PostgreSQL)"""
+    if isinstance(value, str):
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    return value
@@ -0,0 +1,381 @@
+"""
+Feature Snapshot Service
+Exports per-day post features to NumPy files and re-scores history from them
+"""
+import math
+import os
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from backend.src.models.sentiment_score import SentimentScore
+from backend.src.models.weighting_config import WeightingConfig
+from backend.src.services.daily_aggregator import DailyAggregator
+from backend.src.services.formula_engine import FormulaDomainError
+from backend.src.services.weighting_calculator import WeightingCalculator, SENTIMENT_CODES, sequential_sum
+
+
+# Sentiment code for posts an algorithm has not scored
+UNSCORED = np.iinfo(np.int8).min
+
+# Bump when the arrays stored in a snapshot file change
+SNAPSHOT_FORMAT = 1
+
+
+class FeatureSnapshot:
+    """
+    Columnar post features for one day
+    
+    One element per post for engagement, author and bot features, and
+    one row per algorithm for classification codes and 0-100 scores.
+    Missing bot signals and scores are stored as NaN.
+    """
+    
+    def __init__(
+        self,
+        day: date,
+        algorithms: List[str],
+        likes: np.ndarray,
+        retweets: np.ndarray,
+        replies: np.ndarray,
+        quotes: np.ndarray,
+        followers: np.ndarray,
+        verified: np.ndarray,
+        bot_score: np.ndarray,
+        sentiment: np.ndarray,
+        score: np.ndarray
+    ):
+        self.date = day
+        self.algorithms = list(algorithms)
+        self.likes = likes
+        self.retweets = retweets
+        self.replies = replies
+        self.quotes = quotes
+        self.followers = followers
+        self.verified = verified
+        self.bot_score = bot_score
+        self.sentiment = sentiment
+        self.score = score
+    
+    def __len__(self):
+        return len(self.likes)
+    
+    def __repr__(self):
+        return f"<FeatureSnapshot(date={self.date}, posts={len(self)}, algorithms={self.algorithms})>"
+    
+    @classmethod
+    def from_rows(cls, day: date, rows: Iterable, algorithms: List[str]) -> "FeatureSnapshot":
+        """
+        Build a snapshot from DailyAggregator.post_rows_query rows
+        
+        Rows must be ordered by post (one row per post and algorithm).
+        """
+        algorithm_index = {algorithm: i for i, algorithm in enumerate(algorithms)}
+        features = []
+        scores = []
+        
+        for position, (_, post_rows) in enumerate(groupby(rows, key=lambda row: row.post_id)):
+            for row in post_rows:
+                scores.append((
+                    algorithm_index[row.algorithm_id],
+                    position,
+                    SENTIMENT_CODES[row.classification.value],
+                    row.score
+                ))
+            features.append((
+                row.like_count,
+                row.retweet_count,
+                row.reply_count,
+                row.quote_count,
+                row.followers_count,
+                row.verified,
+                row.bot_score
+            ))
+        
+        likes, retweets, replies, quotes, followers, verified, bot_score = (
+            zip(*features) if features else ((),) * 7
+        )
+        
+        sentiment = np.full((len(algorithms), len(features)), UNSCORED, dtype=np.int8)
+        score = np.full((len(algorithms), len(features)), np.nan)
+        if scores:
+            rows_index, columns_index, codes, values = zip(*scores)
+            sentiment[rows_index, columns_index] = codes
+            score[rows_index, columns_index] = np.array(values, dtype=np.float64)
+        
+        return cls(
+            day=day,
+            algorithms=algorithms,
+            likes=np.array(likes, dtype=np.int64),
+            retweets=np.array(retweets, dtype=np.int64),
+            replies=np.array(replies, dtype=np.int64),
+            quotes=np.array(quotes, dtype=np.int64),
+            followers=np.array(followers, dtype=np.int64),
+            verified=np.array(verified, dtype=bool),
+            bot_score=np.array(bot_score, dtype=np.float64),
+            sentiment=sentiment,
+            score=score
+        )
+    
+    def save(self, directory: str) -> str:
+        """Write the snapshot to <directory>/<YYYY-MM-DD>.npz and return the path"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.date.isoformat()}.npz")
+        
+        # Write then rename so readers never load a partial file
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            format=np.array(SNAPSHOT_FORMAT),
+            date=np.array(self.date.isoformat()),
+            algorithms=np.array(self.algorithms, dtype=str),
+            likes=self.likes,
+            retweets=self.retweets,
+            replies=self.replies,
+            quotes=self.quotes,
+            followers=self.followers,
+            verified=self.verified,
+            bot_score=self.bot_score,
+            sentiment=self.sentiment,
+            score=self.score
+        )
+        os.replace(tmp_path, path)
+        return path
+    
+    @classmethod
+    def load(cls, path: str) -> "FeatureSnapshot":
+        """Load a snapshot written by save()"""
+        with np.load(path) as data:
+            if int(data["format"]) != SNAPSHOT_FORMAT:
+                raise ValueError(f"Unsupported snapshot format in {path}: {int(data['format'])}")
+            
+            return cls(
+                day=date.fromisoformat(str(data["date"])),
+                algorithms=[str(algorithm) for algorithm in data["algorithms"]],
+                likes=data["likes"],
+                retweets=data["retweets"],
+                replies=data["replies"],
+                quotes=data["quotes"],
+                followers=data["followers"],
+                verified=data["verified"],
+                bot_score=data["bot_score"],
+                sentiment=data["sentiment"],
+                score=data["score"]
+            )
+    
+    def reweight(
+        self,
+        calculator: WeightingCalculator,
+        algorithm: str,
+        human_bot_threshold: float = DailyAggregator.HUMAN_BOT_THRESHOLD
+    ) -> Optional[Dict]:
+        """
+        Recompute the day's weighted and Fear & Greed scores for one algorithm
+        
+        Uses the same rules as DailyAggregator: missing bot signals count as
+        human (0.0), missing or zero scores as neutral (50).
+        
+        Args:
+            calculator: WeightingCalculator for the config under test
+            algorithm: Sentiment algorithm whose classifications to use
+            human_bot_threshold: Bot score at or above which posts are not human
+        
+        Returns:
+            Dict of scores for the day, or None if the algorithm scored no posts
+        """
+        if algorithm not in self.algorithms:
+            return None
+        
+        row = self.algorithms.index(algorithm)
+        scored = self.sentiment[row] != UNSCORED
+        total_posts = int(np.count_nonzero(scored))
+        if total_posts == 0:
+            return None
+        
+        likes = self.likes[scored]
+        retweets = self.retweets[scored]
+        bot_score = np.nan_to_num(self.bot_score[scored], nan=0.0)
+        sentiment = self.sentiment[row][scored]
+        
+        weighted_result = calculator.calculate_weighted_sentiment_batch(
+            likes=likes,
+            retweets=retweets,
+            replies=self.replies[scored],
+            quotes=self.quotes[scored],
+            followers=self.followers[scored],
+            verified=self.verified[scored],
+            bot_score=bot_score,
+            sentiment=sentiment
+        )
+        
+        # Dual sentiment scores (0-100 Fear & Greed), weighted by engagement
+        score = self.score[row][scored]
+        score = np.where(np.isnan(score) | (score == 0), 50.0, score)
+        engagement = likes + retweets
+        weighted_scores = score * engagement
+        is_human = bot_score < human_bot_threshold
+        
+        overall_denominator = int(engagement.sum())
+        human_denominator = int(engagement[is_human].sum())
+        
+        return {
+            "date": self.date.isoformat(),
+            "algorithm_id": algorithm,
+            "weighting_config_version": calculator.config["version"],
+            "total_posts": total_posts,
+            "weighted_score": weighted_result["weighted_score"],
+            "dominant_sentiment": weighted_result["dominant_sentiment"],
+            "weighted_bullish_score": weighted_result.get("bullish_weight", 0.0),
+            "weighted_bearish_score": weighted_result.get("bearish_weight", 0.0),
+            "overall_sentiment_score": (
+                sequential_sum(weighted_scores) / overall_denominator
+                if overall_denominator > 0 else 50
+            ),
+            "human_sentiment_score": (
+                sequential_sum(weighted_scores[is_human]) / human_denominator
+                if human_denominator > 0 else 50
+            ),
+            "human_tweet_count": int(np.count_nonzero(is_human)),
+            "bot_tweet_count": total_posts - int(np.count_nonzero(is_human))
+        }
+
+
+class FeatureSnapshotBuilder:
+    """Exports per-day feature snapshots from the database"""
+    
+    def __init__(self, session_factory=None):
+        """
+        Args:
+            session_factory: Callable returning a Session (defaults to get_session)
+        """
+        self.aggregator = DailyAggregator(session_factory=session_factory)
+        self.session_factory = self.aggregator.session_factory
+    
+    def build(
+        self,
+        start_date: date,
+        end_date: date,
+        directory: str,
+        algorithms: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Write one snapshot file per day with scored posts
+        
+        Streams the range once with the aggregation query, so the features
+        match what DailyAggregator sees.
+        
+        Args:
+            start_date: First date to export (inclusive)
+            end_date: Last date to export (inclusive)
+            directory: Output directory
+            algorithms: Algorithms to include (default: every algorithm in the database)
+        
+        Returns:
+            Paths of the written snapshot files, ordered by date
+        """
+        session = self.session_factory()
+        
+        try:
+            if algorithms is None:
+                algorithms = sorted(
+                    algorithm for (algorithm,) in session.query(SentimentScore.algorithm_id).distinct()
+                )
+            
+            start_datetime = datetime.combine(start_date, datetime.min.time())
+            end_datetime = datetime.combine(end_date, datetime.max.time())
+            
+            rows = self.aggregator.post_rows_query(
+                session, start_datetime, end_datetime, algorithms
+            ).yield_per(DailyAggregator.CHUNK_SIZE)
+            
+            paths = []
+            for day, day_rows in groupby(rows, key=lambda row: row.created_at.date()):
+                snapshot = FeatureSnapshot.from_rows(day, day_rows, algorithms)
+                paths.append(snapshot.save(directory))
+            
+            return paths
+        
+        finally:
+            session.close()
+
+
+def reweight_history(
+    directory: str,
+    algorithm: str,
+    config: Optional[WeightingConfig] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    human_bot_threshold: float = DailyAggregator.HUMAN_BOT_THRESHOLD,
+    deadline: Optional[float] = None
+) -> List[Dict]:
+    """
+    Re-score every snapshotted day under a weighting config (no database access)
+    
+    Args:
+        directory: Snapshot directory written by FeatureSnapshotBuilder
+        algorithm: Sentiment algorithm whose classifications to use
+        config: WeightingConfig to evaluate (default config if None)
+        start_date: First date to include (default: earliest snapshot)
+        end_date: Last date to include (default: latest snapshot)
+        human_bot_threshold: Bot score at or above which posts are not human
+        deadline: time.monotonic() value after which to stop (checked between days)
+    
+    Returns:
+        List of per-day score dicts, ordered by date
+    
+    Raises:
+        FormulaError: If the config's formulas are invalid
+        FormulaDomainError: If a day's weights or scores are not finite
+        TimeoutError: If the deadline passes before every day is re-scored
+    """
+    calculator = WeightingCalculator(config)
+    results = []
+    
+    for path in snapshot_paths(directory, start_date, end_date):
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError("Re-scoring did not finish before the deadline")
+        
+        snapshot = _load_snapshot(path, os.path.getmtime(path))
+        result = snapshot.reweight(calculator, algorithm, human_bot_threshold)
+        if result is None:
+            continue
+        
+        # Finite weights can still sum to inf (and divide to NaN)
+        if any(isinstance(value, float) and not math.isfinite(value) for value in result.values()):
+            raise FormulaDomainError(f"Weighting config {calculator.config['version']!r} gives non-finite scores on {result['date']}")
+        results.append(result)
+    
+    return results
+
+
+def snapshot_paths(
+    directory: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> List[str]:
+    """List snapshot files in a directory within an optional date range, ordered by date"""
+    if not os.path.isdir(directory):
+        return []
+    
+    paths = []
+    for name in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(name)
+        if extension != ".npz":
+            continue
+        try:
+            day = date.fromisoformat(stem)
+        except ValueError:
+            continue
+        if (start_date and day < start_date) or (end_date and day > end_date):
+            continue
+        paths.append(os.path.join(directory, name))
+    
+    return paths
+
+
+@lru_cache(maxsize=1024)
+def _load_snapshot(path: str, mtime: float) -> FeatureSnapshot:
+    """Keep loaded snapshots in memory until the file changes"""
+    return FeatureSnapshot.load(path)
@@ -0,0 +1,311 @@
+"""
+Formula Engine
+Safely compiles WeightingConfig formula strings into scalar and NumPy callables
+"""
+import ast
+import math
+import operator
+from functools import reduce
+from typing import Callable, Dict, Tuple
+import numpy as np
+from sqlalchemy import Float, cast, func, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+
+
+# Functions a formula may call, with their scalar and vectorized implementations
+SCALAR_FUNCTIONS = {
+    "log": math.log,
+    "sqrt": math.sqrt,
+    "max": max,
+    "min": min
+}
+
+# np.log's SIMD kernel can differ from math.log in the last bit, so the
+# vector path applies math.log element-wise to match the scalar path exactly
+_math_log = np.frompyfunc(math.log, 1, 1)
+
+
+def _vector_log(values) -> np.ndarray:
+    return np.asarray(_math_log(np.asarray(values, dtype=np.float64)), dtype=np.float64)
+
+
+VECTOR_FUNCTIONS = {
+    "log": _vector_log,
+    "sqrt": np.sqrt,
+    "max": lambda *args: reduce(np.maximum, args),
+    "min": lambda *args: reduce(np.minimum, args)
+}
+
+class greatest(GenericFunction):
+    """Largest argument (SQL greatest; multi-argument max on SQLite)"""
+    type = Float()
+    inherit_cache = True
+
+
+class least(GenericFunction):
+    """Smallest argument (SQL least; multi-argument min on SQLite)"""
+    type = Float()
+    inherit_cache = True
+
+
+@compiles(greatest, "sqlite")
+def _sqlite_greatest(element, compiler, **kwargs):
+    return f"max({compiler.process(element.clauses, **kwargs)})"
+
+
+@compiles(least, "sqlite")
+def _sqlite_least(element, compiler, **kwargs):
+    return f"min({compiler.process(element.clauses, **kwargs)})"
+
+
+# SQL counterparts, for evaluating a formula inside an aggregate query
+SQL_FUNCTIONS = {
+    "log": func.ln,
+    "sqrt": func.sqrt,
+    "max": greatest,
+    "min": least
+}
+
+SQL_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: func.power
+}
+
+# Number of positional arguments each function accepts (min, max)
+FUNCTION_ARITY = {
+    "log": (1, 1),
+    "sqrt": (1, 1),
+    "max": (2, None),
+    "min": (2, None)
+}
+
+ALLOWED_BINARY_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow)
+ALLOWED_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+# Exponents must be small numeric constants and powers may not be nested
+# (big integer powers like (9 ** 16) ** 16 ** ... never finish)
+MAX_EXPONENT = 16
+
+# Formulas can come from API callers, so bound their size and nesting
+MAX_FORMULA_LENGTH = 500
+MAX_FORMULA_DEPTH = 32
+
+# Errors Python's math raises where a formula has no (finite) value
+DOMAIN_ERRORS = (ValueError, ZeroDivisionError, OverflowError)
+
+
+class FormulaError(ValueError):
+    """Raised when a formula string is not a valid, safe expression"""
+    pass
+
+
+class FormulaDomainError(ValueError):
+    """Raised when a formula has no finite value for some input (e.g. log(0))"""
+    pass
+
+
+class CompiledFormula:
+    """A validated formula compiled to a scalar function and a NumPy kernel"""
+    
+    def __init__(
+        self,
+        source: str,
+        variables: Tuple[str, ...],
+        scalar: Callable,
+        vector: Callable,
+        expression: ast.expr = None
+    ):
+        self.source = source
+        self.variables = variables
+        self._scalar = scalar
+        self._vector = vector
+        self._expression = expression
+    
+    def scalar(self, *values) -> float:
+        """
+        Evaluate the formula for one set of values (one per variable)
+        
+        Raises:
+            FormulaDomainError: If the result is undefined or not finite
+        """
+        try:
+            result = self._scalar(*values)
+            # A fractional power of a negative number is complex in Python (NaN in NumPy)
+            if isinstance(result, complex):
+                raise ValueError("complex result")
+            # float() overflows on integer results too large for the vector path
+            result = float(result)
+        except DOMAIN_ERRORS as e:
+            raise FormulaDomainError(f"Formula {self.source!r} is undefined for {values}: {e}") from e
+        if not math.isfinite(result):
+            raise FormulaDomainError(f"Formula {self.source!r} is not finite for {values}")
+        return result
+    
+    def vector(self, *arrays) -> np.ndarray:
+        """
+        Evaluate the formula element-wise over arrays (one per variable)
+        
+        Inputs are evaluated as float64, so large integer powers do not
+        wrap around. Formulas that do not reference every variable (e.g.
+        a constant) are broadcast to the input length.
+        
+        Raises:
+            FormulaDomainError: If the result is undefined or not finite
+                for any element, as .scalar would for that element
+        """
+        arrays = [np.asarray(array, dtype=np.float64) for array in arrays]
+        try:
+            with np.errstate(all="ignore"):
+                result = self._vector(*arrays)
+        except DOMAIN_ERRORS as e:
+            raise FormulaDomainError(f"Formula {self.source!r} is undefined for some inputs: {e}") from e
+        if arrays:
+            result = np.broadcast_to(result, np.shape(arrays[0]))
+        result = np.asarray(result, dtype=np.float64)
+        if not np.isfinite(result).all():
+            raise FormulaDomainError(f"Formula {self.source!r} is not finite for some inputs")
+        return result
+    
+    def sql(self, *columns):
+        """
+        Build the equivalent SQL expression over columns (one per variable)
+        
+        Variables are cast to float, so / is true division on every
+        backend. log maps to ln, which needs PostgreSQL or an SQLite built
+        with math functions.
+        """
+        return _to_sql(self._expression, dict(zip(self.variables, columns)))
+    
+    def __repr__(self):
+        return f"<CompiledFormula({self.source!r}, variables={self.variables})>"
+
+
+def compile_formula(source: str, variables: Tuple[str, ...]) -> CompiledFormula:
+    """
+    Parse, validate and compile a formula string
+    
+    Only numeric constants, the given variables, + - * / **, unary minus
+    and calls to log, sqrt, max and min are accepted. The expression is
+    compiled once into a function taking the variables positionally.
+    
+    Args:
+        source: Formula string, e.g. "log(1 + likes + retweets * 2)"
+        variables: Variable names the formula may use, in argument order
+    
+    Returns:
+        CompiledFormula with .scalar(*values) and .vector(*arrays)
+    
+    Raises:
+        FormulaError: If the formula is malformed, too large or uses anything not allowed
+    """
+    if len(source) > MAX_FORMULA_LENGTH:
+        raise FormulaError(f"Formula is longer than {MAX_FORMULA_LENGTH} characters")
+    
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise FormulaError(f"Invalid formula {source!r}: {e.msg}") from e
+    
+    _validate(tree.body, source, set(variables))
+    
+    # Wrap the expression in a lambda so each call is a plain function call
+    function = ast.Expression(body=ast.Lambda(
+        args=ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg(arg=name) for name in variables],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[]
+        ),
+        body=tree.body
+    ))
+    code = compile(ast.fix_missing_locations(function), f"<formula {source!r}>", "eval")
+    
+    return CompiledFormula(
+        source=source,
+        variables=tuple(variables),
+        scalar=eval(code, {"__builtins__": {}, **SCALAR_FUNCTIONS}),
+        vector=eval(code, {"__builtins__": {}, **VECTOR_FUNCTIONS}),
+        expression=tree.body
+    )
+
+
+def _validate(node: ast.AST, source: str, variables: set, depth: int = 1):
+    """Reject every node that is not part of the arithmetic whitelist"""
+    if depth > MAX_FORMULA_DEPTH:
+        raise FormulaError(f"Formula {source!r} is nested more than {MAX_FORMULA_DEPTH} levels deep")
+    
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise FormulaError(f"Invalid constant {node.value!r} in formula {source!r}")
+    
+    elif isinstance(node, ast.Name):
+        if node.id not in variables:
+            allowed = ", ".join(sorted(variables))
+            raise FormulaError(f"Unknown variable {node.id!r} in formula {source!r} (allowed: {allowed})")
+    
+    elif isinstance(node, ast.BinOp):
+        if not isinstance(node.op, ALLOWED_BINARY_OPERATORS):
+            raise FormulaError(f"Operator {type(node.op).__name__} not allowed in formula {source!r}")
+        if isinstance(node.op, ast.Pow):
+            if not _is_small_constant(node.right):
+                raise FormulaError(f"Exponent must be a constant between -{MAX_EXPONENT} and {MAX_EXPONENT} in formula {source!r}")
+            if any(_is_power(inner) for inner in ast.walk(node.left)):
+                raise FormulaError(f"Nested powers are not allowed in formula {source!r}")
+        _validate(node.left, source, variables, depth + 1)
+        _validate(node.right, source, variables, depth + 1)
+    
+    elif isinstance(node, ast.UnaryOp):
+        if not isinstance(node.op, ALLOWED_UNARY_OPERATORS):
+            raise FormulaError(f"Operator {type(node.op).__name__} not allowed in formula {source!r}")
+        _validate(node.operand, source, variables, depth + 1)
+    
+    elif isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTION_ARITY:
+            allowed = ", ".join(sorted(FUNCTION_ARITY))
+            raise FormulaError(f"Only {allowed} may be called in formula {source!r}")
+        if node.keywords or any(isinstance(arg, ast.Starred) for arg in node.args):
+            raise FormulaError(f"{node.func.id}() takes positional arguments only in formula {source!r}")
+        
+        min_args, max_args = FUNCTION_ARITY[node.func.id]
+        if len(node.args) < min_args or (max_args is not None and len(node.args) > max_args):
+            raise FormulaError(f"Wrong number of arguments to {node.func.id}() in formula {source!r}")
+        for arg in node.args:
+            _validate(arg, source, variables, depth + 1)
+    
+    else:
+        raise FormulaError(f"{type(node).__name__} not allowed in formula {source!r}")
+
+
+def _to_sql(node: ast.AST, columns: Dict):
+    """Translate a validated formula node into a SQLAlchemy expression"""
+    if isinstance(node, ast.Constant):
+        return literal(float(node.value), Float)
+    if isinstance(node, ast.Name):
+        return cast(columns[node.id], Float)
+    if isinstance(node, ast.BinOp):
+        return SQL_OPERATORS[type(node.op)](_to_sql(node.left, columns), _to_sql(node.right, columns))
+    if isinstance(node, ast.UnaryOp):
+        operand = _to_sql(node.operand, columns)
+        return -operand if isinstance(node.op, ast.USub) else operand
+    return SQL_FUNCTIONS[node.func.id](*(_to_sql(arg, columns) for arg in node.args))
+
+
+def _is_power(node: ast.AST) -> bool:
+    return isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow)
+
+
+def _is_small_constant(node: ast.AST) -> bool:
+    """Whether node is a numeric literal (optionally negated) within MAX_EXPONENT"""
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ALLOWED_UNARY_OPERATORS):
+        node = node.operand
+    return (
+        isinstance(node, ast.Constant)
+        and isinstance(node.value, (int, float))
+        and not isinstance(node.value, bool)
+        and abs(node.value) <= MAX_EXPONENT
+    )
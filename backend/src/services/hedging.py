@@ -0,0 +1,136 @@
+"""
+Request Hedging
+Sends a duplicate of a slow request and keeps whichever answer comes first
+"""
+import asyncio
+import math
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+PRIMARY = "primary"
+DUPLICATE = "duplicate"
+
+
+class LatencyTracker:
+    """Latencies of the last `window_size` calls, for rolling percentiles"""
+    
+    def __init__(self, window_size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=max(1, window_size))
+    
+    def record(self, elapsed_ms: float):
+        self._samples.append(elapsed_ms)
+    
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Nearest-rank percentile in ms (None until min_samples calls were recorded)"""
+        if not self._samples or len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+        return ordered[rank - 1]
+    
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class HedgedCall:
+    """One hedged request; `hedged` turns True once a duplicate was sent"""
+    
+    def __init__(self):
+        self.hedged = False
+
+
+class RequestHedger:
+    """
+    Hedges calls that outlive the rolling latency percentile
+    
+    run() starts the call and, if it has not finished after the
+    `percentile` latency of recent successful calls, starts a duplicate.
+    The first successful result wins and the other call is cancelled.
+    Duplicates are capped at `max_hedge_rate` of all calls, so a provider
+    that is slow across the board is not sent twice the traffic.
+    """
+    
+    def __init__(
+        self,
+        percentile: float = 95,
+        window_size: int = 200,
+        min_samples: int = 20,
+        max_hedge_rate: float = 0.05
+    ):
+        self.percentile = percentile
+        self.max_hedge_rate = max_hedge_rate
+        self.latencies = LatencyTracker(window_size=window_size, min_samples=min_samples)
+        
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+    
+    def record(self, elapsed_ms: float):
+        """Feed the latency of a successful call (or a lower bound, for a cancelled one)"""
+        self.latencies.record(elapsed_ms)
+    
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging (None: not enough latency samples)"""
+        threshold_ms = self.latencies.percentile(self.percentile)
+        return threshold_ms / 1000 if threshold_ms is not None else None
+    
+    def _may_hedge(self) -> bool:
+        return self.hedges + 1 <= self.max_hedge_rate * self.calls
+    
+    async def run(self, call: Callable[[HedgedCall, str], Awaitable[T]]) -> T:
+        """
+        Run `call(hedged_call, role)` with hedging
+        
+        `role` is PRIMARY or DUPLICATE; `hedged_call.hedged` tells a call
+        whether a duplicate was sent alongside it (e.g. for logging).
+        """
+        self.calls += 1
+        hedged_call = HedgedCall()
+        primary = asyncio.ensure_future(call(hedged_call, PRIMARY))
+        tasks = [primary]
+        
+        try:
+            delay = self.hedge_delay()
+            if delay is None:
+                return await primary
+            
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self._may_hedge():
+                return await primary
+            
+            self.hedges += 1
+            hedged_call.hedged = True
+            duplicate = asyncio.ensure_future(call(hedged_call, DUPLICATE))
+            tasks.append(duplicate)
+            
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        if task is duplicate:
+                            self.hedge_wins += 1
+                        return task.result()
+            # Both calls failed: report the primary's error
+            return primary.result()
+        finally:
+            # Cancel the loser (or everything, if we were cancelled ourselves)
+            unfinished = [task for task in tasks if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            if unfinished:
+                await asyncio.gather(*unfinished, return_exceptions=True)
+    
+    def stats(self) -> Dict:
+        """Calls, hedges sent and won, and the current hedge delay"""
+        delay = self.hedge_delay()
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": self.hedges / self.calls if self.calls else 0.0,
+            "hedge_delay_ms": round(delay * 1000) if delay is not None else None
+        }
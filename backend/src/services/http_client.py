@@ -0,0 +1,86 @@
+"""
+HTTP Clients
+Shared, long-lived httpx clients with pooled keep-alive connections
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+from weakref import WeakKeyDictionary
+import httpx
+from backend.src.config import config
+
+
+# httpx connections belong to the event loop that opened them, so keep one set per loop
+_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = WeakKeyDictionary()
+
+
+def client_options(name: str) -> Dict[str, Any]:
+    """
+    httpx.AsyncClient options for a named client
+    
+    Defaults come from the http section of config.yaml; http.clients.<name>
+    overrides them for one client.
+    """
+    http_config = config.http_config
+    options = {
+        key: value for key, value in http_config.items() if key != 'clients'
+    }
+    options.update(http_config.get('clients', {}).get(name, {}))
+    
+    http2 = bool(options.get('http2', False))
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print(f"⚠️  http2 enabled for '{name}' but the h2 package is not installed, using HTTP/1.1")
+            http2 = False
+    
+    return {
+        "limits": httpx.Limits(
+            max_connections=options.get('max_connections', 20),
+            max_keepalive_connections=options.get('max_keepalive_connections', 10),
+            keepalive_expiry=options.get('keepalive_expiry_seconds', 30)
+        ),
+        "timeout": httpx.Timeout(
+            options.get('timeout_seconds', 30),
+            connect=options.get('connect_timeout_seconds', 10)
+        ),
+        "http2": http2
+    }
+
+
+def _create_client(name: str) -> httpx.AsyncClient:
+    """Build a new client for `name`"""
+    return httpx.AsyncClient(**client_options(name))
+
+
+def get_http_client(name: str) -> httpx.AsyncClient:
+    """
+    Shared client for a service (e.g. "openrouter", "x_api")
+    
+    The first call in an event loop creates the client; later calls reuse
+    it, so requests share pooled keep-alive connections instead of paying
+    TCP and TLS setup each time. Close with close_http_clients().
+    """
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+    client = clients.get(name)
+    if client is None or client.is_closed:
+        client = clients[name] = _create_client(name)
+    return client
+
+
+async def close_http_clients():
+    """Close every shared client opened in the running event loop"""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+@asynccontextmanager
+async def http_clients():
+    """Close the shared clients when the block exits (e.g. around a script's main)"""
+    try:
+        yield
+    finally:
+        await close_http_clients()
@@ -0,0 +1,230 @@
+"""
+Near-Duplicate Index
+MinHash LSH over post text so near-identical posts share one sentiment analysis
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from backend.src.config import config
+from backend.src.storage.database import get_session
+from backend.src.models.post import Post
+from backend.src.models.post_signature import PostSignature, LSHBucket
+from backend.src.models.sentiment_score import SentimentScore
+from backend.src.models.sentiment_reuse import SentimentReuse
+from backend.src.services.sketches import MinHash
+
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.8
+
+
+class NearDuplicateIndex:
+    """
+    Clusters posts whose text differs only by a cashtag, emoji, link, ...
+    
+    Each post gets a MinHash signature and one LSH bucket row per band.
+    A new post joins the cluster of its most similar indexed candidate
+    when the estimated Jaccard similarity reaches the threshold, and
+    starts a new cluster otherwise.
+    """
+    
+    def __init__(self, session_factory=None, threshold: Optional[float] = None):
+        """
+        Args:
+            session_factory: Callable returning a Session (defaults to get_session)
+            threshold: Minimum similarity to share a score (default: config, 0.8)
+        """
+        self.session_factory = session_factory or get_session
+        if threshold is None:
+            threshold = config.analysis_config.get('near_duplicates', {}).get(
+                'similarity_threshold', DEFAULT_SIMILARITY_THRESHOLD
+            )
+        self.threshold = threshold
+        self.minhash = MinHash()
+    
+    def add_post(self, session: Session, post_id: str, text: str) -> PostSignature:
+        """
+        Index one post inside the caller's transaction
+        
+        Flushes so posts added later in the same session can match it.
+        """
+        signature = self.minhash.signature(text)
+        representative_post_id, similarity = post_id, 1.0
+        keys = []
+        
+        # Posts with no text left after normalization (only links/emoji) are never matched
+        if not self.minhash.is_empty(signature):
+            keys = self.minhash.band_keys(signature)
+            match = self._best_match(session, signature, keys)
+            if match is not None:
+                candidate, similarity = match
+                representative_post_id = candidate.representative_post_id
+        
+        row = PostSignature(
+            post_id=post_id,
+            signature=MinHash.to_bytes(signature),
+            representative_post_id=representative_post_id,
+            similarity=similarity,
+            created_at=datetime.utcnow()
+        )
+        session.add(row)
+        session.add_all(
+            LSHBucket(band=band, bucket_key=key, post_id=post_id)
+            for band, key in enumerate(keys)
+        )
+        session.flush()
+        return row
+    
+    def _best_match(self, session: Session, signature: np.ndarray, keys: List[int]):
+        """Most similar indexed candidate at or above the threshold, with its similarity"""
+        candidate_ids = session.query(LSHBucket.post_id).filter(or_(*(
+            and_(LSHBucket.band == band, LSHBucket.bucket_key == key)
+            for band, key in enumerate(keys)
+        ))).distinct()
+        
+        best, best_similarity = None, self.threshold
+        for candidate in session.query(PostSignature).filter(PostSignature.post_id.in_(candidate_ids)):
+            similarity = MinHash.similarity(signature, MinHash.from_bytes(candidate.signature))
+            if similarity >= best_similarity and (best is None or similarity > best_similarity):
+                best, best_similarity = candidate, similarity
+        
+        return (best, best_similarity) if best is not None else None
+    
+    def index_missing(self, chunk_size: int = 500) -> int:
+        """
+        Index posts stored without a signature (e.g. before this index existed)
+        
+        Returns:
+            Number of posts indexed
+        """
+        session = self.session_factory()
+        indexed = 0
+        
+        try:
+            while True:
+                posts = session.query(Post.post_id, Post.text).outerjoin(
+                    PostSignature, PostSignature.post_id == Post.post_id
+                ).filter(
+                    PostSignature.post_id.is_(None)
+                ).order_by(Post.created_at, Post.post_id).limit(chunk_size).all()
+                
+                if not posts:
+                    return indexed
+                
+                for post_id, text in posts:
+                    self.add_post(session, post_id, text)
+                session.commit()
+                indexed += len(posts)
+        
+        finally:
+            session.close()
+    
+    def clusters(self, post_ids: Iterable[str]) -> Dict[str, str]:
+        """Representative post of each indexed post (unindexed posts are left out)"""
+        post_ids = list(post_ids)
+        session = self.session_factory()
+        
+        try:
+            return dict(session.query(PostSignature.post_id, PostSignature.representative_post_id).filter(
+                PostSignature.post_id.in_(post_ids)
+            ))
+        finally:
+            session.close()
+    
+    def reuse_scores(self, post_ids: Iterable[str], algorithm: str) -> Dict[str, SentimentScore]:
+        """
+        Copy scores from analyzed near-duplicates to unscored posts
+        
+        For each post, the analyzed members of its cluster are tried in
+        order (representative first, then oldest score) and the first with
+        similarity at or above the threshold is copied. Only original
+        scores are copied, never earlier copies. Every copy is recorded in
+        sentiment_reuses.
+        
+        Args:
+            post_ids: Posts to fill (posts already scored by `algorithm` are skipped)
+            algorithm: Algorithm whose scores to reuse
+        
+        Returns:
+            Dict of post_id -> the new SentimentScore
+        """
+        post_ids = list(post_ids)
+        if not post_ids:
+            return {}
+        
+        session = self.session_factory()
+        
+        try:
+            already_scored = {
+                post_id for (post_id,) in session.query(SentimentScore.post_id).filter(
+                    SentimentScore.post_id.in_(post_ids),
+                    SentimentScore.algorithm_id == algorithm
+                )
+            }
+            signatures = {
+                row.post_id: row for row in session.query(PostSignature).filter(
+                    PostSignature.post_id.in_(post_ids)
+                )
+                if row.post_id not in already_scored
+            }
+            if not signatures:
+                return {}
+            
+            copied_scores = session.query(SentimentReuse.sentiment_score_id)
+            sources = defaultdict(list)
+            for member, score in session.query(PostSignature, SentimentScore).join(
+                SentimentScore, SentimentScore.post_id == PostSignature.post_id
+            ).filter(
+                PostSignature.representative_post_id.in_({row.representative_post_id for row in signatures.values()}),
+                SentimentScore.algorithm_id == algorithm,
+                ~SentimentScore.id.in_(copied_scores)
+            ).order_by(SentimentScore.id):
+                sources[member.representative_post_id].append((member, score))
+            
+            reused = {}
+            now = datetime.utcnow()
+            for post_id, row in signatures.items():
+                candidates = sorted(
+                    sources.get(row.representative_post_id, []),
+                    key=lambda source: source[0].post_id != row.representative_post_id
+                )
+                signature = MinHash.from_bytes(row.signature)
+                
+                for member, source in candidates:
+                    similarity = MinHash.similarity(signature, MinHash.from_bytes(member.signature))
+                    if member.post_id == post_id or similarity < self.threshold:
+                        continue
+                    
+                    score = SentimentScore(
+                        post_id=post_id,
+                        algorithm_id=source.algorithm_id,
+                        algorithm_version=source.algorithm_version,
+                        classification=source.classification,
+                        confidence=source.confidence,
+                        score=source.score,
+                        reasoning=source.reasoning,
+                        created_at=now
+                    )
+                    session.add(score)
+                    session.flush()
+                    session.add(SentimentReuse(
+                        sentiment_score_id=score.id,
+                        post_id=post_id,
+                        source_post_id=member.post_id,
+                        source_score_id=source.id,
+                        algorithm_id=algorithm,
+                        similarity=similarity,
+                        created_at=now
+                    ))
+                    reused[post_id] = score
+                    break
+            
+            session.commit()
+            for score in reused.values():
+                session.refresh(score)
+            return reused
+        
+        finally:
+            session.close()
@@ -0,0 +1,252 @@
+"""
+Rate Limiter
+Adaptive token-bucket limits per provider and model, shared by every caller
+"""
+import asyncio
+import re
+import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Mapping, Optional
+from weakref import WeakKeyDictionary
+from backend.src.config import config
+
+
+# Locks bind to the event loop that uses them, so keep one set of limiters per loop
+_limiters: "WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AdaptiveRateLimiter]]" = WeakKeyDictionary()
+
+DURATION_PART_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class RateLimitedError(Exception):
+    """The provider answered 429 (or 503 with Retry-After)"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+
+def parse_reset(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds until a rate-limit window resets
+    
+    Accepts durations ("1s", "6m0s", "250ms"), epoch timestamps in seconds
+    or milliseconds (OpenRouter sends milliseconds) and plain seconds.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    
+    parts = DURATION_PART_PATTERN.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+    
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    now = time.time() if now is None else now
+    if number > 1e12:
+        return max(0.0, number / 1000 - now)
+    if number > 1e9:
+        return max(0.0, number - now)
+    return max(0.0, number)
+
+
+class AdaptiveRateLimiter:
+    """
+    Token buckets for requests/second and tokens/minute with AIMD adaptation
+    
+    acquire() waits (in FIFO order) until both buckets have room. Each
+    success raises the request rate additively up to the configured
+    ceiling; each 429 halves it (multiplicative decrease) and blocks the
+    limiter until Retry-After has passed, so concurrent callers back off
+    together instead of all retrying at once. Rate-limit headers reporting
+    no remaining requests block the limiter until the window resets.
+    """
+    
+    def __init__(
+        self,
+        key: str,
+        requests_per_second: float,
+        tokens_per_minute: Optional[float] = None,
+        burst: Optional[float] = None,
+        min_requests_per_second: float = 0.1,
+        increase_per_success: float = 0.05,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], "asyncio.Future"] = asyncio.sleep
+    ):
+        self.key = key
+        self.max_requests_per_second = float(requests_per_second)
+        self.min_requests_per_second = min(float(min_requests_per_second), self.max_requests_per_second)
+        self.requests_per_second = self.max_requests_per_second
+        self.tokens_per_minute = float(tokens_per_minute) if tokens_per_minute else None
+        self.burst = float(burst) if burst else max(1.0, self.max_requests_per_second)
+        self.increase_per_success = increase_per_success
+        self.decrease_factor = decrease_factor
+        
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = asyncio.Lock()
+        self._updated_at = clock()
+        self._request_tokens = self.burst
+        self._tokens = self.tokens_per_minute or 0.0
+        self._blocked_until = 0.0
+        
+        self.queue_depth = 0
+        self.requests = 0
+        self.rate_limited = 0
+    
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._updated_at)
+        self._updated_at = now
+        self._request_tokens = min(self.burst, self._request_tokens + elapsed * self.requests_per_second)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+    
+    async def acquire(self, tokens: int = 0):
+        """Wait until one request (and `tokens` tokens) may be sent"""
+        tokens = min(float(tokens), self.tokens_per_minute) if self.tokens_per_minute else 0.0
+        self.queue_depth += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = self._clock()
+                    self._refill(now)
+                    
+                    if self._blocked_until > now:
+                        wait = self._blocked_until - now
+                    else:
+                        wait = (1 - self._request_tokens) / self.requests_per_second
+                        if tokens:
+                            wait = max(wait, (tokens - self._tokens) * 60 / self.tokens_per_minute)
+                        if wait <= 0:
+                            self._request_tokens -= 1
+                            self._tokens -= tokens
+                            self.requests += 1
+                            return
+                    
+                    await self._sleep(wait)
+        finally:
+            self.queue_depth -= 1
+    
+    def on_success(self, headers: Optional[Mapping[str, str]] = None):
+        """Additive increase; honor remaining/reset rate-limit headers"""
+        self.requests_per_second = min(
+            self.max_requests_per_second,
+            self.requests_per_second + self.increase_per_success
+        )
+        if not headers:
+            return
+        
+        for remaining_name, reset_name in (
+            ("x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+            ("x-ratelimit-remaining", "x-ratelimit-reset")
+        ):
+            remaining = headers.get(remaining_name)
+            if remaining is None:
+                continue
+            try:
+                exhausted = float(remaining) <= 0
+            except ValueError:
+                continue
+            reset = parse_reset(headers.get(reset_name))
+            if exhausted and reset:
+                self._block(reset)
+            return
+    
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """
+        Multiplicative decrease and block until the provider allows requests again
+        
+        Returns:
+            Seconds the limiter is blocked for
+        """
+        self.rate_limited += 1
+        self.requests_per_second = max(
+            self.min_requests_per_second,
+            self.requests_per_second * self.decrease_factor
+        )
+        self._request_tokens = min(self._request_tokens, 0.0)
+        delay = retry_after if retry_after is not None else 1 / self.requests_per_second
+        self._block(delay)
+        return delay
+    
+    def _block(self, seconds: float):
+        self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+    
+    def metrics(self) -> Dict:
+        """Current limits, queue depth and counters"""
+        now = self._clock()
+        return {
+            "key": self.key,
+            "requests_per_second": round(self.requests_per_second, 4),
+            "max_requests_per_second": self.max_requests_per_second,
+            "tokens_per_minute": self.tokens_per_minute,
+            "queue_depth": self.queue_depth,
+            "blocked_for_seconds": round(max(0.0, self._blocked_until - now), 3),
+            "requests": self.requests,
+            "rate_limited": self.rate_limited
+        }
+
+
+def rate_limit_settings(provider: str, model: Optional[str] = None) -> Dict:
+    """
+    Settings for a provider/model from analysis.rate_limits in config.yaml
+    
+    "<provider>/<model>" overrides "<provider>", which overrides "default".
+    """
+    rate_limits = config.analysis_config.get('rate_limits', {})
+    settings = dict(rate_limits.get('default', {}))
+    settings.update(rate_limits.get(provider, {}))
+    if model:
+        settings.update(rate_limits.get(f"{provider}/{model}", {}))
+    return settings
+
+
+def rate_limiter(provider: str, model: Optional[str] = None) -> AdaptiveRateLimiter:
+    """
+    Limiter shared by every caller of a provider/model in this event loop
+    """
+    key = f"{provider}/{model}" if model else provider
+    loop = asyncio.get_running_loop()
+    limiters = _limiters.setdefault(loop, {})
+    if key not in limiters:
+        settings = rate_limit_settings(provider, model)
+        limiters[key] = AdaptiveRateLimiter(
+            key,
+            requests_per_second=settings.get('requests_per_second', 2),
+            tokens_per_minute=settings.get('tokens_per_minute'),
+            burst=settings.get('burst'),
+            min_requests_per_second=settings.get('min_requests_per_second', 0.1),
+            increase_per_success=settings.get('increase_per_success', 0.05),
+            decrease_factor=settings.get('decrease_factor', 0.5)
+        )
+    return limiters[key]
+
+
+def rate_limit_metrics() -> List[Dict]:
+    """metrics() of every limiter in the running event loop"""
+    limiters = _limiters.get(asyncio.get_running_loop(), {})
+    return [limiter.metrics() for limiter in limiters.values()]
@@ -3,7 +3,7 @@ Base Sentiment Analyzer
 Abstract interface for sentiment analysis algorithms
 """
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List, Optional
 
 
 class SentimentAnalyzer(ABC):
@@ -26,6 +26,37 @@ class SentimentAnalyzer(ABC):
         """
         pass
     
+    async def analyze_batch(self, texts: List[str], post_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Analyze many texts (results in input order)
+        
+        Default implementation analyzes one text at a time; analyzers
+        that can do better (e.g. one API request per batch) override it.
+        """
+        return [await self.analyze(text) for text in texts]
+    
+    def cache_identity(self) -> Dict:
+        """
+        Everything besides the text that determines a result
+        
+        Part of the result cache key: when any value changes, earlier
+        cached results stop matching.
+        """
+        return {"algorithm_version": self.algorithm_version}
+    
+    def is_cacheable(self, result: Dict) -> bool:
+        """Whether a result may be cached (fallback results are not)"""
+        return result.get("algorithm_id") == self.algorithm_id
+    
+    def shares_results(self) -> bool:
+        """
+        Whether posts with the same text may share one in-flight analysis
+        
+        False for analyzers whose result depends on the post as well as
+        its text.
+        """
+        return True
+    
     @property
     @abstractmethod
     def algorithm_id(self) -> str:
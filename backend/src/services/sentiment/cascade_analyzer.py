@@ -0,0 +1,233 @@
+"""
+Cascade Sentiment Analyzer
+Runs a cheap local analyzer first and escalates to the LLM only where it matters
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from backend.src.services.sentiment.base import SentimentAnalyzer
+from backend.src.services.weighting_calculator import WeightingCalculator
+from backend.src.storage.database import get_session
+from backend.src.models.post import Post
+from backend.src.models.author import Author
+from backend.src.models.engagement import Engagement
+from backend.src.models.cascade_decision import CascadeDecision
+
+
+def engagement_weights(
+    post_ids: List[str],
+    session_factory=None,
+    calculator: Optional[WeightingCalculator] = None
+) -> Dict[str, float]:
+    """
+    Current aggregate weight of each post (one query, vectorized)
+    
+    Bot detection runs after sentiment, so the bot penalty is left out
+    (bot_score 0). Posts missing from the database are left out.
+    """
+    if not post_ids:
+        return {}
+    
+    session = (session_factory or get_session)()
+    try:
+        rows = session.query(
+            Post.post_id,
+            Engagement.like_count,
+            Engagement.retweet_count,
+            Engagement.reply_count,
+            Engagement.quote_count,
+            Author.followers_count,
+            Author.verified
+        ).outerjoin(
+            Engagement, Engagement.post_id == Post.post_id
+        ).outerjoin(
+            Author, Author.user_id == Post.author_id
+        ).filter(Post.post_id.in_(post_ids)).all()
+    finally:
+        session.close()
+    
+    if not rows:
+        return {}
+    
+    calculator = calculator or WeightingCalculator()
+    columns = list(zip(*rows))
+    weights = calculator.calculate_weights_batch(
+        likes=[value or 0 for value in columns[1]],
+        retweets=[value or 0 for value in columns[2]],
+        replies=[value or 0 for value in columns[3]],
+        quotes=[value or 0 for value in columns[4]],
+        followers=[value or 0 for value in columns[5]],
+        verified=[bool(value) for value in columns[6]],
+        bot_score=[0.0] * len(rows)
+    )
+    return dict(zip(columns[0], weights.tolist()))
+
+
+class CascadeAnalyzer(SentimentAnalyzer):
+    """
+    Cheap analyzer first, LLM for the posts where it matters
+    
+    A post is escalated when the first analyzer's confidence is below
+    `confidence_threshold`, or when its engagement weight (its pull on
+    the weighted aggregate) is at least `weight_threshold`. Escalated
+    posts are sent to the LLM in one analyze_batch call. If the LLM only
+    returns a fallback result, the first analyzer's result is kept.
+    
+    Results are stored under algorithm_id "cascade"; algorithm_version
+    names the analyzer that decided ("openai:<model>", "vader:v2.0").
+    Every routing decision is written to cascade_decisions, and stats()
+    gives this process's escalation rate.
+    """
+    
+    def __init__(
+        self,
+        first: SentimentAnalyzer,
+        escalation: SentimentAnalyzer,
+        confidence_threshold: float = 0.7,
+        weight_threshold: Optional[float] = None,
+        weight_lookup: Optional[Callable[[List[str]], Dict[str, float]]] = None,
+        session_factory=None
+    ):
+        """
+        Args:
+            first: Cheap analyzer that sees every post (e.g. VADER)
+            escalation: Analyzer for escalated posts (e.g. OpenAI)
+            confidence_threshold: Escalate below this first-analyzer confidence
+            weight_threshold: Escalate at or above this engagement weight (None: never)
+            weight_lookup: post_ids -> weights (default: engagement_weights)
+            session_factory: Callable returning a Session for decision records
+        """
+        self.first = first
+        self.escalation = escalation
+        self.confidence_threshold = confidence_threshold
+        self.weight_threshold = weight_threshold
+        self.session_factory = session_factory or get_session
+        self.weight_lookup = weight_lookup or (
+            lambda post_ids: engagement_weights(post_ids, session_factory=self.session_factory)
+        )
+        
+        self.routed = 0
+        self.escalated = 0
+        self.reasons: Counter = Counter()
+        
+        self._algorithm_id = "cascade"
+    
+    def pack_batches(self, texts: List[str]) -> List[List[int]]:
+        """Units of work sized for the escalation analyzer's batches"""
+        pack_batches = getattr(self.escalation, "pack_batches", None)
+        if pack_batches is not None:
+            return pack_batches(texts)
+        return [[index] for index in range(len(texts))]
+    
+    async def analyze(self, text: str, post_id: str = None) -> Dict:
+        return (await self.analyze_batch([text], post_ids=[post_id]))[0]
+    
+    async def analyze_batch(self, texts: List[str], post_ids: Optional[List[str]] = None) -> List[Dict]:
+        """Route each text through the cascade (results in input order)"""
+        post_ids = list(post_ids) if post_ids is not None else [None] * len(texts)
+        first_results = await self.first.analyze_batch(texts)
+        
+        weights = {}
+        known_ids = [post_id for post_id in post_ids if post_id is not None]
+        if self.weight_threshold is not None and known_ids:
+            weights = self.weight_lookup(known_ids)
+        
+        reasons = []
+        for post_id, result in zip(post_ids, first_results):
+            reason = []
+            if result["confidence"] < self.confidence_threshold:
+                reason.append("low_confidence")
+            weight = weights.get(post_id)
+            if weight is not None and weight >= self.weight_threshold:
+                reason.append("high_weight")
+            reasons.append(",".join(reason) or None)
+        
+        final_results = list(first_results)
+        escalate = [index for index, reason in enumerate(reasons) if reason]
+        if escalate:
+            try:
+                escalated = await self.escalation.analyze_batch(
+                    [texts[index] for index in escalate],
+                    post_ids=[post_ids[index] for index in escalate]
+                )
+            except Exception as e:
+                print(f"   ⚠️ Cascade escalation of {len(escalate)} posts failed, keeping first results: {e}")
+                escalated = [None] * len(escalate)
+            
+            for index, result in zip(escalate, escalated):
+                if result is not None and result.get("algorithm_id") == self.escalation.algorithm_id:
+                    final_results[index] = result
+        
+        self.routed += len(texts)
+        self.escalated += len(escalate)
+        self.reasons.update(reason for reason in reasons if reason)
+        self._record(post_ids, first_results, final_results, reasons, weights)
+        
+        return [
+            {
+                **result,
+                "algorithm_id": self.algorithm_id,
+                "algorithm_version": f"{result['algorithm_id']}:{result['algorithm_version']}"
+            }
+            for result in final_results
+        ]
+    
+    def _record(self, post_ids, first_results, final_results, reasons, weights):
+        """Write one CascadeDecision per post with a known post_id"""
+        now = datetime.utcnow()
+        decisions = [
+            CascadeDecision(
+                post_id=post_id,
+                first_algorithm_id=first["algorithm_id"],
+                first_classification=first["classification"],
+                first_confidence=first["confidence"],
+                weight=weights.get(post_id),
+                escalated=reason is not None,
+                reason=reason,
+                final_algorithm_id=final["algorithm_id"],
+                created_at=now
+            )
+            for post_id, first, final, reason in zip(post_ids, first_results, final_results, reasons)
+            if post_id is not None
+        ]
+        if not decisions:
+            return
+        
+        session = self.session_factory()
+        try:
+            session.add_all(decisions)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"   ⚠️ Could not record cascade decisions: {e}")
+        finally:
+            session.close()
+    
+    def stats(self) -> Dict:
+        """Posts routed and escalated in this process"""
+        return {
+            "routed": self.routed,
+            "escalated": self.escalated,
+            "escalation_rate": self.escalated / self.routed if self.routed else 0.0,
+            "reasons": dict(self.reasons)
+        }
+    
+    def cache_identity(self) -> Dict:
+        return {
+            "first": {"algorithm_id": self.first.algorithm_id, **self.first.cache_identity()},
+            "escalation": {"algorithm_id": self.escalation.algorithm_id, **self.escalation.cache_identity()},
+            "confidence_threshold": self.confidence_threshold,
+            "weight_threshold": self.weight_threshold
+        }
+    
+    def shares_results(self) -> bool:
+        # Routing depends on each post's engagement weight, and each post gets its own decision record
+        return False
+    
+    @property
+    def algorithm_id(self) -> str:
+        return self._algorithm_id
+    
+    @property
+    def algorithm_version(self) -> str:
+        return f"{self.first.algorithm_id}>{self.escalation.algorithm_id}"
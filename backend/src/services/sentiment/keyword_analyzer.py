@@ -0,0 +1,39 @@
+"""
+Keyword Sentiment Analyzer
+Scores posts by the bullish and bearish keywords in config.yaml
+"""
+from typing import Dict, List, Optional
+from backend.src.services.sentiment.base import SentimentAnalyzer
+from backend.src.services.sentiment.keyword_matcher import KeywordMatcher, default_matcher
+
+
+class KeywordAnalyzer(SentimentAnalyzer):
+    """Keyword-count sentiment analyzer (no API calls)"""
+    
+    def __init__(self, matcher: Optional[KeywordMatcher] = None):
+        self.matcher = matcher or default_matcher()
+        self._algorithm_id = "keyword"
+        self._algorithm_version = "v1.1"
+    
+    async def analyze(self, text: str, post_id: str = None) -> Dict:
+        """Analyze sentiment by counting configured keywords"""
+        return self._result(self.matcher.analyze(text))
+    
+    async def analyze_batch(self, texts: List[str], post_ids: Optional[List[str]] = None) -> List[Dict]:
+        """Analyze many texts in one matcher pass"""
+        return [self._result(result) for result in self.matcher.analyze_batch(texts)]
+    
+    def _result(self, result: Dict) -> Dict:
+        return {
+            **result,
+            "algorithm_id": self.algorithm_id,
+            "algorithm_version": self.algorithm_version
+        }
+    
+    @property
+    def algorithm_id(self) -> str:
+        return self._algorithm_id
+    
+    @property
+    def algorithm_version(self) -> str:
+        return self._algorithm_version
@@ -0,0 +1,153 @@
+"""
+Keyword Matcher
+Compiled multi-keyword matching for the keyword-based analyzers
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+from backend.src.config import config
+
+
+BULLISH = 0
+BEARISH = 1
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """
+    Regex alternation with shared prefixes factored out
+    
+    ["buy", "bull", "bullish"] becomes "bu(?:ll(?:ish)?|y)", so the regex
+    engine walks a trie of the keywords instead of retrying every keyword
+    at every position.
+    """
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def _render(node: Dict) -> str:
+        branches = [re.escape(char) + _render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+    
+    return _render(trie)
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def keyword_result(bullish_count: int, bearish_count: int) -> Dict:
+    """
+    Classification from keyword counts
+    
+    Each keyword on the winning side adds 0.1 confidence (max 0.95) and
+    moves the score 10 points past the 60/40 edge of the neutral band.
+    """
+    if bullish_count > bearish_count:
+        classification = "Bullish"
+        confidence = min(0.6 + (bullish_count * 0.1), 0.95)
+        score = 60 + (bullish_count * 10)  # 60-100 range
+    elif bearish_count > bullish_count:
+        classification = "Bearish"
+        confidence = min(0.6 + (bearish_count * 0.1), 0.95)
+        score = 40 - (bearish_count * 10)  # 0-40 range
+    else:
+        classification = "Neutral"
+        confidence = 0.5
+        score = 50
+    
+    return {
+        "classification": classification,
+        "confidence": confidence,
+        "score": max(0, min(100, score))  # Clamp to 0-100
+    }
+
+
+class KeywordMatcher:
+    """
+    Counts bullish and bearish keywords in texts with one compiled regex
+    
+    Keywords match whole words only ("up" does not match "update", "down"
+    does not match "countdown"); keywords that start or end with a symbol
+    or emoji ("🚀", "$mstr") only need a word boundary on their word side.
+    Matching is case-insensitive and each keyword counts once per text.
+    """
+    
+    def __init__(self, bullish_keywords: Iterable[str], bearish_keywords: Iterable[str]):
+        self.polarity: Dict[str, Tuple[int, int]] = {}
+        for index, keywords in ((BULLISH, bullish_keywords), (BEARISH, bearish_keywords)):
+            for keyword in keywords:
+                keyword = keyword.strip().lower()
+                if keyword:
+                    counts = list(self.polarity.get(keyword, (0, 0)))
+                    counts[index] = 1
+                    self.polarity[keyword] = tuple(counts)
+        
+        words = [kw for kw in self.polarity if _is_word_char(kw[0]) and _is_word_char(kw[-1])]
+        others = [kw for kw in self.polarity if not (_is_word_char(kw[0]) and _is_word_char(kw[-1]))]
+        
+        alternatives = []
+        if words:
+            alternatives.append(r"(?<!\w)" + _trie_pattern(words) + r"(?!\w)")
+        for keyword in sorted(others, key=len, reverse=True):
+            alternatives.append(
+                (r"(?<!\w)" if _is_word_char(keyword[0]) else "")
+                + re.escape(keyword)
+                + (r"(?!\w)" if _is_word_char(keyword[-1]) else "")
+            )
+        self.pattern = re.compile("|".join(alternatives)) if alternatives else None
+    
+    @classmethod
+    def from_config(cls) -> "KeywordMatcher":
+        """Matcher for sentiment.keyword in config.yaml"""
+        keyword_config = config.sentiment_keyword_config
+        return cls(
+            keyword_config.get('bullish_keywords', []),
+            keyword_config.get('bearish_keywords', [])
+        )
+    
+    def count(self, text: str) -> Tuple[int, int]:
+        """(bullish, bearish) distinct keyword counts for one text"""
+        return self.count_batch([text])[0]
+    
+    def count_batch(self, texts: List[str]) -> List[Tuple[int, int]]:
+        """(bullish, bearish) distinct keyword counts for many texts"""
+        if self.pattern is None:
+            return [(0, 0)] * len(texts)
+        
+        findall = self.pattern.findall
+        polarity = self.polarity
+        counts = []
+        for text in texts:
+            bullish = bearish = 0
+            for keyword in set(findall(text.lower())):
+                bull, bear = polarity[keyword]
+                bullish += bull
+                bearish += bear
+            counts.append((bullish, bearish))
+        return counts
+    
+    def analyze(self, text: str) -> Dict:
+        """Classification, confidence and 0-100 score for one text"""
+        return keyword_result(*self.count(text))
+    
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """analyze() for many texts in one pass (results in input order)"""
+        return [keyword_result(bullish, bearish) for bullish, bearish in self.count_batch(texts)]
+
+
+_default_matcher: Optional[KeywordMatcher] = None
+
+
+def default_matcher() -> KeywordMatcher:
+    """Shared matcher for the configured keywords (compiled on first use)"""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = KeywordMatcher.from_config()
+    return _default_matcher
@@ -0,0 +1,96 @@
+"""
+Micro-Batcher
+Groups concurrent single-item requests into batches for a batch function
+"""
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+
+class MicroBatcher:
+    """
+    Collects concurrent submit() calls into batches
+    
+    A batch is sent as soon as `max_batch_size` items are waiting, or
+    `max_wait_ms` after its first item arrived, whichever comes first.
+    The synchronous `process_batch` runs on `executor` (default: the
+    loop's default executor) so the event loop keeps accepting items
+    while a batch is being processed.
+    """
+    
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        executor: Optional[Executor] = None
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor
+        
+        self.batches = 0
+        self.items = 0
+        
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        
+        return await future
+    
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        """Queue several items at once (results in input order)"""
+        return list(await asyncio.gather(*(self.submit(item) for item in items)))
+    
+    def _flush(self):
+        """Start a task for every full batch waiting, plus the remainder"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        # Skip items whose caller has stopped waiting
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+        
+        self.batches += 1
+        self.items += len(batch)
+        
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.process_batch, [item for item, _ in batch]
+            )
+            if len(results) != len(batch):
+                raise ValueError(f"process_batch returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -4,29 +4,65 @@ Uses OpenAI/OpenRouter API for sentiment analysis
 """
 import os
 import json
+import hashlib
+import math
 import asyncio
+from typing import Dict, List, Optional, Tuple
 import httpx
-from typing import Dict
 from dotenv import load_dotenv
 from backend.src.services.sentiment.base import SentimentAnalyzer
+from backend.src.services.sentiment.keyword_matcher import default_matcher
 from backend.src.config import config
 from backend.src.services.api_logger import APILogger, APICallTimer
+from backend.src.services.circuit_breaker import OPEN, CircuitOpenError, circuit_breaker
+from backend.src.services.concurrency import provider_semaphore
+from backend.src.services.hedging import PRIMARY, HedgedCall, RequestHedger
+from backend.src.services.http_client import get_http_client
+from backend.src.services.rate_limiter import RateLimitedError, parse_retry_after, rate_limiter
 
 # Load environment variables
 load_dotenv()
 
+# Reasoning prefix of the neutral result returned when a reply cannot be parsed
+PARSE_ERROR_PREFIX = "Parse error: "
+
 
 class OpenAIAnalyzer(SentimentAnalyzer):
-    """Sentiment analyzer using OpenAI/OpenRouter API"""
+    """
+    Sentiment analyzer using OpenAI/OpenRouter API
+    
+    Calls go through the provider's circuit breaker. While the circuit is
+    open (or without an API key, or after retries run out) results come
+    from `fallback`, or from keyword matching when no fallback is given.
+    """
     
-    def __init__(self):
+    def __init__(self, fallback: Optional[SentimentAnalyzer] = None):
+        """
+        Args:
+            fallback: Analyzer used when the API is unavailable (default: keyword matching)
+        """
         self.api_key = os.getenv("OPENROUTER_API_KEY")
         self.openai_config = config.sentiment_openai_config
         self.system_prompt = config.sentiment_system_prompt
+        self.batch_prompt = config.sentiment_batch_prompt
+        self.fallback = fallback
+        self.hedger = self._create_hedger()
         
         self._algorithm_id = "openai"
         self._algorithm_version = self.openai_config.get('model', 'unknown')
     
+    def _create_hedger(self) -> Optional[RequestHedger]:
+        """Request hedging from sentiment.openai.hedging in config.yaml (None if disabled)"""
+        hedging_config = self.openai_config.get('hedging', {}) or {}
+        if not hedging_config.get('enabled', False):
+            return None
+        return RequestHedger(
+            percentile=hedging_config.get('percentile', 95),
+            window_size=hedging_config.get('window_size', 200),
+            min_samples=hedging_config.get('min_samples', 20),
+            max_hedge_rate=hedging_config.get('max_hedge_rate', 0.05)
+        )
+    
     async def analyze(self, text: str, post_id: str = None) -> Dict:
         """
         Analyze sentiment using OpenRouter API
@@ -34,30 +70,127 @@ class OpenAIAnalyzer(SentimentAnalyzer):
         Args:
             text: Tweet text to analyze
             post_id: Optional post ID for logging
-            
+        
         Returns:
             Dict with classification, confidence, algorithm info
         """
-        if not self.api_key:
-            # Fallback to keyword matching if no API key
-            return await self._fallback_keyword_analysis(text)
+        if not self.api_key or self._circuit_open():
+            # No API key, or provider known to be down: don't wait on it
+            return await self._fallback_analysis(text)
         
         try:
             # Call OpenRouter API with retries
             result = await self._call_openrouter_with_retry(text, post_id=post_id)
             return result
-            
+        
+        except CircuitOpenError:
+            return await self._fallback_analysis(text)
+        
         except Exception as e:
             print(f"   ⚠️ OpenRouter API failed: {e}")
-            # Fallback to keyword matching
-            return await self._fallback_keyword_analysis(text)
+            return await self._fallback_analysis(text)
+    
+    async def analyze_batch(self, texts: List[str], post_ids: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Analyze many tweets with as few requests as possible
+        
+        Tweets are packed into batches (see pack_batches) and each batch
+        is sent as one request, so the system prompt is paid once per
+        batch instead of once per tweet. Items the model drops or returns
+        malformed are retried with single-tweet calls; the rest of the
+        batch is kept.
+        
+        Args:
+            texts: Tweet texts to analyze
+            post_ids: Optional post IDs (same order) for logging
+        
+        Returns:
+            List of result dicts in the same order as texts
+        """
+        post_ids = list(post_ids) if post_ids is not None else [None] * len(texts)
+        if len(post_ids) != len(texts):
+            raise ValueError("post_ids must have the same length as texts")
+        
+        if not self.api_key or self._circuit_open():
+            return await self._fallback_batch(texts)
+        
+        results: List[Optional[Dict]] = [None] * len(texts)
+        
+        for batch in self.pack_batches(texts):
+            if len(batch) == 1:
+                index = batch[0]
+                results[index] = await self.analyze(texts[index], post_id=post_ids[index])
+                continue
+            
+            try:
+                parsed = await self._call_openrouter_batch(
+                    [texts[index] for index in batch],
+                    [post_ids[index] for index in batch]
+                )
+            except Exception as e:
+                if not isinstance(e, CircuitOpenError):
+                    print(f"   ⚠️ OpenRouter batch of {len(batch)} failed: {e}")
+                fallbacks = await self._fallback_batch([texts[index] for index in batch])
+                for index, fallback in zip(batch, fallbacks):
+                    results[index] = fallback
+                continue
+            
+            for position, index in enumerate(batch):
+                if position in parsed:
+                    results[index] = parsed[position]
+                else:
+                    # Missing or malformed in the batch reply: ask for this one alone
+                    results[index] = await self.analyze(texts[index], post_id=post_ids[index])
+        
+        return results
+    
+    def cache_identity(self) -> Dict:
+        """Model, prompts and temperature: changing any of them invalidates cached results"""
+        prompt = f"{self.system_prompt}\n{self.batch_prompt}"
+        return {
+            "model": self.openai_config.get('model'),
+            "prompt_sha256": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+            "temperature": self.openai_config.get('temperature', 0.3)
+        }
+    
+    def is_cacheable(self, result: Dict) -> bool:
+        """Keyword fallbacks and unparseable replies are not cached"""
+        return (
+            result.get("algorithm_id") == self.algorithm_id
+            and not result.get("reasoning", "").startswith(PARSE_ERROR_PREFIX)
+        )
+    
+    def pack_batches(self, texts: List[str]) -> List[List[int]]:
+        """
+        Group tweet indexes into batches under the configured limits
+        
+        A batch closes when it reaches batch_size tweets or when the next
+        tweet would push its estimated input tokens past
+        batch_max_input_tokens. A tweet larger than the budget gets a
+        batch of its own.
+        
+        Returns:
+            List of batches, each a list of indexes into texts
+        """
+        batch_size = max(1, self.openai_config.get('batch_size', 20))
+        token_budget = self.openai_config.get('batch_max_input_tokens', 2000)
+        
+        batches = []
+        batch, batch_tokens = [], 0
+        for index, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if batch and (len(batch) >= batch_size or batch_tokens + tokens > token_budget):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(index)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        
+        return batches
     
     async def _call_openrouter_with_retry(self, text: str, post_id: str = None) -> Dict:
         """Call OpenRouter API with retry logic and logging"""
-        max_retries = self.openai_config.get('max_retries', 3)
-        timeout = self.openai_config.get('timeout_seconds', 30)
-        
-        endpoint = self.openai_config.get('api_base_url') + "/chat/completions"
         request_data = {
             "model": self.openai_config.get('model'),
             "messages": [
@@ -68,56 +201,193 @@ class OpenAIAnalyzer(SentimentAnalyzer):
             "max_tokens": self.openai_config.get('max_tokens', 200)
         }
         
+        result = await self._post_with_retry(request_data, context={'post_id': post_id, 'algorithm_id': self.algorithm_id})
+        return self._parse_openrouter_response(result)
+    
+    async def _call_openrouter_batch(self, texts: List[str], post_ids: List[Optional[str]]) -> Dict[int, Dict]:
+        """
+        Send one request for a batch of tweets
+        
+        Returns:
+            Dict of batch position -> result for every item that parsed
+        """
+        tweets = [{"id": str(position + 1), "text": text} for position, text in enumerate(texts)]
+        per_item_tokens = self.openai_config.get('batch_max_tokens_per_item', 60)
+        
+        request_data = {
+            "model": self.openai_config.get('model'),
+            "messages": [
+                {"role": "system", "content": f"{self.system_prompt}\n{self.batch_prompt}"},
+                {"role": "user", "content": f"Analyze these tweets: {json.dumps(tweets, ensure_ascii=False)}"}
+            ],
+            "temperature": self.openai_config.get('temperature', 0.3),
+            "max_tokens": per_item_tokens * len(texts)
+        }
+        
+        result = await self._post_with_retry(request_data, context={
+            'post_id': ",".join(post_id for post_id in post_ids if post_id) or None,
+            'algorithm_id': self.algorithm_id
+        })
+        return self._parse_batch_response(result, len(texts))
+    
+    async def _post_with_retry(self, request_data: Dict, context: Dict) -> Dict:
+        """POST a chat completion with retries (each attempt hedged if enabled)"""
+        max_retries = self.openai_config.get('max_retries', 3)
+        provider = self.openai_config.get('provider', 'openrouter')
+        breaker = circuit_breaker(provider)
+        
         for attempt in range(max_retries):
+            final = attempt == max_retries - 1
             try:
-                with APICallTimer() as timer:
-                    async with httpx.AsyncClient(timeout=timeout) as client:
-                        response = await client.post(
-                            endpoint,
-                            headers={
-                                "Authorization": f"Bearer {self.api_key}",
-                                "Content-Type": "application/json"
-                            },
-                            json=request_data
-                        )
-                        
-                        response.raise_for_status()
-                        result = response.json()
-                
-                # Log successful API call
-                APILogger.log_api_call(
-                    service='openrouter',
-                    endpoint=endpoint,
-                    request_data=request_data,
-                    response_data=result,
-                    response_time_ms=timer.elapsed_ms,
-                    status='success',
-                    context={'post_id': post_id, 'algorithm_id': self.algorithm_id}
+                if self.hedger is None:
+                    return await self._send(request_data, context, final=final)
+                return await self.hedger.run(
+                    lambda call, role: self._send(request_data, context, final=final, call=call, role=role)
                 )
-                
-                # Parse response
-                return self._parse_openrouter_response(result)
-                    
+            
+            except CircuitOpenError:
+                raise
+            
+            except RateLimitedError:
+                # The limiter already slowed down and waits out Retry-After
+                # on the next acquire(), so no extra sleep here
+                if final:
+                    raise
+            
             except Exception as e:
-                # Log failed API call
-                APILogger.log_api_call(
-                    service='openrouter',
-                    endpoint=endpoint,
-                    request_data=request_data,
-                    response_data=None,
-                    response_time_ms=None,
-                    status='error' if attempt == max_retries - 1 else 'retry',
-                    error_message=str(e),
-                    context={'post_id': post_id, 'algorithm_id': self.algorithm_id}
-                )
-                
-                if attempt == max_retries - 1:
+                if final:
                     raise
+                if breaker.state == OPEN:
+                    raise CircuitOpenError(f"Circuit for {provider} opened") from e
                 # Wait before retry (exponential backoff)
                 await asyncio.sleep(2 ** attempt)
         
         raise Exception("Max retries exceeded")
     
+    async def _send(
+        self,
+        request_data: Dict,
+        context: Dict,
+        final: bool = True,
+        call: Optional[HedgedCall] = None,
+        role: Optional[str] = None
+    ) -> Dict:
+        """
+        One POST through the circuit breaker, rate limiter and provider
+        semaphore, logged to api_logs
+        
+        Hedged calls are logged with their role (primary/duplicate); the
+        call that loses a hedge is cancelled and logged as 'cancelled' with
+        its estimated prompt tokens, so hedge cost shows up in api_logs.
+        Calls cancelled before their POST went out cost nothing and are
+        not logged. A primary that loses a hedge feeds the hedger its
+        elapsed time as a lower bound on its latency.
+        """
+        timeout = self.openai_config.get('timeout_seconds', 30)
+        endpoint = self.openai_config.get('api_base_url') + "/chat/completions"
+        provider = self.openai_config.get('provider', 'openrouter')
+        limiter = rate_limiter(provider, request_data.get('model'))
+        breaker = circuit_breaker(provider)
+        
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Circuit for {provider} is open")
+        
+        def hedge_role():
+            return role if call is not None and call.hedged else None
+        
+        sent = False
+        try:
+            # Wait for the rate limit and a provider slot outside the timer
+            # so queueing is not logged as latency
+            await limiter.acquire(estimate_request_tokens(request_data))
+            async with provider_semaphore(provider):
+                with APICallTimer() as timer:
+                    sent = True
+                    response = await get_http_client("openrouter").post(
+                        endpoint,
+                        headers={
+                            "Authorization": f"Bearer {self.api_key}",
+                            "Content-Type": "application/json"
+                        },
+                        json=request_data,
+                        timeout=timeout
+                    )
+                    
+                    retry_after = parse_retry_after(response.headers.get("retry-after"))
+                    if response.status_code == 429 or (response.status_code == 503 and retry_after is not None):
+                        raise RateLimitedError(
+                            f"Rate limited by {provider} (HTTP {response.status_code})",
+                            retry_after=retry_after
+                        )
+                    response.raise_for_status()
+                    result = response.json()
+        
+        except asyncio.CancelledError:
+            breaker.release()
+            if not sent:
+                # Still queued for the rate limit or a provider slot: nothing to bill
+                raise
+            
+            if self.hedger is not None and role == PRIMARY and hedge_role() is not None:
+                # Censored sample: the primary would have taken at least this long
+                self.hedger.record(timer.elapsed_ms)
+            
+            # Lost a hedge (or the run was stopped): the provider may still bill the prompt
+            APILogger.log_api_call(
+                service='openrouter',
+                endpoint=endpoint,
+                request_data=request_data,
+                status='cancelled',
+                context=context,
+                hedge=hedge_role(),
+                estimated_tokens=estimate_prompt_tokens(request_data)
+            )
+            raise
+        
+        except Exception as e:
+            # Log failed API call
+            APILogger.log_api_call(
+                service='openrouter',
+                endpoint=endpoint,
+                request_data=request_data,
+                response_data=None,
+                response_time_ms=None,
+                status='error' if final else 'retry',
+                error_message=str(e),
+                context=context,
+                hedge=hedge_role()
+            )
+            
+            if isinstance(e, RateLimitedError):
+                # Slow every caller of this model down
+                breaker.release()
+                limiter.on_rate_limited(e.retry_after)
+            elif isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500:
+                # Our request was rejected; says nothing about provider health
+                breaker.release()
+            else:
+                breaker.record_failure(str(e))
+            raise
+        
+        limiter.on_success(response.headers)
+        breaker.record_success(timer.elapsed_ms)
+        if self.hedger is not None:
+            self.hedger.record(timer.elapsed_ms)
+        
+        # Log successful API call
+        APILogger.log_api_call(
+            service='openrouter',
+            endpoint=endpoint,
+            request_data=request_data,
+            response_data=result,
+            response_time_ms=timer.elapsed_ms,
+            status='success',
+            context=context,
+            hedge=hedge_role()
+        )
+        
+        return result
+    
     def _parse_openrouter_response(self, response: Dict) -> Dict:
         """Parse OpenRouter API response (expects score 0-100)"""
         try:
@@ -126,75 +396,114 @@ class OpenAIAnalyzer(SentimentAnalyzer):
             # Try to parse as JSON
             parsed = json.loads(content)
             
-            # Get score (0-100)
-            score = float(parsed.get("score", 50))
-            score = max(0, min(100, score))  # Clamp to 0-100
-            
-            # Map score to classification for backward compatibility
-            if score < 40:
-                classification = "Bearish"
-            elif score < 60:
-                classification = "Neutral"
-            else:
-                classification = "Bullish"
-            
-            # Derive confidence from score distance from neutral (50)
-            confidence = abs(score - 50) / 50  # 0.0 to 1.0
-            confidence = max(0.5, confidence)  # Minimum 0.5
-            
-            return {
-                "classification": classification,
-                "confidence": confidence,
-                "score": score,
-                "reasoning": parsed.get("reasoning", ""),
-                "algorithm_id": self.algorithm_id,
-                "algorithm_version": self.algorithm_version
-            }
+            return self._score_result(float(parsed.get("score", 50)), parsed.get("reasoning", ""))
         except Exception as e:
             # If parsing fails, return neutral
             return {
                 "classification": "Neutral",
                 "confidence": 0.5,
                 "score": 50,
-                "reasoning": f"Parse error: {str(e)}",
+                "reasoning": f"{PARSE_ERROR_PREFIX}{str(e)}",
                 "algorithm_id": self.algorithm_id,
                 "algorithm_version": self.algorithm_version
             }
     
-    async def _fallback_keyword_analysis(self, text: str) -> Dict:
-        """Fallback keyword-based analysis"""
-        text_lower = text.lower()
+    def _parse_batch_response(self, response: Dict, size: int) -> Dict[int, Dict]:
+        """
+        Parse a batch reply (JSON array of {id, score, reasoning})
         
-        bullish_keywords = ["moon", "bullish", "buy", "pump", "rocket", "🚀", "up", "gain", "accumulate"]
-        bearish_keywords = ["dump", "bearish", "sell", "crash", "down", "loss", "exit"]
+        Items are validated one by one: unknown or repeated ids, missing or
+        non-numeric scores and non-string reasoning are dropped so only
+        those tweets are retried. A reply that is not a JSON array yields
+        no items.
         
-        bullish_count = sum(1 for kw in bullish_keywords if kw in text_lower)
-        bearish_count = sum(1 for kw in bearish_keywords if kw in text_lower)
+        Returns:
+            Dict of batch position (0-based) -> result
+        """
+        try:
+            items = json.loads(_strip_code_fence(response["choices"][0]["message"]["content"]))
+        except Exception:
+            return {}
         
-        if bullish_count > bearish_count:
-            classification = "Bullish"
-            confidence = min(0.6 + (bullish_count * 0.1), 0.95)
-            score = 60 + (bullish_count * 10)  # 60-100 range
-        elif bearish_count > bullish_count:
+        if isinstance(items, dict):
+            # Some models wrap the array in an object, e.g. {"results": [...]}
+            items = next((value for value in items.values() if isinstance(value, list)), None)
+        if not isinstance(items, list):
+            return {}
+        
+        results = {}
+        repeated = set()
+        for item in items:
+            parsed = _parse_batch_item(item, size)
+            if parsed is None:
+                continue
+            position, score, reasoning = parsed
+            if position in results:
+                repeated.add(position)
+                continue
+            results[position] = self._score_result(score, reasoning)
+        
+        # Conflicting answers for one tweet: trust neither
+        for position in repeated:
+            del results[position]
+        
+        return results
+    
+    def _score_result(self, score: float, reasoning: str) -> Dict:
+        """Build a result dict from a 0-100 score"""
+        score = max(0, min(100, score))  # Clamp to 0-100
+        
+        # Map score to classification for backward compatibility
+        if score < 40:
             classification = "Bearish"
-            confidence = min(0.6 + (bearish_count * 0.1), 0.95)
-            score = 40 - (bearish_count * 10)  # 0-40 range
-        else:
+        elif score < 60:
             classification = "Neutral"
-            confidence = 0.5
-            score = 50
+        else:
+            classification = "Bullish"
         
-        score = max(0, min(100, score))  # Clamp to 0-100
+        # Derive confidence from score distance from neutral (50)
+        confidence = abs(score - 50) / 50  # 0.0 to 1.0
+        confidence = max(0.5, confidence)  # Minimum 0.5
         
         return {
             "classification": classification,
             "confidence": confidence,
             "score": score,
-            "reasoning": "Keyword fallback (API unavailable)",
-            "algorithm_id": "keyword-fallback",
-            "algorithm_version": "v1.0"
+            "reasoning": reasoning,
+            "algorithm_id": self.algorithm_id,
+            "algorithm_version": self.algorithm_version
         }
     
+    def _circuit_open(self) -> bool:
+        """Whether the provider's circuit breaker is currently rejecting calls"""
+        return circuit_breaker(self.openai_config.get('provider', 'openrouter')).state == OPEN
+    
+    async def _fallback_analysis(self, text: str) -> Dict:
+        """Fallback analysis for one text"""
+        return (await self._fallback_batch([text]))[0]
+    
+    async def _fallback_batch(self, texts: List[str]) -> List[Dict]:
+        """Fallback analyzer results, or keyword matching when none is configured"""
+        if self.fallback is None:
+            return self._fallback_keyword_batch(texts)
+        return [
+            {**result, "reasoning": f"{result['algorithm_id']} fallback (API unavailable)"}
+            for result in await self.fallback.analyze_batch(texts)
+        ]
+    
+    @staticmethod
+    def _fallback_keyword_batch(texts: List[str]) -> List[Dict]:
+        """Fallback keyword-based analysis for many texts in one matcher pass"""
+        return [
+            {
+                **result,
+                "reasoning": "Keyword fallback (API unavailable)",
+                "algorithm_id": "keyword-fallback",
+                "algorithm_version": "v1.1"
+            }
+            for result in default_matcher().analyze_batch(texts)
+        ]
+    
     @property
     def algorithm_id(self) -> str:
         return self._algorithm_id
@@ -202,3 +511,56 @@ class OpenAIAnalyzer(SentimentAnalyzer):
     @property
     def algorithm_version(self) -> str:
         return self._algorithm_version
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def estimate_prompt_tokens(request_data: Dict) -> int:
+    """Estimated prompt tokens of a chat completion request"""
+    return sum(estimate_tokens(message.get("content", "")) for message in request_data.get("messages", []))
+
+
+def estimate_request_tokens(request_data: Dict) -> int:
+    """Tokens a chat completion may count against a tokens/minute limit (prompt + max_tokens)"""
+    return estimate_prompt_tokens(request_data) + request_data.get("max_tokens", 0)
+
+
+def _strip_code_fence(content: str) -> str:
+    """Remove a ```json ... ``` wrapper if the model added one"""
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.split("\n", 1)[1] if "\n" in content else ""
+        if content.rstrip().endswith("```"):
+            content = content.rstrip()[:-3]
+    return content
+
+
+def _parse_batch_item(item, size: int) -> Optional[Tuple[int, float, str]]:
+    """Validate one batch reply item; returns (position, score, reasoning) or None"""
+    if not isinstance(item, dict):
+        return None
+    
+    try:
+        position = int(str(item.get("id")).strip()) - 1
+    except ValueError:
+        return None
+    if not 0 <= position < size:
+        return None
+    
+    score = item.get("score")
+    if isinstance(score, str):
+        try:
+            score = float(score)
+        except ValueError:
+            return None
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not math.isfinite(score):
+        return None
+    
+    reasoning = item.get("reasoning", "")
+    if not isinstance(reasoning, str):
+        return None
+    
+    return position, float(score), reasoning
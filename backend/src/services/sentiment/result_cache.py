@@ -0,0 +1,231 @@
+"""
+Sentiment Result Cache
+Content-addressed SQLite cache of analyzer results with LRU/TTL eviction
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from typing import Dict, List, Optional
+from backend.src.services.sentiment.base import SentimentAnalyzer
+
+
+URL_PATTERN = re.compile(r"https?://\S+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of a post for cache keys
+    
+    NFKC-normalizes, replaces links with a placeholder (copies of the same
+    spam carry different t.co links) and collapses whitespace. Case is
+    kept: "SELL NOW" and "sell now" may not score the same.
+    """
+    text = unicodedata.normalize("NFKC", text)
+    text = URL_PATTERN.sub("<url>", text)
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def cache_key(text: str, identity: Dict) -> str:
+    """SHA-256 of the normalized text and everything that affects the result"""
+    payload = json.dumps(
+        {"text": normalize_text(text), **identity},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent key -> result store
+    
+    Entries expire `ttl_seconds` after they were written; when the cache
+    grows past `max_entries`, the least recently used entries are removed.
+    Hit, miss, expiry and eviction counters cover this process only.
+    """
+    
+    def __init__(self, path: str, max_entries: int = 100_000, ttl_seconds: Optional[float] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+        """)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_results_last_used ON results (last_used_at)")
+        self._connection.commit()
+        self._size = self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    
+    def __len__(self):
+        return self._size
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached result for key, or None (counts a hit or miss)"""
+        row = self._connection.execute(
+            "SELECT result, created_at FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        
+        if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+            self._connection.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._connection.commit()
+            self._size -= 1
+            self.expired += 1
+            row = None
+        
+        if row is None:
+            self.misses += 1
+            return None
+        
+        self._connection.execute("UPDATE results SET last_used_at = ? WHERE key = ?", (now, key))
+        self._connection.commit()
+        self.hits += 1
+        return json.loads(row[0])
+    
+    def put(self, key: str, result: Dict):
+        """Store a result, evicting least recently used entries past max_entries"""
+        now = time.time()
+        inserted = self._connection.execute(
+            "INSERT OR IGNORE INTO results (key, result, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(result), now, now)
+        ).rowcount
+        if not inserted:
+            self._connection.execute(
+                "UPDATE results SET result = ?, created_at = ?, last_used_at = ? WHERE key = ?",
+                (json.dumps(result), now, now, key)
+            )
+        self._size += inserted
+        
+        if self._size > self.max_entries:
+            excess = self._size - self.max_entries
+            self._connection.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used_at LIMIT ?)",
+                (excess,)
+            )
+            self._size -= excess
+            self.evictions += excess
+        
+        self._connection.commit()
+    
+    def purge_expired(self) -> int:
+        """Delete every expired entry; returns the number removed"""
+        if self.ttl_seconds is None:
+            return 0
+        removed = self._connection.execute(
+            "DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+        ).rowcount
+        self._connection.commit()
+        self._size -= removed
+        self.expired += removed
+        return removed
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._size,
+            "expired": self.expired,
+            "evictions": self.evictions
+        }
+    
+    def close(self):
+        self._connection.close()
+
+
+class CachedAnalyzer(SentimentAnalyzer):
+    """
+    Serves repeated texts from a ResultCache instead of the wrapped analyzer
+    
+    Keys include the analyzer's cache_identity() (model, prompt hash,
+    temperature, ...), so changing any of them misses old entries. Only
+    results the analyzer marks cacheable are stored, so keyword fallbacks
+    and parse errors are retried next time.
+    """
+    
+    def __init__(self, analyzer: SentimentAnalyzer, cache: ResultCache):
+        self.analyzer = analyzer
+        self.cache = cache
+    
+    def __getattr__(self, name):
+        # Expose the wrapped analyzer's extras (e.g. pack_batches)
+        return getattr(self.analyzer, name)
+    
+    def _key(self, text: str) -> str:
+        return cache_key(text, {"algorithm_id": self.analyzer.algorithm_id, **self.analyzer.cache_identity()})
+    
+    async def analyze(self, text: str, post_id: str = None) -> Dict:
+        key = self._key(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if post_id is not None:
+            result = await self.analyzer.analyze(text, post_id=post_id)
+        else:
+            result = await self.analyzer.analyze(text)
+        if self.analyzer.is_cacheable(result):
+            self.cache.put(key, result)
+        return result
+    
+    async def analyze_batch(self, texts: List[str], post_ids: Optional[List[str]] = None) -> List[Dict]:
+        """Analyze only texts not in the cache, each distinct text once"""
+        post_ids = list(post_ids) if post_ids is not None else [None] * len(texts)
+        keys = [self._key(text) for text in texts]
+        
+        results: Dict[str, Dict] = {}
+        pending: Dict[str, int] = {}
+        for index, key in enumerate(keys):
+            if key in results or key in pending:
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = index
+        
+        if pending:
+            indexes = list(pending.values())
+            fresh = await self.analyzer.analyze_batch(
+                [texts[index] for index in indexes],
+                post_ids=[post_ids[index] for index in indexes]
+            )
+            for key, result in zip(pending, fresh):
+                results[key] = result
+                if self.analyzer.is_cacheable(result):
+                    self.cache.put(key, result)
+        
+        return [dict(results[key]) for key in keys]
+    
+    def shares_results(self) -> bool:
+        return self.analyzer.shares_results()
+    
+    @property
+    def algorithm_id(self) -> str:
+        return self.analyzer.algorithm_id
+    
+    @property
+    def algorithm_version(self) -> str:
+        return self.analyzer.algorithm_version
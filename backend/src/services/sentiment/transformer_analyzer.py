@@ -0,0 +1,146 @@
+"""
+Transformer Sentiment Analyzer
+Local sequence-classification model (transformers + torch) on CPU, no API cost
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from backend.src.services.sentiment.base import SentimentAnalyzer
+from backend.src.services.sentiment.micro_batcher import MicroBatcher
+from backend.src.config import config
+
+
+DEFAULT_LABEL_MAP = {
+    "positive": "Bullish",
+    "bullish": "Bullish",
+    "negative": "Bearish",
+    "bearish": "Bearish",
+    "neutral": "Neutral"
+}
+
+
+class TransformerAnalyzer(SentimentAnalyzer):
+    """
+    Sentiment analyzer backed by a local Hugging Face classification model
+    
+    The model is loaded on first use from `model_path` (a directory or
+    hub name). Concurrent analyze() calls are grouped into micro-batches
+    padded to their longest text, and batches run one at a time on a
+    dedicated thread, leaving torch's intra-op threads to use the cores.
+    """
+    
+    def __init__(self, model_path: Optional[str] = None, **overrides):
+        """
+        Args:
+            model_path: Model directory or hub name (default: sentiment.transformer.model_path)
+            **overrides: Any other sentiment.transformer setting (max_batch_size,
+                max_wait_ms, max_length, quantize_int8, num_threads, label_map)
+        """
+        transformer_config = {**config.sentiment_transformer_config, **overrides}
+        self.model_path = model_path or transformer_config.get('model_path', 'ProsusAI/finbert')
+        self.max_length = transformer_config.get('max_length', 128)
+        self.quantize_int8 = bool(transformer_config.get('quantize_int8', False))
+        self.num_threads = transformer_config.get('num_threads')
+        self.label_map = {
+            **DEFAULT_LABEL_MAP,
+            **{str(label).lower(): value for label, value in (transformer_config.get('label_map') or {}).items()}
+        }
+        
+        self.batcher = MicroBatcher(
+            self._predict,
+            max_batch_size=transformer_config.get('max_batch_size', 16),
+            max_wait_ms=transformer_config.get('max_wait_ms', 10),
+            executor=ThreadPoolExecutor(max_workers=1, thread_name_prefix="transformer")
+        )
+        
+        self._model = None
+        self._tokenizer = None
+        self._labels: List[str] = []
+        self._load_lock = threading.Lock()
+        
+        self._algorithm_id = "transformer"
+        self._algorithm_version = os.path.basename(self.model_path.rstrip("/")) + ("-int8" if self.quantize_int8 else "")
+    
+    def load(self):
+        """Load tokenizer and model (called automatically by the first batch)"""
+        with self._load_lock:
+            if self._model is not None:
+                return
+            
+            import torch
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer
+            
+            if self.num_threads:
+                torch.set_num_threads(int(self.num_threads))
+            
+            tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+            model = AutoModelForSequenceClassification.from_pretrained(self.model_path)
+            model.eval()
+            if self.quantize_int8:
+                # Dynamic quantization: int8 Linear weights, activations quantized per batch
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            
+            id2label = model.config.id2label
+            self._labels = [
+                self.label_map.get(str(id2label[index]).lower(), "Neutral")
+                for index in range(model.config.num_labels)
+            ]
+            self._tokenizer = tokenizer
+            self._model = model
+    
+    def _predict(self, texts: List[str]) -> List[Dict]:
+        """Classify one micro-batch (runs on the batcher's thread)"""
+        import torch
+        
+        self.load()
+        encoded = self._tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="pt"
+        )
+        with torch.inference_mode():
+            probabilities = torch.softmax(self._model(**encoded).logits, dim=-1).tolist()
+        
+        return [self._result(row) for row in probabilities]
+    
+    def _result(self, probabilities: List[float]) -> Dict:
+        """Classification, confidence and 0-100 score from class probabilities"""
+        by_class = {"Bullish": 0.0, "Bearish": 0.0, "Neutral": 0.0}
+        for label, probability in zip(self._labels, probabilities):
+            by_class[label] += probability
+        
+        best = max(range(len(probabilities)), key=probabilities.__getitem__)
+        return {
+            "classification": self._labels[best],
+            "confidence": round(probabilities[best], 4),
+            "score": round(50 + 50 * (by_class["Bullish"] - by_class["Bearish"]), 1),
+            "algorithm_id": self.algorithm_id,
+            "algorithm_version": self.algorithm_version
+        }
+    
+    async def analyze(self, text: str, post_id: str = None) -> Dict:
+        """Analyze one text (batched with other concurrent calls)"""
+        return await self.batcher.submit(text)
+    
+    async def analyze_batch(self, texts: List[str], post_ids: Optional[List[str]] = None) -> List[Dict]:
+        """Analyze many texts in micro-batches of max_batch_size"""
+        return await self.batcher.submit_many(texts)
+    
+    def cache_identity(self) -> Dict:
+        return {
+            "algorithm_version": self.algorithm_version,
+            "model_path": self.model_path,
+            "max_length": self.max_length,
+            "quantize_int8": self.quantize_int8
+        }
+    
+    @property
+    def algorithm_id(self) -> str:
+        return self._algorithm_id
+    
+    @property
+    def algorithm_version(self) -> str:
+        return self._algorithm_version
@@ -1,51 +1,157 @@
 """
 VADER Sentiment Analyzer
-Simple rule-based sentiment analysis (fallback/baseline)
+Lexicon-based sentiment analysis (vaderSentiment) extended with crypto slang
 """
-from typing import Dict
+import hashlib
+import json
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from backend.src.services.sentiment.base import SentimentAnalyzer
+from backend.src.config import config
+
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _lexicon_extension() -> Dict[str, float]:
+    """Crypto terms from sentiment.vader.lexicon in config.yaml (lowercase term -> valence)"""
+    extension = config.sentiment_vader_config.get('lexicon', {}) or {}
+    return {str(term).lower(): float(valence) for term, valence in extension.items()}
+
+
+@lru_cache(maxsize=None)
+def load_intensity_analyzer() -> SentimentIntensityAnalyzer:
+    """
+    VADER analyzer with the crypto lexicon applied (loaded once per process)
+    
+    VADER replaces emoji with their text description before looking words
+    up, so an emoji term is stored under its description joined with
+    underscores ("🚀" -> "rocket", "📉" -> "chart_decreasing"). Plain words
+    like "rocket" are left alone unless listed themselves.
+    """
+    analyzer = SentimentIntensityAnalyzer()
+    for term, valence in _lexicon_extension().items():
+        description = analyzer.emojis.get(term)
+        if description is not None:
+            token = "_".join(description.lower().split())
+            analyzer.emojis[term] = token
+            analyzer.lexicon[token] = valence
+        else:
+            analyzer.lexicon[term] = valence
+    return analyzer
+
+
+def vader_result(compound: float, threshold_positive: float = 0.05, threshold_negative: float = -0.05) -> Dict:
+    """
+    Classification, confidence and 0-100 score from a VADER compound score
+    
+    Compound -1..1 maps linearly onto the Fear & Greed scale (0 = -1,
+    50 = 0, 100 = +1); the thresholds decide Bullish/Bearish/Neutral.
+    """
+    if compound >= threshold_positive:
+        classification = "Bullish"
+    elif compound <= threshold_negative:
+        classification = "Bearish"
+    else:
+        classification = "Neutral"
+    
+    return {
+        "classification": classification,
+        "confidence": round(0.5 + abs(compound) / 2, 4) if classification != "Neutral" else 0.5,
+        "score": round(50 + compound * 50, 1),
+        "compound": compound
+    }
+
+
+def score_texts(texts: List[str], threshold_positive: float = 0.05, threshold_negative: float = -0.05) -> List[Dict]:
+    """
+    VADER results for many texts in this process
+    
+    Module-level so it can be sent to a process pool; each worker loads
+    the lexicon on its first chunk and reuses it afterwards.
+    """
+    polarity_scores = load_intensity_analyzer().polarity_scores
+    return [
+        vader_result(polarity_scores(text)["compound"], threshold_positive, threshold_negative)
+        for text in texts
+    ]
 
 
 class VADERAnalyzer(SentimentAnalyzer):
-    """VADER sentiment analyzer (baseline)"""
+    """VADER sentiment analyzer (baseline, no API calls)"""
     
     def __init__(self):
+        vader_config = config.sentiment_vader_config
+        self.threshold_positive = vader_config.get('threshold_positive', 0.05)
+        self.threshold_negative = vader_config.get('threshold_negative', -0.05)
+        
         self._algorithm_id = "vader"
-        self._algorithm_version = "v1.0"
+        self._algorithm_version = "v2.0"
     
-    async def analyze(self, text: str) -> Dict:
+    async def analyze(self, text: str, post_id: str = None) -> Dict:
         """
-        Analyze sentiment using simple keyword matching
+        Analyze sentiment with the VADER lexicon
         """
-        text_lower = text.lower()
+        return self._result(score_texts([text], self.threshold_positive, self.threshold_negative)[0])
+    
+    async def analyze_batch(self, texts: List[str], post_ids: Optional[List[str]] = None) -> List[Dict]:
+        """Analyze many texts in this process (see score_in_pool for large backfills)"""
+        return [
+            self._result(result)
+            for result in score_texts(texts, self.threshold_positive, self.threshold_negative)
+        ]
+    
+    def score_in_pool(
+        self,
+        texts: List[str],
+        executor: Optional[Executor] = None,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> List[Dict]:
+        """
+        Analyze many texts across a process pool (results in input order)
         
-        bullish_keywords = ["moon", "bullish", "buy", "pump", "rocket", "🚀", "up", "gain"]
-        bearish_keywords = ["dump", "bearish", "sell", "crash", "down", "loss"]
+        Texts are sent in chunks of `chunk_size` so each task amortizes
+        pickling and dispatch. Pass an executor to reuse one pool across
+        calls (e.g. for every page of a multi-million-post backfill);
+        otherwise a pool of `workers` processes is created for this call.
+        """
+        chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+        if not chunks:
+            return []
         
-        bullish_count = sum(1 for kw in bullish_keywords if kw in text_lower)
-        bearish_count = sum(1 for kw in bearish_keywords if kw in text_lower)
+        def _run(pool: Executor) -> List[Dict]:
+            results = []
+            for chunk_results in pool.map(
+                score_texts,
+                chunks,
+                [self.threshold_positive] * len(chunks),
+                [self.threshold_negative] * len(chunks)
+            ):
+                results.extend(self._result(result) for result in chunk_results)
+            return results
         
-        if bullish_count > bearish_count:
-            return {
-                "classification": "Bullish",
-                "confidence": 0.6,
-                "algorithm_id": self.algorithm_id,
-                "algorithm_version": self.algorithm_version
-            }
-        elif bearish_count > bullish_count:
-            return {
-                "classification": "Bearish",
-                "confidence": 0.6,
-                "algorithm_id": self.algorithm_id,
-                "algorithm_version": self.algorithm_version
-            }
-        else:
-            return {
-                "classification": "Neutral",
-                "confidence": 0.5,
-                "algorithm_id": self.algorithm_id,
-                "algorithm_version": self.algorithm_version
-            }
+        if executor is not None:
+            return _run(executor)
+        with ProcessPoolExecutor(max_workers=workers, initializer=load_intensity_analyzer) as pool:
+            return _run(pool)
+    
+    def _result(self, result: Dict) -> Dict:
+        return {
+            **result,
+            "algorithm_id": self.algorithm_id,
+            "algorithm_version": self.algorithm_version
+        }
+    
+    def cache_identity(self) -> Dict:
+        lexicon = json.dumps(_lexicon_extension(), sort_keys=True, ensure_ascii=False)
+        return {
+            "algorithm_version": self.algorithm_version,
+            "lexicon_sha256": hashlib.sha256(lexicon.encode("utf-8")).hexdigest(),
+            "thresholds": [self.threshold_positive, self.threshold_negative]
+        }
     
     @property
     def algorithm_id(self) -> str:
@@ -2,10 +2,18 @@
 Sentiment Service
 Coordinates sentiment analysis across multiple algorithms
 """
+import hashlib
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+from backend.src.services.sentiment.base import SentimentAnalyzer
 from backend.src.services.sentiment.openai_analyzer import OpenAIAnalyzer
 from backend.src.services.sentiment.vader_analyzer import VADERAnalyzer
+from backend.src.services.sentiment.keyword_analyzer import KeywordAnalyzer
+from backend.src.services.sentiment.transformer_analyzer import TransformerAnalyzer
+from backend.src.services.sentiment.cascade_analyzer import CascadeAnalyzer
+from backend.src.services.sentiment.result_cache import CachedAnalyzer, ResultCache
+from backend.src.services.single_flight import SingleFlight
+from backend.src.config import config
 from backend.src.storage.database import get_session
 from backend.src.models.sentiment_score import SentimentScore, SentimentClassification
 
@@ -14,11 +22,73 @@ class SentimentService:
     """Coordinates sentiment analysis"""
     
     def __init__(self):
+        self.cache = self._create_cache()
+        self.in_flight = SingleFlight()
+        
         self.analyzers = {
-            "openai": OpenAIAnalyzer(),
-            "openai-gpt4": OpenAIAnalyzer(),  # Backward compatibility
-            "vader": VADERAnalyzer()
+            "vader": VADERAnalyzer(),
+            "keyword": KeywordAnalyzer()
         }
+        
+        openai_analyzer = OpenAIAnalyzer(fallback=self._openai_fallback())
+        if self.cache is not None:
+            openai_analyzer = CachedAnalyzer(openai_analyzer, self.cache)
+        self.analyzers["openai"] = openai_analyzer
+        self.analyzers["openai-gpt4"] = openai_analyzer  # Backward compatibility
+        
+        # Local model is opt-in: it needs torch/transformers and downloads weights on first use
+        if config.sentiment_transformer_config.get('enabled', False):
+            self.analyzers["transformer"] = TransformerAnalyzer()
+        
+        cascade = self._create_cascade()
+        if cascade is not None:
+            self.analyzers["cascade"] = cascade
+    
+    @staticmethod
+    def _create_cache() -> Optional[ResultCache]:
+        """Open the result cache from sentiment.cache in config.yaml (None if disabled)"""
+        cache_config = config.sentiment_cache_config
+        if not cache_config.get('enabled', False):
+            return None
+        
+        ttl_days = cache_config.get('ttl_days')
+        return ResultCache(
+            path=cache_config.get('path', 'data/sentiment_cache.db'),
+            max_entries=cache_config.get('max_entries', 100_000),
+            ttl_seconds=ttl_days * 86400 if ttl_days else None
+        )
+    
+    def _openai_fallback(self) -> Optional[SentimentAnalyzer]:
+        """
+        Analyzer named by sentiment.openai.fallback in config.yaml
+        
+        "keyword" (the default) keeps OpenAIAnalyzer's built-in keyword
+        fallback, stored as "keyword-fallback" so those posts can be
+        re-analyzed later.
+        """
+        name = config.sentiment_openai_config.get('fallback', 'keyword')
+        if name == 'keyword':
+            return None
+        if name not in self.analyzers:
+            print(f"⚠️  Unknown OpenAI fallback '{name}', using keyword matching")
+        return self.analyzers.get(name)
+    
+    def _create_cascade(self) -> Optional[CascadeAnalyzer]:
+        """Cascade from sentiment.cascade in config.yaml (None if an analyzer is unavailable)"""
+        cascade_config = config.sentiment_cascade_config
+        first = self.analyzers.get(cascade_config.get('first', 'vader'))
+        escalation = self.analyzers.get(cascade_config.get('escalate_to', 'openai'))
+        if first is None or escalation is None:
+            print(f"⚠️  Cascade disabled: analyzer '{cascade_config.get('first', 'vader')}' or "
+                  f"'{cascade_config.get('escalate_to', 'openai')}' is not available")
+            return None
+        
+        return CascadeAnalyzer(
+            first=first,
+            escalation=escalation,
+            confidence_threshold=cascade_config.get('confidence_threshold', 0.7),
+            weight_threshold=cascade_config.get('weight_threshold')
+        )
     
     async def classify_sentiment(
         self,
@@ -29,6 +99,11 @@ class SentimentService:
         """
         Classify sentiment of text using specified algorithm
         
+        Concurrent calls for the same text and algorithm (e.g. a spam wave
+        hitting the pipeline at once) share one analysis: later callers
+        await the first call's result instead of starting their own. Only
+        the first caller's post_id reaches the analyzer's logs.
+        
         Args:
             text: Text to analyze
             algorithm: Algorithm to use
@@ -40,8 +115,25 @@ class SentimentService:
         analyzer = self.analyzers.get(algorithm)
         if not analyzer:
             # Fallback to VADER
-            analyzer = self.analyzers["vader"]
+            algorithm, analyzer = "vader", self.analyzers["vader"]
         
+        if not analyzer.shares_results():
+            return await self._classify(analyzer, algorithm, text, post_id)
+        
+        result = await self.in_flight.do(
+            self._flight_key(analyzer, text),
+            lambda: self._classify(analyzer, algorithm, text, post_id)
+        )
+        # Each caller gets its own copy of the shared result
+        return dict(result)
+    
+    @staticmethod
+    def _flight_key(analyzer: SentimentAnalyzer, text: str) -> Tuple[str, str]:
+        """In-flight dedup key, the same for single and batch calls"""
+        return (hashlib.sha256(text.encode("utf-8")).hexdigest(), analyzer.algorithm_id)
+    
+    async def _classify(self, analyzer, algorithm: str, text: str, post_id: str = None) -> Dict:
+        """Run one analyzer, falling back to VADER on error"""
         try:
             result = await analyzer.analyze(text, post_id=post_id)
             return result
@@ -51,6 +143,99 @@ class SentimentService:
                 return await self.analyzers["vader"].analyze(text, post_id=post_id)
             raise
     
+    async def classify_batch(
+        self,
+        texts: List[str],
+        algorithm: str = "openai-gpt4",
+        post_ids: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Classify many texts with one algorithm (batched where supported)
+        
+        Texts already being analyzed by a concurrent call (single or
+        batch), and repeats within texts, share that analysis; the rest
+        go to the analyzer in one analyze_batch call. Analyzers whose
+        result depends on the post (see shares_results) get every text.
+        
+        Args:
+            texts: Texts to analyze
+            algorithm: Algorithm to use
+            post_ids: Optional post IDs (same order) for logging
+        
+        Returns:
+            List of result dicts in the same order as texts
+        """
+        analyzer = self.analyzers.get(algorithm)
+        if not analyzer:
+            # Fallback to VADER
+            algorithm, analyzer = "vader", self.analyzers["vader"]
+        
+        if not analyzer.shares_results():
+            return await self._classify_batch(analyzer, algorithm, texts, post_ids)
+        
+        def _start(indexes: List[int]):
+            return self._classify_batch(
+                analyzer,
+                algorithm,
+                [texts[index] for index in indexes],
+                [post_ids[index] for index in indexes] if post_ids is not None else None
+            )
+        
+        results = await self.in_flight.do_batch([self._flight_key(analyzer, text) for text in texts], _start)
+        # Each caller gets its own copy of shared results
+        return [dict(result) for result in results]
+    
+    async def _classify_batch(
+        self,
+        analyzer,
+        algorithm: str,
+        texts: List[str],
+        post_ids: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """Run one analyzer over a batch, falling back to VADER on error"""
+        try:
+            return await analyzer.analyze_batch(texts, post_ids=post_ids)
+        except Exception as e:
+            # Fallback to VADER on error
+            if algorithm != "vader":
+                return await self.analyzers["vader"].analyze_batch(texts, post_ids=post_ids)
+            raise
+    
+    async def classify_and_store_batch(
+        self,
+        posts: List[Tuple[str, str]],
+        algorithm: str = "openai-gpt4"
+    ) -> List[SentimentScore]:
+        """
+        Classify many posts and store the scores in one transaction
+        
+        Args:
+            posts: (post_id, text) pairs
+            algorithm: Algorithm to use
+        
+        Returns:
+            SentimentScore objects in the same order as posts
+        """
+        if not posts:
+            return []
+        
+        post_ids, texts = zip(*posts)
+        results = await self.classify_batch(list(texts), algorithm, post_ids=list(post_ids))
+        
+        session = get_session()
+        try:
+            scores = [
+                self._make_score(post_id, result)
+                for post_id, result in zip(post_ids, results)
+            ]
+            session.add_all(scores)
+            session.commit()
+            for score in scores:
+                session.refresh(score)
+            return scores
+        finally:
+            session.close()
+    
     async def classify_and_store(
         self,
         post_id: str,
@@ -70,28 +255,32 @@ class SentimentService:
         """
         result = await self.classify_sentiment(text, algorithm, post_id=post_id)
         
-        # Map string to enum
-        classification_map = {
-            "Bullish": SentimentClassification.BULLISH,
-            "Bearish": SentimentClassification.BEARISH,
-            "Neutral": SentimentClassification.NEUTRAL
-        }
-        
         session = get_session()
         try:
-            score = SentimentScore(
-                post_id=post_id,
-                algorithm_id=result["algorithm_id"],
-                algorithm_version=result["algorithm_version"],
-                classification=classification_map[result["classification"]],
-                confidence=result["confidence"],
-                score=result.get("score"),  # New: 0-100 score
-                reasoning=result.get("reasoning"),  # New: LLM reasoning
-                created_at=datetime.utcnow()
-            )
+            score = self._make_score(post_id, result)
             session.add(score)
             session.commit()
             session.refresh(score)
             return score
         finally:
             session.close()
+    
+    def _make_score(self, post_id: str, result: Dict) -> SentimentScore:
+        """Build a SentimentScore row from an analyzer result"""
+        # Map string to enum
+        classification_map = {
+            "Bullish": SentimentClassification.BULLISH,
+            "Bearish": SentimentClassification.BEARISH,
+            "Neutral": SentimentClassification.NEUTRAL
+        }
+        
+        return SentimentScore(
+            post_id=post_id,
+            algorithm_id=result["algorithm_id"],
+            algorithm_version=result["algorithm_version"],
+            classification=classification_map[result["classification"]],
+            confidence=result["confidence"],
+            score=result.get("score"),  # New: 0-100 score
+            reasoning=result.get("reasoning"),  # New: LLM reasoning
+            created_at=datetime.utcnow()
+        )
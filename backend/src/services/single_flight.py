@@ -0,0 +1,114 @@
+"""
+Single Flight
+Concurrent calls with the same key share one in-flight call
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one
+    
+    The first caller for a key starts the work; callers arriving while it
+    is still running await the same future and get the same result (or
+    exception). Nothing is kept once the call finishes: this covers the
+    gap before a result cache has an entry, it is not a cache itself.
+    The work runs as its own task, so a caller that is cancelled does not
+    cancel it for the others.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        
+        self.started = 0
+        self.shared = 0
+    
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Result of `call()`, shared with concurrent callers of the same key"""
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+            self.started += 1
+        else:
+            self.shared += 1
+        
+        return await asyncio.shield(future)
+    
+    async def do_batch(
+        self,
+        keys: List[Hashable],
+        call: Callable[[List[int]], Awaitable[List[T]]]
+    ) -> List[T]:
+        """
+        Results for many keys, sharing calls already in flight
+        
+        Keys already in flight (and repeats within `keys`) join the
+        existing call. The rest are started together as one
+        `call(indexes)`, where indexes point at the first occurrence of
+        each new key in `keys`; it must return their results in the same
+        order. Each key is in flight on its own, so later callers can
+        join single keys of the batch.
+        
+        Returns:
+            Results in the same order as keys
+        """
+        futures: Dict[Hashable, asyncio.Future] = {}
+        indexes = []
+        for index, key in enumerate(keys):
+            if key in futures:
+                self.shared += 1
+                continue
+            future = self._calls.get(key)
+            if future is None:
+                future = asyncio.get_running_loop().create_future()
+                self._calls[key] = future
+                future.add_done_callback(lambda done, key=key: self._forget(key, done))
+                indexes.append(index)
+                self.started += 1
+            else:
+                self.shared += 1
+            futures[key] = future
+        
+        if indexes:
+            started = {keys[index]: futures[keys[index]] for index in indexes}
+            batch = asyncio.ensure_future(call(indexes))
+            batch.add_done_callback(lambda done: self._settle(done, started))
+        
+        return await asyncio.shield(asyncio.gather(*(futures[key] for key in keys)))
+    
+    @staticmethod
+    def _settle(batch: asyncio.Future, futures: Dict[Hashable, asyncio.Future]):
+        """Hand each key's future its part of a finished batch call"""
+        if batch.cancelled():
+            for future in futures.values():
+                future.cancel()
+            return
+        
+        error = batch.exception()
+        if error is None and len(batch.result()) != len(futures):
+            error = ValueError(f"Batch call returned {len(batch.result())} results for {len(futures)} keys")
+        for position, future in enumerate(futures.values()):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(batch.result()[position])
+    
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # Retrieve the exception so an abandoned call doesn't warn at garbage collection
+        if not future.cancelled():
+            future.exception()
+    
+    def __len__(self) -> int:
+        """Calls currently in flight"""
+        return len(self._calls)
+    
+    def stats(self) -> Dict:
+        """Calls started and calls that joined one already in flight"""
+        return {"started": self.started, "shared": self.shared, "in_flight": len(self._calls)}
@@ -0,0 +1,8 @@
+"""
+Mergeable sketches stored alongside daily aggregates, and MinHash signatures for posts
+"""
+from backend.src.services.sketches.hyperloglog import HyperLogLog
+from backend.src.services.sketches.histogram import ScoreHistogram
+from backend.src.services.sketches.minhash import MinHash
+
+__all__ = ["HyperLogLog", "ScoreHistogram", "MinHash"]
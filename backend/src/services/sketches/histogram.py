@@ -0,0 +1,121 @@
+"""
+Score Histogram
+Fixed-bin histogram of 0-100 Fear & Greed scores, mergeable across days
+"""
+import zlib
+from typing import Dict, Iterable, List
+import numpy as np
+
+
+class ScoreHistogram:
+    """
+    Counts of scores in equal-width bins over [0, 100]
+    
+    Histograms add bin-wise, so a date range's distribution is the sum of
+    its daily histograms. Quantiles interpolate linearly inside a bin, so
+    they are exact to within one bin width (1 point at the default).
+    """
+    
+    DEFAULT_BINS = 100
+    LOW = 0.0
+    HIGH = 100.0
+    
+    def __init__(self, bins: int = DEFAULT_BINS, counts: np.ndarray = None):
+        if bins < 1:
+            raise ValueError("bins must be at least 1")
+        
+        self.bins = bins
+        self.width = (self.HIGH - self.LOW) / bins
+        if counts is None:
+            counts = np.zeros(bins, dtype=np.int64)
+        elif counts.shape != (bins,):
+            raise ValueError(f"Expected {bins} counts, got {counts.shape}")
+        self.counts = counts
+    
+    def __repr__(self):
+        return f"<ScoreHistogram(bins={self.bins}, total={self.total})>"
+    
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+    
+    def _bin(self, scores: np.ndarray) -> np.ndarray:
+        """Bin index per score; out-of-range scores go to the edge bins"""
+        indexes = np.floor((scores - self.LOW) / self.width).astype(np.int64)
+        return np.clip(indexes, 0, self.bins - 1)
+    
+    def add(self, score: float, count: int = 1) -> "ScoreHistogram":
+        """Count one score (a negative count takes it back out)"""
+        self.counts[self._bin(np.array([score], dtype=np.float64))[0]] += count
+        return self
+    
+    def update(self, scores: Iterable[float]) -> "ScoreHistogram":
+        """Count many scores"""
+        scores = np.asarray(list(scores) if not isinstance(scores, np.ndarray) else scores, dtype=np.float64)
+        if scores.size:
+            self.counts += np.bincount(self._bin(scores), minlength=self.bins)
+        return self
+    
+    def merge(self, other: "ScoreHistogram") -> "ScoreHistogram":
+        """Add another histogram's counts into this one (in place)"""
+        if other.bins != self.bins:
+            raise ValueError("Cannot merge histograms with different bins")
+        self.counts += other.counts
+        return self
+    
+    @classmethod
+    def union(cls, histograms: Iterable["ScoreHistogram"], bins: int = DEFAULT_BINS) -> "ScoreHistogram":
+        """Return a new histogram with the summed counts"""
+        result = cls(bins)
+        for histogram in histograms:
+            result.merge(histogram)
+        return result
+    
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        """
+        Estimate quantiles (0-1) of the counted scores
+        
+        Returns:
+            One score per q, or NaN for each q if the histogram is empty
+        """
+        qs = np.asarray(list(qs), dtype=np.float64)
+        total = self.total
+        if total == 0:
+            return [float("nan")] * len(qs)
+        
+        cumulative = np.cumsum(self.counts)
+        targets = qs * total
+        # First bin whose cumulative count reaches the target rank (q=0: first non-empty bin)
+        indexes = np.minimum(np.searchsorted(cumulative, targets, side="left"), self.bins - 1)
+        indexes = np.where(targets > 0, indexes, np.argmax(self.counts > 0))
+        below = np.where(indexes > 0, cumulative[indexes - 1], 0)
+        in_bin = self.counts[indexes]
+        fraction = np.divide(targets - below, in_bin, out=np.zeros_like(targets), where=in_bin > 0)
+        
+        return [float(value) for value in self.LOW + (indexes + fraction) * self.width]
+    
+    def mean(self) -> float:
+        """Approximate mean (bin midpoints)"""
+        total = self.total
+        if total == 0:
+            return float("nan")
+        midpoints = self.LOW + (np.arange(self.bins) + 0.5) * self.width
+        return float(np.dot(self.counts, midpoints) / total)
+    
+    def to_dict(self) -> Dict:
+        """Bin edges and counts (e.g. for charts)"""
+        return {
+            "bin_edges": [float(edge) for edge in np.linspace(self.LOW, self.HIGH, self.bins + 1)],
+            "counts": [int(count) for count in self.counts]
+        }
+    
+    def to_bytes(self) -> bytes:
+        """Serialize (bin count + compressed int32 counts) for storage"""
+        return self.bins.to_bytes(2, "big") + zlib.compress(self.counts.astype(np.int32).tobytes())
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ScoreHistogram":
+        """Deserialize a histogram written by to_bytes()"""
+        bins = int.from_bytes(data[:2], "big")
+        counts = np.frombuffer(zlib.decompress(data[2:]), dtype=np.int32).astype(np.int64)
+        return cls(bins, counts)
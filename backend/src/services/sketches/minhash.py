@@ -0,0 +1,95 @@
+"""
+MinHash Signatures
+Near-duplicate text detection with MinHash and banded LSH keys
+"""
+import hashlib
+import re
+from typing import List, Set
+import numpy as np
+
+
+URL_PATTERN = re.compile(r"https?://\S+")
+NON_WORD_PATTERN = re.compile(r"[^0-9a-z]+")
+
+
+def shingle_text(text: str, size: int = 5) -> Set[str]:
+    """
+    Character shingles of a post's normalized text
+    
+    Lowercases, drops links and replaces punctuation, emoji and symbols
+    (so "$MSTR" and "MSTR 🚀" read the same) with single spaces.
+    """
+    text = URL_PATTERN.sub(" ", text.lower())
+    text = NON_WORD_PATTERN.sub(" ", text).strip()
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHash:
+    """
+    MinHash signatures over character shingles
+    
+    The fraction of equal signature slots estimates the Jaccard similarity
+    of two posts' shingle sets. Signatures are split into `bands` bands of
+    `rows` slots; posts sharing any band are LSH candidates, which with
+    the defaults (16 x 8) catches pairs at 0.8 similarity ~95% of the time
+    and pairs at 0.9 almost always.
+    """
+    
+    DEFAULT_BANDS = 16
+    DEFAULT_ROWS = 8
+    SEED = 1
+    
+    def __init__(self, bands: int = DEFAULT_BANDS, rows: int = DEFAULT_ROWS, shingle_size: int = 5):
+        self.bands = bands
+        self.rows = rows
+        self.num_perm = bands * rows
+        self.shingle_size = shingle_size
+        
+        # Multiply-shift hash family: h(x) = (a * x + b) >> 32 over uint64 with odd a
+        rng = np.random.default_rng(self.SEED)
+        self._a = rng.integers(1, 2 ** 63, size=self.num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=self.num_perm, dtype=np.uint64)
+    
+    def signature(self, text: str) -> np.ndarray:
+        """uint32 signature of length bands * rows (all-max for empty text)"""
+        shingles = shingle_text(text, self.shingle_size)
+        if not shingles:
+            return np.full(self.num_perm, np.iinfo(np.uint32).max, dtype=np.uint32)
+        
+        hashes = np.array([
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+            for shingle in shingles
+        ], dtype=np.uint64)
+        
+        with np.errstate(over="ignore"):
+            permuted = (hashes[:, None] * self._a[None, :] + self._b[None, :]) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+    
+    @staticmethod
+    def is_empty(signature: np.ndarray) -> bool:
+        """Whether the signature came from a text with no shingles"""
+        return bool(np.all(signature == np.iinfo(np.uint32).max))
+    
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit key per band (fits an SQL BIGINT)"""
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8, person=band.to_bytes(2, "big")).digest()
+            keys.append(int.from_bytes(digest, "big", signed=True))
+        return keys
+    
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.count_nonzero(first == second)) / len(first)
+    
+    @staticmethod
+    def to_bytes(signature: np.ndarray) -> bytes:
+        return signature.astype("<u4").tobytes()
+    
+    @staticmethod
+    def from_bytes(data: bytes) -> np.ndarray:
+        return np.frombuffer(data, dtype="<u4").astype(np.uint32)
@@ -10,6 +10,8 @@ from backend.src.storage.database import get_session
 from backend.src.models.author import Author
 from backend.src.models.post import Post
 from backend.src.models.engagement import Engagement
+from backend.src.services.near_duplicates import NearDuplicateIndex
+from backend.src.config import config
 
 
 class TweetCollector:
@@ -33,6 +35,11 @@ class TweetCollector:
     def __init__(self, log_file: str = "data/logs/collection_log.csv"):
         self.x_client = XAPIClient()
         self.log_file = log_file
+        
+        # Cluster near-duplicate posts as they are stored so analysis can reuse scores
+        self.near_duplicates = None
+        if config.analysis_config.get('near_duplicates', {}).get('enabled', True):
+            self.near_duplicates = NearDuplicateIndex()
     
     def _log_collection(self, posts_count: int, status: str = "success", error_msg: Optional[str] = None):
         """Log collection attempt to CSV"""
@@ -166,6 +173,9 @@ class TweetCollector:
                 )
                 session.add(engagement)
                 
+                if self.near_duplicates:
+                    self.near_duplicates.add_post(session, post.post_id, post.text)
+                
                 posts_stored += 1
             
             session.commit()
@@ -178,7 +188,7 @@ class TweetCollector:
                 print(f"✅ Collected and stored {posts_stored} posts")
             
             return posts_stored
-            
+        
         except Exception as e:
             if session:
                 session.rollback()
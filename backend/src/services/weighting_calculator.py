@@ -2,9 +2,25 @@
 Weighting Calculator Service
 Calculates weighted sentiment scores based on visibility, influence, verification, and bot penalty
 """
-import math
-from typing import Dict, Optional
+import numpy as np
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from sqlalchemy import case
 from backend.src.models.weighting_config import WeightingConfig
+from backend.src.services.formula_engine import CompiledFormula, compile_formula
+
+
+# Integer codes for sentiment classifications in columnar (batch) inputs
+SENTIMENT_CODES = {
+    "Bullish": 1,
+    "Neutral": 0,
+    "Bearish": -1
+}
+
+# Variables available to each WeightingConfig formula, in argument order
+VISIBILITY_VARIABLES = ("likes", "retweets", "replies", "quotes")
+INFLUENCE_VARIABLES = ("followers",)
+BOT_PENALTY_VARIABLES = ("bot_score",)
 
 
 class WeightingCalculator:
@@ -18,27 +34,38 @@ class WeightingCalculator:
             config: WeightingConfig object (uses default if None)
         """
         if config is None:
-            # Use default configuration
-            self.config = {
-                "version": "v1.0",
-                "visibility_weight": lambda engagement: math.log(1 + engagement["like_count"] + engagement["retweet_count"] * 2 + engagement["reply_count"] + engagement["quote_count"]),
-                "influence_weight": lambda followers: math.log(1 + followers),
-                "verification_multiplier": 1.5,
-                "bot_penalty": lambda bot_score: max(0, 1 - bot_score * 2)
-            }
-        else:
-            self.config = self._parse_config(config)
+            config = WeightingConfig.get_default()
+        
+        self.config = self._parse_config(config)
     
     def _parse_config(self, config: WeightingConfig) -> Dict:
-        """Parse WeightingConfig model into executable functions"""
-        # TODO: Safely evaluate formula strings
-        # For now, use default formulas
+        """Compile WeightingConfig formula strings into executable functions"""
+        visibility, influence, bot_penalty = compile_weighting_formulas(
+            config.version,
+            config.visibility_formula,
+            config.influence_formula,
+            config.bot_penalty_formula
+        )
+        
         return {
             "version": config.version,
-            "visibility_weight": lambda engagement: math.log(1 + engagement["like_count"] + engagement["retweet_count"] * 2),
-            "influence_weight": lambda followers: math.log(1 + followers),
+            "visibility_weight": lambda engagement: visibility.scalar(
+                engagement.get("like_count", 0),
+                engagement.get("retweet_count", 0),
+                engagement.get("reply_count", 0),
+                engagement.get("quote_count", 0)
+            ),
+            "influence_weight": influence.scalar,
             "verification_multiplier": config.verification_multiplier,
-            "bot_penalty": lambda bot_score: max(0, 1 - bot_score * 2)
+            "bot_penalty": bot_penalty.scalar,
+            # Vectorized counterparts used by the batch API
+            "visibility_weight_batch": visibility.vector,
+            "influence_weight_batch": influence.vector,
+            "bot_penalty_batch": bot_penalty.vector,
+            # SQL counterparts used to weight posts inside an aggregate query
+            "visibility_weight_sql": visibility.sql,
+            "influence_weight_sql": influence.sql,
+            "bot_penalty_sql": bot_penalty.sql
         }
     
     def calculate_weight(self, post_data: Dict) -> float:
@@ -107,6 +134,142 @@ class WeightingCalculator:
             elif sentiment == "Bearish":
                 bearish_weight += weight
         
+        return self.summarize_weights(bullish_weight, bearish_weight, total_weight)
+    
+    def calculate_weights_batch(
+        self,
+        likes,
+        retweets,
+        replies,
+        quotes,
+        followers,
+        verified,
+        bot_score
+    ) -> np.ndarray:
+        """
+        Calculate weights for many posts at once
+        
+        Vectorized equivalent of calculate_weight over columnar inputs
+        (one array element per post).
+        
+        Args:
+            likes, retweets, replies, quotes: Engagement counts
+            followers: Author follower counts
+            verified: Author verification flags
+            bot_score: Bot likelihood scores 0-1
+        
+        Returns:
+            Array of weights, one per post
+        """
+        likes = np.asarray(likes, dtype=np.int64)
+        retweets = np.asarray(retweets, dtype=np.int64)
+        replies = np.asarray(replies, dtype=np.int64)
+        quotes = np.asarray(quotes, dtype=np.int64)
+        followers = np.asarray(followers, dtype=np.int64)
+        verified = np.asarray(verified, dtype=bool)
+        bot_score = np.asarray(bot_score, dtype=np.float64)
+        
+        visibility_weight = self.config["visibility_weight_batch"](likes, retweets, replies, quotes)
+        influence_weight = self.config["influence_weight_batch"](followers)
+        verification_mult = np.where(verified, self.config["verification_multiplier"], 1.0)
+        bot_penalty = self.config["bot_penalty_batch"](bot_score)
+        
+        # Same multiplication order as calculate_weight
+        return visibility_weight * influence_weight * verification_mult * bot_penalty
+    
+    def weight_expression(
+        self,
+        likes,
+        retweets,
+        replies,
+        quotes,
+        followers,
+        verified,
+        bot_score
+    ):
+        """
+        Build a SQL expression computing each row's weight
+        
+        SQL equivalent of calculate_weight over columns, so weights can be
+        summed in the database. Sums are accumulated in whatever order the
+        database scans rows, so they agree with the Python paths to
+        floating-point rounding rather than bit for bit.
+        
+        Args:
+            likes, retweets, replies, quotes: Engagement count columns
+            followers: Author follower count column
+            verified: Author verification flag column
+            bot_score: Bot likelihood score column (no NULLs)
+        
+        Returns:
+            SQLAlchemy expression
+        """
+        visibility_weight = self.config["visibility_weight_sql"](likes, retweets, replies, quotes)
+        influence_weight = self.config["influence_weight_sql"](followers)
+        verification_mult = case((verified, self.config["verification_multiplier"]), else_=1.0)
+        bot_penalty = self.config["bot_penalty_sql"](bot_score)
+        
+        return visibility_weight * influence_weight * verification_mult * bot_penalty
+    
+    def calculate_weighted_sentiment_batch(
+        self,
+        likes,
+        retweets,
+        replies,
+        quotes,
+        followers,
+        verified,
+        bot_score,
+        sentiment
+    ) -> Dict:
+        """
+        Calculate aggregate weighted sentiment from columnar post data
+        
+        Vectorized equivalent of calculate_weighted_sentiment. Sums are
+        accumulated in post order (cumulative sum rather than pairwise),
+        matching the scalar loop.
+        
+        Args:
+            likes, retweets, replies, quotes: Engagement counts
+            followers: Author follower counts
+            verified: Author verification flags
+            bot_score: Bot likelihood scores 0-1
+            sentiment: Sentiment codes (see SENTIMENT_CODES)
+        
+        Returns:
+            Dict with weighted_score, dominant_sentiment
+        """
+        sentiment = np.asarray(sentiment, dtype=np.int8)
+        
+        if sentiment.size == 0:
+            return {
+                "weighted_score": 0.0,
+                "dominant_sentiment": "Neutral"
+            }
+        
+        weights = self.calculate_weights_batch(
+            likes, retweets, replies, quotes, followers, verified, bot_score
+        )
+        
+        total_weight = sequential_sum(weights)
+        bullish_weight = sequential_sum(weights[sentiment == SENTIMENT_CODES["Bullish"]])
+        bearish_weight = sequential_sum(weights[sentiment == SENTIMENT_CODES["Bearish"]])
+        
+        return self.summarize_weights(bullish_weight, bearish_weight, total_weight)
+    
+    @staticmethod
+    def summarize_weights(bullish_weight: float, bearish_weight: float, total_weight: float) -> Dict:
+        """
+        Build the weighted sentiment result from summed weights
+        
+        Args:
+            bullish_weight: Sum of weights of bullish posts
+            bearish_weight: Sum of weights of bearish posts
+            total_weight: Sum of weights of all posts
+        
+        Returns:
+            Dict with weighted_score, dominant_sentiment
+        """
         if total_weight == 0:
             return {
                 "weighted_score": 0.0,
@@ -131,3 +294,33 @@ class WeightingCalculator:
             "bearish_weight": bearish_weight,
             "total_weight": total_weight
         }
+
+
+def sequential_sum(values: np.ndarray) -> float:
+    """Sum in element order (np.sum uses pairwise summation)"""
+    if values.size == 0:
+        return 0.0
+    return float(np.cumsum(values)[-1])
+
+
+@lru_cache(maxsize=32)
+def compile_weighting_formulas(
+    version: str,
+    visibility_formula: str,
+    influence_formula: str,
+    bot_penalty_formula: str
+) -> Tuple[CompiledFormula, CompiledFormula, CompiledFormula]:
+    """
+    Compile a config's formulas once per version (and formula text)
+    
+    Returns:
+        (visibility, influence, bot_penalty) compiled formulas
+    
+    Raises:
+        FormulaError: If any formula is invalid
+    """
+    return (
+        compile_formula(visibility_formula, VISIBILITY_VARIABLES),
+        compile_formula(influence_formula, INFLUENCE_VARIABLES),
+        compile_formula(bot_penalty_formula, BOT_PENALTY_VARIABLES)
+    )
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
 from backend.src.services.token_manager import TokenManager
+from backend.src.services.http_client import get_http_client
 
 load_dotenv()
 
@@ -72,48 +73,46 @@ class XAPIClient:
         if since:
             params["start_time"] = since.isoformat() + "Z"
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/tweets/search/recent",
-                    headers=self.headers,
-                    params=params,
-                    timeout=30.0
-                )
-                
-                if response.status_code == 429:
-                    # Mark current token as rate limited and try to rotate
-                    if self.token_manager:
-                        self.token_manager.mark_rate_limited(self.bearer_token, duration_minutes=60)
-                        # Try with next token
-                        try:
-                            self.bearer_token = self.token_manager.get_active_token()
-                            self._update_headers()
-                            # Retry request with new token
-                            response = await client.get(
-                                f"{self.base_url}/tweets/search/recent",
-                                headers=self.headers,
-                                params=params,
-                                timeout=30.0
-                            )
-                            if response.status_code == 429:
-                                raise RateLimitError("X API rate limit exceeded")
-                        except Exception:
+        client = get_http_client("x_api")
+        try:
+            response = await client.get(
+                f"{self.base_url}/tweets/search/recent",
+                headers=self.headers,
+                params=params
+            )
+            
+            if response.status_code == 429:
+                # Mark current token as rate limited and try to rotate
+                if self.token_manager:
+                    self.token_manager.mark_rate_limited(self.bearer_token, duration_minutes=60)
+                    # Try with next token
+                    try:
+                        self.bearer_token = self.token_manager.get_active_token()
+                        self._update_headers()
+                        # Retry request with new token
+                        response = await client.get(
+                            f"{self.base_url}/tweets/search/recent",
+                            headers=self.headers,
+                            params=params
+                        )
+                        if response.status_code == 429:
                             raise RateLimitError("X API rate limit exceeded")
-                    else:
+                    except Exception:
                         raise RateLimitError("X API rate limit exceeded")
-                
-                response.raise_for_status()
-                return response.json()
-                
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 429:
-                    if self.token_manager:
-                        self.token_manager.mark_rate_limited(self.bearer_token, duration_minutes=60)
+                else:
                     raise RateLimitError("X API rate limit exceeded")
-                # Print error details for debugging
-                print(f"Error response: {e.response.text}")
-                raise
+            
+            response.raise_for_status()
+            return response.json()
+            
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429:
+                if self.token_manager:
+                    self.token_manager.mark_rate_limited(self.bearer_token, duration_minutes=60)
+                raise RateLimitError("X API rate limit exceeded")
+            # Print error details for debugging
+            print(f"Error response: {e.response.text}")
+            raise
     
     async def search_by_query(
         self,
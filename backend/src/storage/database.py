@@ -29,6 +29,28 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def create_session_factory(database_url: str = DATABASE_URL):
+    """
+    Create a session factory bound to a new, private engine
+    
+    Use this in worker processes: engines (and their pooled connections)
+    must not be shared across a fork.
+    
+    Args:
+        database_url: Database URL (default: DATABASE_URL)
+    
+    Returns:
+        sessionmaker bound to the new engine
+    """
+    connect_args = {}
+    if database_url.startswith("sqlite"):
+        # Concurrent writers wait for the file lock instead of failing immediately
+        connect_args = {"check_same_thread": False, "timeout": 30}
+    
+    worker_engine = create_engine(database_url, connect_args=connect_args, echo=False)
+    return sessionmaker(autocommit=False, autoflush=False, bind=worker_engine)
+
+
 def get_session():
     """
     Get database session
@@ -2,6 +2,7 @@
 Database Initialization
 Creates all tables based on SQLAlchemy models
 """
+from sqlalchemy import inspect, text
 from backend.src.storage.database import engine, Base
 from backend.src.models.author import Author
 from backend.src.models.post import Post
@@ -10,7 +11,12 @@ from backend.src.models.sentiment_score import SentimentScore
 from backend.src.models.bot_signal import BotSignal
 from backend.src.models.weighting_config import WeightingConfig
 from backend.src.models.daily_aggregate import DailyAggregate
+from backend.src.models.daily_aggregate_state import DailyAggregateState, DailyAggregateFold, DailyAggregateAuthor
 from backend.src.models.batch_job import BatchJob
+from backend.src.models.post_signature import PostSignature, LSHBucket
+from backend.src.models.sentiment_reuse import SentimentReuse
+from backend.src.models.cascade_decision import CascadeDecision
+from backend.src.models.api_log import APILog
 
 
 def init_database():
@@ -25,6 +31,12 @@ def init_database():
     # Create all tables
     Base.metadata.create_all(bind=engine)
     
+    # create_all skips existing tables, so add indexes and nullable columns introduced since
+    for index in SentimentScore.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    add_missing_columns(DailyAggregate.__table__)
+    add_missing_columns(APILog.__table__)
+    
     print("✓ Database tables created successfully")
     print(f"  - authors")
     print(f"  - posts")
@@ -33,7 +45,33 @@ def init_database():
     print(f"  - bot_signals")
     print(f"  - weighting_configs")
     print(f"  - daily_aggregates")
+    print(f"  - daily_aggregate_states")
+    print(f"  - daily_aggregate_folds")
+    print(f"  - daily_aggregate_authors")
     print(f"  - batch_jobs")
+    print(f"  - post_signatures")
+    print(f"  - lsh_buckets")
+    print(f"  - sentiment_reuses")
+    print(f"  - cascade_decisions")
+    print(f"  - api_logs")
+
+
+def add_missing_columns(table):
+    """
+    Add nullable columns that exist on the model but not in the database
+    
+    Args:
+        table: SQLAlchemy Table to bring up to date
+    """
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    
+    with engine.begin() as connection:
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            print(f"  + {table.name}.{column.name}")
 
 
 def drop_database():
@@ -0,0 +1,123 @@
+"""
+Shared fixtures for unit tests
+Provides an isolated in-memory database and helpers to seed posts
+"""
+import uuid
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import backend.src.models  # noqa: F401 - registers all models with Base
+from backend.src.models.api_log import APILog  # noqa: F401
+from backend.src.storage.database import Base
+from backend.src.models.author import Author
+from backend.src.models.post import Post
+from backend.src.models.engagement import Engagement
+from backend.src.models.sentiment_score import SentimentScore, SentimentClassification
+from backend.src.models.bot_signal import BotSignal
+
+
+@pytest.fixture
+def db_engine():
+    """In-memory SQLite engine with all tables created"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    """Session factory bound to the in-memory engine"""
+    return sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+
+@pytest.fixture
+def query_counter(db_engine):
+    """Counts SQL statements executed against the in-memory engine"""
+    counter = {"count": 0}
+    
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        counter["count"] += 1
+    
+    event.listen(db_engine, "before_cursor_execute", _count)
+    yield counter
+    event.remove(db_engine, "before_cursor_execute", _count)
+
+
+@pytest.fixture
+def seed_post(session_factory):
+    """Insert a post with its author, engagement, sentiment score and bot signal"""
+    
+    def _seed_post(
+        post_id: str,
+        created_at: datetime,
+        author_id: str = "author1",
+        followers: int = 1000,
+        verified: bool = False,
+        likes: int = 10,
+        retweets: int = 5,
+        replies: int = 1,
+        quotes: int = 0,
+        classification: str = "Bullish",
+        confidence: float = 0.8,
+        score: float = 70.0,
+        bot_score: float = 0.1,
+        algorithm: str = "openai",
+        text: str = "Bitcoin to the moon"
+    ):
+        session = session_factory()
+        try:
+            if session.get(Author, author_id) is None:
+                session.add(Author(
+                    user_id=author_id,
+                    username=author_id,
+                    display_name=author_id,
+                    followers_count=followers,
+                    following_count=100,
+                    verified=verified,
+                    created_at=datetime(2020, 1, 1),
+                    first_seen=created_at,
+                    last_updated=created_at
+                ))
+            session.add(Post(
+                post_id=post_id,
+                author_id=author_id,
+                text=text,
+                created_at=created_at,
+                collected_at=created_at
+            ))
+            session.add(Engagement(
+                post_id=post_id,
+                like_count=likes,
+                retweet_count=retweets,
+                reply_count=replies,
+                quote_count=quotes
+            ))
+            if classification is not None:
+                session.add(SentimentScore(
+                    post_id=post_id,
+                    algorithm_id=algorithm,
+                    algorithm_version="test",
+                    classification=SentimentClassification(classification),
+                    confidence=confidence,
+                    score=score,
+                    created_at=created_at
+                ))
+            if bot_score is not None:
+                session.add(BotSignal(
+                    id=str(uuid.uuid4()),
+                    post_id=post_id,
+                    score=bot_score,
+                    created_at=created_at
+                ))
+            session.commit()
+        finally:
+            session.close()
+    
+    return _seed_post
@@ -0,0 +1,155 @@
+"""
+Unit Test: Analysis Runner
+Tests bounded concurrency, per-item failure handling, provider limits and priority order
+"""
+import asyncio
+import math
+from datetime import datetime
+import pytest
+from backend.src.jobs.analysis_runner import expected_weights, prioritize, run_analysis, work_units
+from backend.src.services import concurrency
+
+
+class FakeSentimentService:
+    """Records concurrency and fails for posts whose text contains 'boom'"""
+    
+    def __init__(self, delay=0.01):
+        self.analyzers = {"fake": object()}
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def classify_and_store_batch(self, posts, algorithm):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if any("boom" in text for _, text in posts):
+                raise RuntimeError("analyzer exploded")
+            return [f"score-{post_id}" for post_id, _ in posts]
+        finally:
+            self.in_flight -= 1
+
+
+class FakeBotDetector:
+    """Fails for one author"""
+    
+    def calculate_and_store_bot_likelihood(self, post_id, author_data):
+        if author_data["user_id"] == "broken":
+            raise ValueError("bad author")
+        return 0.25
+
+
+def _posts(count, texts=None):
+    return [
+        {"post_id": f"p{i}", "text": (texts or {}).get(i, f"tweet {i}"), "author": {"user_id": f"a{i}"}}
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_runner_bounds_concurrency_and_stores_every_post():
+    """Never more than `concurrency` units in flight; every post gets a result"""
+    service = FakeSentimentService()
+    
+    summary = await run_analysis(_posts(30), "fake", concurrency=4,
+                                 sentiment_service=service, bot_detector=FakeBotDetector())
+    
+    assert service.max_in_flight == 4
+    assert summary["analyzed"] == 30
+    assert summary["failures"] == []
+    assert sorted(result["post_id"] for result in summary["results"]) == sorted(f"p{i}" for i in range(30))
+    assert all(result["score"] == f"score-{result['post_id']}" for result in summary["results"])
+    assert all(result["bot_score"] == 0.25 for result in summary["results"])
+
+
+@pytest.mark.asyncio
+async def test_runner_records_failures_without_aborting():
+    """A failing unit or bot check is reported and the rest of the run completes"""
+    posts = _posts(6, texts={2: "boom"})
+    posts[4]["author"] = {"user_id": "broken"}
+    posts[5]["author"] = None
+    
+    summary = await run_analysis(posts, "fake", concurrency=2,
+                                 sentiment_service=FakeSentimentService(), bot_detector=FakeBotDetector())
+    
+    assert summary["analyzed"] == 5
+    assert {(failure["post_id"], failure["stage"]) for failure in summary["failures"]} == {
+        ("p2", "sentiment"), ("p4", "bot_detection")
+    }
+    bot_scores = {result["post_id"]: result["bot_score"] for result in summary["results"]}
+    assert bot_scores["p4"] is None and bot_scores["p5"] is None
+
+
+def test_work_units_follow_analyzer_batches():
+    """Batching analyzers decide the units; others get one post per unit"""
+    class Batching:
+        def pack_batches(self, texts):
+            return [[0, 1], [2]]
+    
+    assert work_units(Batching(), ["a", "b", "c"]) == [[0, 1], [2]]
+    assert work_units(object(), ["a", "b"]) == [[0], [1]]
+
+
+@pytest.mark.asyncio
+async def test_provider_semaphore_is_shared_per_provider(monkeypatch):
+    """One semaphore per provider, sized from analysis.provider_concurrency"""
+    monkeypatch.setattr(concurrency.config, "_config", {
+        **concurrency.config._config,
+        "analysis": {"provider_concurrency": {"openrouter": 2}, "default_provider_concurrency": 5}
+    })
+    
+    openrouter = concurrency.provider_semaphore("openrouter")
+    
+    assert concurrency.provider_semaphore("openrouter") is openrouter
+    assert concurrency.provider_limit("openrouter") == 2
+    assert concurrency.provider_limit("other") == 5
+    assert concurrency.provider_semaphore("other") is not openrouter
+
+
+class FixedBotDetector:
+    """Bot likelihood looked up by author id"""
+    
+    def __init__(self, scores):
+        self.scores = scores
+    
+    def calculate_bot_likelihood(self, author_data):
+        return self.scores.get(author_data["user_id"], 0.0)
+
+
+def test_expected_weights_follow_the_weighting_formulas(session_factory, seed_post):
+    """log engagement x log followers x verification x bot penalty, zeros when unknown"""
+    seed_post("p1", datetime(2025, 1, 1), likes=10, retweets=5, replies=1, quotes=0, classification=None)
+    posts = [
+        {"post_id": "p1", "text": "", "author": {"user_id": "a1", "followers_count": 1000, "verified": True}},
+        {"post_id": "p1", "text": "", "author": {"user_id": "bot", "followers_count": 1000, "verified": False}},
+        {"post_id": "missing", "text": "", "author": None}
+    ]
+    
+    weights = expected_weights(posts, session_factory=session_factory, bot_detector=FixedBotDetector({"bot": 0.25}))
+    
+    visibility = math.log(1 + 10 + 5 * 2 + 1 + 0)
+    influence = math.log(1 + 1000)
+    assert weights[0] == pytest.approx(visibility * influence * 1.5)
+    assert weights[1] == pytest.approx(visibility * influence * 0.5)
+    assert weights[2] == 0.0
+
+
+def test_prioritize_orders_by_expected_weight(session_factory, seed_post):
+    """Big accounts with engagement first, likely bots and unseen posts last"""
+    created_at = datetime(2025, 1, 1)
+    seed_post("quiet", created_at, author_id="small", followers=10, likes=1, retweets=0, classification=None)
+    seed_post("viral", created_at, author_id="big", followers=100_000, likes=5000, retweets=800, classification=None)
+    seed_post("spam", created_at, author_id="bot", followers=100_000, likes=5000, retweets=800, classification=None)
+    seed_post("mid", created_at, author_id="mid", followers=5000, likes=40, retweets=3, classification=None)
+    posts = [
+        {"post_id": post_id, "text": post_id, "author": {"user_id": author, "followers_count": followers}}
+        for post_id, author, followers in [
+            ("quiet", "small", 10), ("spam", "bot", 100_000), ("unseen", "nobody", 0),
+            ("mid", "mid", 5000), ("viral", "big", 100_000)
+        ]
+    ]
+    
+    ordered = prioritize(posts, session_factory=session_factory, bot_detector=FixedBotDetector({"bot": 0.9}))
+    
+    assert [post["post_id"] for post in ordered] == ["viral", "mid", "quiet", "spam", "unseen"]
@@ -0,0 +1,105 @@
+"""
+Unit Test: Backfill Job
+Tests sharding, parallel re-aggregation and resume against a SQLite file
+"""
+import json
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine
+from backend.src.storage.database import Base
+from backend.src.models.daily_aggregate import DailyAggregate
+from backend.src.models.weighting_config import WeightingConfig
+from backend.src.jobs.backfill import shard_date_range, run_backfill
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    """File-backed database so worker processes can open their own engines"""
+    return f"sqlite:///{tmp_path / 'backfill.db'}"
+
+
+@pytest.fixture
+def db_engine(db_url):
+    """Overrides the in-memory engine from conftest"""
+    engine = create_engine(db_url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_shard_date_range_covers_range_without_overlap():
+    shards = shard_date_range(date(2025, 1, 1), date(2025, 1, 10), days_per_shard=4)
+    
+    assert shards == [
+        (date(2025, 1, 1), date(2025, 1, 4)),
+        (date(2025, 1, 5), date(2025, 1, 8)),
+        (date(2025, 1, 9), date(2025, 1, 10)),
+    ]
+    assert shard_date_range(date(2025, 1, 2), date(2025, 1, 1)) == []
+    with pytest.raises(ValueError):
+        shard_date_range(date(2025, 1, 1), date(2025, 1, 2), days_per_shard=0)
+
+
+def test_backfill_replaces_aggregates_and_resumes(db_url, session_factory, seed_post, tmp_path):
+    """Shards run in worker processes; a second run skips completed shards"""
+    for day in range(5):
+        for i in range(day + 2):
+            seed_post(f"{day}-{i}", datetime(2025, 1, 1 + day, 12) + timedelta(minutes=i),
+                      author_id=f"a{i}", classification=["Bullish", "Bearish"][i % 2])
+    state_file = str(tmp_path / "state.json")
+    
+    summary = run_backfill(
+        date(2025, 1, 1), date(2025, 1, 5), topics=["Bitcoin", "MSTR"], algorithms=["openai"],
+        database_url=db_url, workers=2, days_per_shard=2, state_file=state_file
+    )
+    
+    assert (summary["shards"], summary["skipped"], summary["completed"]) == (3, 0, 3)
+    assert summary["failed"] == []
+    assert summary["aggregates"] == 10
+    assert summary["scored_posts"] == sum(day + 2 for day in range(5))
+    
+    session = session_factory()
+    try:
+        totals = sorted(
+            (a.date, a.topic.value, a.total_posts) for a in session.query(DailyAggregate)
+        )
+    finally:
+        session.close()
+    assert [(d, n) for d, topic, n in totals if topic == "Bitcoin"] == [
+        (date(2025, 1, 1 + day), day + 2) for day in range(5)
+    ]
+    
+    with open(state_file) as f:
+        assert sorted(json.load(f)["completed"]) == ["2025-01-01", "2025-01-03", "2025-01-05"]
+    
+    resumed = run_backfill(
+        date(2025, 1, 1), date(2025, 1, 5), topics=["Bitcoin", "MSTR"], algorithms=["openai"],
+        database_url=db_url, workers=2, days_per_shard=2, state_file=state_file
+    )
+    
+    assert (resumed["skipped"], resumed["completed"], resumed["aggregates"]) == (3, 0, 0)
+
+
+def test_backfill_uses_the_chosen_weighting_config(db_url, session_factory, seed_post):
+    seed_post("p1", datetime(2025, 1, 1, 12), likes=40, followers=9000)
+    session = session_factory()
+    try:
+        session.add(WeightingConfig(
+            version="v2.0", visibility_formula="sqrt(1 + likes)", influence_formula="1",
+            bot_penalty_formula="1", verification_multiplier=1.0, effective_date=date(2025, 1, 1)
+        ))
+        session.commit()
+    finally:
+        session.close()
+    
+    run_backfill(date(2025, 1, 1), date(2025, 1, 1), topics=["Bitcoin"], algorithms=["openai"],
+                 database_url=db_url, workers=1, state_file=None, weighting_version="v2.0")
+    
+    session = session_factory()
+    try:
+        assert [a.weighting_config_version for a in session.query(DailyAggregate)] == ["v2.0"]
+    finally:
+        session.close()
+    with pytest.raises(ValueError):
+        run_backfill(date(2025, 1, 1), date(2025, 1, 1), algorithms=["openai"],
+                     database_url=db_url, workers=1, state_file=None, weighting_version="missing")
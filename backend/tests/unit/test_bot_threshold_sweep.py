@@ -0,0 +1,63 @@
+"""
+Unit Test: Bot Threshold Sweep
+Tests the prefix-sum threshold curve against direct per-threshold computation
+"""
+import random
+import numpy as np
+import pytest
+from datetime import date, datetime, timedelta
+from backend.src.services.bot_threshold_sweep import human_sentiment_curve, DEFAULT_THRESHOLDS
+from backend.src.services.daily_aggregator import DailyAggregator
+
+
+def _direct(bot_score, score, engagement, threshold):
+    """Human score by filtering at one threshold (what DailyAggregator does)"""
+    human = [(s, e) for b, s, e in zip(bot_score, score, engagement) if b < threshold]
+    denominator = sum(e for _, e in human)
+    return len(human), (sum(s * e for s, e in human) / denominator if denominator > 0 else 50)
+
+
+def test_curve_matches_direct_filtering():
+    rng = random.Random(7)
+    # Rounded scores create ties exactly at thresholds
+    bot_score = [round(rng.random(), 1) for _ in range(500)]
+    score = [rng.uniform(0, 100) for _ in range(500)]
+    engagement = [rng.randint(0, 50) for _ in range(500)]
+    
+    curve = human_sentiment_curve(np.array(bot_score), np.array(score), np.array(engagement))
+    
+    assert [point["threshold"] for point in curve] == DEFAULT_THRESHOLDS
+    for point in curve:
+        human_count, human_score = _direct(bot_score, score, engagement, point["threshold"])
+        assert point["human_tweet_count"] == human_count
+        assert point["bot_tweet_count"] == 500 - human_count
+        assert point["human_sentiment_score"] == pytest.approx(human_score, rel=1e-12)
+
+
+def test_curve_without_human_engagement_is_neutral():
+    curve = human_sentiment_curve([0.9, 0.95], [10.0, 20.0], [3, 4], thresholds=[0.5, 1.0])
+    
+    assert curve[0]["human_tweet_count"] == 0
+    assert curve[0]["human_sentiment_score"] == 50
+    assert curve[1]["human_sentiment_score"] == pytest.approx((10 * 3 + 20 * 4) / 7)
+
+
+@pytest.mark.asyncio
+async def test_aggregator_curve_matches_stored_human_score(session_factory, seed_post):
+    """The point at HUMAN_BOT_THRESHOLD reproduces the aggregate's human score"""
+    start = datetime(2025, 10, 4)
+    for i in range(40):
+        seed_post(f"p{i}", start + timedelta(minutes=i), author_id=f"a{i % 5}", likes=i, retweets=i % 3,
+                  score=None if i % 9 == 0 else float(i * 2), bot_score=None if i % 6 == 0 else (i % 10) / 10)
+    aggregator = DailyAggregator(session_factory=session_factory)
+    
+    result = await aggregator.bot_threshold_curve(date(2025, 10, 4), "openai", [0.5, 0.8])
+    aggregate = await aggregator.aggregate_daily_sentiment(date(2025, 10, 4), "Bitcoin", "openai")
+    
+    assert result["total_posts"] == 40
+    assert result["overall_sentiment_score"] == pytest.approx(aggregate.overall_sentiment_score)
+    point = result["curve"][1]
+    assert point["threshold"] == aggregator.HUMAN_BOT_THRESHOLD
+    assert point["human_tweet_count"] == aggregate.human_tweet_count
+    assert point["human_sentiment_score"] == pytest.approx(aggregate.human_sentiment_score)
+    assert await aggregator.bot_threshold_curve(date(2025, 10, 5), "openai") is None
@@ -0,0 +1,95 @@
+"""
+Unit Test: Cascade Analyzer
+Tests confidence/weight escalation, fallback handling and decision records
+"""
+import pytest
+from datetime import datetime
+from backend.src.models.cascade_decision import CascadeDecision
+from backend.src.services.sentiment.base import SentimentAnalyzer
+from backend.src.services.sentiment.cascade_analyzer import CascadeAnalyzer, engagement_weights
+
+
+class FixedAnalyzer(SentimentAnalyzer):
+    """Returns a preset confidence per text and records what it analyzed"""
+    
+    def __init__(self, algorithm_id, confidences=None, fallback=False):
+        self._algorithm_id = algorithm_id
+        self.confidences = confidences or {}
+        self.fallback = fallback
+        self.analyzed = []
+    
+    async def analyze(self, text: str) -> dict:
+        self.analyzed.append(text)
+        return {
+            "classification": "Bullish",
+            "confidence": self.confidences.get(text, 0.9),
+            "score": 80.0,
+            "algorithm_id": "keyword-fallback" if self.fallback else self.algorithm_id,
+            "algorithm_version": "v1"
+        }
+    
+    @property
+    def algorithm_id(self) -> str:
+        return self._algorithm_id
+    
+    @property
+    def algorithm_version(self) -> str:
+        return "v1"
+
+
+@pytest.mark.asyncio
+async def test_only_uncertain_or_heavy_posts_are_escalated(session_factory, seed_post):
+    """Low confidence or high engagement weight sends a post to the LLM"""
+    for post_id in ("sure", "unsure", "viral"):
+        seed_post(post_id, datetime(2025, 10, 4), classification=None)
+    first = FixedAnalyzer("vader", {"unsure": 0.55})
+    llm = FixedAnalyzer("openai")
+    cascade = CascadeAnalyzer(
+        first, llm, confidence_threshold=0.7, weight_threshold=100.0,
+        weight_lookup=lambda post_ids: {"sure": 1.0, "unsure": 1.0, "viral": 250.0},
+        session_factory=session_factory
+    )
+    
+    results = await cascade.analyze_batch(["sure", "unsure", "viral"], post_ids=["sure", "unsure", "viral"])
+    
+    assert first.analyzed == ["sure", "unsure", "viral"]
+    assert llm.analyzed == ["unsure", "viral"]
+    assert [result["algorithm_version"] for result in results] == ["vader:v1", "openai:v1", "openai:v1"]
+    assert all(result["algorithm_id"] == "cascade" for result in results)
+    assert cascade.stats() == {
+        "routed": 3, "escalated": 2, "escalation_rate": 2 / 3,
+        "reasons": {"low_confidence": 1, "high_weight": 1}
+    }
+    
+    session = session_factory()
+    decisions = {decision.post_id: decision for decision in session.query(CascadeDecision)}
+    session.close()
+    assert (decisions["sure"].escalated, decisions["sure"].final_algorithm_id) == (False, "vader")
+    assert (decisions["unsure"].reason, decisions["unsure"].first_confidence) == ("low_confidence", 0.55)
+    assert (decisions["viral"].reason, decisions["viral"].weight) == ("high_weight", 250.0)
+
+
+@pytest.mark.asyncio
+async def test_llm_fallback_keeps_first_result(session_factory):
+    """A keyword fallback from the LLM path does not replace the cheap analyzer's result"""
+    cascade = CascadeAnalyzer(
+        FixedAnalyzer("vader", {"hmm": 0.5}), FixedAnalyzer("openai", fallback=True),
+        session_factory=session_factory
+    )
+    
+    result = await cascade.analyze("hmm")
+    
+    assert result["algorithm_version"] == "vader:v1"
+    assert cascade.stats()["escalated"] == 1
+
+
+def test_engagement_weights_follow_weighting_formulas(session_factory, seed_post):
+    """Weights come from stored engagement and author data"""
+    seed_post("quiet", datetime(2025, 10, 4), followers=10, likes=0, retweets=0, replies=0)
+    seed_post("loud", datetime(2025, 10, 4), author_id="whale", followers=500_000, verified=True,
+              likes=5000, retweets=800)
+    
+    weights = engagement_weights(["quiet", "loud", "missing"], session_factory=session_factory)
+    
+    assert set(weights) == {"quiet", "loud"}
+    assert weights["loud"] > 40.0 > weights["quiet"]
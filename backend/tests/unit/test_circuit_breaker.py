@@ -0,0 +1,134 @@
+"""
+Unit Test: Circuit Breaker
+Tests state transitions and OpenAIAnalyzer short-circuiting to its fallback
+"""
+import httpx
+import pytest
+from backend.src.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from backend.src.services.sentiment import openai_analyzer
+from backend.src.services.sentiment.openai_analyzer import OpenAIAnalyzer
+from backend.src.services.sentiment.vader_analyzer import VADERAnalyzer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def _breaker(clock, transitions, **kwargs):
+    settings = {"window_size": 10, "minimum_calls": 4, "open_seconds": 30, **kwargs}
+    return CircuitBreaker(
+        "openrouter",
+        clock=clock,
+        on_transition=lambda breaker, old, new, reason: transitions.append((old, new)),
+        **settings
+    )
+
+
+def test_opens_on_error_rate_and_closes_after_successful_probe():
+    clock, transitions = FakeClock(), []
+    breaker = _breaker(clock, transitions, failure_rate_threshold=0.5)
+    
+    breaker.record_success(100)
+    breaker.record_failure("timeout")
+    breaker.record_success(100)
+    assert breaker.state == CLOSED  # below minimum_calls
+    breaker.record_failure("timeout")
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    
+    clock.now = 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # one probe at a time
+    
+    breaker.record_success(100)
+    assert breaker.state == CLOSED
+    assert transitions == [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+    assert breaker.stats()["rejected"] == 2
+
+
+def test_slow_calls_open_the_circuit_and_a_failed_probe_reopens_it():
+    clock, transitions = FakeClock(), []
+    breaker = _breaker(clock, transitions, slow_call_ms=1000, slow_call_rate_threshold=0.75)
+    
+    for elapsed_ms in (2000, 3000, 50, 5000):
+        breaker.record_success(elapsed_ms)
+    assert breaker.state == OPEN
+    
+    clock.now = 31
+    assert breaker.allow_request()
+    breaker.record_failure("503")
+    assert breaker.state == OPEN
+    
+    clock.now = 45  # cool-down restarted at the failed probe
+    assert breaker.state == OPEN
+    
+    clock.now = 61
+    assert breaker.allow_request()
+    breaker.release()  # e.g. rate limited: no verdict, probe slot freed
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    """OpenAIAnalyzer with a VADER fallback, a private breaker and a failing transport"""
+    breaker = CircuitBreaker("openrouter", minimum_calls=2, window_size=5, open_seconds=60)
+    calls = []
+    
+    class FailingClient:
+        async def post(self, endpoint, **kwargs):
+            calls.append(endpoint)
+            response = httpx.Response(503, request=httpx.Request("POST", endpoint))
+            return response
+    
+    async def _sleep(seconds):
+        pass
+    
+    monkeypatch.setattr(openai_analyzer, "circuit_breaker", lambda provider: breaker)
+    monkeypatch.setattr(openai_analyzer, "get_http_client", lambda name: FailingClient())
+    monkeypatch.setattr(openai_analyzer.APILogger, "log_api_call", staticmethod(lambda **kwargs: None))
+    monkeypatch.setattr(openai_analyzer.asyncio, "sleep", _sleep)
+    
+    analyzer = OpenAIAnalyzer(fallback=VADERAnalyzer())
+    analyzer.api_key = "test-key"
+    analyzer.openai_config = {**analyzer.openai_config, "max_retries": 3}
+    analyzer.breaker = breaker
+    analyzer.calls = calls
+    return analyzer
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_stops_retries_and_short_circuits_to_fallback(analyzer):
+    result = await analyzer.analyze("Bitcoin is going to the moon, great gains!")
+    
+    # Two failed attempts open the circuit; the third attempt is never sent
+    assert len(analyzer.calls) == 2
+    assert analyzer.breaker.state == OPEN
+    assert result["algorithm_id"] == "vader"
+    assert result["reasoning"] == "vader fallback (API unavailable)"
+    
+    results = await analyzer.analyze_batch(["Crash incoming, sell everything", "Holding steady"])
+    assert len(analyzer.calls) == 2
+    assert [result["algorithm_id"] for result in results] == ["vader", "vader"]
+    assert not analyzer.is_cacheable(results[0])
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_count_against_the_provider(analyzer, monkeypatch):
+    class RejectingClient:
+        async def post(self, endpoint, **kwargs):
+            analyzer.calls.append(endpoint)
+            return httpx.Response(400, request=httpx.Request("POST", endpoint))
+    
+    monkeypatch.setattr(openai_analyzer, "get_http_client", lambda name: RejectingClient())
+    
+    result = await analyzer.analyze("Some tweet")
+    
+    assert len(analyzer.calls) == 3
+    assert analyzer.breaker.state == CLOSED
+    assert result["algorithm_id"] == "vader"
@@ -0,0 +1,438 @@
+"""
+Unit Test: Daily Aggregator
+Tests the set-based aggregation path against an in-memory database
+"""
+import pytest
+from datetime import date, datetime, timedelta
+from backend.src.models.bot_signal import BotSignal
+from backend.src.models.engagement import Engagement
+from backend.src.models.daily_aggregate_state import DailyAggregateAuthor, DailyAggregateFold, DailyAggregateState
+from backend.src.models.sentiment_score import SentimentClassification, SentimentScore
+from backend.src.models.weighting_config import WeightingConfig
+from backend.src.services.daily_aggregator import DailyAggregator
+from backend.src.services.sketches import ScoreHistogram
+from backend.src.services.weighting_calculator import WeightingCalculator
+
+
+TARGET_DATE = date(2025, 10, 4)
+
+EXPERIMENT = WeightingConfig(
+    version="v2.0",
+    visibility_formula="sqrt(1 + likes)",
+    influence_formula="1",
+    bot_penalty_formula="1",
+    verification_multiplier=3.0
+)
+
+
+def _seed_day(seed_post, count, day=TARGET_DATE):
+    """Seed `count` posts spread over a single day"""
+    start = datetime.combine(day, datetime.min.time())
+    for i in range(count):
+        seed_post(
+            post_id=f"{day.isoformat()}-{i}",
+            created_at=start + timedelta(minutes=i),
+            author_id=f"author{i % 7}",
+            followers=100 * (i + 1),
+            verified=(i % 7 == 0),
+            likes=i,
+            retweets=i % 3,
+            classification=["Bullish", "Bearish", "Neutral"][i % 3],
+            score=float(10 + (i * 13) % 80),
+            bot_score=(i % 10) / 10
+        )
+
+
+@pytest.mark.asyncio
+async def test_aggregate_matches_weighting_calculator(session_factory, seed_post):
+    """Aggregate fields should match a direct computation over the same posts"""
+    seed_post("p1", datetime(2025, 10, 4, 9), author_id="a1", followers=5000, verified=True,
+              likes=100, retweets=50, classification="Bullish", score=80.0, bot_score=0.1)
+    seed_post("p2", datetime(2025, 10, 4, 10), author_id="a2", followers=50,
+              likes=1, retweets=0, classification="Bearish", score=20.0, bot_score=0.9)
+    seed_post("p3", datetime(2025, 10, 4, 11), author_id="a1",
+              likes=4, retweets=1, classification="Neutral", score=None, bot_score=None)
+    # Different day and unscored posts are excluded
+    seed_post("p4", datetime(2025, 10, 5, 9), classification="Bearish")
+    seed_post("p5", datetime(2025, 10, 4, 12), classification=None)
+    
+    aggregator = DailyAggregator(session_factory=session_factory)
+    aggregate = await aggregator.aggregate_daily_sentiment(TARGET_DATE, "Bitcoin", "openai")
+    
+    assert aggregate.total_posts == 3
+    assert (aggregate.bullish_count, aggregate.bearish_count, aggregate.neutral_count) == (1, 1, 1)
+    assert aggregate.unique_authors == 2
+    assert aggregate.verified_authors == 1
+    assert aggregate.total_likes == 105
+    assert aggregate.total_posts_after_bot_filter == 2
+    assert aggregate.human_tweet_count == 2
+    assert aggregate.bot_tweet_count == 1
+    
+    # Missing score counts as neutral 50
+    assert aggregate.overall_sentiment_score == pytest.approx((80 * 150 + 20 * 1 + 50 * 5) / 156)
+    assert aggregate.human_sentiment_score == pytest.approx((80 * 150 + 50 * 5) / 155)
+    
+    expected = WeightingCalculator().calculate_weighted_sentiment([
+        {"sentiment": "Bullish", "bot_score": 0.1,
+         "engagement": {"like_count": 100, "retweet_count": 50, "reply_count": 1, "quote_count": 0},
+         "author": {"followers_count": 5000, "verified": True}},
+        {"sentiment": "Bearish", "bot_score": 0.9,
+         "engagement": {"like_count": 1, "retweet_count": 0, "reply_count": 1, "quote_count": 0},
+         "author": {"followers_count": 50, "verified": False}},
+        {"sentiment": "Neutral", "bot_score": 0.0,
+         "engagement": {"like_count": 4, "retweet_count": 1, "reply_count": 1, "quote_count": 0},
+         "author": {"followers_count": 5000, "verified": True}},
+    ])
+    assert aggregate.weighted_score == pytest.approx(expected["weighted_score"])
+    assert aggregate.dominant_sentiment.value == expected["dominant_sentiment"]
+
+
+@pytest.mark.asyncio
+async def test_aggregate_returns_none_without_scored_posts(session_factory, seed_post):
+    """Days with no scored posts produce no aggregate"""
+    seed_post("p1", datetime(2025, 10, 4, 9), classification=None)
+    
+    aggregator = DailyAggregator(session_factory=session_factory)
+    
+    assert await aggregator.aggregate_daily_sentiment(TARGET_DATE, "Bitcoin", "openai") is None
+
+
+@pytest.mark.asyncio
+async def test_aggregate_uses_earliest_bot_signal(session_factory, seed_post):
+    """A re-checked post uses its first bot signal, whatever its UUID"""
+    seed_post("p1", datetime(2025, 10, 4, 9), bot_score=None)
+    session = session_factory()
+    session.add(BotSignal(id="ffff", post_id="p1", score=0.9, created_at=datetime(2025, 10, 4, 9)))
+    session.add(BotSignal(id="0000", post_id="p1", score=0.1, created_at=datetime(2025, 10, 5, 9)))
+    session.commit()
+    session.close()
+    
+    aggregator = DailyAggregator(session_factory=session_factory)
+    aggregate = await aggregator.aggregate_daily_sentiment(TARGET_DATE, "Bitcoin", "openai")
+    
+    assert aggregate.bot_tweet_count == 1
+    assert aggregate.human_tweet_count == 0
+
+
+@pytest.mark.asyncio
+async def test_aggregate_query_count_is_flat(session_factory, seed_post, query_counter):
+    """Query count should not grow with the number of posts in a day"""
+    aggregator = DailyAggregator(session_factory=session_factory)
+    
+    _seed_day(seed_post, 10, day=date(2025, 10, 3))
+    query_counter["count"] = 0
+    small = await aggregator.aggregate_daily_sentiment(date(2025, 10, 3), "Bitcoin", "openai")
+    small_queries = query_counter["count"]
+    
+    _seed_day(seed_post, 300)
+    query_counter["count"] = 0
+    large = await aggregator.aggregate_daily_sentiment(TARGET_DATE, "Bitcoin", "openai")
+    large_queries = query_counter["count"]
+    
+    assert small.total_posts == 10
+    assert large.total_posts == 300
+    assert large_queries == small_queries
+
+
+AGGREGATE_FIELDS = [
+    "total_posts", "total_posts_after_bot_filter", "unique_authors", "verified_authors",
+    "bullish_count", "bearish_count", "neutral_count", "weighted_score",
+    "weighted_bullish_score", "weighted_bearish_score", "total_likes", "total_retweets",
+    "avg_engagement_per_post", "bot_detection_rate", "high_confidence_sentiment_pct",
+    "overall_sentiment_score", "human_sentiment_score", "human_tweet_count", "bot_tweet_count",
+    "dominant_sentiment"
+]
+
+
+@pytest.mark.asyncio
+async def test_sql_mode_matches_row_mode(session_factory, seed_post):
+    """SQL GROUP BY aggregation should reproduce the row-based aggregate"""
+    _seed_day(seed_post, 40, day=date(2025, 10, 3))
+    _seed_day(seed_post, 25)
+    aggregator = DailyAggregator(session_factory=session_factory)
+    
+    sql_aggregates = await aggregator.aggregate_date_range_sql(
+        date(2025, 10, 3), TARGET_DATE, "MSTR", "openai"
+    )
+    row_aggregates = [
+        await aggregator.aggregate_daily_sentiment(day, "Bitcoin", "openai")
+        for day in (date(2025, 10, 3), TARGET_DATE)
+    ]
+    
+    assert [a.date for a in sql_aggregates] == [date(2025, 10, 3), TARGET_DATE]
+    for sql_aggregate, row_aggregate in zip(sql_aggregates, row_aggregates):
+        for field in AGGREGATE_FIELDS:
+            assert getattr(sql_aggregate, field) == pytest.approx(getattr(row_aggregate, field)), field
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sql_math", [True, False])
+async def test_sql_mode_weights_and_histograms(session_factory, seed_post, monkeypatch, sql_math):
+    """Weights and histograms come from SQL when it has math functions, else from streamed rows"""
+    _seed_day(seed_post, 30)
+    aggregator = DailyAggregator(session_factory=session_factory)
+    row_aggregate = await aggregator.aggregate_daily_sentiment(TARGET_DATE, "Bitcoin", "openai")
+    
+    monkeypatch.setattr(aggregator, "_sql_math_available", lambda session: sql_math)
+    if sql_math:
+        def _no_streaming(*args):
+            raise AssertionError("per-post rows streamed")
+        monkeypatch.setattr(aggregator, "_daily_weights", _no_streaming)
+    
+    [sql_aggregate] = await aggregator.aggregate_date_range_sql(TARGET_DATE, TARGET_DATE, "MSTR", "openai")
+    
+    for field in ("weighted_score", "weighted_bullish_score", "weighted_bearish_score"):
+        assert getattr(sql_aggregate, field) == pytest.approx(getattr(row_aggregate, field)), field
+    assert sql_aggregate.score_histogram == row_aggregate.score_histogram
+    assert sql_aggregate.human_score_histogram == row_aggregate.human_score_histogram
+
+
+@pytest.mark.asyncio
+async def test_sql_mode_bins_fractional_scores_like_rows(session_factory, seed_post):
+    """SQL-mode bins floor fractional scores like ScoreHistogram, bin for bin"""
+    scores = [49.6, 0.4, 99.9, 12.5, 50.0, 73.01]
+    for i, score in enumerate(scores):
+        seed_post(f"fractional-{i}", datetime(2025, 10, 4, 12, i), score=score)
+    aggregator = DailyAggregator(session_factory=session_factory)
+    row_aggregate = await aggregator.aggregate_daily_sentiment(TARGET_DATE, "Bitcoin", "openai")
+    with session_factory() as session:
+        if not aggregator._sql_math_available(session):
+            pytest.skip("SQLite built without math functions")
+    
+    [sql_aggregate] = await aggregator.aggregate_date_range_sql(TARGET_DATE, TARGET_DATE, "MSTR", "openai")
+    
+    sql_counts = ScoreHistogram.from_bytes(sql_aggregate.score_histogram).counts
+    assert sql_counts.tolist() == ScoreHistogram.from_bytes(row_aggregate.score_histogram).counts.tolist()
+    assert sql_counts.nonzero()[0].tolist() == [0, 12, 49, 50, 73, 99]
+
+
+@pytest.mark.asyncio
+async def test_sql_mode_skips_existing_aggregates(session_factory, seed_post):
+    """Days that already have an aggregate are not duplicated"""
+    _seed_day(seed_post, 5)
+    aggregator = DailyAggregator(session_factory=session_factory)
+    
+    first = await aggregator.aggregate_daily_sentiment(TARGET_DATE, "Bitcoin", "openai", mode="sql")
+    second = await aggregator.aggregate_date_range_sql(TARGET_DATE, TARGET_DATE, "Bitcoin", "openai")
+    
+    assert first.total_posts == 5
+    assert second == []
+
+
+@pytest.mark.asyncio
+async def test_incremental_mode_absorbs_late_posts(session_factory, seed_post):
+    """Late-scored posts are folded into the existing aggregate in place"""
+    _seed_day(seed_post, 12)
+    aggregator = DailyAggregator(session_factory=session_factory)
+    
+    first = await aggregator.aggregate_daily_sentiment(TARGET_DATE, "Bitcoin", "openai", mode="incremental")
+    assert first.total_posts == 12
+    
+    # Posts that arrive (and get scored) after the first run
+    for i in range(12, 20):
+        seed_post(f"late-{i}", datetime(2025, 10, 4, 23, i), author_id=f"late-author{i % 3}",
+                  verified=(i % 2 == 0), likes=i * 3, classification="Bearish", score=15.0,
+                  bot_score=0.95 if i % 4 == 0 else 0.2)
+    
+    updated = await aggregator.aggregate_daily_sentiment(TARGET_DATE, "Bitcoin", "openai", mode="incremental")
+    unchanged = await aggregator.refresh_incremental(TARGET_DATE, "Bitcoin", "openai")
+    recomputed = await DailyAggregator(session_factory=session_factory).aggregate_daily_sentiment(
+        TARGET_DATE, "MSTR", "openai"
+    )
+    
+    assert updated.id == first.id == unchanged.id
+    for field in AGGREGATE_FIELDS:
+        assert getattr(updated, field) == pytest.approx(getattr(recomputed, field)), field
+        assert getattr(unchanged, field) == pytest.approx(getattr(recomputed, field)), field
+    
+    session = session_factory()
+    try:
+        from backend.src.models.daily_aggregate import DailyAggregate, Topic
+        assert session.query(DailyAggregate).filter_by(topic=Topic.BITCOIN).count() == 1
+    finally:
+        session.close()
+
+
+@pytest.mark.asyncio
+async def test_incremental_mode_folds_late_and_changed_inputs(session_factory, seed_post):
+    """Out-of-order scores, late engagement rows and changed bot signals or engagement are all folded in"""
+    _seed_day(seed_post, 6)
+    seed_post("no-engagement", datetime(2025, 10, 4, 20), author_id="late-author", verified=True,
+              classification="Bearish", score=20.0, bot_score=None)
+    session = session_factory()
+    late_engagement = session.get(Engagement, "no-engagement")
+    session.delete(late_engagement)
+    # Take a score id below ids that get folded, as a concurrent writer committing late would
+    session.query(SentimentScore).filter_by(post_id=f"{TARGET_DATE.isoformat()}-5").update({"id": 1000})
+    slow_score = session.query(SentimentScore).filter_by(post_id=f"{TARGET_DATE.isoformat()}-4").one()
+    slow_post_id = slow_score.post_id
+    session.delete(slow_score)
+    session.commit()
+    session.close()
+    
+    aggregator = DailyAggregator(session_factory=session_factory)
+    first = await aggregator.refresh_incremental(TARGET_DATE, "Bitcoin", "openai")
+    assert first.total_posts == 5
+    
+    session = session_factory()
+    session.add(Engagement(post_id="no-engagement", like_count=40, retweet_count=4, reply_count=0, quote_count=0))
+    session.add(SentimentScore(
+        id=500, post_id=slow_post_id, algorithm_id="openai", algorithm_version="test",
+        classification=SentimentClassification.BULLISH, confidence=0.9, score=90.0,
+        created_at=datetime(2025, 10, 4, 21)
+    ))
+    session.add(BotSignal(id="late-signal", post_id=f"{TARGET_DATE.isoformat()}-1", score=0.99,
+                          created_at=datetime(2025, 10, 3)))
+    session.get(Engagement, f"{TARGET_DATE.isoformat()}-2").like_count = 5000
+    session.commit()
+    session.close()
+    
+    updated = await aggregator.refresh_incremental(TARGET_DATE, "Bitcoin", "openai")
+    recomputed = await aggregator.aggregate_daily_sentiment(TARGET_DATE, "MSTR", "openai")
+    
+    assert updated.total_posts == 7
+    for field in AGGREGATE_FIELDS:
+        assert getattr(updated, field) == pytest.approx(getattr(recomputed, field)), field
+    assert updated.score_histogram == recomputed.score_histogram
+    assert updated.human_score_histogram == recomputed.human_score_histogram
+    assert updated.author_sketch == recomputed.author_sketch
+    assert updated.verified_author_sketch == recomputed.verified_author_sketch
+
+
+@pytest.mark.asyncio
+async def test_incremental_mode_returns_none_without_data(session_factory):
+    """No scored posts means no state and no aggregate"""
+    aggregator = DailyAggregator(session_factory=session_factory)
+    
+    assert await aggregator.refresh_incremental(TARGET_DATE, "Bitcoin", "openai") is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_range_matches_per_day_aggregation(session_factory, seed_post, query_counter):
+    """One pass over a range should match per-day aggregation for every bucket"""
+    _seed_day(seed_post, 30, day=date(2025, 10, 2))
+    _seed_day(seed_post, 20)
+    for i in range(15):
+        seed_post(f"vader-{i}", datetime(2025, 10, 4, 8, i), author_id=f"v{i % 4}",
+                  classification=["Bearish", "Neutral"][i % 2], score=30.0, algorithm="vader")
+    aggregator = DailyAggregator(session_factory=session_factory)
+    
+    query_counter["count"] = 0
+    aggregates = await aggregator.aggregate_date_range(
+        date(2025, 10, 1), TARGET_DATE, ["Bitcoin", "MSTR"], ["openai", "vader"]
+    )
+    bulk_queries = query_counter["count"]
+    
+    keys = [(a.date, a.topic.value, a.algorithm_id) for a in aggregates]
+    assert keys == [
+        (date(2025, 10, 2), "Bitcoin", "openai"), (date(2025, 10, 2), "MSTR", "openai"),
+        (TARGET_DATE, "Bitcoin", "openai"), (TARGET_DATE, "MSTR", "openai"),
+        (TARGET_DATE, "Bitcoin", "vader"), (TARGET_DATE, "MSTR", "vader"),
+    ]
+    assert bulk_queries <= 4
+    
+    for aggregate in aggregates:
+        expected = await aggregator.aggregate_daily_sentiment(
+            aggregate.date, "BitcoinTreasuries", aggregate.algorithm_id
+        )
+        for field in AGGREGATE_FIELDS:
+            assert getattr(aggregate, field) == pytest.approx(getattr(expected, field)), field
+
+
+@pytest.mark.asyncio
+async def test_bulk_range_skips_or_replaces_existing(session_factory, seed_post):
+    """Existing aggregates are skipped by default and recomputed with replace=True"""
+    _seed_day(seed_post, 5)
+    aggregator = DailyAggregator(session_factory=session_factory)
+    await aggregator.aggregate_daily_sentiment(TARGET_DATE, "Bitcoin", "openai")
+    seed_post("late", datetime(2025, 10, 4, 22))
+    
+    skipped = await aggregator.aggregate_date_range(TARGET_DATE, TARGET_DATE, ["Bitcoin"], ["openai"])
+    replaced = await aggregator.aggregate_date_range(
+        TARGET_DATE, TARGET_DATE, ["Bitcoin"], ["openai"], replace=True
+    )
+    
+    assert skipped == []
+    assert [a.total_posts for a in replaced] == [6]
+
+
+@pytest.mark.asyncio
+async def test_incremental_range_refreshes_every_day_topic_and_algorithm_in_one_pass(
+    session_factory, seed_post, query_counter
+):
+    """One delta query for the range; one state per day and algorithm, shared by topics"""
+    days = [TARGET_DATE - timedelta(days=1), TARGET_DATE]
+    for day in days:
+        _seed_day(seed_post, 8, day=day)
+        for i in range(4):
+            seed_post(f"{day}-vader-{i}", datetime.combine(day, datetime.min.time()) + timedelta(hours=3, minutes=i),
+                      algorithm="vader", classification="Bearish", score=30.0)
+    aggregator = DailyAggregator(session_factory=session_factory)
+    
+    first = await aggregator.refresh_incremental_range(days[0], days[-1], ["Bitcoin", "MSTR"], ["openai", "vader"])
+    
+    assert sorted((a.date, a.topic.value, a.algorithm_id, a.total_posts) for a in first) == sorted(
+        (day, topic, algorithm, posts)
+        for day in days for topic in ("Bitcoin", "MSTR") for algorithm, posts in (("openai", 8), ("vader", 4))
+    )
+    session = session_factory()
+    try:
+        assert session.query(DailyAggregateState).count() == 4
+    finally:
+        session.close()
+    
+    query_counter["count"] = 0
+    assert await aggregator.refresh_incremental_range(days[0], days[-1], ["Bitcoin", "MSTR"], ["openai", "vader"]) == []
+    assert query_counter["count"] == 3  # states, delta rows, existing aggregate keys
+    
+    session = session_factory()
+    session.get(Engagement, f"{days[0].isoformat()}-3").like_count = 900
+    session.commit()
+    session.close()
+    
+    updated = await aggregator.refresh_incremental_range(days[0], days[-1], ["Bitcoin", "MSTR"], ["openai", "vader"])
+    recomputed = await aggregator.aggregate_daily_sentiment(days[0], "BitcoinTreasuries", "openai")
+    
+    assert sorted((a.date, a.topic.value, a.algorithm_id) for a in updated) == [
+        (days[0], "Bitcoin", "openai"), (days[0], "MSTR", "openai")
+    ]
+    for aggregate in updated:
+        for field in AGGREGATE_FIELDS:
+            assert getattr(aggregate, field) == pytest.approx(getattr(recomputed, field)), field
+
+
+@pytest.mark.asyncio
+async def test_replace_drops_incremental_states_and_records_the_config(session_factory, seed_post):
+    """A backfill under a new config is not overwritten by stale folded weights on the next refresh"""
+    _seed_day(seed_post, 12)
+    await DailyAggregator(session_factory=session_factory).refresh_incremental(TARGET_DATE, "Bitcoin", "openai")
+    aggregator = DailyAggregator(session_factory=session_factory, weighting_config=EXPERIMENT)
+    
+    [backfilled] = await aggregator.aggregate_date_range(
+        TARGET_DATE, TARGET_DATE, ["Bitcoin"], ["openai"], replace=True
+    )
+    session = session_factory()
+    try:
+        assert [session.query(model).count() for model in
+                (DailyAggregateState, DailyAggregateFold, DailyAggregateAuthor)] == [0, 0, 0]
+    finally:
+        session.close()
+    refreshed = await aggregator.refresh_incremental(TARGET_DATE, "Bitcoin", "openai")
+    
+    assert backfilled.weighting_config_version == refreshed.weighting_config_version == "v2.0"
+    assert refreshed.weighted_score == pytest.approx(backfilled.weighted_score)
+    assert refreshed.weighted_bullish_score == pytest.approx(backfilled.weighted_bullish_score)
+
+
+@pytest.mark.asyncio
+async def test_incremental_state_is_rebuilt_under_a_new_config(session_factory, seed_post):
+    _seed_day(seed_post, 12)
+    await DailyAggregator(session_factory=session_factory).refresh_incremental(TARGET_DATE, "Bitcoin", "openai")
+    aggregator = DailyAggregator(session_factory=session_factory, weighting_config=EXPERIMENT)
+    
+    refreshed = await aggregator.refresh_incremental(TARGET_DATE, "Bitcoin", "openai")
+    recomputed = await aggregator.aggregate_daily_sentiment(TARGET_DATE, "MSTR", "openai", mode="rows")
+    
+    assert refreshed.weighting_config_version == "v2.0"
+    assert refreshed.total_posts == 12
+    assert refreshed.weighted_score == pytest.approx(recomputed.weighted_score)
@@ -0,0 +1,145 @@
+"""
+Unit Test: Feature Snapshot
+Tests snapshot export and what-if reweighting against the aggregator
+"""
+import time
+import numpy as np
+import pytest
+from datetime import date, datetime, timedelta
+from fastapi import HTTPException
+from backend.src.api import sentiment as sentiment_api
+from backend.src.models.weighting_config import WeightingConfig
+from backend.src.services.daily_aggregator import DailyAggregator
+from backend.src.services.formula_engine import FormulaDomainError
+from backend.src.services.feature_snapshot import (
+    FeatureSnapshot, FeatureSnapshotBuilder, UNSCORED, reweight_history, snapshot_paths
+)
+from backend.src.services.weighting_calculator import WeightingCalculator
+
+
+DAYS = [date(2025, 10, 3), date(2025, 10, 4)]
+
+FIELDS = [
+    "total_posts", "weighted_score", "weighted_bullish_score", "weighted_bearish_score",
+    "overall_sentiment_score", "human_sentiment_score", "human_tweet_count", "bot_tweet_count"
+]
+
+EXPERIMENT = WeightingConfig(
+    version="sqrt-followers",
+    visibility_formula="log(1 + likes + retweets)",
+    influence_formula="sqrt(followers)",
+    bot_penalty_formula="max(0, 1 - bot_score)",
+    verification_multiplier=3.0
+)
+
+
+@pytest.fixture
+def seeded(seed_post):
+    """Two days of posts; vader scores only some of them"""
+    for day in DAYS:
+        start = datetime.combine(day, datetime.min.time())
+        for i in range(25):
+            seed_post(f"{day}-{i}", start + timedelta(minutes=i), author_id=f"a{i % 6}",
+                      followers=50 * (i + 1), verified=(i % 6 == 0), likes=i * 2, retweets=i % 4,
+                      classification=["Bullish", "Bearish", "Neutral"][i % 3],
+                      score=None if i % 5 == 0 else float(5 + i * 3),
+                      bot_score=None if i % 7 == 0 else (i % 10) / 10)
+        for i in range(10):
+            seed_post(f"{day}-vader-{i}", start + timedelta(hours=2, minutes=i), algorithm="vader",
+                      classification=["Bearish", "Neutral"][i % 2], score=35.0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("weighting_config", [None, EXPERIMENT])
+async def test_reweighting_matches_aggregator(session_factory, seeded, tmp_path, weighting_config):
+    """Snapshot re-scoring reproduces DailyAggregator under the same config"""
+    paths = FeatureSnapshotBuilder(session_factory).build(DAYS[0], DAYS[-1], str(tmp_path))
+    assert paths == snapshot_paths(str(tmp_path))
+    
+    aggregator = DailyAggregator(session_factory=session_factory)
+    aggregator.weighting_calculator = WeightingCalculator(weighting_config)
+    
+    for algorithm in ("openai", "vader"):
+        results = reweight_history(str(tmp_path), algorithm, weighting_config)
+        assert [r["date"] for r in results] == [day.isoformat() for day in DAYS]
+        
+        for day, result in zip(DAYS, results):
+            aggregate = await aggregator.aggregate_daily_sentiment(day, "Bitcoin", algorithm, mode="rows")
+            assert result["dominant_sentiment"] == aggregate.dominant_sentiment.value
+            for field in FIELDS:
+                assert result[field] == pytest.approx(getattr(aggregate, field), rel=1e-12), field
+
+
+def test_snapshot_round_trip(session_factory, seeded, tmp_path):
+    """Saved snapshots load back with the same arrays (NaN for missing values)"""
+    path = FeatureSnapshotBuilder(session_factory).build(DAYS[0], DAYS[0], str(tmp_path))[0]
+    snapshot = FeatureSnapshot.load(path)
+    
+    assert snapshot.date == DAYS[0]
+    assert snapshot.algorithms == ["openai", "vader"]
+    assert len(snapshot) == 35
+    assert np.isnan(snapshot.bot_score).sum() == 4
+    assert np.count_nonzero(snapshot.sentiment[0] != UNSCORED) == 25
+    assert np.count_nonzero(snapshot.sentiment[1] != UNSCORED) == 10
+    assert np.isnan(snapshot.score[0][snapshot.sentiment[0] != UNSCORED]).sum() == 5
+
+
+def test_reweighting_filters_by_date_and_algorithm(session_factory, seeded, tmp_path):
+    FeatureSnapshotBuilder(session_factory).build(DAYS[0], DAYS[-1], str(tmp_path))
+    
+    assert [r["date"] for r in reweight_history(str(tmp_path), "openai", start_date=DAYS[1])] == ["2025-10-04"]
+    assert reweight_history(str(tmp_path), "finbert") == []
+    assert reweight_history(str(tmp_path / "missing"), "openai") == []
+
+
+def test_reweighting_rejects_non_finite_days(session_factory, seeded, tmp_path):
+    """Weights that are finite per post but overflow when summed are an error, not inf/NaN"""
+    FeatureSnapshotBuilder(session_factory).build(DAYS[0], DAYS[-1], str(tmp_path))
+    overflowing = WeightingConfig(
+        version="overflow",
+        visibility_formula="1e300",
+        influence_formula="1e300 + followers",
+        bot_penalty_formula="1",
+        verification_multiplier=1.0
+    )
+    
+    with pytest.raises(FormulaDomainError):
+        reweight_history(str(tmp_path), "openai", overflowing)
+
+
+def test_reweighting_stops_at_the_deadline(session_factory, seeded, tmp_path):
+    FeatureSnapshotBuilder(session_factory).build(DAYS[0], DAYS[-1], str(tmp_path))
+    
+    with pytest.raises(TimeoutError):
+        reweight_history(str(tmp_path), "openai", deadline=time.monotonic() - 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("formulas, timeout, status_code", [
+    ({"visibility_formula": "log(likes)"}, 30, 400),
+    ({"bot_penalty_formula": "(bot_score - 1) ** 0.5"}, 30, 400),
+    ({"visibility_formula": "1e300", "influence_formula": "1e300 + followers"}, 30, 400),
+    ({"bot_penalty_formula": "max(" * 40 + "1" + ", 1)" * 40}, 30, 400),
+    ({}, 0, 503),
+])
+async def test_what_if_endpoint_errors(session_factory, seeded, tmp_path, monkeypatch, formulas, timeout, status_code):
+    """Bad formulas and non-finite scores are 400s and slow requests are cut off, never 500s"""
+    FeatureSnapshotBuilder(session_factory).build(DAYS[0], DAYS[-1], str(tmp_path))
+    settings = {"snapshot_directory": str(tmp_path), "what_if_timeout_seconds": timeout}
+    monkeypatch.setattr(type(sentiment_api.config), "aggregation_config", property(lambda self: settings))
+    
+    with pytest.raises(HTTPException) as error:
+        await sentiment_api.what_if_reweighting(sentiment_api.WhatIfRequest(algorithm="openai", **formulas))
+    
+    assert error.value.status_code == status_code
+
+
+@pytest.mark.asyncio
+async def test_what_if_endpoint_returns_days(session_factory, seeded, tmp_path, monkeypatch):
+    FeatureSnapshotBuilder(session_factory).build(DAYS[0], DAYS[-1], str(tmp_path))
+    settings = {"snapshot_directory": str(tmp_path)}
+    monkeypatch.setattr(type(sentiment_api.config), "aggregation_config", property(lambda self: settings))
+    
+    response = await sentiment_api.what_if_reweighting(sentiment_api.WhatIfRequest(algorithm="openai"))
+    
+    assert [day["date"] for day in response["days"]] == [day.isoformat() for day in DAYS]
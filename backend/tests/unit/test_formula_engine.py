@@ -0,0 +1,148 @@
+"""
+Unit Test: Formula Engine
+Tests validation and compilation of WeightingConfig formula strings
+"""
+import math
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, literal, select
+from backend.src.models.weighting_config import WeightingConfig
+from backend.src.services.formula_engine import FormulaDomainError, FormulaError, compile_formula
+from backend.src.services.weighting_calculator import WeightingCalculator, compile_weighting_formulas
+
+
+VARIABLES = ("likes", "retweets")
+
+
+@pytest.mark.parametrize("source, expected", [
+    ("log(1 + likes + retweets * 2)", lambda l, r: math.log(1 + l + r * 2)),
+    ("sqrt(likes) - -retweets / 4", lambda l, r: math.sqrt(l) + r / 4),
+    ("max(0, min(likes, 10, retweets ** 2))", lambda l, r: max(0, min(l, 10, r ** 2))),
+    ("2.5", lambda l, r: 2.5),
+])
+def test_scalar_and_vector_agree(source, expected):
+    formula = compile_formula(source, VARIABLES)
+    likes = np.array([0, 3, 40, 900])
+    retweets = np.array([1, 0, 7, 2])
+    
+    values = [formula.scalar(int(l), int(r)) for l, r in zip(likes, retweets)]
+    
+    assert values == pytest.approx([expected(int(l), int(r)) for l, r in zip(likes, retweets)])
+    assert formula.vector(likes, retweets).tolist() == values
+
+
+@pytest.mark.parametrize("source", [
+    "log(1 + likes + retweets * 2)",
+    "sqrt(likes) - -retweets / 4",
+    "max(0, min(likes, 10, retweets ** 2))",
+    "2.5",
+])
+def test_sql_matches_scalar(source):
+    formula = compile_formula(source, VARIABLES)
+    engine = create_engine("sqlite://")
+    
+    with engine.connect() as connection:
+        for likes, retweets in [(0, 1), (3, 0), (40, 7), (900, 2)]:
+            value = connection.execute(select(formula.sql(literal(likes), literal(retweets)))).scalar()
+            assert value == pytest.approx(formula.scalar(likes, retweets))
+
+
+@pytest.mark.parametrize("source", [
+    "__import__('os').system('true')",
+    "likes.__class__",
+    "exp(likes)",
+    "followers + 1",
+    "log(likes, 10)",
+    "max(likes)",
+    "max(*[likes, retweets])",
+    "min(likes, key=retweets)",
+    "likes if retweets else 0",
+    "[likes][0]",
+    "lambda: 1",
+    "likes // 2",
+    "likes ** retweets",
+    "9 ** 99",
+    "(likes ** 2) ** 2",
+    "((((((9**16)**16)**16)**16)**16)**16)**16*0",
+    "log(likes ** 2) ** 2",
+    "'abc'",
+    "True + likes",
+    "log(",
+    "likes + 1" * 60,
+    "sqrt(" * 40 + "likes" + ")" * 40,
+    "(" * 300 + "likes" + ")" * 300,
+])
+def test_rejects_unsafe_or_invalid_formulas(source):
+    with pytest.raises(FormulaError):
+        compile_formula(source, VARIABLES)
+
+
+@pytest.mark.parametrize("source, likes, retweets", [
+    ("log(likes)", [1, 0], [0, 0]),
+    ("sqrt(likes - 5)", [9, 4], [0, 0]),
+    ("likes / retweets", [1, 1], [2, 0]),
+    ("likes ** -1", [2, 0], [0, 0]),
+    ("(likes - 1) ** 0.5", [5, 0], [0, 0]),
+    ("likes ** 16 * likes ** 16 * likes ** 16", [2, 10 ** 9], [0, 0]),
+])
+def test_scalar_and_vector_reject_the_same_domain_errors(source, likes, retweets):
+    """Both paths raise FormulaDomainError where the result is undefined or not finite"""
+    formula = compile_formula(source, VARIABLES)
+    
+    assert formula.vector(likes[:1], retweets[:1]).tolist() == [formula.scalar(likes[0], retweets[0])]
+    with pytest.raises(FormulaDomainError):
+        formula.scalar(likes[1], retweets[1])
+    with pytest.raises(FormulaDomainError):
+        formula.vector(likes, retweets)
+
+
+def test_vector_does_not_wrap_large_integer_powers():
+    formula = compile_formula("likes ** 4", VARIABLES)
+    
+    assert formula.vector([10 ** 6], [0]).tolist() == [float(formula.scalar(10 ** 6, 0))]
+
+
+def test_compiled_formulas_are_cached_by_version():
+    config = WeightingConfig.get_default()
+    compile_weighting_formulas.cache_clear()
+    
+    WeightingCalculator(config)
+    WeightingCalculator(config)
+    
+    assert compile_weighting_formulas.cache_info().misses == 1
+    assert compile_weighting_formulas.cache_info().hits == 1
+
+
+def test_calculator_uses_config_formulas():
+    config = WeightingConfig(
+        version="test-sqrt",
+        visibility_formula="sqrt(likes + retweets)",
+        influence_formula="1",
+        bot_penalty_formula="1 - bot_score",
+        verification_multiplier=2.0
+    )
+    calculator = WeightingCalculator(config)
+    post = {
+        "engagement": {"like_count": 7, "retweet_count": 2, "reply_count": 0, "quote_count": 0},
+        "author": {"followers_count": 10, "verified": True},
+        "bot_score": 0.25
+    }
+    
+    assert calculator.calculate_weight(post) == pytest.approx(3 * 1 * 2.0 * 0.75)
+    np.testing.assert_allclose(
+        calculator.calculate_weights_batch([7, 7], [2, 2], [0, 0], [0, 0], [10, 10], [True, False], [0.25, 0.25]),
+        [4.5, 2.25]
+    )
+
+
+def test_invalid_config_formula_raises():
+    config = WeightingConfig(
+        version="bad",
+        visibility_formula="open('/etc/passwd')",
+        influence_formula="log(1 + followers)",
+        bot_penalty_formula="1",
+        verification_multiplier=1.5
+    )
+    
+    with pytest.raises(FormulaError):
+        WeightingCalculator(config)
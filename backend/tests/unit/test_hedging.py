@@ -0,0 +1,171 @@
+"""
+Unit Test: Request Hedging
+Tests the rolling percentile, hedge firing and capping, and hedge logging
+"""
+import asyncio
+import httpx
+import pytest
+from backend.src.models.api_log import APILog
+from backend.src.services import api_logger
+from backend.src.services.circuit_breaker import CircuitBreaker
+from backend.src.services.hedging import DUPLICATE, PRIMARY, LatencyTracker, RequestHedger
+from backend.src.services.sentiment import openai_analyzer
+from backend.src.services.sentiment.openai_analyzer import OpenAIAnalyzer, estimate_prompt_tokens
+
+
+def _hedger(latency_ms=10, **kwargs):
+    """Hedger already primed with `latency_ms` latencies"""
+    settings = {"min_samples": 5, "max_hedge_rate": 1.0, **kwargs}
+    hedger = RequestHedger(**settings)
+    for _ in range(settings["min_samples"]):
+        hedger.record(latency_ms)
+    return hedger
+
+
+def test_rolling_percentile_needs_min_samples_and_forgets_old_calls():
+    tracker = LatencyTracker(window_size=20, min_samples=10)
+    for elapsed_ms in range(1, 10):
+        tracker.record(elapsed_ms)
+    assert tracker.percentile(95) is None
+    
+    tracker.record(10)
+    assert tracker.percentile(95) == 10
+    assert tracker.percentile(50) == 5
+    
+    for _ in range(20):
+        tracker.record(100)
+    assert tracker.percentile(50) == 100
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_the_loser_cancelled():
+    hedger = _hedger()
+    cancelled = []
+    
+    async def call(hedged_call, role):
+        try:
+            await asyncio.sleep(5 if role == PRIMARY else 0)
+        except asyncio.CancelledError:
+            cancelled.append((role, hedged_call.hedged))
+            raise
+        return role
+    
+    assert await hedger.run(call) == DUPLICATE
+    assert cancelled == [(PRIMARY, True)]
+    assert (hedger.calls, hedger.hedges, hedger.hedge_wins) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_fast_calls_are_not_hedged_and_failures_fall_through():
+    hedger = _hedger(latency_ms=1000)
+    roles = []
+    
+    async def call(hedged_call, role):
+        roles.append(role)
+        return "ok"
+    
+    assert await hedger.run(call) == "ok"
+    assert roles == [PRIMARY]
+    
+    async def failing(hedged_call, role):
+        raise ValueError("boom")
+    
+    with pytest.raises(ValueError):
+        await hedger.run(failing)
+    assert hedger.hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_hedge_rate_is_capped():
+    hedger = _hedger(max_hedge_rate=0.25)
+    
+    async def call(hedged_call, role):
+        await asyncio.sleep(0.03 if role == PRIMARY else 0)
+        return role
+    
+    results = [await hedger.run(call) for _ in range(4)]
+    
+    assert results.count(DUPLICATE) == 1
+    assert hedger.stats()["hedge_rate"] == 0.25
+
+
+@pytest.mark.asyncio
+async def test_openai_hedge_is_logged_with_roles_and_cancelled_cost(monkeypatch):
+    """The slow primary is cancelled and logged with its estimated prompt tokens"""
+    posts = []
+    logs = []
+    
+    class SlowThenFastClient:
+        async def post(self, endpoint, **kwargs):
+            posts.append(endpoint)
+            if len(posts) == 1:
+                await asyncio.sleep(5)
+            return httpx.Response(200, json={"choices": []}, request=httpx.Request("POST", endpoint))
+    
+    breaker = CircuitBreaker("openrouter")
+    monkeypatch.setattr(openai_analyzer, "circuit_breaker", lambda provider: breaker)
+    monkeypatch.setattr(openai_analyzer, "get_http_client", lambda name: SlowThenFastClient())
+    monkeypatch.setattr(openai_analyzer.APILogger, "log_api_call", staticmethod(lambda **kwargs: logs.append(kwargs)))
+    
+    analyzer = OpenAIAnalyzer()
+    analyzer.api_key = "test-key"
+    analyzer.hedger = _hedger()
+    request_data = {"model": "m", "messages": [{"role": "user", "content": "Analyze this tweet: hi"}], "max_tokens": 10}
+    
+    assert await analyzer._post_with_retry(request_data, context={}) == {"choices": []}
+    
+    assert len(posts) == 2
+    assert sorted((log["status"], log["hedge"]) for log in logs) == [
+        ("cancelled", PRIMARY), ("success", DUPLICATE)
+    ]
+    cancelled = next(log for log in logs if log["status"] == "cancelled")
+    assert cancelled["estimated_tokens"] == estimate_prompt_tokens(request_data)
+    assert breaker.stats()["state"] == "closed"
+    # The winner's latency plus a censored sample for the cancelled primary (at least the 10ms hedge delay)
+    assert len(analyzer.hedger.latencies) == 5 + 2
+    assert analyzer.hedger.latencies.percentile(100) >= 10
+
+
+@pytest.mark.asyncio
+async def test_openai_call_cancelled_before_sending_is_not_logged(monkeypatch):
+    """A call still waiting on the rate limiter was never billed, so it logs no hedge cost"""
+    logs = []
+    
+    class BlockedLimiter:
+        async def acquire(self, tokens):
+            await asyncio.sleep(5)
+    
+    breaker = CircuitBreaker("openrouter")
+    monkeypatch.setattr(openai_analyzer, "circuit_breaker", lambda provider: breaker)
+    monkeypatch.setattr(openai_analyzer, "rate_limiter", lambda provider, model: BlockedLimiter())
+    monkeypatch.setattr(openai_analyzer.APILogger, "log_api_call", staticmethod(lambda **kwargs: logs.append(kwargs)))
+    
+    analyzer = OpenAIAnalyzer()
+    analyzer.hedger = _hedger()
+    request_data = {"model": "m", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 10}
+    
+    task = asyncio.ensure_future(analyzer._send(request_data, context={}, role=PRIMARY))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    
+    assert logs == []
+    assert len(analyzer.hedger.latencies) == 5
+    assert breaker.stats()["state"] == "closed"
+
+
+def test_cancelled_calls_do_not_lower_the_success_rate(session_factory, monkeypatch):
+    monkeypatch.setattr(api_logger, "get_session", session_factory)
+    session = session_factory()
+    try:
+        for status, hedge in [("success", None), ("success", DUPLICATE), ("cancelled", PRIMARY), ("error", None)]:
+            session.add(APILog(service="openrouter", endpoint="/chat/completions", status=status, hedge=hedge))
+        session.commit()
+    finally:
+        session.close()
+    
+    stats = api_logger.APILogger.get_stats()
+    
+    assert (stats["total_calls"], stats["successful"], stats["failed"], stats["cancelled"]) == (4, 2, 1, 1)
+    assert stats["success_rate"] == pytest.approx(2 / 3 * 100)
@@ -0,0 +1,88 @@
+"""
+Unit Test: Shared HTTP Clients
+Tests client reuse, per-client options and shutdown
+"""
+import asyncio
+import json
+import httpx
+import pytest
+from backend.src.services import http_client
+from backend.src.services.sentiment.openai_analyzer import OpenAIAnalyzer
+
+
+@pytest.fixture
+def mock_transport(monkeypatch):
+    """Route every shared client through a MockTransport and count clients"""
+    state = {"clients": 0, "requests": []}
+    
+    def handler(request):
+        state["requests"].append(request)
+        content = json.dumps({"score": 80, "reasoning": "mock"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+    
+    def _create_client(name):
+        state["clients"] += 1
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler), **http_client.client_options(name))
+    
+    monkeypatch.setattr(http_client, "_create_client", _create_client)
+    monkeypatch.setattr("backend.src.services.api_logger.APILogger.log_api_call", lambda **kwargs: None)
+    return state
+
+
+def test_client_options_merge_defaults_and_overrides(monkeypatch):
+    """Per-client settings override the shared http defaults"""
+    monkeypatch.setattr(http_client.config, "_config", {
+        **http_client.config._config,
+        "http": {"timeout_seconds": 12, "connect_timeout_seconds": 3, "http2": False,
+                 "clients": {"slow": {"timeout_seconds": 60}}}
+    })
+    
+    default = http_client.client_options("other")
+    slow = http_client.client_options("slow")
+    
+    assert default["timeout"] == httpx.Timeout(12, connect=3)
+    assert slow["timeout"] == httpx.Timeout(60, connect=3)
+    assert default["http2"] is False
+
+
+@pytest.mark.asyncio
+async def test_clients_are_reused_per_name_until_closed(mock_transport):
+    """One client per name in a loop; closing makes the next call open a new one"""
+    openrouter = http_client.get_http_client("openrouter")
+    
+    assert http_client.get_http_client("openrouter") is openrouter
+    assert http_client.get_http_client("x_api") is not openrouter
+    
+    await http_client.close_http_clients()
+    
+    assert openrouter.is_closed
+    assert http_client.get_http_client("openrouter") is not openrouter
+    await http_client.close_http_clients()
+
+
+@pytest.mark.asyncio
+async def test_analyzer_requests_share_one_client(mock_transport):
+    """Concurrent analyzer calls go through a single pooled client"""
+    analyzer = OpenAIAnalyzer()
+    analyzer.api_key = "test-key"
+    
+    async with http_client.http_clients():
+        results = await asyncio.gather(*(analyzer.analyze(f"tweet {i}") for i in range(5)))
+    
+    assert [result["score"] for result in results] == [80] * 5
+    assert len(mock_transport["requests"]) == 5
+    assert mock_transport["clients"] == 1
+
+
+def test_each_event_loop_gets_its_own_client(mock_transport):
+    """Clients are not shared across event loops (e.g. successive asyncio.run calls)"""
+    async def _open():
+        client = http_client.get_http_client("openrouter")
+        await http_client.close_http_clients()
+        return client
+    
+    first = asyncio.run(_open())
+    second = asyncio.run(_open())
+    
+    assert first is not second
+    assert mock_transport["clients"] == 2
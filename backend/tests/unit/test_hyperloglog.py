@@ -0,0 +1,67 @@
+"""
+Unit Test: HyperLogLog
+Tests sketch accuracy, merging and serialization, and multi-day author counts
+"""
+import pytest
+from datetime import date, datetime, timedelta
+from backend.src.services.daily_aggregator import DailyAggregator
+from backend.src.services.sketches import HyperLogLog
+
+
+@pytest.mark.parametrize("n", [0, 1, 50, 5000, 50000])
+def test_estimate_is_within_error_bound(n):
+    sketch = HyperLogLog().update(f"user{i}" for i in range(n))
+    
+    # ~1.6% standard error at precision 12; allow 5 sigma
+    assert sketch.count() == pytest.approx(n, rel=0.08, abs=1)
+
+
+def test_union_matches_sketch_of_union():
+    a = HyperLogLog().update(range(0, 3000))
+    b = HyperLogLog().update(range(2000, 6000))
+    
+    union = HyperLogLog.union([a, b])
+    
+    assert (union.registers == HyperLogLog().update(range(6000)).registers).all()
+    assert a.count() == HyperLogLog().update(range(0, 3000)).count()  # inputs untouched
+    assert union.count() == pytest.approx(6000, rel=0.08)
+
+
+def test_serialization_round_trip():
+    sketch = HyperLogLog(precision=10).update(["a", "b", "c", "a"])
+    
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    
+    assert restored.precision == 10
+    assert (restored.registers == sketch.registers).all()
+    assert restored.count() == 3
+
+
+def test_rejects_mismatched_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+
+
+@pytest.mark.asyncio
+async def test_distinct_authors_unions_daily_sketches(session_factory, seed_post):
+    """Range and rolling counts come from stored sketches, not exact per-day counts"""
+    start = date(2025, 10, 1)
+    for day in range(4):
+        # Each day sees authors day*10 .. day*10+19, so consecutive days overlap by 10
+        for i in range(20):
+            author = day * 10 + i
+            seed_post(f"{day}-{i}", datetime.combine(start + timedelta(days=day), datetime.min.time()) + timedelta(minutes=i),
+                      author_id=f"author{author}", verified=(author % 5 == 0))
+    aggregator = DailyAggregator(session_factory=session_factory)
+    await aggregator.aggregate_date_range(start, start + timedelta(days=3), ["Bitcoin"], ["openai"])
+    
+    result = await aggregator.distinct_authors(start + timedelta(days=1), start + timedelta(days=3),
+                                               "Bitcoin", "openai", window_days=2)
+    
+    assert result["days"] == 3
+    assert result["days_without_sketch"] == 0
+    assert result["unique_authors"] == pytest.approx(40, rel=0.08)  # authors 10..49
+    assert result["verified_authors"] == pytest.approx(8, abs=1)
+    # Rolling 2-day windows: authors day*10-10 .. day*10+19
+    assert [point["unique_authors"] for point in result["rolling"]] == pytest.approx([30, 30, 30], rel=0.08)
+    assert [point["date"] for point in result["rolling"]] == ["2025-10-02", "2025-10-03", "2025-10-04"]
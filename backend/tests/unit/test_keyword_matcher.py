@@ -0,0 +1,69 @@
+"""
+Unit Test: Keyword Matcher
+Tests word-boundary matching, config keywords and the batch API
+"""
+import time
+import pytest
+from backend.src.services.sentiment.keyword_analyzer import KeywordAnalyzer
+from backend.src.services.sentiment.keyword_matcher import KeywordMatcher, _trie_pattern, keyword_result
+from backend.src.services.sentiment.openai_analyzer import OpenAIAnalyzer
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher(
+        ["moon", "bullish", "buy", "up", "🚀", "$mstr", "buy the dip"],
+        ["dump", "sell", "down", "crash"]
+    )
+
+
+def test_trie_pattern_shares_prefixes():
+    """Keywords with a common prefix share one branch"""
+    assert _trie_pattern(["buy", "bull", "bullish"]) == "bu(?:ll(?:ish)?|y)"
+
+
+def test_matches_whole_words_only(matcher):
+    """Substrings of longer words do not count; symbols and emoji need no boundary"""
+    assert matcher.count("Update: countdown to the buyback, supporters selling") == (0, 0)
+    assert matcher.count("MSTR up, BUY!") == (2, 0)
+    assert matcher.count("to the moon🚀🚀 with $MSTR") == (3, 0)
+    # The longest keyword at a position wins: "buy the dip" is one match, not two
+    assert matcher.count("time to buy the dip before the crash") == (1, 1)
+
+
+def test_each_keyword_counts_once_per_text(matcher):
+    """Repeating a keyword does not inflate its side"""
+    assert matcher.count("dump dump dump, moon") == (1, 1)
+    assert matcher.analyze("dump dump dump, moon")["classification"] == "Neutral"
+
+
+def test_batch_matches_single_text(matcher):
+    """analyze_batch gives the same results as analyze, in input order"""
+    texts = ["moon 🚀", "sell, crash, down", "", "nothing here", "buy the dip"]
+    
+    assert matcher.analyze_batch(texts) == [matcher.analyze(text) for text in texts]
+    assert matcher.analyze_batch(texts)[1] == keyword_result(0, 3)
+    assert KeywordMatcher([], []).count_batch(texts) == [(0, 0)] * len(texts)
+
+
+def test_batch_scores_thousands_of_texts_quickly(matcher):
+    """A few thousand tweets are scored within a fraction of a second"""
+    texts = ["Saylor bought more BTC, MSTR to the moon 🚀 https://t.co/x"] * 5000
+    
+    started = time.perf_counter()
+    results = matcher.analyze_batch(texts)
+    
+    assert time.perf_counter() - started < 0.5
+    assert len(results) == 5000
+
+
+@pytest.mark.asyncio
+async def test_analyzers_use_config_keywords():
+    """The keyword analyzer and the OpenAI fallback read sentiment.keyword"""
+    analyzer = KeywordAnalyzer()
+    
+    result = await analyzer.analyze("Opened a long with calls")
+    fallback = OpenAIAnalyzer._fallback_keyword_batch(["Opened a short with puts"])[0]
+    
+    assert (result["classification"], result["algorithm_id"]) == ("Bullish", "keyword")
+    assert (fallback["classification"], fallback["algorithm_id"]) == ("Bearish", "keyword-fallback")
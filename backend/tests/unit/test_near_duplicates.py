@@ -0,0 +1,133 @@
+"""
+Unit Test: Near-Duplicate Index
+Tests MinHash similarity, LSH clustering and sentiment score reuse
+"""
+import pytest
+from datetime import datetime
+from backend.src.jobs.analysis_runner import run_analysis, split_by_cluster
+from backend.src.models.post_signature import PostSignature, LSHBucket
+from backend.src.models.sentiment_reuse import SentimentReuse
+from backend.src.models.sentiment_score import SentimentScore, SentimentClassification
+from backend.src.services.near_duplicates import NearDuplicateIndex
+from backend.src.services.sketches import MinHash
+
+
+SPAM = "🚨 $MSTR is about to EXPLODE 🚀🚀 Saylor just bought another 10,000 BTC, load up before Monday https://t.co/aaa"
+SPAM_COPY = "🚨 MSTR is about to explode 🚀 Saylor just bought another 10,000 BTC!! load up before Monday https://t.co/bbb"
+UNRELATED = "Bitcoin ETF outflows for the third day in a row, miners are selling into strength"
+CREATED_AT = datetime(2025, 10, 4, 9)
+
+
+def test_minhash_estimates_similarity():
+    """Copies differing by cashtags, emoji, case and links score high; unrelated text low"""
+    minhash = MinHash()
+    spam = minhash.signature(SPAM)
+    
+    assert MinHash.similarity(spam, minhash.signature(SPAM_COPY)) >= 0.8
+    assert MinHash.similarity(spam, minhash.signature(UNRELATED)) < 0.2
+    assert MinHash.similarity(spam, MinHash.from_bytes(MinHash.to_bytes(spam))) == 1.0
+    assert set(minhash.band_keys(spam)) & set(minhash.band_keys(minhash.signature(SPAM_COPY)))
+    assert MinHash.is_empty(minhash.signature("🚀🚀 https://t.co/x"))
+
+
+def _index(session_factory, seed_post, texts, scored=()):
+    """Seed posts (scored only if listed in `scored`) and index them in order"""
+    index = NearDuplicateIndex(session_factory=session_factory, threshold=0.8)
+    for post_id, text in texts.items():
+        seed_post(post_id, CREATED_AT, text=text,
+                  classification="Bullish" if post_id in scored else None, score=85.0)
+    assert index.index_missing() == len(texts)
+    return index
+
+
+def test_similar_posts_share_a_representative(session_factory, seed_post):
+    """The first post of a cluster represents later near-duplicates"""
+    index = _index(session_factory, seed_post, {"p1": SPAM, "p2": UNRELATED, "p3": SPAM_COPY})
+    
+    assert index.clusters(["p1", "p2", "p3"]) == {"p1": "p1", "p2": "p2", "p3": "p1"}
+    
+    session = session_factory()
+    assert session.query(LSHBucket).filter_by(post_id="p1").count() == index.minhash.bands
+    assert session.get(PostSignature, "p3").similarity >= 0.8
+    session.close()
+
+
+def test_reuse_copies_score_and_records_audit(session_factory, seed_post):
+    """Unscored near-duplicates get a copy of the analyzed post's score"""
+    index = _index(session_factory, seed_post, {"p1": SPAM, "p2": UNRELATED, "p3": SPAM_COPY}, scored={"p1"})
+    
+    reused = index.reuse_scores(["p2", "p3"], "openai")
+    
+    assert list(reused) == ["p3"]
+    assert reused["p3"].score == 85.0
+    assert reused["p3"].classification.value == "Bullish"
+    
+    session = session_factory()
+    audit = session.query(SentimentReuse).one()
+    source = session.query(SentimentScore).filter_by(post_id="p1").one()
+    assert (audit.post_id, audit.source_post_id, audit.source_score_id) == ("p3", "p1", source.id)
+    assert audit.sentiment_score_id == reused["p3"].id
+    assert audit.similarity >= 0.8
+    session.close()
+    
+    # Already-scored posts and other algorithms are left alone
+    assert index.reuse_scores(["p3"], "openai") == {}
+    assert index.reuse_scores(["p3"], "vader") == {}
+
+
+class FakeSentimentService:
+    """Stores a score for each analyzed post so the index can reuse it"""
+    
+    def __init__(self, session_factory):
+        self.analyzers = {"openai": object()}
+        self.session_factory = session_factory
+        self.analyzed = []
+    
+    async def classify_and_store_batch(self, posts, algorithm):
+        session = self.session_factory()
+        scores = []
+        for post_id, _ in posts:
+            self.analyzed.append(post_id)
+            score = SentimentScore(post_id=post_id, algorithm_id=algorithm, algorithm_version="test",
+                                   classification=SentimentClassification.BULLISH, confidence=0.9, score=90.0, created_at=CREATED_AT)
+            session.add(score)
+            scores.append(score)
+        session.commit()
+        session.close()
+        return scores
+
+
+class FakeBotDetector:
+    def calculate_and_store_bot_likelihood(self, post_id, author_data):
+        return 0.5
+
+
+def test_split_by_cluster_prefers_representative():
+    """One post per cluster is analyzed; unindexed posts always are"""
+    posts = [{"post_id": post_id} for post_id in ("p3", "p1", "p2", "p9")]
+    
+    analyze, deferred = split_by_cluster(posts, {"p1": "p1", "p2": "p2", "p3": "p1"})
+    
+    assert [post["post_id"] for post in analyze] == ["p1", "p2", "p9"]
+    assert [post["post_id"] for post in deferred] == ["p3"]
+
+
+@pytest.mark.asyncio
+async def test_runner_analyzes_one_post_per_cluster(session_factory, seed_post):
+    """Near-duplicates reuse their cluster's fresh score, with bot detection still run"""
+    index = _index(session_factory, seed_post, {"p1": SPAM, "p2": UNRELATED, "p3": SPAM_COPY})
+    service = FakeSentimentService(session_factory)
+    posts = [
+        {"post_id": post_id, "text": "", "author": {"user_id": "a"}}
+        for post_id in ("p1", "p2", "p3")
+    ]
+    
+    summary = await run_analysis(posts, "openai", concurrency=2, sentiment_service=service,
+                                 bot_detector=FakeBotDetector(), near_duplicates=index)
+    
+    assert sorted(service.analyzed) == ["p1", "p2"]
+    assert summary["analyzed"] == 3
+    assert summary["reused"] == 1
+    reused = next(result for result in summary["results"] if result["reused"])
+    assert reused["post_id"] == "p3"
+    assert reused["bot_score"] == 0.5
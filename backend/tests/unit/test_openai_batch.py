@@ -0,0 +1,120 @@
+"""
+Unit Test: OpenAI Batch Analysis
+Tests batch packing, per-item validation and single-call fallback
+"""
+import json
+import pytest
+from backend.src.services.sentiment.openai_analyzer import OpenAIAnalyzer, estimate_tokens
+
+
+def _completion(content):
+    """Chat completion response carrying `content`"""
+    return {"choices": [{"message": {"content": content}}]}
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    """OpenAIAnalyzer with a fake transport recording every request"""
+    analyzer = OpenAIAnalyzer()
+    analyzer.api_key = "test-key"
+    analyzer.openai_config = {**analyzer.openai_config, "batch_size": 4, "batch_max_input_tokens": 100}
+    analyzer.requests = []
+    analyzer.reply = None
+    
+    async def _post_with_retry(request_data, context):
+        analyzer.requests.append(request_data)
+        user_message = request_data["messages"][1]["content"]
+        if user_message.startswith("Analyze these tweets: "):
+            tweets = json.loads(user_message[len("Analyze these tweets: "):])
+            return _completion(analyzer.reply(tweets))
+        text = user_message[len("Analyze this tweet: "):]
+        return _completion(json.dumps({"score": 50 if "?" in text else 90, "reasoning": "single"}))
+    
+    monkeypatch.setattr(analyzer, "_post_with_retry", _post_with_retry)
+    return analyzer
+
+
+def _score_all(tweets):
+    """Batch reply scoring every tweet by its length"""
+    return json.dumps([
+        {"id": tweet["id"], "score": len(tweet["text"]), "reasoning": "batch"} for tweet in tweets
+    ])
+
+
+def test_pack_batches_respects_size_and_token_budget(analyzer):
+    """Batches close at batch_size tweets or the input token budget"""
+    texts = ["short"] * 6 + ["x" * 400, "tail"]
+    
+    batches = analyzer.pack_batches(texts)
+    
+    assert batches == [[0, 1, 2, 3], [4, 5], [6], [7]]
+    assert estimate_tokens("x" * 400) > 100
+
+
+@pytest.mark.asyncio
+async def test_batch_sends_one_request_per_batch(analyzer):
+    """Well-formed replies need one request per batch, in input order"""
+    analyzer.reply = _score_all
+    texts = [f"tweet {'!' * i}" for i in range(10)]
+    
+    results = await analyzer.analyze_batch(texts, post_ids=[f"p{i}" for i in range(10)])
+    
+    assert len(analyzer.requests) == 3
+    assert [result["score"] for result in results] == [len(text) for text in texts]
+    assert all(result["reasoning"] == "batch" for result in results)
+    # The system prompt is sent once per batch, with the batch instructions
+    assert analyzer.requests[0]["messages"][0]["content"].endswith(analyzer.batch_prompt)
+    assert analyzer.requests[0]["max_tokens"] == 4 * analyzer.openai_config["batch_max_tokens_per_item"]
+
+
+@pytest.mark.asyncio
+async def test_only_invalid_items_fall_back_to_single_calls(analyzer):
+    """Missing, malformed, out-of-range and conflicting items are retried alone"""
+    analyzer.reply = lambda tweets: "```json\n" + json.dumps([
+        {"id": "1", "score": 10, "reasoning": "ok"},
+        {"id": "2", "score": "not a number"},
+        {"id": "3", "score": 30},
+        {"id": "3", "score": 70},
+        {"id": "9", "score": 20},
+        # id 4 missing
+    ]) + "\n```"
+    
+    results = await analyzer.analyze_batch(["a", "b?", "c", "d"])
+    
+    assert len(analyzer.requests) == 1 + 3
+    assert [result["score"] for result in results] == [10, 50, 90, 90]
+    assert [result["reasoning"] for result in results] == ["ok", "single", "single", "single"]
+    assert results[0]["classification"] == "Bearish"
+
+
+@pytest.mark.asyncio
+async def test_unparseable_batch_falls_back_per_item(analyzer):
+    """A reply that is not a JSON array retries each tweet individually"""
+    analyzer.reply = lambda tweets: "Sorry, I can't help with that."
+    
+    results = await analyzer.analyze_batch(["a", "b"])
+    
+    assert len(analyzer.requests) == 3
+    assert [result["reasoning"] for result in results] == ["single", "single"]
+
+
+@pytest.mark.asyncio
+async def test_wrapped_array_is_accepted(analyzer):
+    """An object wrapping the result array is unwrapped"""
+    analyzer.reply = lambda tweets: json.dumps({"results": json.loads(_score_all(tweets))})
+    
+    results = await analyzer.analyze_batch(["aa", "bbb"])
+    
+    assert len(analyzer.requests) == 1
+    assert [result["score"] for result in results] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_batch_without_api_key_uses_keyword_fallback(analyzer):
+    """No API key means no requests"""
+    analyzer.api_key = None
+    
+    results = await analyzer.analyze_batch(["bitcoin to the moon", "sell now"])
+    
+    assert analyzer.requests == []
+    assert [result["classification"] for result in results] == ["Bullish", "Bearish"]
@@ -0,0 +1,186 @@
+"""
+Unit Test: Rate Limiter
+Tests token buckets, AIMD adaptation, header parsing and 429 handling
+"""
+import asyncio
+import pytest
+import httpx
+from backend.src.services import rate_limiter as rate_limiter_module
+from backend.src.services.rate_limiter import (
+    AdaptiveRateLimiter,
+    parse_reset,
+    parse_retry_after,
+    rate_limit_metrics,
+    rate_limiter
+)
+from backend.src.services.sentiment import openai_analyzer
+from backend.src.services.sentiment.openai_analyzer import OpenAIAnalyzer
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the limiter sleeps"""
+    
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+    
+    def __call__(self):
+        return self.now
+    
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _limiter(clock, **kwargs):
+    return AdaptiveRateLimiter("test", clock=clock, sleep=clock.sleep, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_requests_are_paced_after_the_burst():
+    """Burst 2 at 2 req/s: two immediate requests, then one every 0.5s"""
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_second=2, burst=2)
+    
+    for _ in range(4):
+        await limiter.acquire()
+    
+    assert clock.now == pytest.approx(1001.0)
+    assert clock.sleeps == pytest.approx([0.5, 0.5])
+    assert limiter.requests == 4
+
+
+@pytest.mark.asyncio
+async def test_tokens_per_minute_bucket_limits_large_requests():
+    """A request needing more tokens than are left waits for the refill"""
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_second=100, tokens_per_minute=600)
+    
+    await limiter.acquire(tokens=500)
+    await limiter.acquire(tokens=200)  # 100 tokens short at 10 tokens/s
+    
+    assert clock.now == pytest.approx(1010.0)
+    
+    # More than a whole minute's budget is capped instead of waiting forever
+    await limiter.acquire(tokens=10_000)
+    assert clock.now == pytest.approx(1070.0)
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_halves_rate_and_blocks_until_retry_after():
+    """AIMD: 429 halves the rate and waits out Retry-After; successes add back"""
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_second=4, increase_per_success=0.5, min_requests_per_second=1.5)
+    
+    assert limiter.on_rate_limited(retry_after=3) == 3
+    assert limiter.requests_per_second == 2
+    assert limiter.metrics()["blocked_for_seconds"] == 3
+    
+    await limiter.acquire()
+    assert clock.now >= 1003.0
+    
+    limiter.on_rate_limited()
+    assert limiter.requests_per_second == 1.5  # floor
+    
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.requests_per_second == 4  # ceiling
+    assert limiter.rate_limited == 2
+
+
+@pytest.mark.asyncio
+async def test_exhausted_rate_limit_headers_block_the_limiter():
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_second=10)
+    
+    limiter.on_success({"x-ratelimit-remaining-requests": "5", "x-ratelimit-reset-requests": "20s"})
+    assert limiter.metrics()["blocked_for_seconds"] == 0
+    
+    limiter.on_success({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "1m30s"})
+    assert limiter.metrics()["blocked_for_seconds"] == 90
+    
+    await limiter.acquire()
+    assert clock.now >= 1090.0
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_counts_waiting_callers():
+    limiter = AdaptiveRateLimiter("test", requests_per_second=50, burst=1)
+    
+    tasks = [asyncio.ensure_future(limiter.acquire()) for _ in range(3)]
+    await asyncio.sleep(0)
+    # The first caller takes the burst token, the other two wait
+    assert limiter.metrics()["queue_depth"] == 2
+    
+    await asyncio.gather(*tasks)
+    assert limiter.metrics()["queue_depth"] == 0
+
+
+def test_header_parsing():
+    assert parse_retry_after("7") == 7
+    assert parse_retry_after("Wed, 21 Oct 2026 07:28:00 GMT", now=1792567660.0) == 20
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+    
+    assert parse_reset("250ms") == pytest.approx(0.25)
+    assert parse_reset("6m0s") == 360
+    assert parse_reset("2.5") == 2.5
+    assert parse_reset("1700000030000", now=1700000000.0) == 30  # epoch milliseconds
+    assert parse_reset("1700000030", now=1700000000.0) == 30  # epoch seconds
+    assert parse_reset("later") is None
+
+
+@pytest.mark.asyncio
+async def test_limiters_are_shared_per_provider_and_model(monkeypatch):
+    monkeypatch.setattr(rate_limiter_module, "rate_limit_settings", lambda provider, model=None: {
+        "requests_per_second": 3 if model else 5
+    })
+    
+    first = rate_limiter("openrouter", "model-a")
+    assert rate_limiter("openrouter", "model-a") is first
+    assert rate_limiter("openrouter", "model-b") is not first
+    assert rate_limiter("openrouter").max_requests_per_second == 5
+    
+    assert {metrics["key"] for metrics in rate_limit_metrics()} == {
+        "openrouter/model-a", "openrouter/model-b", "openrouter"
+    }
+
+
+@pytest.mark.asyncio
+async def test_post_with_retry_backs_off_through_the_limiter_on_429(monkeypatch):
+    """A 429 with Retry-After slows the limiter instead of sleeping blindly"""
+    responses = [
+        httpx.Response(429, headers={"retry-after": "2"}, json={"error": "rate limited"}),
+        httpx.Response(200, json={"choices": []})
+    ]
+    
+    class FakeClient:
+        async def post(self, endpoint, **kwargs):
+            response = responses.pop(0)
+            response.request = httpx.Request("POST", endpoint)
+            return response
+    
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_second=4)
+    sleeps = []
+    
+    async def _sleep(seconds):
+        sleeps.append(seconds)
+    
+    monkeypatch.setattr(openai_analyzer, "get_http_client", lambda name: FakeClient())
+    monkeypatch.setattr(openai_analyzer, "rate_limiter", lambda provider, model=None: limiter)
+    monkeypatch.setattr(openai_analyzer.APILogger, "log_api_call", staticmethod(lambda **kwargs: None))
+    monkeypatch.setattr(openai_analyzer.asyncio, "sleep", _sleep)
+    
+    analyzer = OpenAIAnalyzer()
+    analyzer.api_key = "test-key"
+    result = await analyzer._post_with_retry(
+        {"model": "m", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 10},
+        context={}
+    )
+    
+    assert result == {"choices": []}
+    assert sleeps == []
+    assert clock.sleeps == [2]
+    assert limiter.rate_limited == 1
+    assert limiter.requests_per_second == pytest.approx(2.05)
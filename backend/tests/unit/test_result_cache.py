@@ -0,0 +1,160 @@
+"""
+Unit Test: Sentiment Result Cache
+Tests keys, LRU/TTL eviction, persistence and the cached analyzer wrapper
+"""
+import pytest
+from backend.src.services.sentiment import result_cache
+from backend.src.services.sentiment.base import SentimentAnalyzer
+from backend.src.services.sentiment.openai_analyzer import OpenAIAnalyzer
+from backend.src.services.sentiment.result_cache import CachedAnalyzer, ResultCache, cache_key, normalize_text
+
+
+class CountingAnalyzer(SentimentAnalyzer):
+    """Scores by text length and counts how many texts it analyzed"""
+    
+    def __init__(self):
+        self.analyzed = []
+        self.version = "v1"
+    
+    async def analyze(self, text: str) -> dict:
+        self.analyzed.append(text)
+        if "fallback" in text:
+            return {"classification": "Neutral", "score": 50, "algorithm_id": "keyword-fallback"}
+        return {"classification": "Bullish", "score": len(text), "algorithm_id": self.algorithm_id}
+    
+    @property
+    def algorithm_id(self) -> str:
+        return "counting"
+    
+    @property
+    def algorithm_version(self) -> str:
+        return self.version
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.db"), max_entries=3, ttl_seconds=60)
+    yield cache
+    cache.close()
+
+
+def test_normalize_text_ignores_whitespace_and_links():
+    """Copies that differ only in spacing or shortened links share a key"""
+    assert normalize_text("  MSTR   to the moon\n🚀 https://t.co/abc ") == "MSTR to the moon 🚀 <url>"
+    assert cache_key("buy  now https://t.co/1", {"model": "m"}) == cache_key("buy now https://t.co/2", {"model": "m"})
+    assert cache_key("buy now", {"model": "m"}) != cache_key("buy now", {"model": "other"})
+    assert cache_key("buy now", {"model": "m"}) != cache_key("BUY NOW", {"model": "m"})
+
+
+def test_get_put_counts_hits_and_misses(cache):
+    """Hits return the stored result; misses are counted"""
+    assert cache.get("a") is None
+    cache.put("a", {"score": 80})
+    
+    assert cache.get("a") == {"score": 80}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_least_recently_used_entries_are_evicted(cache, monkeypatch):
+    """Past max_entries the entry used longest ago goes first"""
+    clock = iter(range(100))
+    monkeypatch.setattr(result_cache.time, "time", lambda: next(clock))
+    
+    for key in "abc":
+        cache.put(key, {"key": key})
+    cache.get("a")
+    cache.put("d", {"key": "d"})
+    
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert cache.get("a") == {"key": "a"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(cache, monkeypatch):
+    """Entries older than ttl_seconds are misses and get deleted"""
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    cache.put("a", {"score": 1})
+    cache.put("b", {"score": 2})
+    
+    now[0] += 61
+    
+    assert cache.get("a") is None
+    assert cache.purge_expired() == 1
+    assert len(cache) == 0
+    assert cache.stats()["expired"] == 2
+
+
+def test_cache_persists_across_instances(tmp_path):
+    """Entries survive reopening the file"""
+    path = str(tmp_path / "cache.db")
+    first = ResultCache(path)
+    first.put("a", {"score": 42})
+    first.close()
+    
+    second = ResultCache(path)
+    
+    assert len(second) == 1
+    assert second.get("a") == {"score": 42}
+    second.close()
+
+
+@pytest.mark.asyncio
+async def test_cached_analyzer_analyzes_each_distinct_text_once(cache):
+    """Repeats within a batch and across calls are served from the cache"""
+    inner = CountingAnalyzer()
+    analyzer = CachedAnalyzer(inner, cache)
+    
+    results = await analyzer.analyze_batch(["gm", "gm ", "moon", "gm"])
+    again = await analyzer.analyze("moon")
+    
+    assert inner.analyzed == ["gm", "moon"]
+    assert [result["score"] for result in results] == [2, 2, 4, 2]
+    assert again["score"] == 4
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fallback_results_are_not_cached(cache):
+    """Results from a fallback path are analyzed again next time"""
+    inner = CountingAnalyzer()
+    analyzer = CachedAnalyzer(inner, cache)
+    
+    await analyzer.analyze("fallback please")
+    await analyzer.analyze("fallback please")
+    
+    assert len(inner.analyzed) == 2
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_identity_change_invalidates_entries(cache):
+    """A new algorithm version (or model/prompt) misses earlier entries"""
+    inner = CountingAnalyzer()
+    analyzer = CachedAnalyzer(inner, cache)
+    await analyzer.analyze("moon")
+    
+    inner.version = "v2"
+    await analyzer.analyze("moon")
+    
+    assert len(inner.analyzed) == 2
+
+
+def test_openai_identity_tracks_model_prompt_and_temperature():
+    """Editing system_prompt, model or temperature changes the cache identity"""
+    analyzer = OpenAIAnalyzer()
+    original = analyzer.cache_identity()
+    
+    analyzer.system_prompt += "\nBe stricter."
+    prompt_changed = analyzer.cache_identity()
+    analyzer.openai_config = {**analyzer.openai_config, "model": "other-model", "temperature": 0.0}
+    model_changed = analyzer.cache_identity()
+    
+    assert original["prompt_sha256"] != prompt_changed["prompt_sha256"]
+    assert model_changed["model"] == "other-model"
+    assert model_changed["temperature"] == 0.0
+    assert not analyzer.is_cacheable({"algorithm_id": "openai", "reasoning": "Parse error: bad json"})
+    assert analyzer.is_cacheable({"algorithm_id": "openai", "reasoning": "fine"})
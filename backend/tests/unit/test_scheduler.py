@@ -0,0 +1,36 @@
+"""
+Unit Test: Scheduler
+Tests that the daily aggregation job refreshes aggregates and snapshots over the same window
+"""
+import pytest
+from datetime import date, timedelta
+from backend.src.jobs import scheduler
+
+
+@pytest.mark.asyncio
+async def test_aggregation_job_refreshes_the_lookback_window_once(monkeypatch):
+    calls = []
+    
+    class FakeAggregator:
+        async def refresh_incremental_range(self, start_date, end_date, topics, algorithms):
+            calls.append(("aggregate", start_date, end_date, tuple(topics), tuple(algorithms)))
+            return []
+    
+    class FakeSnapshotBuilder:
+        def build(self, start_date, end_date, directory):
+            calls.append(("snapshot", start_date, end_date))
+            return []
+    
+    settings = {"incremental_lookback_days": 2, "snapshot_directory": "unused"}
+    monkeypatch.setattr(type(scheduler.config), "aggregation_config", property(lambda self: settings))
+    monkeypatch.setattr(scheduler, "DailyAggregator", FakeAggregator)
+    monkeypatch.setattr(scheduler, "FeatureSnapshotBuilder", FakeSnapshotBuilder)
+    
+    await scheduler.daily_aggregation_job()
+    
+    today = date.today()
+    assert calls == [
+        ("aggregate", today - timedelta(days=2), today,
+         ("Bitcoin", "MSTR", "BitcoinTreasuries"), ("openai-gpt4", "vader")),
+        ("snapshot", today - timedelta(days=2), today),
+    ]
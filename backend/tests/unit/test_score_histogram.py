@@ -0,0 +1,137 @@
+"""
+Unit Test: Score Histogram
+Tests quantile accuracy, merging, serialization and daily aggregate histograms
+"""
+import numpy as np
+import pytest
+from datetime import date, datetime, timedelta
+from backend.src.services.daily_aggregator import DailyAggregator
+from backend.src.services.sketches import ScoreHistogram
+
+
+def test_quantiles_within_one_bin_of_exact():
+    """Interpolated quantiles stay within one bin width of the exact values"""
+    scores = np.random.default_rng(7).beta(2, 5, size=5000) * 100
+    histogram = ScoreHistogram().update(scores)
+    qs = [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0]
+    
+    estimates = histogram.quantiles(qs)
+    
+    assert histogram.total == 5000
+    assert estimates == pytest.approx(list(np.quantile(scores, qs)), abs=histogram.width)
+    assert histogram.mean() == pytest.approx(scores.mean(), abs=histogram.width)
+
+
+def test_quantiles_of_constant_and_empty_histograms():
+    """A single repeated score is found at every quantile; empty gives NaN"""
+    histogram = ScoreHistogram().update([50, 50, 50])
+    
+    assert histogram.quantiles([0.0, 0.5, 1.0]) == pytest.approx([50, 50, 51], abs=1)
+    assert all(np.isnan(value) for value in ScoreHistogram().quantiles([0.5]))
+
+
+def test_edge_scores_land_in_edge_bins():
+    """0 and 100 (and out-of-range values) are clipped into the first/last bin"""
+    histogram = ScoreHistogram().update([-5, 0, 100, 130])
+    
+    assert histogram.counts[0] == 2
+    assert histogram.counts[-1] == 2
+
+
+def test_merge_and_union_add_counts():
+    """Merging daily histograms equals one histogram of all scores"""
+    days = [np.linspace(10, 40, 30), np.linspace(60, 90, 50), np.array([55.5])]
+    
+    merged = ScoreHistogram.union(ScoreHistogram().update(day) for day in days)
+    direct = ScoreHistogram().update(np.concatenate(days))
+    
+    assert np.array_equal(merged.counts, direct.counts)
+    with pytest.raises(ValueError):
+        ScoreHistogram(bins=10).merge(ScoreHistogram())
+
+
+def test_serialization_round_trip():
+    """to_bytes/from_bytes preserve bins and counts"""
+    histogram = ScoreHistogram(bins=20).update([1, 2, 3, 99, 42.5])
+    
+    restored = ScoreHistogram.from_bytes(histogram.to_bytes())
+    
+    assert restored.bins == 20
+    assert np.array_equal(restored.counts, histogram.counts)
+    assert histogram.to_dict()["bin_edges"][:3] == [0.0, 5.0, 10.0]
+
+
+def _seed_days(seed_post, days):
+    """Seed a few days of posts with varied scores and bot scores"""
+    scores = []
+    for day in days:
+        start = datetime.combine(day, datetime.min.time())
+        for i in range(40):
+            score = float((i * 37 + day.day * 11) % 101)
+            seed_post(
+                post_id=f"{day.isoformat()}-{i}",
+                created_at=start + timedelta(minutes=i),
+                likes=i,
+                classification=["Bullish", "Bearish", "Neutral"][i % 3],
+                score=score,
+                bot_score=(i % 10) / 10
+            )
+            # Aggregation counts a zero score as neutral 50
+            scores.append((score or 50.0, (i % 10) / 10))
+    return scores
+
+
+@pytest.mark.asyncio
+async def test_all_aggregation_modes_store_the_same_histograms(session_factory, seed_post):
+    """Row, SQL and incremental aggregation produce identical histograms"""
+    day = date(2025, 10, 4)
+    _seed_days(seed_post, [day])
+    aggregator = DailyAggregator(session_factory=session_factory)
+    
+    rows = await aggregator.aggregate_daily_sentiment(day, "Bitcoin", "openai")
+    sql = (await aggregator.aggregate_date_range_sql(day, day, "MSTR", "openai"))[0]
+    incremental = await aggregator.aggregate_daily_sentiment(day, "BitcoinTreasuries", "openai", mode="incremental")
+    
+    for aggregate in (sql, incremental):
+        assert aggregate.score_histogram == rows.score_histogram
+        assert aggregate.human_score_histogram == rows.human_score_histogram
+    
+    assert ScoreHistogram.from_bytes(rows.score_histogram).total == 40
+    assert ScoreHistogram.from_bytes(rows.human_score_histogram).total == rows.human_tweet_count
+
+
+@pytest.mark.asyncio
+async def test_score_distribution_matches_exact_quantiles(session_factory, seed_post):
+    """Range quantiles from stored histograms match the raw scores to 1 point"""
+    days = [date(2025, 10, 2), date(2025, 10, 3), date(2025, 10, 4)]
+    scores = _seed_days(seed_post, days)
+    aggregator = DailyAggregator(session_factory=session_factory)
+    await aggregator.aggregate_date_range(days[0], days[-1], ["Bitcoin"], ["openai"])
+    
+    overall = await aggregator.score_distribution(days[0], days[-1], "Bitcoin", "openai", quantiles=[0.1, 0.5, 0.9])
+    human = await aggregator.score_distribution(days[0], days[-1], "Bitcoin", "openai", quantiles=[0.5], human_only=True)
+    
+    all_scores = [score for score, _ in scores]
+    human_scores = [score for score, bot_score in scores if bot_score < DailyAggregator.HUMAN_BOT_THRESHOLD]
+    
+    assert overall["days"] == 3
+    assert overall["days_without_histogram"] == 0
+    assert overall["total_posts"] == 120
+    assert list(overall["quantiles"]) == ["p10", "p50", "p90"]
+    # Estimates fall inside the bin holding the exact order statistic
+    exact = np.quantile(all_scores, [0.1, 0.5, 0.9], method="inverted_cdf")
+    assert all(0 <= estimate - value <= 1 for estimate, value in zip(overall["quantiles"].values(), exact))
+    assert human["total_posts"] == len(human_scores)
+    assert 0 <= human["quantiles"]["p50"] - np.quantile(human_scores, 0.5, method="inverted_cdf") <= 1
+
+
+@pytest.mark.asyncio
+async def test_score_distribution_without_aggregates(session_factory):
+    """No aggregates means an empty histogram and no quantiles"""
+    aggregator = DailyAggregator(session_factory=session_factory)
+    
+    result = await aggregator.score_distribution(date(2025, 10, 1), date(2025, 10, 4), "Bitcoin", "openai")
+    
+    assert result["total_posts"] == 0
+    assert result["mean"] is None
+    assert set(result["quantiles"].values()) == {None}
@@ -0,0 +1,179 @@
+"""
+Unit Test: Single Flight
+Tests in-flight dedup of concurrent identical classifications
+"""
+import asyncio
+import pytest
+from backend.src.jobs.analysis_runner import run_analysis
+from backend.src.services import sentiment_service as sentiment_service_module
+from backend.src.services.sentiment.base import SentimentAnalyzer
+from backend.src.services.sentiment.cascade_analyzer import CascadeAnalyzer
+from backend.src.services.single_flight import SingleFlight
+from backend.src.services.sentiment_service import SentimentService
+
+
+class SlowAnalyzer(SentimentAnalyzer):
+    """Analyzer that counts calls and answers after a short delay"""
+    
+    algorithm_id = "slow"
+    algorithm_version = "v1"
+    
+    def __init__(self, algorithm_id="slow"):
+        self.algorithm_id = algorithm_id
+        self.calls = []
+        self.batches = []
+    
+    async def analyze(self, text, post_id=None):
+        self.calls.append((text, post_id))
+        await asyncio.sleep(0.01)
+        return {"classification": "Bullish", "confidence": 0.9, "score": 80.0,
+                "algorithm_id": self.algorithm_id, "algorithm_version": self.algorithm_version}
+    
+    async def analyze_batch(self, texts, post_ids=None):
+        self.batches.append(list(texts))
+        await asyncio.sleep(0.01)
+        return [{"classification": "Bullish", "confidence": 0.9, "score": 80.0,
+                 "algorithm_id": self.algorithm_id, "algorithm_version": self.algorithm_version}
+                for _ in texts]
+    
+    def pack_batches(self, texts):
+        return [list(range(start, min(start + 2, len(texts)))) for start in range(0, len(texts), 2)]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(SentimentService, "_create_cache", staticmethod(lambda: None))
+    service = SentimentService()
+    service.analyzers["slow"] = SlowAnalyzer()
+    return service
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_texts_share_one_call(service):
+    analyzer = service.analyzers["slow"]
+    texts = ["Free BTC giveaway, click now"] * 5 + ["Something else"]
+    
+    results = await asyncio.gather(*(
+        service.classify_sentiment(text, "slow", post_id=f"p{index}") for index, text in enumerate(texts)
+    ))
+    
+    assert len(analyzer.calls) == 2
+    assert analyzer.calls[0] == ("Free BTC giveaway, click now", "p0")
+    assert all(result["score"] == 80.0 for result in results)
+    # Callers get separate copies
+    results[0]["score"] = 0
+    assert results[1]["score"] == 80.0
+    assert service.in_flight.stats() == {"started": 2, "shared": 4, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_later_calls_run_again_once_the_first_has_finished(service):
+    analyzer = service.analyzers["slow"]
+    
+    await service.classify_sentiment("same text", "slow")
+    await service.classify_sentiment("same text", "slow")
+    
+    assert len(analyzer.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_analysis_shares_identical_texts_across_units(service, session_factory, monkeypatch):
+    """Concurrent units of a run analyze each distinct text once and still store every post"""
+    monkeypatch.setattr(sentiment_service_module, "get_session", session_factory)
+    analyzer = service.analyzers["slow"]
+    texts = ["Free BTC giveaway, click now"] * 6 + ["Something else", "Free BTC giveaway, click now"]
+    posts = [{"post_id": f"p{index}", "text": text, "author": None} for index, text in enumerate(texts)]
+    
+    summary = await run_analysis(posts, "slow", concurrency=4, sentiment_service=service, bot_detector=object())
+    
+    assert sorted(text for batch in analyzer.batches for text in batch) == [
+        "Free BTC giveaway, click now", "Something else"
+    ]
+    assert summary["analyzed"] == 8
+    assert sorted(result["score"].post_id for result in summary["results"]) == sorted(post["post_id"] for post in posts)
+    assert service.in_flight.stats() == {"started": 2, "shared": 6, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_batch_joins_single_calls_in_flight(service):
+    analyzer = service.analyzers["slow"]
+    
+    single = asyncio.ensure_future(service.classify_sentiment("same text", "slow"))
+    await asyncio.sleep(0)
+    results = await service.classify_batch(["same text", "other text"], "slow")
+    
+    assert analyzer.calls == [("same text", None)]
+    assert analyzer.batches == [["other text"]]
+    assert (await single)["score"] == results[0]["score"] == 80.0
+
+
+@pytest.mark.asyncio
+async def test_weight_dependent_analyzers_do_not_share(service, session_factory):
+    """The cascade routes identical texts differently by engagement weight, so each post is analyzed"""
+    first, escalation = SlowAnalyzer("vader"), SlowAnalyzer("openai")
+    service.analyzers["cascade"] = CascadeAnalyzer(
+        first, escalation, confidence_threshold=0.5, weight_threshold=100.0,
+        weight_lookup=lambda post_ids: {"light": 1.0, "viral": 250.0},
+        session_factory=session_factory
+    )
+    
+    light, viral = await asyncio.gather(
+        service.classify_batch(["same text"], "cascade", post_ids=["light"]),
+        service.classify_batch(["same text"], "cascade", post_ids=["viral"])
+    )
+    
+    assert light[0]["algorithm_version"] == "vader:v1"
+    assert viral[0]["algorithm_version"] == "openai:v1"
+    assert service.in_flight.stats()["started"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_reach_every_key():
+    flight = SingleFlight()
+    
+    async def failing(indexes):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+    
+    results = await asyncio.gather(
+        flight.do_batch(["a", "b", "a"], failing),
+        flight.do("b", failing),
+        return_exceptions=True
+    )
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.stats() == {"started": 2, "shared": 2, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiting_caller():
+    flight = SingleFlight()
+    calls = []
+    
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+    
+    results = await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+    
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+    
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+    
+    first = asyncio.ensure_future(flight.do("key", work))
+    second = asyncio.ensure_future(flight.do("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+    
+    assert await second == "done"
+    assert first.cancelled()
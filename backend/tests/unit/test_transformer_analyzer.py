@@ -0,0 +1,108 @@
+"""
+Unit Test: Transformer Analyzer
+Tests micro-batching, and the local model path with a tiny random model
+"""
+import asyncio
+import threading
+import pytest
+from backend.src.services.sentiment.micro_batcher import MicroBatcher
+
+
+class RecordingBatch:
+    """Batch function that records batch sizes and fails on 'boom'"""
+    
+    def __init__(self):
+        self.sizes = []
+        self.threads = set()
+    
+    def __call__(self, items):
+        self.sizes.append(len(items))
+        self.threads.add(threading.current_thread().name)
+        if "boom" in items:
+            raise RuntimeError("model exploded")
+        return [item.upper() for item in items]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_grouped_up_to_max_batch_size():
+    """Ten concurrent calls become batches of 4, 4 and 2"""
+    process = RecordingBatch()
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=50)
+    
+    results = await asyncio.gather(*(batcher.submit(f"t{i}") for i in range(10)))
+    
+    assert results == [f"T{i}" for i in range(10)]
+    assert sorted(process.sizes) == [2, 4, 4]
+    assert (batcher.batches, batcher.items) == (3, 10)
+    assert threading.current_thread().name not in process.threads
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_sent_after_max_wait():
+    """A lone call is not held longer than max_wait_ms"""
+    process = RecordingBatch()
+    batcher = MicroBatcher(process, max_batch_size=64, max_wait_ms=5)
+    
+    result = await asyncio.wait_for(batcher.submit("solo"), timeout=1)
+    staggered = await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+    
+    assert result == "SOLO"
+    assert staggered == ["A", "B"]
+    assert process.sizes == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller_in_the_batch():
+    """An exception fails that batch only"""
+    batcher = MicroBatcher(RecordingBatch(), max_batch_size=2, max_wait_ms=5)
+    
+    results = await asyncio.gather(
+        batcher.submit("ok"), batcher.submit("boom"), batcher.submit("fine"),
+        return_exceptions=True
+    )
+    
+    assert isinstance(results[0], RuntimeError) and isinstance(results[1], RuntimeError)
+    assert results[2] == "FINE"
+
+
+def _tiny_model(path):
+    """Save a randomly initialized 3-label BERT with a tiny vocabulary"""
+    transformers = pytest.importorskip("transformers")
+    pytest.importorskip("torch")
+    
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "bitcoin", "moon", "crash", "to", "the"]
+    (path / "vocab.txt").write_text("\n".join(vocab))
+    transformers.BertTokenizer(str(path / "vocab.txt")).save_pretrained(str(path))
+    model_config = transformers.BertConfig(
+        vocab_size=len(vocab), hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+        intermediate_size=32, num_labels=3,
+        id2label={0: "negative", 1: "neutral", 2: "positive"},
+        label2id={"negative": 0, "neutral": 1, "positive": 2}
+    )
+    transformers.BertForSequenceClassification(model_config).save_pretrained(str(path))
+    return str(path)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("quantize_int8", [False, True])
+async def test_local_model_scores_micro_batches(tmp_path, quantize_int8):
+    """Concurrent analyze() calls share padded batches and return valid results"""
+    from backend.src.services.sentiment.transformer_analyzer import TransformerAnalyzer
+    
+    analyzer = TransformerAnalyzer(
+        _tiny_model(tmp_path), max_batch_size=4, max_wait_ms=20,
+        quantize_int8=quantize_int8, num_threads=1
+    )
+    texts = ["bitcoin to the moon", "crash", "the bitcoin crash to the moon", "moon", "bitcoin"]
+    
+    results = await asyncio.gather(*(analyzer.analyze(text) for text in texts))
+    batch = await analyzer.analyze_batch(texts)
+    
+    assert analyzer.batcher.batches == 4
+    for result in results:
+        assert result["classification"] in ("Bullish", "Bearish", "Neutral")
+        assert 0 <= result["score"] <= 100
+        assert 1 / 3 <= result["confidence"] <= 1
+        assert result["algorithm_id"] == "transformer"
+    assert [result["classification"] for result in batch] == [result["classification"] for result in results]
+    assert analyzer.algorithm_version.endswith("-int8") == quantize_int8
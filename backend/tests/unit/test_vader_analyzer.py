@@ -0,0 +1,96 @@
+"""
+Unit Test: VADER Analyzer
+Tests the crypto lexicon, score mapping, batch paths and the VADER backfill
+"""
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from backend.src.storage.database import Base
+from backend.src.models.sentiment_score import SentimentScore
+from backend.src.jobs.vader_backfill import run_vader_backfill
+from backend.src.services.sentiment.vader_analyzer import VADERAnalyzer, load_intensity_analyzer, vader_result
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    """File-backed database so worker processes can open their own engines"""
+    return f"sqlite:///{tmp_path / 'vader.db'}"
+
+
+@pytest.fixture
+def db_engine(db_url):
+    """Overrides the in-memory engine from conftest"""
+    engine = create_engine(db_url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_lexicon_is_loaded_once_with_crypto_terms():
+    """Crypto slang and emoji carry valence; the analyzer is shared per process"""
+    analyzer = load_intensity_analyzer()
+    
+    assert load_intensity_analyzer() is analyzer
+    assert analyzer.polarity_scores("HODL")["compound"] > 0
+    assert analyzer.polarity_scores("rekt")["compound"] < 0
+    assert analyzer.polarity_scores("liquidation")["compound"] < 0
+    assert analyzer.polarity_scores("MSTR 🚀")["compound"] > 0
+
+
+def test_compound_maps_to_score_and_classification():
+    """-1..1 maps onto 0..100; thresholds pick the class"""
+    assert vader_result(1.0)["score"] == 100.0
+    assert vader_result(-1.0)["score"] == 0.0
+    assert vader_result(0.0) == {"classification": "Neutral", "confidence": 0.5, "score": 50.0, "compound": 0.0}
+    assert vader_result(0.04)["classification"] == "Neutral"
+    assert vader_result(-0.6)["classification"] == "Bearish"
+    assert vader_result(0.04, threshold_positive=0.02)["classification"] == "Bullish"
+
+
+@pytest.mark.asyncio
+async def test_analyze_and_batch_agree():
+    """Single and batch paths give the same results in input order"""
+    analyzer = VADERAnalyzer()
+    texts = ["Got rekt in the liquidation cascade", "HODL, MSTR to the moon 🚀🚀", "Saylor posted a chart"]
+    
+    batch = await analyzer.analyze_batch(texts)
+    
+    assert batch == [await analyzer.analyze(text) for text in texts]
+    assert [result["classification"] for result in batch] == ["Bearish", "Bullish", "Neutral"]
+    assert all(result["algorithm_id"] == "vader" for result in batch)
+
+
+@pytest.mark.asyncio
+async def test_score_in_pool_matches_in_process():
+    """Chunks scored in worker processes come back in input order"""
+    analyzer = VADERAnalyzer()
+    texts = [f"post {i} {'rekt' if i % 3 else 'wagmi'}" for i in range(25)]
+    
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        pooled = analyzer.score_in_pool(texts, executor=executor, chunk_size=4)
+    
+    assert pooled == await analyzer.analyze_batch(texts)
+    assert analyzer.score_in_pool([]) == []
+
+
+def test_vader_backfill_scores_unscored_posts_and_resumes(db_url, session_factory, seed_post):
+    """Pages are scored across the pool; posts with a VADER score are skipped"""
+    for i in range(7):
+        seed_post(f"p{i}", datetime(2025, 1, 1) + timedelta(minutes=i), classification=None,
+                  text="HODL 🚀" if i % 2 else "got rekt")
+    seed_post("scored", datetime(2025, 1, 2), classification="Neutral", algorithm="vader")
+    
+    summary = run_vader_backfill(database_url=db_url, workers=2, page_size=3, chunk_size=2)
+    
+    assert (summary["scored_posts"], summary["pages"]) == (7, 3)
+    session = session_factory()
+    try:
+        scores = {score.post_id: score for score in session.query(SentimentScore).filter_by(algorithm_id="vader")}
+    finally:
+        session.close()
+    assert len(scores) == 8
+    assert scores["p1"].score > 50 > scores["p0"].score
+    assert scores["scored"].algorithm_version == "test"
+    
+    assert run_vader_backfill(database_url=db_url, workers=1)["scored_posts"] == 0
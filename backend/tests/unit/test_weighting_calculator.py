@@ -0,0 +1,86 @@
+"""
+Unit Test: Weighting Calculator
+Tests that the vectorized batch API agrees with the scalar path
+"""
+import random
+import numpy as np
+import pytest
+from backend.src.models.weighting_config import WeightingConfig
+from backend.src.services.weighting_calculator import WeightingCalculator, SENTIMENT_CODES
+
+
+@pytest.fixture
+def random_posts():
+    """Random post dicts in the shape calculate_weighted_sentiment expects"""
+    rng = random.Random(42)
+    return [
+        {
+            "sentiment": rng.choice(["Bullish", "Bearish", "Neutral"]),
+            "engagement": {
+                "like_count": rng.randint(0, 5000),
+                "retweet_count": rng.randint(0, 1000),
+                "reply_count": rng.randint(0, 200),
+                "quote_count": rng.randint(0, 50)
+            },
+            "author": {
+                "followers_count": rng.randint(0, 2_000_000),
+                "verified": rng.random() < 0.2
+            },
+            "bot_score": rng.random()
+        }
+        for _ in range(2000)
+    ]
+
+
+def _columns(posts):
+    """Convert post dicts to the batch API's columnar arguments"""
+    return dict(
+        likes=[p["engagement"]["like_count"] for p in posts],
+        retweets=[p["engagement"]["retweet_count"] for p in posts],
+        replies=[p["engagement"]["reply_count"] for p in posts],
+        quotes=[p["engagement"]["quote_count"] for p in posts],
+        followers=[p["author"]["followers_count"] for p in posts],
+        verified=[p["author"]["verified"] for p in posts],
+        bot_score=[p["bot_score"] for p in posts],
+    )
+
+
+@pytest.mark.parametrize("config", [None, WeightingConfig.get_default()])
+def test_batch_matches_scalar(random_posts, config):
+    """Batch weights and sums should be bit-identical to the scalar path"""
+    calculator = WeightingCalculator(config)
+    columns = _columns(random_posts)
+    
+    weights = calculator.calculate_weights_batch(**columns)
+    expected_weights = [calculator.calculate_weight(p) for p in random_posts]
+    assert weights.tolist() == expected_weights
+    
+    result = calculator.calculate_weighted_sentiment_batch(
+        **columns,
+        sentiment=[SENTIMENT_CODES[p["sentiment"]] for p in random_posts]
+    )
+    expected = calculator.calculate_weighted_sentiment(random_posts)
+    
+    assert result["dominant_sentiment"] == expected["dominant_sentiment"]
+    for key in ("weighted_score", "bullish_weight", "bearish_weight", "total_weight"):
+        assert result[key] == expected[key]
+
+
+def test_batch_handles_empty_input():
+    """Empty columns behave like an empty post list"""
+    calculator = WeightingCalculator()
+    
+    result = calculator.calculate_weighted_sentiment_batch([], [], [], [], [], [], [], [])
+    
+    assert result == calculator.calculate_weighted_sentiment([])
+
+
+def test_batch_handles_all_zero_weight():
+    """Posts that are all bots (zero weight) fall back to Neutral"""
+    calculator = WeightingCalculator()
+    
+    result = calculator.calculate_weighted_sentiment_batch(
+        [10], [1], [0], [0], [100], [False], [0.9], [SENTIMENT_CODES["Bullish"]]
+    )
+    
+    assert result == {"weighted_score": 0.0, "dominant_sentiment": "Neutral"}
@@ -6,6 +6,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import asyncio
 from datetime import datetime, timedelta
 from sqlalchemy import func
 from backend.src.storage.database import get_session
@@ -15,6 +16,7 @@ from backend.src.models.engagement import Engagement
 from backend.src.models.sentiment_score import SentimentScore
 from backend.src.models.bot_signal import BotSignal
 from backend.src.models.daily_aggregate import DailyAggregate
+from backend.src.services.daily_aggregator import DailyAggregator
 
 # Page config
 st.set_page_config(
@@ -208,6 +210,18 @@ def load_data(days=90, algorithm="openai"):
         session.close()
 
 
+@st.cache_data(ttl=60)
+def load_score_distribution(days=90, algorithm="openai", human_only=False):
+    """Load merged score histogram and quantiles from daily aggregates"""
+    end_date = datetime.utcnow().date()
+    start_date = end_date - timedelta(days=days)
+    
+    return asyncio.run(DailyAggregator().score_distribution(
+        start_date, end_date, "Bitcoin", algorithm,
+        quantiles=(0.1, 0.5, 0.9), human_only=human_only
+    ))
+
+
 def main():
     # Header with professional styling
     st.markdown("""
@@ -624,6 +638,63 @@ def main():
     
     st.markdown("---")
     
+    # Score Distribution (merged from per-day histograms)
+    st.header("📊 Score Distribution")
+    
+    distribution_human_only = st.checkbox(
+        "👤 Human posts only",
+        value=False,
+        help="Only include posts below the bot threshold"
+    )
+    distribution = load_score_distribution(days=90, algorithm=algorithm, human_only=distribution_human_only)
+    
+    if distribution["total_posts"] == 0:
+        st.info("No score histograms yet. Re-run aggregation (e.g. `python utils/run_backfill.py`) to build them.")
+    else:
+        quantiles = distribution["quantiles"]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("P10", f"{quantiles['p10']:.0f}")
+        col2.metric("Median", f"{quantiles['p50']:.0f}")
+        col3.metric("P90", f"{quantiles['p90']:.0f}")
+        col4.metric("Posts", f"{distribution['total_posts']:,}")
+        
+        histogram = distribution["histogram"]
+        edges = histogram["bin_edges"]
+        fig_dist = go.Figure(go.Bar(
+            x=[(low + high) / 2 for low, high in zip(edges[:-1], edges[1:])],
+            y=histogram["counts"],
+            width=[high - low for low, high in zip(edges[:-1], edges[1:])],
+            marker=dict(color='#3498db'),
+            hovertemplate='<b>Score %{x:.0f}</b><br>Posts: %{y}<extra></extra>'
+        ))
+        
+        for label, value in (("P10", quantiles['p10']), ("Median", quantiles['p50']), ("P90", quantiles['p90'])):
+            fig_dist.add_vline(x=value, line=dict(color='#e0e0e0', width=1.5, dash='dot'),
+                               annotation_text=label, annotation_font_color='#e0e0e0')
+        
+        fig_dist.update_layout(
+            title=dict(
+                text="Fear & Greed Score Distribution (Last 90 Days)",
+                font=dict(size=24, color='#e0e0e0', family='Arial Black')
+            ),
+            xaxis_title="Fear & Greed Index",
+            yaxis_title="Posts",
+            xaxis=dict(range=[0, 100], gridcolor='rgba(255, 255, 255, 0.1)'),
+            yaxis=dict(gridcolor='rgba(255, 255, 255, 0.1)'),
+            bargap=0,
+            height=400,
+            plot_bgcolor='rgba(0, 0, 0, 0.2)',
+            paper_bgcolor='rgba(0, 0, 0, 0)',
+            font=dict(color='#e0e0e0')
+        )
+        
+        st.plotly_chart(fig_dist, use_container_width=True)
+        
+        if distribution["days_without_histogram"]:
+            st.caption(f"{distribution['days_without_histogram']} days were aggregated before histograms were stored and are not included.")
+    
+    st.markdown("---")
+    
     # Algorithm Comparison View
     if comparison_mode:
         st.header("🔬 Algorithm Comparison")
@@ -6,9 +6,13 @@ import asyncio
 from backend.src.storage.database import get_session
 from backend.src.models.post import Post
 from backend.src.models.author import Author
-from backend.src.models.engagement import Engagement
 from backend.src.services.sentiment_service import SentimentService
 from backend.src.services.bot_detector import BotDetector
+from backend.src.services.near_duplicates import NearDuplicateIndex
+from backend.src.jobs.analysis_runner import prioritize, run_analysis, work_units
+from backend.src.services.http_client import http_clients
+from backend.src.services.rate_limiter import rate_limit_metrics
+from backend.src.services.circuit_breaker import circuit_breaker_stats
 from backend.src.config import config
 
 
@@ -26,22 +30,22 @@ async def main():
     print(f"Using bot detection algorithm: {bot_algo}")
     print("")
     
-    # Get all posts and filter by algorithm
-    from backend.src.models.sentiment_score import SentimentScore
-    from backend.src.models.bot_signal import BotSignal
+    # Index posts stored before near-duplicate detection (or with it disabled)
+    near_duplicates = None
+    if config.analysis_config.get('near_duplicates', {}).get('enabled', True):
+        near_duplicates = NearDuplicateIndex()
+        indexed = near_duplicates.index_missing()
+        if indexed:
+            print(f"Indexed {indexed} posts for near-duplicate detection")
+            print("")
     
-    all_posts = session.query(Post).all()
-    posts_to_analyze = []
+    # Get all posts without a score from this algorithm (one query)
+    from backend.src.models.sentiment_score import SentimentScore
     
-    for post in all_posts:
-        # Check if this post already has sentiment from this algorithm
-        existing_sentiment = session.query(SentimentScore).filter_by(
-            post_id=post.post_id,
-            algorithm_id=sentiment_algo
-        ).first()
-        
-        if not existing_sentiment:
-            posts_to_analyze.append(post)
+    scored_post_ids = session.query(SentimentScore.post_id).filter(
+        SentimentScore.algorithm_id == sentiment_algo
+    )
+    posts_to_analyze = session.query(Post).filter(~Post.post_id.in_(scored_post_ids)).all()
     
     if not posts_to_analyze:
         print("⚠️  No posts need analysis with this algorithm")
@@ -51,50 +55,117 @@ async def main():
     print(f"Found {len(posts_to_analyze)} posts to analyze")
     print("")
     
-    # Safety limit
+    sentiment_service = SentimentService()
+    bot_detector = BotDetector()
+    
+    # Load authors for bot detection (and prioritization) in one query
+    author_ids = {post.author_id for post in posts_to_analyze}
+    authors = {
+        author.user_id: {
+            "user_id": author.user_id,
+            "followers_count": author.followers_count,
+            "following_count": author.following_count,
+            "verified": author.verified,
+            "created_at": author.created_at,
+            "profile_description": author.profile_description
+        }
+        for author in session.query(Author).filter(Author.user_id.in_(author_ids))
+    }
+    posts = [
+        {"post_id": post.post_id, "text": post.text, "author": authors.get(post.author_id)}
+        for post in posts_to_analyze
+    ]
+    
+    # Highest expected weight first, so a capped run scores the posts that move the index
+    priority_config = config.analysis_config.get('priority', {})
+    if priority_config.get('enabled', True):
+        posts = prioritize(posts, bot_detector=bot_detector)
+    
+    # Safety limit (batched analyzers send several posts per API call)
     MAX_API_CALLS = config.sentiment_openai_config.get('max_api_calls_per_run', 10)
-    if len(posts_to_analyze) > MAX_API_CALLS:
-        print(f"⚠️  Limiting to {MAX_API_CALLS} posts (safety limit)")
-        posts_to_analyze = posts_to_analyze[:MAX_API_CALLS]
+    units = work_units(sentiment_service.analyzers.get(sentiment_algo), [post["text"] for post in posts])
+    leftovers = []
+    if len(units) > MAX_API_CALLS:
+        limit = sum(len(unit) for unit in units[:MAX_API_CALLS])
+        posts, leftovers = posts[:limit], posts[limit:]
+        print(f"⚠️  Limiting to {MAX_API_CALLS} API calls ({len(posts)} posts, safety limit)")
         print("")
     
-    sentiment_service = SentimentService()
-    bot_detector = BotDetector()
+    # Sentiment analysis (using config) and bot detection, run concurrently
+    summary = await run_analysis(
+        posts,
+        algorithm=sentiment_algo,
+        sentiment_service=sentiment_service,
+        bot_detector=bot_detector,
+        near_duplicates=near_duplicates
+    )
+    print("")
     
-    for i, post in enumerate(posts_to_analyze, 1):
-        print(f"[{i}/{len(posts_to_analyze)}] Analyzing post {post.post_id[:10]}...")
-        
-        # Sentiment analysis (using config)
-        score = await sentiment_service.classify_and_store(
-            post_id=post.post_id,
-            text=post.text,
-            algorithm=sentiment_algo
-        )
+    for result in summary["results"]:
+        score = result["score"]
         
-        # Bot detection
-        author = session.query(Author).filter_by(user_id=post.author_id).first()
-        if author:
-            bot_score = bot_detector.calculate_and_store_bot_likelihood(
-                post_id=post.post_id,
-                author_data={
-                    "user_id": author.user_id,
-                    "followers_count": author.followers_count,
-                    "following_count": author.following_count,
-                    "verified": author.verified,
-                    "created_at": author.created_at,
-                    "profile_description": author.profile_description
-                }
+        # Display sentiment with new 0-100 score
+        if score.score:
+            score_label = "Fear" if score.score < 40 else "Neutral" if score.score < 60 else "Greed"
+            sentiment = f"{score.score:.0f}/100 ({score_label}) - {score.classification.value}"
+        else:
+            sentiment = f"{score.classification.value} ({score.confidence:.2f})"
+        bot = f"{result['bot_score']:.2f}" if result["bot_score"] is not None else "n/a"
+        reused = "  (near-duplicate)" if result["reused"] else ""
+        print(f"   {result['post_id'][:10]}  Sentiment: {sentiment}  Bot score: {bot}{reused}")
+    
+    for failure in summary["failures"]:
+        print(f"   ✗ {failure['post_id'][:10]} ({failure['stage']}): {failure['error']}")
+    
+    print("")
+    print(f"Analyzed {summary['analyzed']}/{summary['posts']} posts in {summary['elapsed_seconds']:.1f}s "
+          f"({summary['posts_per_second']:.1f} posts/s), {len(summary['failures'])} failures, "
+          f"{summary['reused']} reused from near-duplicates")
+    if sentiment_service.cache is not None:
+        stats = sentiment_service.cache.stats()
+        print(f"Result cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries")
+    cascade = sentiment_service.analyzers.get(sentiment_algo)
+    if sentiment_algo == "cascade" and cascade is not None:
+        stats = cascade.stats()
+        print(f"Cascade: {stats['escalated']}/{stats['routed']} posts escalated "
+              f"({stats['escalation_rate']:.0%}), reasons: {stats['reasons']}")
+    
+    # Posts over the budget get a cheap local score now; they stay unscored
+    # for the main algorithm, so later runs still pick them up
+    leftover_algo = priority_config.get('leftover_algorithm')
+    if leftovers and leftover_algo in sentiment_service.analyzers and leftover_algo != sentiment_algo:
+        leftover_scored = {
+            post_id for (post_id,) in session.query(SentimentScore.post_id).filter(
+                SentimentScore.algorithm_id == leftover_algo
             )
-            
-            # Display sentiment with new 0-100 score
-            if score.score:
-                score_label = "Fear" if score.score < 40 else "Neutral" if score.score < 60 else "Greed"
-                print(f"   Sentiment: {score.score:.0f}/100 ({score_label}) - {score.classification.value}")
-            else:
-                print(f"   Sentiment: {score.classification.value} ({score.confidence:.2f})")
-            print(f"   Bot score: {bot_score:.2f}")
-        
-        print("")
+        }
+        leftovers = [post for post in leftovers if post["post_id"] not in leftover_scored]
+        if leftovers:
+            print(f"Scoring {len(leftovers)} lower-priority posts with '{leftover_algo}'")
+            leftover_summary = await run_analysis(
+                leftovers,
+                algorithm=leftover_algo,
+                sentiment_service=sentiment_service,
+                bot_detector=bot_detector,
+                near_duplicates=near_duplicates
+            )
+            print(f"Scored {leftover_summary['analyzed']}/{leftover_summary['posts']} lower-priority posts "
+                  f"with '{leftover_algo}', {len(leftover_summary['failures'])} failures")
+    
+    for limiter in rate_limit_metrics():
+        print(f"Rate limit {limiter['key']}: {limiter['requests_per_second']}/{limiter['max_requests_per_second']} req/s, "
+              f"{limiter['requests']} requests, {limiter['rate_limited']} rate limited, "
+              f"queue depth {limiter['queue_depth']}")
+    hedger = getattr(sentiment_service.analyzers.get("openai"), "hedger", None)
+    if hedger is not None and hedger.calls:
+        stats = hedger.stats()
+        print(f"Hedging: {stats['hedges']}/{stats['calls']} calls hedged ({stats['hedge_wins']} won by the duplicate), "
+              f"p{hedger.percentile:g} delay {stats['hedge_delay_ms']}ms")
+    for breaker in circuit_breaker_stats():
+        print(f"Circuit {breaker['name']}: {breaker['state']}, {breaker['rejected']} calls short-circuited, "
+              f"{breaker['transitions']} transitions")
+    print("")
     
     session.close()
     
@@ -105,5 +176,10 @@ async def main():
     print("   2. Check: curl \"http://localhost:8000/sentiment/trends?topic=Bitcoin&days=1\"")
 
 
+async def run():
+    async with http_clients():
+        await main()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run())
@@ -0,0 +1,42 @@
+"""
+Build Feature Snapshots
+Exports per-day post features for what-if reweighting (POST /sentiment/what-if)
+
+Usage:
+    python utils/build_feature_snapshots.py [START_DATE END_DATE]
+"""
+import sys
+from datetime import datetime
+from sqlalchemy import func
+from backend.src.config import config
+from backend.src.storage.database import get_session
+from backend.src.models.post import Post
+from backend.src.services.feature_snapshot import FeatureSnapshotBuilder
+
+
+def main():
+    print("📦 Building feature snapshots...")
+    print("")
+    
+    if len(sys.argv) > 2:
+        start_date = datetime.strptime(sys.argv[1], "%Y-%m-%d").date()
+        end_date = datetime.strptime(sys.argv[2], "%Y-%m-%d").date()
+    else:
+        # Default to every day with posts
+        session = get_session()
+        first_post, last_post = session.query(func.min(Post.created_at), func.max(Post.created_at)).one()
+        session.close()
+        
+        if first_post is None:
+            print("⚠️  No posts found in database")
+            return
+        start_date, end_date = first_post.date(), last_post.date()
+    
+    directory = config.aggregation_config.get("snapshot_directory", "data/snapshots")
+    paths = FeatureSnapshotBuilder().build(start_date, end_date, directory)
+    
+    print(f"✅ Wrote {len(paths)} snapshots ({start_date} to {end_date}) to {directory}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,31 @@
 """
 Bulk Aggregator
 Aggregates sentiment for all days with posts
+
+Usage:
+    python utils/run_aggregator_bulk.py [--sql]
 """
+import argparse
 import asyncio
-from datetime import date, timedelta
 from sqlalchemy import func
 from backend.src.services.daily_aggregator import DailyAggregator
 from backend.src.storage.database import get_session
 from backend.src.models.post import Post
 
 
-async def main():
+async def aggregate_range(aggregator, start_date, end_date, sql=False):
+    """Aggregate Bitcoin / openai-gpt4 for a date range, in Python or with SQL aggregates"""
+    if sql:
+        return await aggregator.aggregate_date_range_sql(start_date, end_date, "Bitcoin", "openai-gpt4")
+    return await aggregator.aggregate_date_range(
+        start_date=start_date,
+        end_date=end_date,
+        topics=["Bitcoin"],
+        algorithms=["openai-gpt4"]
+    )
+
+
+async def main(sql=False):
     print("🔄 Running bulk aggregator...")
     print("")
     
@@ -42,24 +57,36 @@ async def main():
     print("")
     
     aggregator = DailyAggregator()
-    success_count = 0
+    aggregates_by_date = {}
+    errors = {}
     
+    # Single pass over every post in the range (one query, one bulk insert)
+    try:
+        for aggregate in await aggregate_range(aggregator, dates[0], dates[-1], sql):
+            aggregates_by_date[aggregate.date] = aggregate
+    except Exception as e:
+        # Nothing was written; redo it day by day so one bad day doesn't sink the rest
+        print(f"⚠️  Single-pass aggregation failed ({e}), retrying day by day")
+        print("")
+        for target_date in dates:
+            try:
+                for aggregate in await aggregate_range(aggregator, target_date, target_date, sql):
+                    aggregates_by_date[aggregate.date] = aggregate
+            except Exception as day_error:
+                errors[target_date] = day_error
+    
+    success_count = len(aggregates_by_date)
+    
+    sentiment_emoji = {"Bullish": "🟢", "Bearish": "🔴", "Neutral": "🟡"}
     for i, target_date in enumerate(dates, 1):
-        try:
-            aggregate = await aggregator.aggregate_daily_sentiment(
-                target_date=target_date,
-                topic="Bitcoin",
-                algorithm="openai-gpt4"
-            )
-            
-            if aggregate:
-                success_count += 1
-                sentiment_emoji = {"Bullish": "🟢", "Bearish": "🔴", "Neutral": "🟡"}
-                emoji = sentiment_emoji.get(aggregate.dominant_sentiment.value, "⚪")
-                print(f"[{i}/{len(dates)}] {target_date}: {emoji} {aggregate.dominant_sentiment.value} (score: {aggregate.weighted_score:.3f}, posts: {aggregate.total_posts})")
+        if target_date in errors:
+            print(f"[{i}/{len(dates)}] {target_date}: ❌ Error - {errors[target_date]}")
+            continue
         
-        except Exception as e:
-            print(f"[{i}/{len(dates)}] {target_date}: ❌ Error - {e}")
+        aggregate = aggregates_by_date.get(target_date)
+        if aggregate:
+            emoji = sentiment_emoji.get(aggregate.dominant_sentiment.value, "⚪")
+            print(f"[{i}/{len(dates)}] {target_date}: {emoji} {aggregate.dominant_sentiment.value} (score: {aggregate.weighted_score:.3f}, posts: {aggregate.total_posts})")
     
     print("")
     print(f"✅ Aggregated {success_count}/{len(dates)} days successfully!")
@@ -69,4 +96,12 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Aggregate sentiment for all days with posts")
+    parser.add_argument(
+        "--sql",
+        action="store_true",
+        help="Compute totals and weights with SQL aggregates (fastest on PostgreSQL)"
+    )
+    args = parser.parse_args()
+    
+    asyncio.run(main(sql=args.sql))
@@ -0,0 +1,60 @@
+"""
+Run Backfill
+Re-aggregates a date range in parallel (e.g. after a weighting or bot-detector change)
+
+Usage:
+    python utils/run_backfill.py 2025-01-01 2025-12-31 [--workers 8] [--days-per-shard 7] [--weighting-version v2.0]
+"""
+import argparse
+import os
+from datetime import datetime
+from backend.src.jobs.backfill import (
+    run_backfill, DEFAULT_TOPICS, DEFAULT_ALGORITHMS, DEFAULT_STATE_FILE
+)
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-aggregate daily sentiment for a date range")
+    parser.add_argument("start_date", type=_parse_date, help="First date (YYYY-MM-DD)")
+    parser.add_argument("end_date", type=_parse_date, help="Last date (YYYY-MM-DD)")
+    parser.add_argument("--topics", nargs="+", default=DEFAULT_TOPICS)
+    parser.add_argument("--algorithms", nargs="+", default=DEFAULT_ALGORITHMS)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--days-per-shard", type=int, default=7)
+    parser.add_argument("--state-file", default=DEFAULT_STATE_FILE, help="Progress file used to resume")
+    parser.add_argument("--restart", action="store_true", help="Ignore previous progress")
+    parser.add_argument("--weighting-version", default=None,
+                        help="Stored weighting config to use (default: built-in default config)")
+    args = parser.parse_args()
+    
+    print("🔄 Running backfill...")
+    print("")
+    
+    if args.restart and args.state_file:
+        if os.path.exists(args.state_file):
+            os.remove(args.state_file)
+    
+    summary = run_backfill(
+        start_date=args.start_date,
+        end_date=args.end_date,
+        topics=args.topics,
+        algorithms=args.algorithms,
+        workers=args.workers,
+        days_per_shard=args.days_per_shard,
+        state_file=args.state_file,
+        weighting_version=args.weighting_version
+    )
+    
+    print("")
+    if summary["failed"]:
+        print(f"⚠️  {len(summary['failed'])} shards failed, run the same command again to resume")
+    else:
+        print(f"✅ Backfilled {summary['shards']} shards ({summary['skipped']} resumed from a previous run)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Run VADER Backfill
+Scores every post without a VADER score, in parallel (e.g. after a lexicon change)
+
+Usage:
+    python utils/run_vader_backfill.py [--workers 8] [--page-size 50000] [--limit 1000000]
+"""
+import argparse
+from backend.src.jobs.vader_backfill import run_vader_backfill, DEFAULT_PAGE_SIZE
+from backend.src.services.sentiment.vader_analyzer import DEFAULT_CHUNK_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store VADER scores for posts that have none")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Posts committed per page")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Posts per worker task")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many posts")
+    args = parser.parse_args()
+    
+    print("🔄 Running VADER backfill...")
+    print("")
+    
+    summary = run_vader_backfill(
+        workers=args.workers,
+        page_size=args.page_size,
+        chunk_size=args.chunk_size,
+        limit=args.limit
+    )
+    
+    print("")
+    print(f"✅ Scored {summary['scored_posts']} posts in {summary['elapsed_seconds']:.1f}s "
+          f"({summary['posts_per_second']:.0f} posts/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -57,8 +57,10 @@ def print_stats(hours=24):
     print(f"   Total Calls: {stats['total_calls']}")
     print(f"   Successful: {stats['successful']} ({stats['success_rate']:.1f}%)")
     print(f"   Failed: {stats['failed']}")
+    print(f"   Cancelled: {stats['cancelled']} (not counted in the success rate)")
     print(f"   Total Cost: ${stats['total_cost_usd']:.6f}")
     print(f"   Avg Latency: {stats['avg_latency_ms']:.0f}ms")
+    print(f"   Hedged Calls: {stats['hedged_calls']} (cancelled hedge cost: ${stats['hedge_cost_usd']:.6f})")
 
 
 def print_expensive_calls(limit=5):